@@ -16,8 +16,8 @@ D({-1: 0.25, 0: 0.5, 1: 0.25})
 >>> D3values.draw()
 0
 >>> D3values.draw_nparray(20)
-array([ 0,  0,  0,  0,  0,  0,  1,  1,  0,  1,  0,  0,  1, -1, -1, -1,  1,
-        1,  1,  1])
+array([ 1,  0,  0,  0,  0,  0,  1,  0,  0,  1,  0,  0,  0, -1, -1, -1,  1,
+        1,  1,  0])
 
 - Another example, with heavy tail:
 
@@ -30,9 +30,20 @@ D({-1e+03: 0.001, 0: 0.5, 1: 0.25, 2: 0.25, 1e+03: 0.001})
 Examples of sampling from an arm:
 
 >>> D5values.draw()
-2
+1
 >>> D5values.draw_nparray(20)
-array([0, 2, 0, 1, 0, 2, 1, 0, 0, 2, 0, 1, 0, 1, 1, 1, 2, 1, 0, 0])
+array([1, 1, 0, 2, 0, 2, 0, 1, 0, 1, 1, 0, 0, 2, 2, 2, 2, 1, 0, 1])
+
+- The frequencies of the samples follow the distribution (chi-square test):
+
+>>> from scipy.stats import chisquare
+>>> D200values = DiscreteArm({v: p for v, p in enumerate(np.random.dirichlet(np.ones(200)))})
+>>> samples = D200values.draw_nparray(200000)
+>>> chisquare(np.bincount(samples, minlength=200), 200000 * D200values._probabilities).pvalue > 0.01
+True
+>>> samples = np.array([D200values.draw() for _ in range(200000)])
+>>> chisquare(np.bincount(samples, minlength=200), 200000 * D200values._probabilities).pvalue > 0.01
+True
 """
 from __future__ import division, print_function  # Python 2 compatibility
 
@@ -40,7 +51,7 @@ __author__ = "Lilian Besson"
 __version__ = "0.9"
 
 import numpy as np
-from numpy.random import choice
+from numpy.random import random_sample
 
 # Local imports
 try:
@@ -51,8 +62,39 @@ except ImportError:
     from kullback import klBern
 
 
+def alias_table(probabilities):
+    """ Compute the alias table of Walker & Vose for this discrete distribution, to sample from it in :math:`\mathcal{O}(1)`.
+
+    - Return ``(threshold, alias)``, two arrays of size ``n``: to sample, draw a uniform ``x`` in :math:`[0, n)`, and return ``i = floor(x)`` if ``x - i < threshold[i]``, or ``alias[i]`` otherwise,
+    - it is computed in :math:`\mathcal{O}(n)` time, see `Keith Schwarz's "Darts, Dice, and Coins" <http://www.keithschwarz.com/darts-dice-coins/>`_.
+
+    >>> threshold, alias = alias_table([0.25, 0.5, 0.25])
+    >>> threshold
+    array([0.75, 1.  , 0.75])
+    >>> alias
+    array([1, 1, 1])
+    """
+    n = len(probabilities)
+    scaled = np.asarray(probabilities, dtype=float) * n
+    threshold = np.ones(n)
+    alias = np.arange(n)
+    small = [i for i in range(n) if scaled[i] < 1]
+    large = [i for i in range(n) if scaled[i] >= 1]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        threshold[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1 - scaled[less]
+        (small if scaled[more] < 1 else large).append(more)
+    # the remaining ones have a probability of 1 (up to rounding errors)
+    return threshold, alias
+
+
 class DiscreteArm(Arm):
-    """ DiscreteArm distributed arm."""
+    """ DiscreteArm distributed arm.
+
+    - The samples are drawn with the alias method (see :func:`alias_table`), computed once: one uniform random number gives one sample.
+    """
 
     def __init__(self, values_to_proba):
         """New arm."""
@@ -70,16 +112,21 @@ class DiscreteArm(Arm):
         self._amplitude = max(self._values) - self._lower
         self.mean = sum(v * p for v, p in self._items)  #: Mean for this DiscreteArm arm
         self.size = len(self._values)  #: Number of different values in this DiscreteArm arm
+        self._threshold, self._alias = alias_table(self._probabilities)
 
     # --- Random samples
 
     def draw(self, t=None):
         """ Draw one random sample."""
-        return choice(self._values, p=self._probabilities)
+        x = random_sample() * self.size
+        i = min(int(x), self.size - 1)
+        return self._values[i] if x - i < self._threshold[i] else self._values[self._alias[i]]
 
     def draw_nparray(self, shape=(1,)):
         """ Draw a numpy array of random samples, of a certain shape."""
-        return np.asarray(choice(self._values, p=self._probabilities, replace=True, size=shape))
+        x = random_sample(shape) * self.size
+        i = np.minimum(x.astype(int), self.size - 1)
+        return self._values[np.where(x - i < self._threshold[i], i, self._alias[i])]
 
     # --- Printing
 
@@ -14,20 +14,19 @@ Example of creating an arm:
 Examples of sampling from an arm:
 
 >>> Gamma03.draw()  # doctest: +ELLIPSIS
-0.079...
+0.135...
 >>> Gamma03.draw_nparray(20)  # doctest: +ELLIPSIS,+NORMALIZE_WHITESPACE
-array([1.35...e-01, 1.84...e-01, 5.71...e-02, 6.36...e-02,
-       4.94...e-01, 1.51...e-01, 1.48...e-04, 2.25...e-06,
-       4.56...e-01, 1.00...e+00, 7.59...e-02, 8.12...e-04,
-       1.54...e-03, 1.14...e-01, 1.18...e-02, 7.30...e-02,
-       1.76...e-06, 1.94...e-01, 1.00...e+00, 3.30...e-02])
+array([1.84...e-01, 5.71...e-02, 6.36...e-02, 4.94...e-01,
+       1.51...e-01, 1.48...e-04, 2.25...e-06, 4.56...e-01,
+       1.00...e+00, 7.59...e-02, 8.12...e-04, 1.54...e-03,
+       1.14...e-01, 1.18...e-02, 7.30...e-02, 1.76...e-06,
+       1.94...e-01, 1.00...e+00, 3.30...e-02, 2.58...e-01])
 """
 from __future__ import division, print_function  # Python 2 compatibility
 
 __author__ = "Lilian Besson"
 __version__ = "0.6"
 
-from random import gammavariate
 from numpy.random import gamma
 import numpy as np
 
@@ -66,12 +65,13 @@ class Gamma(Arm):
     # --- Random samples
 
     def draw(self, t=None):
-        """ Draw one random sample. The parameter t is ignored in this Arm."""
-        return min(max(gammavariate(self.shape, self.scale), self.min), self.max)
+        """ Draw one random sample, with :meth:`draw_nparray` (the samples are drawn by blocks by :meth:`Environment.MAB.MAB.draw`). The parameter t is ignored in this Arm."""
+        return self.draw_nparray((1,)).item()
 
     def draw_nparray(self, shape=(1,)):
-        """ Draw a numpy array of random samples, of a certain shape."""
-        return np.minimum(np.maximum(gamma(self.shape, self.scale, size=shape), self.min), self.max)
+        """ Draw a numpy array of random samples, of a certain shape, truncated to [min, max] in place (the samples out of the interval are set to its bounds)."""
+        samples = gamma(self.shape, self.scale, size=shape)
+        return np.clip(samples, self.min, self.max, out=samples)
 
     # --- Printing
 
@@ -14,19 +14,18 @@ N(0.3, 0.05)
 Examples of sampling from an arm:
 
 >>> Gauss03.draw()  # doctest: +ELLIPSIS
-0.3470...
+0.3882...
 >>> Gauss03.draw_nparray(20)  # doctest: +ELLIPSIS,+NORMALIZE_WHITESPACE
-array([0.388..., 0.320..., 0.348... , 0.412..., 0.393... ,
-       0.251..., 0.347..., 0.292..., 0.294..., 0.320...,
-       0.307..., 0.372..., 0.338..., 0.306..., 0.322...,
-       0.316..., 0.374..., 0.289..., 0.315..., 0.257...])
+array([0.320..., 0.348..., 0.412..., 0.393..., 0.251...,
+       0.347..., 0.292..., 0.294..., 0.320..., 0.307...,
+       0.372..., 0.338..., 0.306..., 0.322..., 0.316...,
+       0.374..., 0.289..., 0.315..., 0.257..., 0.172...])
 """
 from __future__ import division, print_function  # Python 2 compatibility
 
 __author__ = "Olivier Cappé, Aurélien Garivier, Lilian Besson"
 __version__ = "0.9"
 
-from random import gauss
 from numpy.random import standard_normal
 import numpy as np
 from scipy.special import erf
@@ -65,12 +64,15 @@ class Gaussian(Arm):
     # --- Random samples
 
     def draw(self, t=None):
-        """ Draw one random sample. The parameter t is ignored in this Arm."""
-        return min(max(gauss(self.mu, self.sigma), self.min), self.max)
+        """ Draw one random sample, with :meth:`draw_nparray` (the samples are drawn by blocks by :meth:`Environment.MAB.MAB.draw`). The parameter t is ignored in this Arm."""
+        return self.draw_nparray((1,)).item()
 
     def draw_nparray(self, shape=(1,)):
-        """ Draw a numpy array of random samples, of a certain shape."""
-        return np.minimum(np.maximum(self.mu + self.sigma * standard_normal(shape), self.min), self.max)
+        """ Draw a numpy array of random samples, of a certain shape, truncated to [min, max] in place (the samples out of the interval are set to its bounds)."""
+        samples = standard_normal(shape)
+        samples *= self.sigma
+        samples += self.mu
+        return np.clip(samples, self.min, self.max, out=samples)
 
     # --- Printing
 
@@ -178,12 +180,15 @@ class UnboundedGaussian(Gaussian):
     # --- Random samples
 
     def draw(self, t=None):
-        """ Draw one random sample. The parameter t is ignored in this Arm."""
-        return gauss(self.mu, self.sigma)
+        """ Draw one random sample, with :meth:`draw_nparray` (the samples are drawn by blocks by :meth:`Environment.MAB.MAB.draw`). The parameter t is ignored in this Arm."""
+        return self.draw_nparray((1,)).item()
 
     def draw_nparray(self, shape=(1,)):
         """ Draw a numpy array of random samples, of a certain shape."""
-        return self.mu + self.sigma * standard_normal(shape)
+        samples = standard_normal(shape)
+        samples *= self.sigma
+        samples += self.mu
+        return samples
 
     def __repr__(self):
         return "N({:.3g}, {:.3g})".format(self.mu, self.sigma)
@@ -20,6 +20,7 @@ Also contains:
 - :func:`uniformMeansWithSparsity`, to generate uniformly spaced means of arms, with sparsity constraints.
 - :func:`randomMeans`, to generate randomly spaced means of arms.
 - :func:`randomMeansWithGapBetweenMbestMworst`, to generate randomly spaced means of arms, with a constraint on the gap between the M-best arms and the (K-M)-worst arms.
+- :func:`randomMeansMatrix` and :func:`randomMeansWithGapBetweenMbestMworstMatrix`, their vectorized versions, to generate many vectors of means at once, and :func:`meansMatrix` to use them for any function generating means.
 - :func:`randomMeansWithSparsity`, to generate randomly spaced means of arms with sparsity constraint.
 - :func:`shuffled`, to return a shuffled version of a list.
 - Utility functions :func:`array_from_str` :func:`list_from_str` and :func:`tuple_from_str` to obtain a `numpy.ndarray`, a `list` or a `tuple` from a string (used for the CLI env variables interface).
@@ -161,42 +162,97 @@ def randomMeans(nbArms=3, mingap=None, lower=0., amplitude=1., isSorted=True):
     >>> randomMeans(nbArms=5, mingap=0.01, isSorted=False)  # doctest: +ELLIPSIS
     [0.419..., 0.932..., 0.072..., 0.755..., 0.650...]
     """
+    return list(randomMeansMatrix(nbDraws=1, nbArms=nbArms, mingap=mingap, lower=lower, amplitude=amplitude, isSorted=isSorted)[0])
+
+
+def randomMeansWithGapBetweenMbestMworst(nbArms=3, mingap=None, nbPlayers=2, lower=0., amplitude=1., isSorted=True):
+    """Return a list of means of arms, randomly sampled uniformly in [lower, lower + amplitude], with a min gap >= mingap between the set Mbest and Mworst.
+    """
+    return list(randomMeansWithGapBetweenMbestMworstMatrix(nbDraws=1, nbArms=nbArms, mingap=mingap, nbPlayers=nbPlayers, lower=lower, amplitude=amplitude, isSorted=isSorted)[0])
+
+
+def _rejectionSampling(nbDraws, nbArms, isRejected):
+    """Return a (nbDraws, nbArms) array of uniform samples in [0, 1], where the rows such that ``isRejected(rows)`` are drawn again until none is rejected.
+
+    - Only the rejected rows are drawn again, all at once, so a row is drawn exactly like with a loop ``while isRejected(row): row = np.random.rand(nbArms)`` (and with the same random stream if ``nbDraws=1``).
+    """
+    mus = np.random.rand(nbDraws, nbArms)
+    rejected = np.flatnonzero(isRejected(mus))
+    while len(rejected) > 0:
+        mus[rejected] = np.random.rand(len(rejected), nbArms)
+        rejected = rejected[isRejected(mus[rejected])]
+    return mus
+
+
+def _scaled(mus, lower=0., amplitude=1., isSorted=True):
+    """Scale the (nbDraws, nbArms) array of samples in [0, 1] to [lower, lower + amplitude], and sort or shuffle each row."""
+    if isSorted:
+        mus.sort(axis=1)
+    else:
+        for row in mus:
+            np.random.shuffle(row)  # Useless
+    return lower + (amplitude * mus)
+
+
+def randomMeansMatrix(nbDraws=1, nbArms=3, mingap=None, lower=0., amplitude=1., isSorted=True):
+    """Return a (nbDraws, nbArms) array of means of arms: each row is like a call to :func:`randomMeans`, but the rows are drawn at once, with a vectorized rejection of the rows with a too small gap.
+
+    >>> import numpy as np; np.random.seed(1234)  # reproducible results
+    >>> randomMeansMatrix(nbDraws=4, nbArms=3, mingap=0.05)  # doctest: +ELLIPSIS
+    array([[0.191..., 0.437..., 0.622...],
+           [0.013..., 0.503..., 0.561...],
+           [0.276..., 0.801..., 0.958...],
+           [0.357..., 0.500..., 0.875...]])
+    """
     assert nbArms >= 1, "Error: 'nbArms' = {} has to be >= 1.".format(nbArms)  # DEBUG
     assert amplitude > 0, "Error: 'amplitude' = {:.3g} has to be > 0.".format(amplitude)  # DEBUG
-    mus = np.random.rand(nbArms)
+    isRejected = lambda mus: np.zeros(len(mus), dtype=bool)
     if mingap is not None and mingap > 0:
         assert (nbArms * mingap) < (amplitude / 2.), "Error: 'mingap' = {:.3g} is too large, it might be impossible to find a vector of means with such a large gap for {} arms.".format(mingap, nbArms)  # DEBUG
-        # while len(set(mus)) == nbArms and np.min(np.abs(np.diff(mus))) <= mingap:  # Ensure a min gap > mingap
-        while np.min(np.abs(np.diff(mus))) <= mingap:  # Ensure a min gap > mingap
-            mus = np.random.rand(nbArms)
-    if isSorted:
-        return sorted(list(lower + (amplitude * mus)))
-    else:
-        np.random.shuffle(mus)  # Useless
-        return list(lower + (amplitude * mus))
+        isRejected = lambda mus: np.min(np.abs(np.diff(mus, axis=1)), axis=1) <= mingap  # Ensure a min gap > mingap
+    return _scaled(_rejectionSampling(nbDraws, nbArms, isRejected), lower=lower, amplitude=amplitude, isSorted=isSorted)
 
 
-def randomMeansWithGapBetweenMbestMworst(nbArms=3, mingap=None, nbPlayers=2, lower=0., amplitude=1., isSorted=True):
-    """Return a list of means of arms, randomly sampled uniformly in [lower, lower + amplitude], with a min gap >= mingap between the set Mbest and Mworst.
+def randomMeansWithGapBetweenMbestMworstMatrix(nbDraws=1, nbArms=3, mingap=None, nbPlayers=2, lower=0., amplitude=1., isSorted=True):
+    """Return a (nbDraws, nbArms) array of means of arms: each row is like a call to :func:`randomMeansWithGapBetweenMbestMworst`, but the rows are drawn at once, with a vectorized rejection of the rows with a too small gap.
+
+    >>> import numpy as np; np.random.seed(1234)  # reproducible results
+    >>> randomMeansWithGapBetweenMbestMworstMatrix(nbDraws=3, nbArms=4, mingap=0.1, nbPlayers=2)  # doctest: +ELLIPSIS
+    array([[0.191..., 0.437..., 0.622..., 0.785...],
+           [0.272..., 0.276..., 0.779..., 0.801...],
+           [0.357..., 0.500..., 0.875..., 0.958...]])
     """
     assert nbArms >= 1, "Error: 'nbArms' = {} has to be >= 1.".format(nbArms)  # DEBUG
     assert amplitude > 0, "Error: 'amplitude' = {:.3g} has to be > 0.".format(amplitude)  # DEBUG
-    mus = np.random.rand(nbArms)
+    isRejected = lambda mus: np.zeros(len(mus), dtype=bool)
     if mingap is not None and mingap > 0 and nbPlayers < nbArms:
         assert mingap < amplitude, "Error: 'mingap' = {:.3g} is too large, it might be impossible to find a vector of means with such a large gap for {} arms.".format(mingap, nbArms)  # DEBUG
-        def gap(mus):
-            sorted_mus = sorted(mus)
-            mu_Mbest = sorted_mus[-nbPlayers]
-            mu_Mworst = sorted_mus[-nbPlayers-1]
-            return mu_Mbest - mu_Mworst
-        # while len(set(mus)) == nbArms and gap(mus) <= mingap:  # Ensure a min gap > mingap
-        while gap(mus) <= mingap:  # Ensure a min gap > mingap
-            mus = np.random.rand(nbArms)
-    if isSorted:
-        return sorted(list(lower + (amplitude * mus)))
-    else:
-        np.random.shuffle(mus)  # Useless
-        return list(lower + (amplitude * mus))
+        def isRejected(mus):
+            sorted_mus = np.sort(mus, axis=1)
+            mu_Mbest = sorted_mus[:, -nbPlayers]
+            mu_Mworst = sorted_mus[:, -nbPlayers-1]
+            return mu_Mbest - mu_Mworst <= mingap  # Ensure a min gap > mingap
+    return _scaled(_rejectionSampling(nbDraws, nbArms, isRejected), lower=lower, amplitude=amplitude, isSorted=isSorted)
+
+
+def meansMatrix(newMeans, nbDraws=1, **args):
+    """Return a (nbDraws, nbArms) array of means of arms, each row being drawn by ``newMeans(**args)``.
+
+    - The rows are drawn at once with the vectorized version of ``newMeans``, if it is :func:`randomMeans` or :func:`randomMeansWithGapBetweenMbestMworst`, or else with nbDraws calls to ``newMeans(**args)``.
+
+    >>> import numpy as np; np.random.seed(1234)  # reproducible results
+    >>> meansMatrix(randomMeans, nbDraws=2, nbArms=3, mingap=0.05)  # doctest: +ELLIPSIS
+    array([[0.191..., 0.437..., 0.622...],
+           [0.276..., 0.801..., 0.958...]])
+    >>> meansMatrix(uniformMeans, nbDraws=2, nbArms=3)
+    array([[0.05, 0.5 , 0.95],
+           [0.05, 0.5 , 0.95]])
+    """
+    if newMeans is randomMeans:
+        return randomMeansMatrix(nbDraws=nbDraws, **args)
+    elif newMeans is randomMeansWithGapBetweenMbestMworst:
+        return randomMeansWithGapBetweenMbestMworstMatrix(nbDraws=nbDraws, **args)
+    return np.array([newMeans(**args) for _ in range(nbDraws)], dtype=float)
 
 
 def randomMeansWithSparsity(nbArms=10, sparsity=3, mingap=0.01, delta=0.05, lower=0., lowerNonZero=0.5, amplitude=1., isSorted=True):
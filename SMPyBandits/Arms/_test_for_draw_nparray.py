@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+""" Test and benchmark of the vectorized ``draw_nparray(shape)`` method of all the arms exported by :mod:`Arms`.
+
+For one instance of every arm class exported in ``Arms/__init__.py``, it checks that:
+
+- ``draw_nparray(shape)`` returns an array of the good shape, with samples in the support of the arm (given by its ``lower_amplitude``),
+- the empirical means of the samples of ``draw_nparray(shape)`` and of the scalar ``draw()`` are both close to ``arm.mean`` (the truncated arms set the samples out of their support to its bounds),
+
+and it reports the cost of one call to the scalar ``draw()`` (in µs) and of one sample of ``draw_nparray(shape)`` (in ns), so that the cached rewards and the batched simulations are never bottlenecked on the sampling of the arms.
+
+The script exits with status 1 if one arm fails the checks.
+
+$ cd SMPyBandits
+$ python Arms/_test_for_draw_nparray.py
+Arm                          support  mean   |  draw (µs)  draw_nparray (ns/sample)
+Constant(0.3)                True     True   |       0.07         0.7
+...
+All the 18 arms have a vectorized draw_nparray() method.
+"""
+from __future__ import division, print_function  # Python 2 compatibility
+
+__author__ = "Lilian Besson"
+__version__ = "0.9"
+
+import sys
+import timeit
+import numpy as np
+
+try:
+    from Arms import *
+except ImportError:
+    sys.path.insert(0, '.')
+    sys.path.insert(0, '..')
+    from Arms import *
+
+
+#: One instance of every arm class exported by :mod:`Arms`.
+#: The truncation happens with a non-negligible probability for the Poisson and Exponential arms, whose means are computed for it, but not for the Gaussian and Gamma arms, whose means ignore it.
+ARMS = [
+    Constant(0.3),
+    UniformArm(0, 1),
+    Bernoulli(0.3),
+    Binomial(0.3, 10),
+    DiscreteArm({0: 0.3, 0.5: 0.2, 1: 0.5}),
+    Poisson(2, trunc=5),
+    UnboundedPoisson(2),
+    Gaussian(0.3, 0.05),
+    Gaussian_0_1(0.5, 0.1),
+    Gaussian_m1_1(0.2),
+    Gaussian_m5_5(1),
+    UnboundedGaussian(0.3, 1),
+    Exponential(2),
+    ExponentialFromMean(0.3),
+    UnboundedExponential(2),
+    Gamma(2, 0.1),
+    GammaFromMean(0.3, scale=0.01),
+    UnboundedGamma(2, 0.1),
+]
+
+#: Number of samples used to check the empirical means.
+NB_SAMPLES = 200000
+
+#: Number of samples of one call to ``draw_nparray(shape)`` used to measure its cost.
+BLOCK_SIZE = 100000
+
+#: Number of calls used to measure the costs.
+NB_CALLS = 10
+
+#: Tolerance on the empirical means, in number of standard deviations of the samples.
+NB_STD = 5
+
+
+# --- Utility functions
+
+def check_support(arm, shape=(100, 30)):
+    """ Check that ``draw_nparray(shape)`` returns an array of the good shape, with samples in the support of the arm."""
+    samples = np.asarray(arm.draw_nparray(shape))
+    lower, amplitude = arm.lower_amplitude
+    upper = np.inf if np.isinf(amplitude) else lower + amplitude
+    return samples.shape == shape and np.all(lower <= samples) and np.all(samples <= upper)
+
+
+def check_mean(arm, nbSamples=NB_SAMPLES):
+    """ Check that the empirical means of the samples of ``draw_nparray(shape)`` and of the scalar ``draw()`` are close to ``arm.mean``."""
+    samples = np.asarray(arm.draw_nparray((nbSamples,)), dtype=float)
+    scalar = np.array([arm.draw() for _ in range(nbSamples // 10)], dtype=float)
+    tolerance = NB_STD * max(np.std(samples), 1e-9)
+    if abs(np.mean(samples) - arm.mean) > tolerance / np.sqrt(nbSamples):
+        print("  For {}, the empirical mean of draw_nparray() is {:.4g} and not {:.4g}".format(arm, np.mean(samples), arm.mean))  # DEBUG
+        return False
+    if abs(np.mean(scalar) - arm.mean) > tolerance / np.sqrt(len(scalar)):
+        print("  For {}, the empirical mean of draw() is {:.4g} and not {:.4g}".format(arm, np.mean(scalar), arm.mean))  # DEBUG
+        return False
+    return True
+
+
+def cost_of_draw(arm, nbCalls=NB_CALLS * 1000):
+    """ Measure the mean cost (in µs) of one call to the scalar ``draw()``."""
+    return 1e6 * timeit.timeit(arm.draw, number=nbCalls) / nbCalls
+
+
+def cost_of_draw_nparray(arm, blockSize=BLOCK_SIZE, nbCalls=NB_CALLS):
+    """ Measure the mean cost (in ns) of one sample of ``draw_nparray(shape)``, for blocks of ``blockSize`` samples."""
+    return 1e9 * timeit.timeit(lambda: arm.draw_nparray((blockSize,)), number=nbCalls) / (nbCalls * blockSize)
+
+
+# --- Main function
+
+def main(arms=ARMS):
+    """ Check and benchmark all the arms, print a report, and return the list of the arms failing the checks."""
+    failures = []
+    print("{:<28} {:<8} {:<6} | {:>10}  {}".format("Arm", "support", "mean", "draw (µs)", "draw_nparray (ns/sample)"))
+    for arm in arms:
+        try:
+            support = check_support(arm)
+            mean = check_mean(arm)
+            costs = cost_of_draw(arm), cost_of_draw_nparray(arm)
+        except Exception as e:
+            print("{!r:<28} failed with exception {!r}".format(arm, e))  # DEBUG
+            failures.append(arm)
+            continue
+        print("{!r:<28} {:<8} {:<6} | {:>10.2f}  {:>10.1f}".format(arm, str(support), str(mean), *costs))
+        if not (support and mean):
+            failures.append(arm)
+    if failures:
+        print("\nThe {} following arms fail the checks: {}".format(len(failures), failures))
+    else:
+        print("\nAll the {} arms have a vectorized draw_nparray() method.".format(len(arms)))
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
@@ -17,6 +17,11 @@ As far as now, there is 4 different collision models implemented:
 - :func:`onlyUniqUserGetsReward`: simple collision model, where only the players alone on one arm sample it and receive the reward (default).
 - :func:`rewardIsSharedUniformly`: in case of more than one player on one arm, only one player (uniform choice) can sample it and receive the reward.
 - :func:`closerUserGetsReward`: in case of more than one player on one arm, only the closer player can sample it and receive the reward. It can take, or create if not given, a random distance of each player to the base station (random number in [0, 1]).
+
+Each collision model has two phases:
+
+- the *resolution*, vectorized: the collisions and the rewards of all the players are computed from ``np.bincount(choices)`` and from the vector ``sensing`` of samples of all the arms, taken from a pre-drawn (K, block) matrix refilled by blocks (see :class:`SensingBlocks`),
+- the *dispatch*: the feedback is given to the players by batches (see :func:`dispatch_feedback`).
 """
 from __future__ import division, print_function  # Python 2 compatibility
 
@@ -36,9 +41,14 @@ except ImportError:
             return f
         return lru_cache_internal
 
+import inspect
 import numpy as np
 
 
+#: Default number of time steps of the blocks of sensing draws, see :class:`SensingBlocks`.
+SENSING_BLOCK_SIZE = 1000
+
+
 def handleCollision_or_getZeroReward(player, arm, lower=0):
     """ If the player has a method handleCollision, it is called, otherwise a reward of lower is given to the player for that arm.
     """
@@ -50,43 +60,158 @@ def handleCollision_or_getZeroReward(player, arm, lower=0):
         player.getReward(arm, lower)  # XXX Strong assumption on the model
 
 
-def onlyUniqUserGetsReward(t, arms, players, choices, rewards, pulls, collisions):
+# --- Resolution phase: sensing, and who gets a reward
+
+class SensingBlocks(object):
+    """ Pre-drawn sensing of all the arms, by blocks of ``blockSize`` time steps.
+
+    - A (K, blockSize) matrix of samples is drawn with one call to ``arm.draw_nparray((blockSize,))`` for each arm, and each call returns its next column,
+    - it is refilled when it is exhausted, or when the list of arms changes (e.g., at a change point of a non-stationary problem),
+    - if one arm does not implement ``draw_nparray``, the arms are sampled one by one at every step, as before.
+
+    >>> class Coin(object):  # like Arms.Bernoulli
+    ...     def __init__(self, p): self.p = p
+    ...     def draw_nparray(self, shape): return np.asarray(np.random.random_sample(shape) < self.p, dtype=float)
+    >>> np.random.seed(0)  # reproductible
+    >>> arms = [Coin(0.1), Coin(0.9)]
+    >>> sensing = SensingBlocks(arms, blockSize=4)
+    >>> np.array([sensing(t, arms) for t in range(6)])
+    array([[0., 1.],
+           [0., 1.],
+           [0., 1.],
+           [0., 1.],
+           [0., 1.],
+           [0., 0.]])
+    >>> arms = [Coin(1), Coin(0)]  # new arms, the block is drawn again
+    >>> sensing(6, arms)
+    array([1., 0.])
+    """
+
+    def __init__(self, arms, blockSize=SENSING_BLOCK_SIZE):
+        self.blockSize = int(blockSize)  #: Number of time steps in one block.
+        self.reset(arms)
+
+    def reset(self, arms):
+        """ Use this new list of arms, the next call will draw a new block."""
+        self.arms = arms  #: Current list of arms.
+        self.vectorized = True  #: False if one arm does not implement ``draw_nparray``.
+        self._block = None
+        self._column = self.blockSize
+
+    def _refill(self):
+        """ Draw a new (K, blockSize) block of samples."""
+        try:
+            self._block = np.array([arm.draw_nparray((self.blockSize,)) for arm in self.arms], dtype=float)
+        except NotImplementedError:
+            self.vectorized = False
+        self._column = 0
+
+    def __call__(self, t, arms=None):
+        """ Return the vector of sensing of the K arms at time t (of the arms given, if they changed)."""
+        if arms is not None and arms is not self.arms:
+            self.reset(arms)
+        if self._column >= self.blockSize:
+            self._refill()
+        if not self.vectorized:
+            return np.array([a.draw(t) for a in self.arms], dtype=float)
+        self._column += 1
+        return self._block[:, self._column - 1]
+
+
+def uses_sensing(collisionModel):
+    """ True if the collision model accepts a vector of pre-drawn sensing (keyword argument ``sensing``), see :class:`SensingBlocks`."""
+    try:
+        return 'sensing' in inspect.signature(collisionModel).parameters
+    except (AttributeError, ValueError, TypeError):  # Python 2, or not a function
+        return False
+
+
+def draw_sensing(t, arms):
+    """ Sense in all the arms, one by one (used if a collision model is called without pre-drawn sensing)."""
+    return np.array([a.draw(t) for a in arms], dtype=float)
+
+
+def independent_draws(t, arms, choices, sensing, nbPlayersOnArms):
+    """ Rewards of players who sample their arm independently: the first player on each arm observes its sensing, the other ones (only if they collide) draw a new sample."""
+    draws = sensing[choices]
+    if np.max(nbPlayersOnArms) > 1:
+        order = np.argsort(choices, kind='mergesort')
+        sortedChoices = choices[order]
+        for i in order[1:][sortedChoices[1:] == sortedChoices[:-1]]:
+            draws[i] = arms[choices[i]].draw(t)
+    return draws
+
+
+def unique_winners(choices, *priorities):
+    """ Boolean mask of the players who win their arm: the one with the largest priority on each chosen arm, uniformly at random among ties (priorities are compared in lexicographic order, the first one being the most important).
+
+    >>> np.random.seed(0)  # reproductible
+    >>> choices = np.array([0, 1, 0, 2, 1])
+    >>> unique_winners(choices, np.array([0.5, 0.1, 0.7, 0.3, 0.9]))
+    array([False, False,  True,  True,  True])
+    >>> [np.flatnonzero(unique_winners(choices)) for _ in range(3)]
+    [array([1, 2, 3]), array([0, 1, 3]), array([2, 3, 4])]
+    """
+    order = np.lexsort((np.random.random_sample(len(choices)),) + tuple(reversed(priorities)) + (choices,))
+    sortedChoices = choices[order]
+    isLast = np.ones(len(choices), dtype=bool)
+    isLast[:-1] = sortedChoices[1:] != sortedChoices[:-1]
+    winners = np.zeros(len(choices), dtype=bool)
+    winners[order[isLast]] = True
+    return winners
+
+
+# --- Dispatch phase: give the feedback to the players
+
+def dispatch_feedback(players, choices, rewards, received, collided, collisionRewards=None):
+    """ Give their feedback to all the players, in two batches:
+
+    - ``players[i].getReward(choices[i], rewards[i])`` for the players in the mask ``received``,
+    - ``players[i].handleCollision(choices[i], collisionRewards[i])`` for the players in the mask ``collided`` (or :func:`handleCollision_or_getZeroReward` if ``collisionRewards`` is None).
+    - If ``players`` has a method ``dispatch_feedback``, it receives the whole batch in one call.
+    """
+    if hasattr(players, 'dispatch_feedback'):
+        return players.dispatch_feedback(choices, rewards, received, collided, collisionRewards)
+    for i in np.flatnonzero(received):
+        players[i].getReward(choices[i], rewards[i])
+    if collisionRewards is None:
+        for i in np.flatnonzero(collided):
+            handleCollision_or_getZeroReward(players[i], choices[i])
+    else:
+        for i in np.flatnonzero(collided):
+            players[i].handleCollision(choices[i], collisionRewards[i])
+
+
+# --- Collision models
+
+def onlyUniqUserGetsReward(t, arms, players, choices, rewards, pulls, collisions, sensing=None):
     """ Simple collision model where only the players alone on one arm samples it and receives the reward.
 
     - This is the default collision model, cf. [[Multi-Player Bandits Revisited, Lilian Besson and Emilie Kaufmann, 2017]](https://hal.inria.fr/hal-01629733).
     - The numpy array 'choices' is increased according to the number of users who collided (it is NOT binary).
+    - ``sensing`` is the vector of samples of all the arms at time t (drawn here if not given, see :class:`SensingBlocks`).
     """
     # First, sense in all the arms
-    sensing = [a.draw(t) for a in arms]
-    # XXX Yes, I know, it's suboptimal to sample each arm even if no player chose it
-    # But a quick benchmark showed it was quicker than
-    # sensing = [a.draw(t) for i,a in enumerate(arms) if nbCollisions[i]>=0]
-
-    nbCollisions = np.bincount(choices, minlength=len(arms)) - 1
-    # print("onlyUniqUserGetsReward() at time t = {}, nbCollisions = {}.".format(t, nbCollisions))  # DEBUG
-
-    # if np.max(nbCollisions) >= 1:  # DEBUG
-    #     print("- onlyUniqUserGetsReward: some collisions on channels {} at time t = {} ...".format(np.nonzero(np.array(nbCollisions) >= 1)[0], t))  # DEBUG
-    for i, player in enumerate(players):  # Loop is needed because player is needed
-        # FIXED pulls counts the number of selection, not the number of successful selection!! HUGE BUG! See https://github.com/SMPyBandits/SMPyBandits/issues/33
-        pulls[i, choices[i]] += 1
-        if nbCollisions[choices[i]] < 1:  # No collision
-            player.getReward(choices[i], sensing[choices[i]])  # Observing *sensing*
-            rewards[i] = sensing[choices[i]]  # Storing actual rewards
-        else:
-            # print("  - 1 collision on channel {} : {} other users chose it at time t = {} ...".format(choices[i], nbCollisions[choices[i]], t))  # DEBUG
-            collisions[choices[i]] += 1  # Should be counted here, onlyUniqUserGetsReward
-            # handleCollision_or_getZeroReward(player, choices[i])  # NOPE
-            player.handleCollision(choices[i], sensing[choices[i]])  # Observing *sensing* but collision
-            # If learning is done on sensing, handleCollision uses this reward
-            # But if learning is done on ACK, handleCollision does not use this reward
+    if sensing is None:
+        sensing = draw_sensing(t, arms)
+    nbPlayersOnArms = np.bincount(choices, minlength=len(arms))
+    collided = nbPlayersOnArms[choices] > 1
+    received = ~collided
+    # FIXED pulls counts the number of selection, not the number of successful selection!! HUGE BUG! See https://github.com/SMPyBandits/SMPyBandits/issues/33
+    pulls[np.arange(len(choices)), choices] += 1
+    collisions += np.where(nbPlayersOnArms > 1, nbPlayersOnArms, 0)  # Should be counted here, onlyUniqUserGetsReward
+    rewards[received] = sensing[choices[received]]  # Storing actual rewards
+    # Colliding players observe *sensing* but collision
+    # If learning is done on sensing, handleCollision uses this reward
+    # But if learning is done on ACK, handleCollision does not use this reward
+    dispatch_feedback(players, choices, rewards, received, collided, collisionRewards=sensing[choices])
 
 
 # Default collision model to use
 defaultCollisionModel = onlyUniqUserGetsReward
 
 
-def onlyUniqUserGetsRewardSparse(t, arms, players, choices, rewards, pulls, collisions):
+def onlyUniqUserGetsRewardSparse(t, arms, players, choices, rewards, pulls, collisions, sensing=None):
     """ Simple collision model where only the players alone on one arm samples it and receives the reward.
 
     - This is the default collision model, cf. [[Multi-Player Bandits Revisited, Lilian Besson and Emilie Kaufmann, 2017]](https://hal.inria.fr/hal-01629733).
@@ -96,30 +221,20 @@ def onlyUniqUserGetsRewardSparse(t, arms, players, choices, rewards, pulls, coll
     # First, sense in all the arms
     # FIXME had support for problems with different means for each players?
     # see issue https://github.com/SMPyBandits/SMPyBandits/issues/185 and papers referenced therein
-    sensing = [a.draw(t) for a in arms]
-
-    nbCollisions = np.bincount(choices[choices >= 0], minlength=len(arms)) - 1
-    # print("onlyUniqUserGetsRewardSparse() at time t = {}, nbCollisions = {}.".format(t, nbCollisions))  # DEBUG
-
-    # if np.max(nbCollisions) >= 1:  # DEBUG
-    #     print("- onlyUniqUserGetsRewardSparse: some collisions on channels {} at time t = {} ...".format(np.nonzero(np.array(nbCollisions) >= 1)[0], t))  # DEBUG
-    for i, player in enumerate(players):  # Loop is needed because player is needed
-        # FIXED pulls counts the number of selection, not the number of successful selection!! HUGE BUG! See https://github.com/SMPyBandits/SMPyBandits/issues/33
-        if choices[i] >= 0:
-            pulls[i, choices[i]] += 1
-            if nbCollisions[choices[i]] < 1:  # No collision
-                player.getReward(choices[i], sensing[choices[i]])  # Observing *sensing*
-                rewards[i] = sensing[choices[i]]  # Storing actual rewards
-            else:
-                # print("  - 1 collision on channel {} : {} other users chose it at time t = {} ...".format(choices[i], nbCollisions[choices[i]], t))  # DEBUG
-                collisions[choices[i]] += 1  # Should be counted here, onlyUniqUserGetsRewardSparse
-                # handleCollision_or_getZeroReward(player, choices[i])  # NOPE
-                player.handleCollision(choices[i], sensing[choices[i]])  # Observing *sensing* but collision
-                # If learning is done on sensing, handleCollision uses this reward
-                # But if learning is done on ACK, handleCollision does not use this reward
-
-
-def allGetRewardsAndUseCollision(t, arms, players, choices, rewards, pulls, collisions):
+    if sensing is None:
+        sensing = draw_sensing(t, arms)
+    activated = choices >= 0
+    activatedChoices = np.where(activated, choices, 0)
+    nbPlayersOnArms = np.bincount(choices[activated], minlength=len(arms))
+    collided = activated & (nbPlayersOnArms[activatedChoices] > 1)
+    received = activated & ~collided
+    pulls[np.flatnonzero(activated), choices[activated]] += 1
+    collisions += np.where(nbPlayersOnArms > 1, nbPlayersOnArms, 0)  # Should be counted here, onlyUniqUserGetsRewardSparse
+    rewards[received] = sensing[choices[received]]  # Storing actual rewards
+    dispatch_feedback(players, choices, rewards, received, collided, collisionRewards=sensing[activatedChoices])
+
+
+def allGetRewardsAndUseCollision(t, arms, players, choices, rewards, pulls, collisions, sensing=None):
     """ A variant of the first simple collision model where all players sample their arm, receive their rewards, and are informed of the collisions.
 
 
@@ -128,37 +243,31 @@ def allGetRewardsAndUseCollision(t, arms, players, choices, rewards, pulls, coll
     - This is the NOT default collision model, cf. [Liu & Zhao, 2009](https://arxiv.org/abs/0910.2065v3) collision model 1.
     - The numpy array 'choices' is increased according to the number of users who collided (it is NOT binary).
     """
-    nbCollisions = np.bincount(choices, minlength=len(arms)) - 1  # XXX this is faster!
-    # print("allGetRewardsAndUseCollision() at time t = {}, nbCollisions = {}.".format(t, nbCollisions))  # DEBUG
-    # if np.max(nbCollisions) >= 1:  # DEBUG
-    #     print("- allGetRewardsAndUseCollision: some collisions on channels {} at time t = {} ...".format(np.nonzero(np.array(nbCollisions) >= 1)[0], t))  # DEBUG
-    for i, player in enumerate(players):  # Loop is needed because player is needed
-        # FIXED pulls counts the number of selection, not the number of successful selection!! HUGE BUG! See https://github.com/SMPyBandits/SMPyBandits/issues/33
-        pulls[i, choices[i]] += 1
+    if sensing is None:
+        sensing = draw_sensing(t, arms)
+    nbPlayersOnArms = np.bincount(choices, minlength=len(arms))
+    collided = nbPlayersOnArms[choices] > 1
+    pulls[np.arange(len(choices)), choices] += 1
+    collisions += np.where(nbPlayersOnArms > 1, nbPlayersOnArms, 0)  # Should be counted here, allGetRewardsAndUseCollision
+    rewards[:] = independent_draws(t, arms, choices, sensing, nbPlayersOnArms)
+    dispatch_feedback(players, choices, rewards, np.ones(len(choices), dtype=bool), collided, collisionRewards=rewards)  # FIXED
 
-        rewards[i] = arms[choices[i]].draw(t)
-        player.getReward(choices[i], rewards[i])
 
-        if nbCollisions[choices[i]] >= 1:  # If collision
-            # print("  - 1 collision on channel {} : {} other users chose it at time t = {} ...".format(choices[i], nbCollisions[choices[i]], t))  # DEBUG
-            collisions[choices[i]] += 1  # Should be counted here, allGetRewardsAndUseCollision
-            player.handleCollision(choices[i], rewards[i])  # FIXED
-
-
-def noCollision(t, arms, players, choices, rewards, pulls, collisions):
+def noCollision(t, arms, players, choices, rewards, pulls, collisions, sensing=None):
     """ Simple collision model where all players sample it and receive the reward.
 
     - It corresponds to the single-player simulation: each player is a policy, compared without collision.
     - The numpy array 'collisions' is not modified.
     """
-    for i, player in enumerate(players):
-        rewards[i] = arms[choices[i]].draw(t)
-        player.getReward(choices[i], rewards[i])
-        pulls[i, choices[i]] += 1
-        # collisions[choices[i]] += 0  # that's the idea, but useless to do it
+    if sensing is None:
+        sensing = draw_sensing(t, arms)
+    pulls[np.arange(len(choices)), choices] += 1
+    # collisions[choices[i]] += 0  # that's the idea, but useless to do it
+    rewards[:] = independent_draws(t, arms, choices, sensing, np.bincount(choices, minlength=len(arms)))
+    dispatch_feedback(players, choices, rewards, np.ones(len(choices), dtype=bool), np.zeros(len(choices), dtype=bool))
 
 
-def rewardIsSharedUniformly(t, arms, players, choices, rewards, pulls, collisions):
+def rewardIsSharedUniformly(t, arms, players, choices, rewards, pulls, collisions, sensing=None):
     """ Less simple collision model where:
 
     - The players alone on one arm sample it and receive the reward.
@@ -168,23 +277,15 @@ def rewardIsSharedUniformly(t, arms, players, choices, rewards, pulls, collision
     .. Note:: it can also model a choice from the users point of view: in a time frame (eg. 1 second), when there is a collision, each colliding user chose (uniformly) a random small time offset (eg. 20 ms), and start sensing + emitting again after that time. The first one to sense is alone, it transmits, and the next ones find the channel used when sensing. So only one player is transmitting, and from the base station point of view, it is the same as if it was chosen uniformly among the colliding users.
 
     """
-    # For each arm, explore who chose it
-    for armId, arm in enumerate(arms):
-        # If he is alone, sure to be chosen, otherwise only one get randomly chosen
-        players_who_chose_it = np.nonzero(choices == armId)[0]
-        # print("players_who_chose_it =", players_who_chose_it)  # DEBUG
-        # print("np.shape(players_who_chose_it) =", np.shape(players_who_chose_it))  # DEBUG
-        # if len(players_who_chose_it) > 1:  # DEBUG
-        #     print("- rewardIsSharedUniformly: for arm {}, {} users won't have a reward at time t = {} ...".format(armId, len(players_who_chose_it) - 1, t))  # DEBUG
-        if np.size(players_who_chose_it) > 0:
-            collisions[armId] += np.size(players_who_chose_it) - 1   # Increase nb of collisions for nb of player who chose it, minus 1 (eg, if 1 then no collision, if 2 then one collision)
-            i = np.random.choice(players_who_chose_it)
-            rewards[i] = arm.draw(t)
-            players[i].getReward(armId, rewards[i])
-            pulls[i, armId] += 1
-            for j in players_who_chose_it:
-                if i != j:
-                    handleCollision_or_getZeroReward(players[j], armId)
+    if sensing is None:
+        sensing = draw_sensing(t, arms)
+    # If he is alone, sure to be chosen, otherwise only one get randomly chosen
+    winners = unique_winners(choices)
+    nbPlayersOnArms = np.bincount(choices, minlength=len(arms))
+    collisions += np.maximum(0, nbPlayersOnArms - 1)   # Increase nb of collisions for nb of player who chose it, minus 1 (eg, if 1 then no collision, if 2 then one collision)
+    pulls[np.flatnonzero(winners), choices[winners]] += 1
+    rewards[winners] = sensing[choices[winners]]
+    dispatch_feedback(players, choices, rewards, winners, ~winners)
 
 
 # XXX Using a cache to not regenerate a random vector of distances. Siooooux!
@@ -196,7 +297,7 @@ def random_distances(nbPlayers):
     return distances
 
 
-def closerUserGetsReward(t, arms, players, choices, rewards, pulls, collisions, distances='uniform'):
+def closerUserGetsReward(t, arms, players, choices, rewards, pulls, collisions, distances='uniform', sensing=None):
     """ Simple collision model where:
 
     - The players alone on one arm sample it and receive the reward.
@@ -209,32 +310,16 @@ def closerUserGetsReward(t, arms, players, choices, rewards, pulls, collisions,
         distances = np.linspace(0, 1, len(players) + 1, endpoint=False)[1:]
     elif isinstance(distances, str) and distances == 'random':  # Or fully uniform
         distances = random_distances(len(players))
-    # For each arm, explore who chose it
-    for armId, arm in enumerate(arms):
-        # If he is alone, sure to be chosen, otherwise only the closest one can sample
-        players_who_chose_it = np.nonzero(choices == armId)[0]
-        # print("players_who_chose_it =", players_who_chose_it)  # DEBUG
-        # if np.size(players_who_chose_it) > 1:  # DEBUG
-        #     print("- rewardIsSharedUniformly: for arm {}, {} users won't have a reward at time t = {} ...".format(armId, np.size(players_who_chose_it) - 1, t))  # DEBUG
-        if np.size(players_who_chose_it) > 0:
-            collisions[armId] += np.size(players_who_chose_it) - 1   # Increase nb of collisions for nb of player who chose it, minus 1 (eg, if 1 then no collision, if 2 then one collision as the closest gets it)
-            distancesChosen = distances[players_who_chose_it]
-            smaller_distance = np.min(distancesChosen)
-            # print("Using distances to chose the user who can pull arm {} : only users at the minimal distance = {} can transmit ...".format(armId, smaller_distance))  # DEBUG
-            if np.count_nonzero(distancesChosen == smaller_distance) == 1:
-                i = players_who_chose_it[np.argmin(distancesChosen)]
-                # print("Only one user is at minimal distance, of index i =", i)  # DEBUG
-            else:   # XXX very low probability, if the distances are randomly chosen
-                i = players_who_chose_it[np.random.choice(np.nonzero(distancesChosen == smaller_distance))]
-                print("  Randomly choosing one user at minimal distance = {:.4g}, among {}... Index i = {} was chose !".format(smaller_distance, np.count_nonzero(distancesChosen == smaller_distance), i + 1))  # DEBUG
-            # Player i can pull the armId
-            rewards[i] = arm.draw(t)
-            players[i].getReward(armId, rewards[i])
-            pulls[i, armId] += 1
-            for j in players_who_chose_it:
-                # The other players cannot
-                if i != j:
-                    handleCollision_or_getZeroReward(players[j], armId)
+    if sensing is None:
+        sensing = draw_sensing(t, arms)
+    # If he is alone, sure to be chosen, otherwise only the closest one can sample (uniformly among the closest ones, with a very low probability if the distances are randomly chosen)
+    winners = unique_winners(choices, -np.asarray(distances))
+    nbPlayersOnArms = np.bincount(choices, minlength=len(arms))
+    collisions += np.maximum(0, nbPlayersOnArms - 1)   # Increase nb of collisions for nb of player who chose it, minus 1 (eg, if 1 then no collision, if 2 then one collision as the closest gets it)
+    pulls[np.flatnonzero(winners), choices[winners]] += 1
+    rewards[winners] = sensing[choices[winners]]
+    # The other players cannot
+    dispatch_feedback(players, choices, rewards, winners, ~winners)
 
 
 #: List of possible collision models
@@ -274,5 +359,17 @@ __all__ = [
     "rewardIsSharedUniformly",
     "defaultCollisionModel",
     "collision_models",
-    "full_lost_if_collision"
+    "full_lost_if_collision",
+    "SensingBlocks",
+    "SENSING_BLOCK_SIZE",
+    "uses_sensing",
 ]
+
+
+# --- Debugging
+
+if __name__ == "__main__":
+    # Code for debugging purposes.
+    from doctest import testmod
+    print("\nTesting automatically all the docstring written in each functions of this module :")
+    testmod(verbose=True)
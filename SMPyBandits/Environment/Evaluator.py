@@ -34,7 +34,7 @@ try:
     from .plotsettings import BBOX_INCHES, signature, maximizeWindow, palette, makemarkers, add_percent_formatter, legend, show_and_save, nrows_ncols, violin_or_box_plot, adjust_xticks_subplots, table_to_latex
     from .sortedDistance import weightedDistance, manhattan, kendalltau, spearmanr, gestalt, meanDistance, sortedDistance
     # Local imports, objects and functions
-    from .MAB import MAB, MarkovianMAB, ChangingAtEachRepMAB, NonStationaryMAB, PieceWiseStationaryMAB, IncreasingMAB
+    from .MAB import MAB, MarkovianMAB, ChangingAtEachRepMAB, NonStationaryMAB, PieceWiseStationaryMAB, IncreasingMAB, ReplayMAB, DRAW_BLOCK_SIZE
     from .Result import Result
     from .memory_consumption import getCurrentMemory, sizeof_fmt
 except ImportError:
@@ -45,7 +45,7 @@ except ImportError:
     from plotsettings import BBOX_INCHES, signature, maximizeWindow, palette, makemarkers, add_percent_formatter, legend, show_and_save, nrows_ncols, violin_or_box_plot, adjust_xticks_subplots, table_to_latex
     from sortedDistance import weightedDistance, manhattan, kendalltau, spearmanr, gestalt, meanDistance, sortedDistance
     # Local imports, objects and functions
-    from MAB import MAB, MarkovianMAB, ChangingAtEachRepMAB, NonStationaryMAB, PieceWiseStationaryMAB, IncreasingMAB
+    from MAB import MAB, MarkovianMAB, ChangingAtEachRepMAB, NonStationaryMAB, PieceWiseStationaryMAB, IncreasingMAB, ReplayMAB, DRAW_BLOCK_SIZE
     from Result import Result
     from memory_consumption import getCurrentMemory, sizeof_fmt
 
@@ -105,6 +105,7 @@ class Evaluator(object):
         self.useJoblibForPolicies = useJoblibForPolicies  #: Use joblib to parallelize for loop on policies (useless)
         self.useJoblib = USE_JOBLIB and self.cfg['n_jobs'] != 1  #: Use joblib to parallelize for loop on repetitions (useful)
         self.cache_rewards = self.cfg.get('cache_rewards', False)  #: Should we cache and precompute rewards
+        self.draw_block_size = self.cfg.get('draw_block_size', DRAW_BLOCK_SIZE)  #: Number of samples of each arm drawn at once by the environments, see :meth:`MAB.MAB.draw` (can be overwritten by a key ``'draw_block_size'`` of one environment)
         self.environment_bayesian = self.cfg.get('environment_bayesian', False)  #: Is the environment Bayesian?
         self.showplot = self.cfg.get('showplot', True)  #: Show the plot (interactive display or not)
         self.use_box_plot = USE_BOX_PLOT or (self.repetitions == 1)  #: To use box plot (or violin plot if False). Force to use boxplot if repetitions=1.
@@ -116,6 +117,7 @@ class Evaluator(object):
         self.envs = []  #: List of environments
         self.policies = []  #: List of policies
         self.__initEnvironments__()
+        assert not (self.cache_rewards and any(isinstance(env, ReplayMAB) for env in self.envs)), "Error: the rewards of a ReplayMAB are read from its log at each time step, they cannot be cached (the cached rewards would be drawn from its 'steadyArm' arms): use 'cache_rewards': False."  # DEBUG
 
         # Update signature for non stationary problems
         if self.nb_break_points > 1:
@@ -184,11 +186,17 @@ class Evaluator(object):
                 elif configuration_arms["arm_type"] == "Markovian" \
                     and "transitions" in configuration_arms["params"]:
                     new_mab_problem = MarkovianMAB(configuration_arms)
+                # ReplayMAB
+                elif configuration_arms["arm_type"] == "Replay" \
+                    and ("filename" in configuration_arms["params"] or "rewards" in configuration_arms["params"]):
+                    new_mab_problem = ReplayMAB(configuration_arms)
                 # IncreasingMAB
                 elif "change_lower_amplitude" in configuration_arms:
                     new_mab_problem = IncreasingMAB(configuration_arms)
             if new_mab_problem is None:
                 new_mab_problem = MAB(configuration_arms)
+            if not (isinstance(configuration_arms, dict) and "draw_block_size" in configuration_arms):
+                new_mab_problem.reset_draw_buffers(self.draw_block_size)
             self.envs.append(new_mab_problem)
 
     def __initPolicies__(self, env):
@@ -235,6 +243,9 @@ class Evaluator(object):
         print("\n\nEvaluating environment:", repr(env))
         self.policies = []
         self.__initPolicies__(env)
+        # Draw at once the means of all the repetitions of a Bayesian problem, the same for all the policies
+        if isinstance(env, ChangingAtEachRepMAB):
+            env.newMeansOfRepetitions(self.repetitions)
         # Precompute rewards
         if self.cache_rewards:
             allrewards = self.compute_cache_rewards(env.arms)
@@ -253,7 +264,7 @@ class Evaluator(object):
                 self.minCumRewards[policyId, envId, :] = np.minimum(self.minCumRewards[policyId, envId, :], np.cumsum(r.rewards)) if repeatId > 1 else np.cumsum(r.rewards)
             if hasattr(self, 'maxCumRewards'):
                 self.maxCumRewards[policyId, envId, :] = np.maximum(self.maxCumRewards[policyId, envId, :], np.cumsum(r.rewards)) if repeatId > 1 else np.cumsum(r.rewards)
-            self.bestArmPulls[envId][policyId, :] += np.cumsum(np.in1d(r.choices, r.indexes_bestarm))
+            self.bestArmPulls[envId][policyId, :] += np.cumsum(r.choices_of_bestarm())
             self.pulls[envId][policyId, :] += r.pulls
             if self.moreAccurate: self.allPulls[envId][policyId, :, :] += np.array([1 * (r.choices == armId) for armId in range(env.nbArms)])  # XXX consumes a lot of zeros but it is not so costly
             self.memoryConsumption[envId][policyId, repeatId] = r.memory_consumption
@@ -388,11 +399,12 @@ class Evaluator(object):
     def getAverageWeightedSelections(self, policyId, envId=0):
         """Extract weighted count of selections."""
         weighted_selections = np.zeros(self.horizon)
+        # DONE this is now fixed for non-stationary bandits
+        allMeans = self.envs[envId].get_allMeans(horizon=self.horizon) if hasattr(self.envs[envId], 'get_allMeans') else None
         for armId in range(self.envs[envId].nbArms):
             mean_selections = self.allPulls[envId][policyId, armId, :] / float(self.repetitions)
-            # DONE this is now fixed for non-stationary bandits
-            if hasattr(self.envs[envId], 'get_allMeans'):
-                meanOfThisArm = self.envs[envId].get_allMeans(horizon=self.horizon)[armId, :]
+            if allMeans is not None:
+                meanOfThisArm = allMeans[armId, :]
             else:
                 meanOfThisArm = self.envs[envId].means[armId]
             weighted_selections += meanOfThisArm * mean_selections
@@ -423,14 +435,15 @@ class Evaluator(object):
 
     def getLastRegrets_LessAccurate(self, policyId, envId=0):
         """Extract last regrets, based on accumulated rewards."""
-        return np.sum(self.envs[envId].get_maxArm(self.horizon)) - self.lastCumRewards[policyId, envId, :]
+        return self.envs[envId].sum_maxArms(M=1, horizon=self.horizon) - self.lastCumRewards[policyId, envId, :]
 
     def getAllLastWeightedSelections(self, policyId, envId=0):
         """Extract weighted count of selections."""
         all_last_weighted_selections = np.zeros(self.repetitions)
+        allMeans = self.envs[envId].get_allMeans(horizon=self.horizon) if hasattr(self.envs[envId], 'get_allMeans') else None
         for armId in range(self.envs[envId].nbArms):
-            if hasattr(self.envs[envId], 'get_allMeans'):
-                meanOfThisArm = self.envs[envId].get_allMeans(horizon=self.horizon)[armId, :]
+            if allMeans is not None:
+                meanOfThisArm = allMeans[armId, :]
                 # DONE this is now fixed for non-stationary bandits
             else:
                 meanOfThisArm = self.envs[envId].means[armId]
@@ -449,7 +462,7 @@ class Evaluator(object):
 
     def getLastRegrets_MoreAccurate(self, policyId, envId=0):
         """Extract last regrets, based on counts of selections and not actual rewards."""
-        return np.sum(self.envs[envId].get_maxArm(self.horizon)) - self.getAllLastWeightedSelections(policyId, envId=envId)
+        return self.envs[envId].sum_maxArms(M=1, horizon=self.horizon) - self.getAllLastWeightedSelections(policyId, envId=envId)
 
     def getLastRegrets(self, policyId, envId=0, moreAccurate=None):
         """Using either the more accurate or the less accurate regret count."""
@@ -622,9 +635,9 @@ class Evaluator(object):
         # Get a small string to add to ylabel
         ylabel2 = r"%s%s" % (r", $\pm 1$ standard deviation" if (plotSTD and not plotMaxMin) else "", r", $\pm 1$ amplitude" if (plotMaxMin and not plotSTD) else "")
         if meanReward:
-            if hasattr(self.envs[envId], 'get_allMeans'):
+            if hasattr(self.envs[envId], 'get_segments'):
                 # DONE this is now fixed for non-stationary bandits
-                means = self.envs[envId].get_allMeans(horizon=self.horizon)
+                _, _, means = self.envs[envId].get_segments(horizon=self.horizon)
                 minArm, maxArm = np.min(means), np.max(means)
             else:
                 minArm, maxArm = self.envs[envId].minArm, self.envs[envId].maxArm
@@ -955,7 +968,9 @@ def delayed_play(env, policy, horizon,
     env = deepcopy(env)
     policy = deepcopy(policy)
     means = env.means
-    if env.isChangingAtEachRepetition:
+    if isinstance(env, ChangingAtEachRepMAB):
+        means = env.newRandomArms(repeatId=repeatId)
+    elif env.isChangingAtEachRepetition:
         means = env.newRandomArms()
     indexes_bestarm = np.nonzero(np.isclose(means, max(means)))[0]
 
@@ -979,7 +994,9 @@ def delayed_play(env, policy, horizon,
         random_shuffle = False
         random_invert = False
     if nb_break_points > 0:
-        t_events = [i * int(horizon / float(nb_break_points)) for i in range(nb_break_points)]
+        t_events = {i * int(horizon / float(nb_break_points)) for i in range(nb_break_points)}
+    # Next time step where the means of the arms change
+    nextChangePoint = env.nextChangePoint(0) if env.isDynamic else float('inf')
 
     prettyRange = tqdm(range(horizon), desc="Time t") if repeatId == 0 else range(horizon)
     for t in prettyRange:
@@ -998,12 +1015,12 @@ def delayed_play(env, policy, horizon,
         # 4. Finally we store the results
         result.store(t, choice, reward)
 
-        if env.isDynamic:
-            if t in env.changePoints:
-                means = env.newRandomArms(t)
-                indexes_bestarm = np.nonzero(np.isclose(means, np.max(means)))[0]
-                result.change_in_arms(t, indexes_bestarm)
-                if repeatId == 0: print("\nNew means vector = {}, best arm(s) = {}, at time t = {} ...".format(means, indexes_bestarm, t))  # DEBUG
+        if t == nextChangePoint:
+            means = env.newRandomArms(t)
+            indexes_bestarm = np.nonzero(np.isclose(means, np.max(means)))[0]
+            result.change_in_arms(t, indexes_bestarm)
+            if repeatId == 0: print("\nNew means vector = {}, best arm(s) = {}, at time t = {} ...".format(means, indexes_bestarm, t))  # DEBUG
+            nextChangePoint = env.nextChangePoint(t + 1)
 
         # XXX remove these two special cases when the NonStationaryMAB is ready?
         # XXX regret is not correct when displayed for these two guys…
@@ -12,6 +12,7 @@ import sys
 import pickle
 USE_PICKLE = False   #: Should we save the figure objects to a .pickle file at the end of the simulation?
 from copy import deepcopy
+from multiprocessing import cpu_count
 from re import search
 import random
 import time
@@ -34,11 +35,11 @@ try:
     # Local imports, tools and config
     from .plotsettings import BBOX_INCHES, signature, maximizeWindow, palette, makemarkers, add_percent_formatter, wraptext, wraplatex, legend, show_and_save, nrows_ncols, addTextForWorstCases, violin_or_box_plot, adjust_xticks_subplots
     from .sortedDistance import weightedDistance, manhattan, kendalltau, spearmanr, gestalt, meanDistance, sortedDistance
-    from .fairnessMeasures import amplitude_fairness, std_fairness, rajjain_fairness, mean_fairness, fairnessMeasure, fairness_mapping
+    from .fairnessMeasures import amplitude_fairness, std_fairness, rajjain_fairness, mean_fairness, fairnessMeasure, fairness_mapping, STREAMING_FAIRNESS
     # Local imports, objects and functions
-    from .CollisionModels import onlyUniqUserGetsReward, noCollision, closerUserGetsReward, rewardIsSharedUniformly, defaultCollisionModel, full_lost_if_collision
+    from .CollisionModels import onlyUniqUserGetsReward, noCollision, closerUserGetsReward, rewardIsSharedUniformly, defaultCollisionModel, full_lost_if_collision, SensingBlocks, SENSING_BLOCK_SIZE, uses_sensing
     from .MAB import MAB, MarkovianMAB, ChangingAtEachRepMAB, NonStationaryMAB, PieceWiseStationaryMAB, IncreasingMAB
-    from .ResultMultiPlayers import ResultMultiPlayers
+    from .ResultMultiPlayers import ResultMultiPlayers, MergedResultsMultiPlayers, RanksTransitions, grid_size
     from .memory_consumption import getCurrentMemory, sizeof_fmt
 except ImportError:
     from usejoblib import USE_JOBLIB, Parallel, delayed
@@ -46,16 +47,20 @@ except ImportError:
     # Local imports, tools and config
     from plotsettings import BBOX_INCHES, signature, maximizeWindow, palette, makemarkers, add_percent_formatter, wraptext, wraplatex, legend, show_and_save, nrows_ncols, addTextForWorstCases, violin_or_box_plot, adjust_xticks_subplots
     from sortedDistance import weightedDistance, manhattan, kendalltau, spearmanr, gestalt, meanDistance, sortedDistance
-    from fairnessMeasures import amplitude_fairness, std_fairness, rajjain_fairness, mean_fairness, fairnessMeasure, fairness_mapping
+    from fairnessMeasures import amplitude_fairness, std_fairness, rajjain_fairness, mean_fairness, fairnessMeasure, fairness_mapping, STREAMING_FAIRNESS
     # Local imports, objects and functions
-    from CollisionModels import onlyUniqUserGetsReward, noCollision, closerUserGetsReward, rewardIsSharedUniformly, defaultCollisionModel, full_lost_if_collision
+    from CollisionModels import onlyUniqUserGetsReward, noCollision, closerUserGetsReward, rewardIsSharedUniformly, defaultCollisionModel, full_lost_if_collision, SensingBlocks, SENSING_BLOCK_SIZE, uses_sensing
     from MAB import MAB, MarkovianMAB, ChangingAtEachRepMAB, NonStationaryMAB, PieceWiseStationaryMAB, IncreasingMAB
-    from ResultMultiPlayers import ResultMultiPlayers
+    from ResultMultiPlayers import ResultMultiPlayers, MergedResultsMultiPlayers, RanksTransitions, grid_size
     from memory_consumption import getCurrentMemory, sizeof_fmt
 
 REPETITIONS = 1  #: Default nb of repetitions
 DELTA_T_PLOT = 50  #: Default sampling rate for plotting
 COUNT_RANKS_MARKOV_CHAIN = False  #: If true, count and then print a lot of statistics for the Markov Chain of the underlying configurations on ranks
+CHUNKS_PER_JOB = 4  #: Default number of chunks of repetitions for each parallel job (more chunks balance better the load of the jobs, less chunks build less players).
+REGRET_GRID = "linear"  #: Default time grid of the cached regrets, see :func:`regret_grid`: "linear" (the plotting grid, every ``delta_t_plot`` steps) or "log" (logarithmically spaced time steps).
+REGRET_GRID_SIZE = 1000  #: Default number of time steps of the logarithmic time grid of the cached regrets.
+STACK_PLAYERS = True  #: If true, the children of an homogeneous decentralized policy (e.g., ``rhoRand(M, K, UCB).children``) are played in one vectorized pass, see :class:`PoliciesMultiPlayers.StackedPlayers`. The trajectories are the same.
 
 MORE_ACCURATE = False          #: Use the count of selections instead of rewards for a more accurate mean/var reward measure.
 MORE_ACCURATE = True           #: Use the count of selections instead of rewards for a more accurate mean/var reward measure.
@@ -94,6 +99,9 @@ class EvaluatorMultiPlayers(object):
         self.collisionModel = self.cfg.get('collisionModel', defaultCollisionModel)  #: Which collision model should be used
         self.full_lost_if_collision = full_lost_if_collision.get(self.collisionModel.__name__, True)  #: Is there a full loss of rewards if collision ? To compute the correct decomposition of regret
         print("Using collision model {} (function {}).\nMore details:\n{}".format(self.collisionModel.__name__, self.collisionModel, self.collisionModel.__doc__))
+        self.sensing_block_size = self.cfg.get('sensing_block_size', SENSING_BLOCK_SIZE)  #: Number of time steps of the blocks of pre-drawn sensing of the arms, see :class:`CollisionModels.SensingBlocks`
+        self.stack_players = self.cfg.get('stack_players', STACK_PLAYERS)  #: Play the children of an homogeneous decentralized policy in one vectorized pass?
+        self.repetitions_per_chunk = self.cfg.get('repetitions_per_chunk', None)  #: Number of repetitions played by a parallel job with the same players (default is to use ``CHUNKS_PER_JOB`` chunks for each job)
         self.signature = signature
         # Flags
         self.moreAccurate = moreAccurate  #: Use the count of selections instead of rewards for a more accurate mean/var reward measure.
@@ -115,38 +123,53 @@ class EvaluatorMultiPlayers(object):
         self.players = []  #: List of players
         self.__initEnvironments__()
         # Internal vectorial memory
-        self.rewards = dict()  #: For each env, history of rewards
+        self.rewards = dict()  #: For each env, history of the cumulated rewards of each player, on the plotting grid
+        self.sumRewards = dict()  #: For each env, history of the cumulated rewards of all the players
         # self.rewardsSquared = dict()
         self.pulls = dict()  #: For each env, keep the history of arm pulls (mean)
         self.lastPulls = dict()  #: For each env, keep the distribution of arm pulls
-        self.allPulls = dict()  #: For each env, keep the full history of arm pulls
-        self.collisions = dict()  #: For each env, keep the history of collisions on all arms
+        self.allPulls = dict()  #: For each env, keep the history of cumulated arm pulls, on the plotting grid
+        self.collisions = dict()  #: For each env, keep the history of cumulated collisions on all arms, on the plotting grid
+        self.nbCollisions = dict()  #: For each env, keep the history of the number of collisions (on all arms)
         self.lastCumCollisions = dict()  #: For each env, last count of collisions on all arms
+        self.regretTerms = dict()  #: For each env, keep the history of the losses of the three terms of the centralized regret
         self.nbSwitchs = dict()  #: For each env, keep the history of switches (change of configuration of players)
         self.bestArmPulls = dict()  #: For each env, keep the history of best arm pulls
         self.freeTransmissions = dict()  #: For each env, keep the history of successful transmission (1 - collisions, basically)
+        self.fairness = dict()  #: For each env, keep the sums on the repetitions of the fairness measures ``STREAMING_FAIRNESS`` of the cumulated rewards, on the plotting grid
         self.lastCumRewards = dict()  #: For each env, last accumulated rewards, to compute variance and histogram of whole regret R_T
         self.runningTimes = dict()  #: For each env, keep the history of running times
         self.memoryConsumption = dict()  #: For each env, keep the history of running times
+        self.ranksTransitions = dict()  #: For each env, keep the transitions of the configurations of ranks (a :class:`RanksTransitions`), if they are counted
 
         print("Number of environments to try:", len(self.envs))  # DEBUG
         # XXX: WARNING no memorized vectors should have dimension horizon * repetitions, that explodes the RAM consumption!
+        # XXX: and no memorized vectors should have dimension nbPlayers * nbArms * horizon, the pulls and collisions are only kept on the plotting grid
+        nbGridPoints = grid_size(self.horizon, self.delta_t_plot)
         for envId in range(len(self.envs)):  # Zeros everywhere
-            self.rewards[envId] = np.zeros((self.nbPlayers, self.horizon))
+            self.rewards[envId] = np.zeros((self.nbPlayers, nbGridPoints))
+            self.sumRewards[envId] = np.zeros(self.horizon)
             # self.rewardsSquared[envId] = np.zeros((self.nbPlayers, self.horizon))
             self.lastCumRewards[envId] = np.zeros(self.repetitions)
             self.pulls[envId] = np.zeros((self.nbPlayers, self.envs[envId].nbArms), dtype=np.int32)
             self.lastPulls[envId] = np.zeros((self.nbPlayers, self.envs[envId].nbArms, self.repetitions), dtype=np.int32)
-            self.allPulls[envId] = np.zeros((self.nbPlayers, self.envs[envId].nbArms, self.horizon), dtype=np.int32)
-            self.collisions[envId] = np.zeros((self.envs[envId].nbArms, self.horizon))
+            self.allPulls[envId] = np.zeros((self.nbPlayers, self.envs[envId].nbArms, nbGridPoints), dtype=np.int32)
+            self.collisions[envId] = np.zeros((self.envs[envId].nbArms, nbGridPoints), dtype=np.int32)
+            self.nbCollisions[envId] = np.zeros(self.horizon, dtype=np.int32)
             self.lastCumCollisions[envId] = np.zeros((self.envs[envId].nbArms, self.repetitions), dtype=np.int32)
+            self.regretTerms[envId] = np.zeros((3, self.horizon))
             self.nbSwitchs[envId] = np.zeros((self.nbPlayers, self.horizon), dtype=np.int32)
             self.bestArmPulls[envId] = np.zeros((self.nbPlayers, self.horizon), dtype=np.int32)
             self.freeTransmissions[envId] = np.zeros((self.nbPlayers, self.horizon), dtype=np.int32)
+            self.fairness[envId] = np.zeros((len(STREAMING_FAIRNESS), nbGridPoints))
             self.runningTimes[envId] = np.zeros((self.nbPlayers, self.repetitions))
             self.memoryConsumption[envId] = np.zeros((self.nbPlayers, self.repetitions))
         # To speed up plotting
         self._times = np.arange(1, 1 + self.horizon)
+        self._grid = self._times[::self.delta_t_plot] - 1  #: Time steps of the plotting grid, where the pulls and collisions are kept
+        self.regret_grid = self.cfg.get('regret_grid', REGRET_GRID)  #: Time grid of the cached regrets, "linear" or "log", see :func:`regret_grid`
+        self._regretGrid = regret_grid(self.horizon, kind=self.regret_grid, delta_t_plot=self.delta_t_plot, size=self.cfg.get('regret_grid_size', REGRET_GRID_SIZE))  #: Time steps of the grid of the cached regrets
+        self._regretsOnGrid = dict()  #: For each env, cache of the terms of the regret and of the centralized regrets on the time grid, see :meth:`getRegretsOnGrid`
 
     # --- Init methods
 
@@ -213,47 +236,52 @@ class EvaluatorMultiPlayers(object):
         print("\n\nEvaluating environment:", repr(env))  # DEBUG
         self.players = []
         self.__initPlayers__(env)
+        # Draw at once the means of all the repetitions of a Bayesian problem
+        if isinstance(env, ChangingAtEachRepMAB):
+            env.newMeansOfRepetitions(self.repetitions)
         # Get the position of the best arms
         means = env.means
         bestarm = env.maxArm
         # FIXME for > 1 player, this has no meaning
         indexes_bestarm = np.nonzero(np.isclose(means, bestarm))[0]
 
-        def store(r, repeatId):
-            """Store the result of the experiment r."""
-            self.rewards[envId] += np.cumsum(r.rewards, axis=1)  # cumsum on time
-            # self.rewardsSquared[envId] += np.cumsum(r.rewards ** 2, axis=1)  # cumsum on time
-            # self.rewardsSquared[envId] += np.cumsum(r.rewardsSquared, axis=1)  # cumsum on time
-            self.lastCumRewards[envId][repeatId] = np.sum(r.rewards)  # sum on time and sum on players
-            self.pulls[envId] += r.pulls
-            self.lastPulls[envId][:, :, repeatId] = r.pulls
-            self.allPulls[envId] += r.allPulls
-            self.collisions[envId] += r.collisions
-            self.lastCumCollisions[envId][:, repeatId] = np.sum(r.collisions, axis=1)  # sum on time
-            for playerId in range(self.nbPlayers):
-                self.nbSwitchs[envId][playerId, 1:] += (np.diff(r.choices[playerId, :]) != 0)
-                self.bestArmPulls[envId][playerId, :] += np.cumsum(np.in1d(r.choices[playerId, :], indexes_bestarm))
-                # FIXME there is probably a bug in this computation
-                self.freeTransmissions[envId][playerId, :] += np.array([r.choices[playerId, t] not in r.collisions[:, t] for t in range(self.horizon)])
-                self.runningTimes[envId][playerId, repeatId] = r.running_time
-                self.memoryConsumption[envId][playerId, repeatId] = r.memory_consumption
-
+        def store(merged):
+            """Store the merged results of a chunk of experiments."""
+            repeatIds = merged.repeatIds
+            self.rewards[envId] += merged.rewards
+            self.sumRewards[envId] += merged.sumRewards
+            self.lastCumRewards[envId][repeatIds] = merged.lastCumRewards
+            self.pulls[envId] += merged.pulls
+            self.lastPulls[envId][:, :, repeatIds] = merged.lasts("lastPulls")
+            self.allPulls[envId] += merged.allPulls
+            self.collisions[envId] += merged.allCollisions
+            self.nbCollisions[envId] += merged.nbCollisions
+            self.lastCumCollisions[envId][:, repeatIds] = merged.lasts("lastCumCollisions")
+            self.regretTerms[envId] += merged.regretTerms
+            self.nbSwitchs[envId][:, 1:] += merged.nbSwitchs
+            self.bestArmPulls[envId] += merged.bestArmPulls
+            self.freeTransmissions[envId] += merged.freeTransmissions
+            self.fairness[envId] += merged.fairness
+            self.runningTimes[envId][:, repeatIds] = merged.running_time
+            self.memoryConsumption[envId][:, repeatIds] = merged.memory_consumption
+            if merged.ranksTransitions is not None:
+                self.ranksTransitions[envId] = merged.ranksTransitions
+            self._regretsOnGrid.pop(envId, None)  # the cached regrets are outdated
+
+        kwargs = dict(count_ranks_markov_chain=self.count_ranks_markov_chain, useJoblib=self.useJoblib, delta_t_plot=self.delta_t_plot, full_lost_if_collision=self.full_lost_if_collision, sensing_block_size=self.sensing_block_size, stack_players=self.stack_players)
         # Start now
         if self.useJoblib:
             seeds = np.random.randint(low=0, high=100 * self.repetitions, size=self.repetitions)
-            repeatIdout = 0
-            for r in Parallel(n_jobs=self.cfg['n_jobs'], verbose=self.cfg['verbosity'])(
-                delayed(delayed_play)(env, self.players, self.horizon, self.collisionModel, seed=seeds[repeatId], repeatId=repeatId, count_ranks_markov_chain=self.count_ranks_markov_chain, useJoblib=self.useJoblib)
-                for repeatId in tqdm(range(self.repetitions), desc="Repeat||")
+            factory = PlayersFactory(self.players)
+            chunks = chunks_of_repetitions(self.repetitions, self.cfg['n_jobs'], repetitions_per_chunk=self.repetitions_per_chunk)
+            for merged in Parallel(n_jobs=self.cfg['n_jobs'], verbose=self.cfg['verbosity'])(
+                delayed(play_chunk)(delayed_play, env, factory, repeatIds, seeds[repeatIds], indexes_bestarm, self.horizon, self.collisionModel, **kwargs)
+                for repeatIds in tqdm(chunks, desc="Chunks||")
             ):
-                store(r, repeatIdout)
-                repeatIdout += 1
-            if env.isChangingAtEachRepetition:
-                env._t += self.repetitions  # new self.repetitions draw!
+                store(merged)
         else:
-            for repeatId in tqdm(range(self.repetitions), desc="Repeat"):
-                r = delayed_play(env, self.players, self.horizon, self.collisionModel, repeatId=repeatId, count_ranks_markov_chain=self.count_ranks_markov_chain, useJoblib=self.useJoblib)
-                store(r, repeatId)
+            # all the repetitions are played by one copy of the players, restarted by their startGame
+            store(play_chunk(delayed_play, env, PlayersFactory(self.players), tqdm(range(self.repetitions), desc="Repeat"), [None] * self.repetitions, indexes_bestarm, self.horizon, self.collisionModel, **kwargs))
 
     # --- Save to disk methods
 
@@ -269,7 +297,7 @@ class EvaluatorMultiPlayers(object):
         # 2. store main attributes and all other attributes, if they exist
         for name_of_attr in [
                 "nbPlayers", "horizon", "repetitions",
-                "delta_t_plot", "collisionModel", "full_lost_if_collision", "signature",  "nb_break_points", "plot_lowerbounds", "moreAccurate", "finalRanksOnAverage", "useJoblib", "showplot", "use_box_plot", "count_ranks_markov_chain", "cache_rewards", "change_labels", "append_labels"
+                "delta_t_plot", "collisionModel", "full_lost_if_collision", "signature",  "nb_break_points", "plot_lowerbounds", "moreAccurate", "finalRanksOnAverage", "useJoblib", "showplot", "use_box_plot", "count_ranks_markov_chain", "cache_rewards", "change_labels", "append_labels", "regret_grid"
             ]:
             if not hasattr(self, name_of_attr): continue
             value = getattr(self, name_of_attr)
@@ -294,7 +322,7 @@ class EvaluatorMultiPlayers(object):
                 except (ValueError, TypeError):
                     print("Error: when saving the Evaluator object to a HDF5 file, the attribute named {} (value {} of type {}) couldn't be saved. Skipping...".format(name_of_attr, value, type(value)))  # DEBUG
             # 3.c. store data for that env
-            for name_of_dataset in [ "rewards", "lastCumRewards", "pulls", "lastPulls", "allPulls", "collisions", "lastCumCollisions", "nbSwitchs", "bestArmPulls", "freeTransmissions", "runningTimes", "memoryConsumption"]:
+            for name_of_dataset in [ "rewards", "sumRewards", "lastCumRewards", "pulls", "lastPulls", "allPulls", "collisions", "nbCollisions", "lastCumCollisions", "regretTerms", "nbSwitchs", "bestArmPulls", "freeTransmissions", "fairness", "runningTimes", "memoryConsumption"]:
                 if not (hasattr(self, name_of_dataset) and envId in getattr(self, name_of_dataset)): continue
                 data = getattr(self, name_of_dataset)[envId]
                 try: sbgrp.create_dataset(name_of_dataset, data=data)
@@ -303,7 +331,7 @@ class EvaluatorMultiPlayers(object):
                     print("Exception:\n", e)  # DEBUG
 
             # 3.d. compute and store data for that env
-            for methodName in ["getRunningTimes", "getMemoryConsumption", "getPulls", "getNbSwitchs", "getBestArmPulls", "getfreeTransmissions", "getCollisions", "getRewards", "getFirstRegretTerm", "getSecondRegretTerm", "getThirdRegretTerm", "getCentralizedRegret", "getLastRegrets"]:
+            for methodName in ["getRunningTimes", "getMemoryConsumption", "getPulls", "getNbSwitchs", "getBestArmPulls", "getfreeTransmissions", "getCollisions", "getNbCollisions", "getRewards", "getFirstRegretTerm", "getSecondRegretTerm", "getThirdRegretTerm", "getCentralizedRegret", "getLastRegrets"]:
                 if not hasattr(self, methodName): continue
                 name_of_dataset = methodName.replace("get", "")
                 name_of_dataset = name_of_dataset[0].lower() + name_of_dataset[1:]
@@ -330,6 +358,18 @@ class EvaluatorMultiPlayers(object):
                     print("Error: when saving the Evaluator object to a HDF5 file, the dataset named {} (value of type {} and shape {} and dtype {}) couldn't be saved. Skipping...".format(name_of_dataset, type(data), data.shape, data.dtype))  # DEBUG
                     print("Exception:\n", e)  # DEBUG
 
+            # 3.e. store the transitions of the configurations of ranks, as a sparse matrix (rows, columns, counts), if they were counted
+            if envId in self.ranksTransitions:
+                ranksTransitions = self.ranksTransitions[envId]
+                sbgrp.create_dataset("ranksConfigurations", data=ranksTransitions.configurations())
+                sbgrp.create_dataset("ranksTransitions", data=np.array(ranksTransitions.transitions()))
+
+            # 3.f. store the regrets cached on the time grid
+            self.getRegretsOnGrid(envId)
+            regretsOnGrid = sbgrp.create_group("regretsOnGrid")
+            for name_of_dataset, data in self._regretsOnGrid[envId].items():
+                regretsOnGrid.create_dataset(name_of_dataset, data=data)
+
         # 4. when done, close the file
         h5file.close()
 
@@ -348,7 +388,7 @@ class EvaluatorMultiPlayers(object):
         return self.pulls[envId][playerId, :] / float(self.repetitions)
 
     def getAllPulls(self, playerId, armId, envId=0):
-        """Extract mean of all pulls."""
+        """Extract mean of cumulated pulls, on the plotting grid (times ``self._grid``)."""
         return self.allPulls[envId][playerId, armId, :] / float(self.repetitions)
 
     def getNbSwitchs(self, playerId, envId=0):
@@ -369,79 +409,57 @@ class EvaluatorMultiPlayers(object):
         return self.freeTransmissions[envId][playerId, :] / float(self.repetitions)
 
     def getCollisions(self, armId, envId=0):
-        """Extract mean of number of collisions."""
+        """Extract mean of cumulated number of collisions on that arm, on the plotting grid (times ``self._grid``)."""
         return self.collisions[envId][armId, :] / float(self.repetitions)
 
+    def getNbCollisions(self, envId=0):
+        """Extract mean of number of collisions on all arms, at each time step."""
+        return self.nbCollisions[envId] / float(self.repetitions)
+
     def getRewards(self, playerId, envId=0):
-        """Extract mean of rewards."""
+        """Extract mean of the cumulated rewards of that player, on the plotting grid (times ``self._grid``)."""
         return self.rewards[envId][playerId, :] / float(self.repetitions)
 
+    def getFairness(self, fairness="Mean", envId=0):
+        """Extract mean on the repetitions of that fairness measure of the cumulated rewards (one of ``STREAMING_FAIRNESS``), on the plotting grid (times ``self._grid``)."""
+        return self.fairness[envId][STREAMING_FAIRNESS.index(fairness), :] / float(self.repetitions)
+
     def getRegretMean(self, playerId, envId=0):
         """Extract mean of regret, for one arm for one player (no meaning).
 
         .. warning:: This is the centralized regret, *for one arm*, it does not make much sense in the multi-players setting!
         """
-        return np.cumsum(self.envs[envId].get_maxArm(self.horizon) - self.getRewards(playerId, envId))
+        return np.cumsum(self.envs[envId].get_maxArm(self.horizon))[self._grid] - self.getRewards(playerId, envId)
 
     def getCentralizedRegret_LessAccurate(self, envId=0):
         """Compute the empirical centralized regret: cumsum on time of the mean rewards of the M best arms - cumsum on time of the empirical rewards obtained by the players, based on accumulated rewards."""
         assert self.nbPlayers <= self.envs[envId].nbArms, "WARNING getCentralizedRegret_LessAccurate is not yet implement in the case when there is more players than arms ?"  # DEBUG
         # FIXED use self.envs[envId].get_maxArms(M=self.nbPlayers, horizon=self.horizon)
         averageBestRewards = np.cumsum(self.envs[envId].get_maxArms(M=self.nbPlayers, horizon=self.horizon))
-        # And for the actual rewards, the collisions are counted in the rewards logged in self.getRewards
-        actualRewards = np.sum([self.getRewards(playerId, envId=0) for playerId in range(self.nbPlayers)], axis=0)
+        # And for the actual rewards, the collisions are counted in the rewards logged in self.sumRewards
+        actualRewards = self.sumRewards[envId] / float(self.repetitions)
         return averageBestRewards - actualRewards
 
     # --- Three terms in the regret
 
     def getFirstRegretTerm(self, envId=0):
         """Extract and compute the first term :math:`(a)` in the centralized regret: losses due to pulling suboptimal arms."""
-        losses = np.zeros(self.horizon)
-        # means = self.envs[envId].means   # Shape: (nbArms)
-        allMeans = self.envs[envId].get_allMeans(self.horizon)   # Shape: (nbArms, horizon)
-        allPulls = self.allPulls[envId] / float(self.repetitions)  # Shape: (nbPlayers, nbArms, horizon)
-        # it's hard to program this in vector operations, so let's do just a loop...
-        for t in range(self.horizon):
-            means = allMeans[:, t]
-            sortingIndex = np.argsort(means)
-            means = np.sort(means)
-            deltaMeansWorstArms = means[-self.nbPlayers] - means[:-self.nbPlayers]
-            allWorstPulls = allPulls[:, sortingIndex[:-self.nbPlayers], t]
-            worstPulls = np.sum(allWorstPulls, axis=0)  # sum for all players
-            losses[t] = np.dot(deltaMeansWorstArms, worstPulls)  # Count and sum on k in Mworst
-        # Conclusion
+        # the losses of each time step were computed during the simulations, from the pulls of that step
+        losses = self.regretTerms[envId][0] / float(self.repetitions)
         firstRegretTerm = np.cumsum(losses)  # Accumulate losses
         return firstRegretTerm
 
     def getSecondRegretTerm(self, envId=0):
         """Extract and compute the second term :math:`(b)` in the centralized regret: losses due to not pulling optimal arms."""
-        losses = np.zeros(self.horizon)
-        # means = self.envs[envId].means   # Shape: (nbArms)
-        allMeans = self.envs[envId].get_allMeans(self.horizon)   # Shape: (nbArms, horizon)
-        allPulls = self.allPulls[envId] / float(self.repetitions)  # Shape: (nbPlayers, nbArms, horizon)
-        # it's hard to program this in vector operations, so let's do just a loop...
-        for t in range(self.horizon):
-            means = allMeans[:, t]
-            sortingIndex = np.argsort(means)
-            means = np.sort(means)
-            deltaMeansBestArms = means[-self.nbPlayers:] - means[-self.nbPlayers]
-            allBestPulls = allPulls[:, sortingIndex[-self.nbPlayers:], t]
-            bestMisses = 1 - np.sum(allBestPulls, axis=0)  # sum for all players
-            losses[t] = np.dot(deltaMeansBestArms, bestMisses)  # Count and sum on k in Mbest
-        # Conclusion
+        losses = self.regretTerms[envId][1] / float(self.repetitions)
         secondRegretTerm = np.cumsum(losses)  # Accumulate losses
         return secondRegretTerm
 
     def getThirdRegretTerm(self, envId=0):
         """Extract and compute the third term :math:`(c)` in the centralized regret: losses due to collisions."""
-        # means = self.envs[envId].means   # Shape: (nbArms)
-        allMeans = self.envs[envId].get_allMeans(self.horizon)   # Shape: (nbArms, horizon)
-        countCollisions = self.collisions[envId]   # Shape: (nbArms, horizon)
         if not self.full_lost_if_collision:
             print("Warning: the collision model ({}) does *not* yield a loss in communication when colliding (one user can communicate, or in average one user can communicate), so countCollisions -= 1 for the 3rd regret term ...".format(self.collisionModel.__name__))  # DEBUG
-            countCollisions = np.maximum(0, countCollisions - 1)
-        # losses = np.dot(means, countCollisions / float(self.repetitions))  # Count and sum on k in 1...K
-        losses = np.sum(allMeans * countCollisions, axis=0) / float(self.repetitions)  # Count and sum on k in 1...K
+        losses = self.regretTerms[envId][2] / float(self.repetitions)
         thirdRegretTerm = losses  # Accumulate losses
         return thirdRegretTerm
 
@@ -458,13 +476,34 @@ class EvaluatorMultiPlayers(object):
         else:
             return self.getCentralizedRegret_LessAccurate(envId=envId)
 
+    def getRegretsOnGrid(self, envId=0, moreAccurate=None):
+        """Get the time steps of the grid of the cached regrets (see :func:`regret_grid`), the centralized regret and the list of its three terms on these time steps.
+
+        - They are computed only once for each env, and cached (in ``self._regretsOnGrid``, saved by :meth:`saveondisk`),
+        - so plotting them costs :math:`\mathcal{O}(\text{size of the grid})` and not :math:`\mathcal{O}(T)`.
+        """
+        moreAccurate = moreAccurate if moreAccurate is not None else self.moreAccurate
+        grid = self._regretGrid
+        cache = self._regretsOnGrid.setdefault(envId, {"times": grid})
+        if "firstRegretTerm" not in cache:
+            cache["firstRegretTerm"] = self.getFirstRegretTerm(envId=envId)[grid]
+            cache["secondRegretTerm"] = self.getSecondRegretTerm(envId=envId)[grid]
+            cache["thirdRegretTerm"] = self.getThirdRegretTerm(envId=envId)[grid]
+        name = "centralizedRegret_{}Accurate".format("More" if moreAccurate else "Less")
+        if name not in cache:
+            if moreAccurate:
+                cache[name] = cache["firstRegretTerm"] + cache["secondRegretTerm"] + cache["thirdRegretTerm"]
+            else:
+                cache[name] = self.getCentralizedRegret_LessAccurate(envId=envId)[grid]
+        return grid, cache[name], [cache["firstRegretTerm"], cache["secondRegretTerm"], cache["thirdRegretTerm"]]
+
     # --- Last regrets
 
     def getLastRegrets_LessAccurate(self, envId=0):
         """Extract last regrets, based on accumulated rewards."""
         # FIXME it depends on the collision model !
         assert self.nbPlayers <= self.envs[envId].nbArms, "WARNING getLastRegrets_LessAccurate is not yet implement in the case when there is more players than arms ?"  # DEBUG
-        sumBestMeans = np.sum(self.envs[envId].get_maxArms(M=self.nbPlayers, horizon=self.horizon))
+        sumBestMeans = self.envs[envId].sum_maxArms(M=self.nbPlayers, horizon=self.horizon)
         # if self.envs[envId].nbArms < self.nbPlayers:
         #     # sure to have collisions, then the best strategy is to put all the collisions in the worse arm
         #     worseArm = np.min(meansArms)
@@ -485,7 +524,7 @@ class EvaluatorMultiPlayers(object):
         """Extract last regrets, based on counts of selections and not actual rewards."""
         # FIXME it depends on the collision model !
         assert self.nbPlayers <= self.envs[envId].nbArms, "WARNING getLastRegrets_MoreAccurate is not yet implement in the case when there is more players than arms ?"  # DEBUG
-        sumBestMeans = np.sum(self.envs[envId].get_maxArms(M=self.nbPlayers, horizon=self.horizon))
+        sumBestMeans = self.envs[envId].sum_maxArms(M=self.nbPlayers, horizon=self.horizon)
         # if self.envs[envId].nbArms < self.nbPlayers:
         #     # sure to have collisions, then the best strategy is to put all the collisions in the worse arm
         #     worseArm = np.min(meansArms)
@@ -526,17 +565,15 @@ class EvaluatorMultiPlayers(object):
         ymin = 0
         colors = palette(self.nbPlayers)
         markers = makemarkers(self.nbPlayers)
-        X = self._times - 1
-        cumRewards = np.zeros((self.nbPlayers, self.horizon))
+        X = self._grid
         for playerId, player in enumerate(self.players):
             label = 'Player #{:>2}: {}'.format(playerId + 1, _extract(player.__cachedstr__))
             Y = self.getRewards(playerId, envId)
-            cumRewards[playerId, :] = Y
             ymin = min(ymin, np.min(Y))
             if semilogx:
-                plt.semilogx(X[::self.delta_t_plot], Y[::self.delta_t_plot], label=label, color=colors[playerId], marker=markers[playerId], markevery=(playerId / 50., 0.1), lw=2)
+                plt.semilogx(X, Y, label=label, color=colors[playerId], marker=markers[playerId], markevery=(playerId / 50., 0.1), lw=2)
             else:
-                plt.plot(X[::self.delta_t_plot], Y[::self.delta_t_plot], label=label, color=colors[playerId], marker=markers[playerId], markevery=(playerId / 50., 0.1), lw=2)
+                plt.plot(X, Y, label=label, color=colors[playerId], marker=markers[playerId], markevery=(playerId / 50., 0.1), lw=2)
         legend()
         plt.xlabel("Time steps $t = 1...T$, horizon $T = {}${}".format(self.horizon, self.signature))
         if self.nb_break_points > 0:
@@ -548,29 +585,36 @@ class EvaluatorMultiPlayers(object):
         show_and_save(self.showplot, savefig, fig=fig, pickleit=USE_PICKLE)
         return fig
 
-    def plotFairness(self, envId=0, savefig=None, semilogx=False, fairness="default", evaluators=()):
-        """Plot a certain measure of "fairness", from these personal rewards, support more than one environments (use evaluators to give a list of other environments)."""
+    def plotFairness(self, envId=0, savefig=None, semilogx=False, fairness="default", evaluators=(), axis=1, perRepetition=False):
+        """Plot a certain measure of "fairness", from these personal rewards, support more than one environments (use evaluators to give a list of other environments).
+
+        - By default, every measure (a name of ``fairness_mapping`` or a function ``fairness(X, axis=1)``) is the fairness of the mean cumulated rewards of the players, computed in one call on an array of shape ``(1, nbPlayers, grid)``, on the plotting grid,
+        - with ``perRepetition=True``, it is the mean on the repetitions of the fairness of the cumulated rewards of each repetition, computed during the simulations: it is only available for the measures of ``STREAMING_FAIRNESS`` (and "default"), and it is larger, as the fluctuations of each repetition do not cancel out.
+        """
         fig = plt.figure()
-        X = self._times - 1
         evaluators = [self] + list(evaluators)  # Default to only [self]
         colors = palette(len(evaluators))
         markers = makemarkers(len(evaluators))
         plot_method = plt.semilogx if semilogx else plt.plot
-        # Decide which fairness function to use
-        fairnessFunction = fairness_mapping[fairness] if isinstance(fairness, str) else fairness
-        fairnessName = fairness if isinstance(fairness, str) else getattr(fairness, '__name__', "std_fairness")
+        # Decide which fairness function to use, names can be shortened and are not case sensitive
+        if isinstance(fairness, str):
+            fairness = next((name for name in fairness_mapping if name.lower().startswith(fairness.lower())), fairness)
+            fairnessFunction = fairness_mapping[fairness]
+            fairnessName = "Mean" if fairnessFunction is fairnessMeasure else fairness
+        else:
+            fairnessFunction = fairness
+            fairnessName = getattr(fairness, '__name__', "std_fairness")
+        if perRepetition:
+            assert fairnessName in STREAMING_FAIRNESS, "Error: the fairness measure '{}' is not computed for each repetition, only the ones of STREAMING_FAIRNESS = {} are.".format(fairnessName, STREAMING_FAIRNESS)  # DEBUG
         for evaId, eva in enumerate(evaluators):
             label = eva.strPlayers(short=True)
-            cumRewards = np.zeros((eva.nbPlayers, eva.horizon))
-            for playerId, _ in enumerate(eva.players):
-                cumRewards[playerId, :] = eva.getRewards(playerId, envId)
-            # # Print each fairness measure  # DEBUG
-            # for fN, fF in fairness_mapping.items():
-            #     f = fF(cumRewards)
-            #     print("  - {} fairness index is = {} ...".format(fN, f))  # DEBUG
-            # Plot only one fairness term
-            fairness = fairnessFunction(cumRewards)
-            plot_method(X[::self.delta_t_plot][2:], fairness[::self.delta_t_plot][2:], markers[evaId] + '-', label=label, markevery=(evaId / 50., 0.1), color=colors[evaId], lw=2)
+            X = eva._grid
+            if perRepetition:
+                Y = eva.getFairness(fairnessName, envId)
+            else:
+                cumRewards = eva.rewards[envId][np.newaxis] / float(eva.repetitions)
+                Y = fairnessFunction(cumRewards, axis=axis)[0]
+            plot_method(X[2:], Y[2:], markers[evaId] + '-', label=label, markevery=(evaId / 50., 0.1), color=colors[evaId], lw=2)
         if len(evaluators) > 1:
             legend()
         plt.xlabel("Time steps $t = 1...T$, horizon $T = {}$, {}{}".format(self.horizon, self.strPlayers() if len(evaluators) == 1 else "", self.signature))
@@ -589,9 +633,9 @@ class EvaluatorMultiPlayers(object):
 
         - The lower bounds are also plotted (Besson & Kaufmann, and Anandkumar et al).
         - The three terms of the regret are also plotting if evaluators = () (that's the default).
+        - The regrets are plotted on the time grid of each evaluator (see :meth:`getRegretsOnGrid`).
         """
         moreAccurate = moreAccurate if moreAccurate is not None else self.moreAccurate
-        X0 = X = self._times - 1
         fig = plt.figure()
         evaluators = [self] + list(evaluators)  # Default to only [self]
         colors = palette(5 if len(evaluators) == 1 and subTerms else len(evaluators))
@@ -601,16 +645,14 @@ class EvaluatorMultiPlayers(object):
         plot_method = plt.semilogx if semilogx else plot_method
         # Loop
         for evaId, eva in enumerate(evaluators):
+            X0, Y, Ys = eva.getRegretsOnGrid(envId, moreAccurate=moreAccurate)
+            X = X0
             if subTerms:
-                Ys = [None] * 3
+                Ys = list(Ys)
                 labels = [""] * 3
-                Ys[0] = eva.getFirstRegretTerm(envId)
                 labels[0] = "$(a)$ term: Pulls of {} suboptimal arms (lower-bounded)".format(max(0, self.envs[envId].nbArms - self.nbPlayers))
-                Ys[1] = eva.getSecondRegretTerm(envId)
                 labels[1] = "$(b)$ term: Non-pulls of {} optimal arms".format(min(self.nbPlayers, self.envs[envId].nbArms))
-                Ys[2] = eva.getThirdRegretTerm(envId)
                 labels[2] = "$(c)$ term: Weighted count of collisions"
-            Y = eva.getCentralizedRegret(envId, moreAccurate=moreAccurate)
             label = "{}umulated centralized regret".format("Normalized c" if normalized else "C") if len(evaluators) == 1 else eva.strPlayers(short=True)
             if semilogx or loglog:  # FIXED for semilogx plots, truncate to only show t >= 100
                 X, Y = X0[X0 >= 100], Y[X0 >= 100]
@@ -624,7 +666,7 @@ class EvaluatorMultiPlayers(object):
                         Ys[i] = Ys[i][X >= 1] / np.log(X[X >= 1])  # XXX prevent /0
             meanY = np.mean(Y)
             # Now plot
-            plot_method(X[::self.delta_t_plot], Y[::self.delta_t_plot], (markers[evaId] + '-'), markevery=(evaId / 50., 0.1), label=label, color=colors[evaId], lw=2)
+            plot_method(X, Y, (markers[evaId] + '-'), markevery=(evaId / 50., 0.1), label=label, color=colors[evaId], lw=2)
             if len(evaluators) == 1:
                 # if not semilogx and not loglog and not semilogy:
                 #     # We plot a horizontal line ----- at the mean regret
@@ -636,7 +678,7 @@ class EvaluatorMultiPlayers(object):
                         labels.append("Sum of 3 terms (= regret)")
                     # print("Difference between regret and sum of three terms:", Y - np.array(Ys[-1]))  # DEBUG
                     for i, (Y, label) in enumerate(zip(Ys, labels)):
-                        plot_method(X[::self.delta_t_plot], Y[::self.delta_t_plot], (markers[i + 1] + '-'), markevery=((i + 1) / 50., 0.1), label=label, color=colors[i + 1], lw=2)
+                        plot_method(X, Y, (markers[i + 1] + '-'), markevery=((i + 1) / 50., 0.1), label=label, color=colors[i + 1], lw=2)
                         if semilogx or loglog:  # Manual fix for issue https://github.com/SMPyBandits/SMPyBandits/issues/38
                             plt.xscale('log')
                         if semilogy or loglog:  # Manual fix for issue https://github.com/SMPyBandits/SMPyBandits/issues/38
@@ -657,9 +699,9 @@ class EvaluatorMultiPlayers(object):
                     X = X[X >= 1]
                     T = np.log(X)
                 if self.plot_lowerbounds:
-                    plot_method(X[::self.delta_t_plot], lowerbound * T[::self.delta_t_plot], 'k-', label="Besson & Kaufmann L-B = ${:.3g} \; \log(t)$".format(lowerbound), lw=3)
-                    plot_method(X[::self.delta_t_plot], anandkumar_lowerbound * T[::self.delta_t_plot], 'k--', label="Anandkumar L-B = ${:.3g} \; \log(t)$".format(anandkumar_lowerbound), lw=2)
-                    plot_method(X[::self.delta_t_plot], centralized_lowerbound * T[::self.delta_t_plot], 'k:', label="Centralized L-B = ${:.3g} \; \log(t)$".format(centralized_lowerbound), lw=2)
+                    plot_method(X, lowerbound * T, 'k-', label="Besson & Kaufmann L-B = ${:.3g} \; \log(t)$".format(lowerbound), lw=3)
+                    plot_method(X, anandkumar_lowerbound * T, 'k--', label="Anandkumar L-B = ${:.3g} \; \log(t)$".format(anandkumar_lowerbound), lw=2)
+                    plot_method(X, centralized_lowerbound * T, 'k:', label="Centralized L-B = ${:.3g} \; \log(t)$".format(centralized_lowerbound), lw=2)
             except AssertionError:
                 print("Error: Unable to compute and display the lower-bound...")  # DEBUG
         # Labels and legends
@@ -748,7 +790,7 @@ class EvaluatorMultiPlayers(object):
 
     def plotAllPulls(self, envId=0, savefig=None, cumulated=True, normalized=False):
         """Plot the frequency of use of every channels, one figure for each channel. Not so useful."""
-        X = self._times - 1
+        X = self._grid
         mainfig = savefig
         colors = palette(self.nbPlayers)
         markers = makemarkers(self.nbPlayers)
@@ -757,11 +799,11 @@ class EvaluatorMultiPlayers(object):
             figs.append(plt.figure())
             for playerId, player in enumerate(self.players):
                 Y = self.getAllPulls(playerId, armId, envId)
-                if cumulated:
-                    Y = np.cumsum(Y)
+                if not cumulated:  # mean frequency of pulls between two points of the grid
+                    Y = np.diff(Y, prepend=0) / np.diff(X, prepend=-1)
                 if normalized:
                     Y /= 1 + X
-                plt.plot(X[::self.delta_t_plot], Y[::self.delta_t_plot], label=player.__cachedstr__, color=colors[playerId], linestyle='', marker=markers[playerId], markevery=(playerId / 50., 0.1), lw=2)
+                plt.plot(X, Y, label=player.__cachedstr__, color=colors[playerId], linestyle='', marker=markers[playerId], markevery=(playerId / 50., 0.1), lw=2)
             legend()
             plt.xlabel("Time steps $t = 1...T$, horizon $T = {}${}".format(self.horizon, self.signature))
             s = ("Normalized " if normalized else "") + ("Cumulated number" if cumulated else "Frequency")
@@ -811,9 +853,7 @@ class EvaluatorMultiPlayers(object):
         plot_method = plt.semilogy if semilogy else plot_method
         plot_method = plt.semilogx if semilogx else plot_method
         for evaId, eva in enumerate(evaluators):
-            Y = np.zeros(eva.horizon)
-            for armId in range(eva.envs[envId].nbArms):
-                Y += eva.getCollisions(armId, envId)
+            Y = eva.getNbCollisions(envId)
             if cumulated:
                 Y = np.cumsum(Y)
             Y /= eva.nbPlayers  # To normalized the count?
@@ -843,7 +883,7 @@ class EvaluatorMultiPlayers(object):
         # All the other arms
         for armId, arm in enumerate(self.envs[envId].arms):
             # Y[armId] = np.sum(self.getCollisions(armId, envId) >= 1)  # XXX no, we should not count just the fact that there were collisions, but instead count all collisions
-            Y[armId] = np.sum(self.getCollisions(armId, envId))
+            Y[armId] = np.sum(self.lastCumCollisions[envId][armId, :]) / float(self.repetitions)
         Y /= (self.horizon * self.nbPlayers)
         assert 0 <= np.sum(Y) <= 1, "Error: the sum of collisions = {}, averaged by horizon and nbPlayers, cannot be outside of [0, 1] ...".format(np.sum(Y))  # DEBUG
         for armId, arm in enumerate(self.envs[envId].arms):
@@ -965,7 +1005,7 @@ class EvaluatorMultiPlayers(object):
         for playerId, player in enumerate(self.players):
             Y = self.getRewards(playerId, envId)
             if self.finalRanksOnAverage:
-                lastY[playerId] = np.mean(Y[-int(self.averageOn * self.horizon)])   # get average value during the last averageOn% of the iterations
+                lastY[playerId] = np.mean(Y[-max(1, int(self.averageOn * len(Y)))])   # get average value during the last averageOn% of the iterations
             else:
                 lastY[playerId] = Y[-1]  # get the last value
         # Sort lastY and give ranking
@@ -1142,43 +1182,163 @@ class EvaluatorMultiPlayers(object):
         return text
 
 
+# --- Parallel repetitions
+
+class PlayersFactory(object):
+    """ Lightweight factory of a list of players, sent to the parallel workers instead of the players.
+
+    - A child of a multi-player policy (e.g., ``rhoRand(M, K, UCB).children[0]``) is only described by the class and the parameters of its mother policy, and its index in the children: calling the factory builds each mother policy again, and returns its fresh children,
+    - the other players (and the children of a mother policy that was not created with known parameters) are copied from the given players, in one deep copy.
+
+    .. warning:: A mother policy drawing random values when it is created (e.g., :class:`CentralizedFixed`) draws them again each time it is built.
+    """
+
+    def __init__(self, players):
+        self.mothers = []  #: List of the (class, args, kwargs) of the mother policies
+        self.recipes = []  #: For each player, the index of its mother policy and its index in the children, or None if it is copied
+        self.templates = []  #: List of the players to copy
+        motherIds = []
+        for player in players:
+            mother = getattr(player, 'mother', None)
+            params = getattr(mother, '_params', None)
+            children = getattr(mother, 'children', [])
+            if params is not None and any(player is child for child in children):
+                if id(mother) not in motherIds:
+                    motherIds.append(id(mother))
+                    self.mothers.append((type(mother), params[0], params[1]))
+                self.recipes.append((motherIds.index(id(mother)), [child is player for child in children].index(True)))
+            else:
+                self.recipes.append(None)
+                self.templates.append(player)
+
+    def __call__(self):
+        """ Build a new list of players."""
+        mothers = [motherClass(*args, **kwargs) for (motherClass, args, kwargs) in self.mothers]
+        copies = iter(deepcopy(self.templates))
+        return [next(copies) if recipe is None else mothers[recipe[0]].children[recipe[1]] for recipe in self.recipes]
+
+
+def chunks_of_repetitions(repetitions, n_jobs, repetitions_per_chunk=None, chunks_per_job=CHUNKS_PER_JOB):
+    """ Split the indexes of the repetitions in chunks, played with the same players by a parallel job.
+
+    - ``n_jobs`` follows the convention of joblib (``-1`` for all the CPUs, ``-2`` for all but one etc),
+    - by default there are ``chunks_per_job`` chunks for each job, unless ``repetitions_per_chunk`` is given.
+
+    >>> chunks_of_repetitions(10, 2)
+    [array([0, 1]), array([2, 3]), array([4]), array([5]), array([6]), array([7]), array([8]), array([9])]
+    >>> chunks_of_repetitions(10, 2, repetitions_per_chunk=4)
+    [array([0, 1, 2, 3]), array([4, 5, 6]), array([7, 8, 9])]
+    """
+    if repetitions_per_chunk is None:
+        nb_jobs = n_jobs if n_jobs > 0 else max(1, cpu_count() + 1 + n_jobs)
+        nbChunks = nb_jobs * chunks_per_job
+    else:
+        nbChunks = -(-repetitions // max(1, repetitions_per_chunk))
+    return np.array_split(np.arange(repetitions), min(repetitions, nbChunks))
+
+
+def regret_grid(horizon, kind=REGRET_GRID, delta_t_plot=1, size=REGRET_GRID_SIZE):
+    """ Time steps (from ``0`` to ``horizon - 1``) of the grid on which the regrets are cached and plotted.
+
+    - ``kind="linear"``: the plotting grid, one time step every ``delta_t_plot`` steps,
+    - ``kind="log"``: about ``size`` time steps, logarithmically spaced (better for the ``semilogx`` and ``loglog`` plots).
+
+    >>> regret_grid(10, "linear", delta_t_plot=3)
+    array([0, 3, 6, 9])
+    >>> regret_grid(1000, "log", size=5)
+    array([  0,   4,  30, 176, 999])
+    """
+    if kind == "linear":
+        return np.arange(0, horizon, delta_t_plot)
+    elif kind == "log":
+        return np.unique(np.geomspace(1, horizon, num=min(size, horizon)).astype(int)) - 1
+    else:
+        raise ValueError("Error: the time grid of the regrets should be 'linear' or 'log', not {} ...".format(kind))
+
+
+def play_chunk(play, env, factory, repeatIds, seeds, indexes_bestarm, *args, **kwargs):
+    """ Play a chunk of repetitions with the same players, and return their merged results (:class:`MergedResultsMultiPlayers`).
+
+    - The players are built once by calling ``factory()`` (e.g., a :class:`PlayersFactory`),
+    - each repetition is played by ``play(env, players, *args, seed=seed, repeatId=repeatId, **kwargs)`` (e.g., :func:`delayed_play`), that plays the same players: they are not copied, but restarted by their ``startGame``, that has to reset all the memory of a policy,
+    - the random values drawn when a policy is created are part of its configuration (e.g., the fixed arms of :class:`CentralizedFixed`), and are kept by all the repetitions of a chunk.
+
+    The repetitions of a chunk give the same results as repetitions played by new players:
+
+    >>> from Arms import Bernoulli
+    >>> from Policies import SWUCB, BESA
+    >>> from PoliciesMultiPlayers import Selfish
+    >>> env = MAB({"arm_type": Bernoulli, "params": [0.1, 0.5, 0.9]})  # doctest: +ELLIPSIS
+    <BLANKLINE>
+    ...
+    >>> def new_players():
+    ...     return Selfish(2, 3, SWUCB, tau=20).children + [BESA(3, horizon=100)]
+    >>> merged = play_chunk(delayed_play, env, new_players, [1, 2], [1, 2], [2], 100, onlyUniqUserGetsReward)
+    >>> merged.lastCumRewards == [np.sum(delayed_play(env, new_players(), 100, onlyUniqUserGetsReward, seed=seed, repeatId=seed).sumRewards) for seed in [1, 2]]
+    True
+    """
+    players = factory()
+    merged = MergedResultsMultiPlayers(indexes_bestarm)
+    for repeatId, seed in zip(repeatIds, seeds):
+        r = play(env, players, *args, seed=seed, repeatId=repeatId, **kwargs)
+        merged.add(r, repeatId)
+    return merged
+
+
 def delayed_play(env, players, horizon, collisionModel,
         seed=None, repeatId=0,
         count_ranks_markov_chain=False,
-        useJoblib=False):
-    """Helper function for the parallelization."""
+        useJoblib=False,
+        delta_t_plot=1, full_lost_if_collision=True,
+        sensing_block_size=SENSING_BLOCK_SIZE, stack_players=STACK_PLAYERS):
+    """Helper function for the parallelization.
+
+    - The returned :class:`ResultMultiPlayers` is compact: pulls and collisions are only kept on the plotting grid (every ``delta_t_plot`` steps).
+    - If the collision model accepts it, the sensing of the arms is pre-drawn by blocks of ``sensing_block_size`` steps, see :class:`CollisionModels.SensingBlocks`.
+    - If ``stack_players`` is True and the players are the children of an homogeneous decentralized policy, they are played in one vectorized pass, see :class:`PoliciesMultiPlayers.StackedPlayers`.
+    """
     start_time = time.time()
     start_memory = getCurrentMemory(thread=useJoblib)
     # Give a unique seed to random & numpy.random for each call of this function
     if seed is not None:
         np.random.seed(seed)
-        random.seed(seed)
+        random.seed(int(seed))
     means = env.means
     if hasattr(env, "currentInterval"): env.currentInterval = 0
-    if env.isChangingAtEachRepetition:
+    if isinstance(env, ChangingAtEachRepMAB):
+        means = env.newRandomArms(repeatId=repeatId)
+    elif env.isChangingAtEachRepetition:
         means = env.newRandomArms()
-    players = deepcopy(players)
     nbArms = env.nbArms
     nbPlayers = len(players)
     # random_arm_orders = [np.random.permutation(nbArms) for i in range(nbPlayers)]
+    stacked = None
+    if stack_players and hasattr(getattr(players[0], 'mother', None), 'stackedPlayers'):
+        stacked = players[0].mother.stackedPlayers(players)
     # Start game
-    for player in players:
-        player.startGame()
+    if stacked is not None:
+        stacked.startGame()
+    else:
+        for player in players:
+            player.startGame()
     # Store results
-    result = ResultMultiPlayers(env.nbArms, horizon, nbPlayers, means=means)
+    result = ResultMultiPlayers(env.nbArms, horizon, nbPlayers, means=means, delta_t_plot=delta_t_plot, full_lost_if_collision=full_lost_if_collision)
     rewards = np.zeros(nbPlayers)
     choices = np.zeros(nbPlayers, dtype=np.int32)
     pulls = np.zeros((nbPlayers, nbArms), dtype=np.int32)
+    sensingBlocks = SensingBlocks(env.arms, blockSize=sensing_block_size) if uses_sensing(collisionModel) else None
     collisions = np.zeros(nbArms, dtype=np.int32)
 
     # print the ranks if possible  # DEBUG
     all_players_have_ranks = count_ranks_markov_chain and (repeatId == 0) and all([hasattr(p, 'rank') for p in players])  # DEBUG
     # this will count all the transitions in the Markov chain, to count their empirical probability at the end  # DEBUG
     if all_players_have_ranks:
-        markov_chain_transitions = dict()  # DEBUG
-        ranks = [p.rank for p in players]
-        binranks = tuple(np.bincount(ranks, minlength=nbPlayers + 1)[1:])
-        state = binranks
+        stacked_ranks = stacked is not None and stacked.kind in ("rank", "rotating")  # the stacked players keep their ranks in one array
+        result.ranksTransitions = RanksTransitions(nbPlayers, maxRank=max(getattr(p, 'maxRank', nbPlayers) for p in players))
+        result.ranksTransitions.add(stacked.ranks if stacked_ranks else [p.rank for p in players])
+
+    # Next time step where the means of the arms change
+    nextChangePoint = env.nextChangePoint(0) if env.isDynamic else float('inf')
 
     prettyRange = tqdm(range(horizon), desc="Time t") if repeatId == 0 else range(horizon)
     for t in prettyRange:
@@ -1187,68 +1347,48 @@ def delayed_play(env, players, horizon, collisionModel,
         pulls.fill(0)
         collisions.fill(0)
         # Every player decides which arm to pull
-        for playerId, player in enumerate(players):
-            # XXX here, the environment should apply ONCE a random permutation to each player, in order for the non-modified UCB-like algorithms to work fine in case of collisions (their initial exploration phase is non-random hence leading to only collisions in the first steps, and ruining the performance)
-            # choices[i] = random_arm_orders[i][player.choice()]
-            choices[playerId] = player.choice()
-            # # print(" Round t = \t{}, player \t#{:>2}/{} ({}) \tchose : {} ...".format(t, playerId + 1, len(players), player, choices[playerId]))  # DEBUG
+        if stacked is not None:
+            choices[:] = stacked.choice()
+        else:
+            for playerId, player in enumerate(players):
+                # XXX here, the environment should apply ONCE a random permutation to each player, in order for the non-modified UCB-like algorithms to work fine in case of collisions (their initial exploration phase is non-random hence leading to only collisions in the first steps, and ruining the performance)
+                # choices[i] = random_arm_orders[i][player.choice()]
+                choices[playerId] = player.choice()
+                # # print(" Round t = \t{}, player \t#{:>2}/{} ({}) \tchose : {} ...".format(t, playerId + 1, len(players), player, choices[playerId]))  # DEBUG
 
         # Then we decide if there is collisions and what to do why them
         # XXX It is here that the player may receive a reward, if there is no collisions
-        collisionModel(t, env.arms, players, choices, rewards, pulls, collisions)
+        receivers = players if stacked is None else stacked  # the stacked players receive all their feedback at once
+        if sensingBlocks is None:
+            collisionModel(t, env.arms, receivers, choices, rewards, pulls, collisions)
+        else:
+            collisionModel(t, env.arms, receivers, choices, rewards, pulls, collisions, sensing=sensingBlocks(t, env.arms))
 
         # Finally we store the results
         result.store(t, choices, rewards, pulls, collisions)
 
-        if env.isDynamic and t in env.changePoints:
+        if t == nextChangePoint:
             means = env.newRandomArms(t)
+            result.change_means(means)
             if repeatId == 0: print("\nNew means vector = {}, at time t = {} ...".format(means, t))  # DEBUG
+            nextChangePoint = env.nextChangePoint(t + 1)
 
         # XXX During the simulation, if using rhoRand or other ranks policy
-        if all_players_have_ranks and t > 1:
-            ranks = [p.rank for p in players]
-            binranks = tuple(np.bincount(ranks, minlength=nbPlayers + 1)[1:])
-            # print(" Round t = \t{}, the list of ranks is \t{}\n   and the point of view of ranks it is \t{} ...".format(t, ranks, binranks))  # DEBUG
-            previous_state, state = state, binranks
-            markov_chain_transitions[(previous_state, state)] = markov_chain_transitions.get((previous_state, state), 0) + 1
-            # print("  One more transition from {} to {} ... Currently it was seen {} times ...".format(previous_state, state, markov_chain_transitions[(previous_state, state)]))
+        if all_players_have_ranks:
+            if stacked_ranks:
+                result.ranksTransitions.add(stacked.ranks)
+            else:
+                if stacked is not None:
+                    stacked.sync()
+                result.ranksTransitions.add([p.rank for p in players])
 
+    if stacked is not None:
+        stacked.sync()
     # Print the quality of estimation of arm ranking for this policy, just for 1st repetition
     if repeatId == 0:
         if all_players_have_ranks:
             # At the end, print the information about the markov chain states and transitions
-            print("==> Information about the markov chain states:")  # DEBUG
-            states = {s1 for (s1, _) in markov_chain_transitions} or {s2 for (_, s2) in markov_chain_transitions}
-            states = sorted(list(states))  # sort it, once and for all
-            print("    The Markov chain has {:>4} = (2M-1 choose M) differents states ...".format(len(states)))  # DEBUG
-            for s in states:
-                print("        ", s)
-            print("==> Information about the markov chain transitions:")  # DEBUG
-            count_states = {}
-            for (sum_count_out, s1) in sorted(zip([
-                    sum(
-                        markov_chain_transitions.get((s11, s3), 0)
-                        for s3 in states
-                    ) for s11 in states],
-                    states)):
-                print("\nState s1 = {} was seen {:>6} times ...".format(s1, sum_count_out))  # DEBUG
-                count_states[tuple(sorted(s1))] = \
-                    count_states.get(tuple(sorted(s1)), 0) + sum_count_out
-                for (count, s2) in sorted(zip([
-                        markov_chain_transitions.get((s1, s3), 0)
-                        for s3 in states],
-                        states)):
-                    if count > 0:
-                        print("    The transition {} --> {} was seen {:>7} times ({:.2%}) ...".format(s1, s2, count, count / float(horizon)))  # DEBUG
-                        if sum_count_out > 0:
-                            print("        So the estimated proba is {:.3g} ...".format(count / sum_count_out))
-            # now from the set point of view
-            print("\n\nNow with states just counting the strong partitions of M = {} ...".format(nbPlayers))  # DEBUG
-            suniques = list({tuple(sorted(s1)) for s1 in states})
-            for (seen, sunique) in sorted(zip(
-                    [count_states[s] for s in suniques],
-                    suniques)):
-                print("    The state {} was seen {:>7} times ({:.2%}) ...".format(sunique, seen, seen / float(horizon)))  # DEBUG
+            result.ranksTransitions.print_summary(horizon=horizon)
         # DONE for this visualization
 
         for playerId, player in enumerate(players):
@@ -10,10 +10,10 @@ __author__ = "Lilian Besson"
 __version__ = "0.9"
 
 # Generic imports
-from copy import deepcopy
 from re import search
 import random
 from random import random as uniform_in_zero_one
+import time
 # Scientific imports
 import numpy as np
 import matplotlib.pyplot as plt
@@ -27,11 +27,11 @@ try:
     from .sortedDistance import weightedDistance, manhattan, kendalltau, spearmanr, gestalt, meanDistance, sortedDistance
     from .fairnessMeasures import amplitude_fairness, std_fairness, rajjain_fairness, mean_fairness, fairnessMeasure, fairness_mapping
     # Local imports, objects and functions
-    from .CollisionModels import onlyUniqUserGetsRewardSparse, full_lost_if_collision
+    from .CollisionModels import onlyUniqUserGetsRewardSparse, full_lost_if_collision, SensingBlocks, SENSING_BLOCK_SIZE, uses_sensing
     from .MAB import MAB, MarkovianMAB, ChangingAtEachRepMAB
     from .ResultMultiPlayers import ResultMultiPlayers
     # Inheritance
-    from .EvaluatorMultiPlayers import EvaluatorMultiPlayers, _extract
+    from .EvaluatorMultiPlayers import EvaluatorMultiPlayers, _extract, PlayersFactory, chunks_of_repetitions, play_chunk, STACK_PLAYERS
 except ImportError:
     # Local imports, libraries
     from usejoblib import USE_JOBLIB, Parallel, delayed
@@ -41,15 +41,16 @@ except ImportError:
     from sortedDistance import weightedDistance, manhattan, kendalltau, spearmanr, gestalt, meanDistance, sortedDistance
     from fairnessMeasures import amplitude_fairness, std_fairness, rajjain_fairness, mean_fairness, fairnessMeasure, fairness_mapping
     # Local imports, objects and functions
-    from CollisionModels import onlyUniqUserGetsRewardSparse, full_lost_if_collision
+    from CollisionModels import onlyUniqUserGetsRewardSparse, full_lost_if_collision, SensingBlocks, SENSING_BLOCK_SIZE, uses_sensing
     from MAB import MAB, MarkovianMAB, ChangingAtEachRepMAB
     from ResultMultiPlayers import ResultMultiPlayers
     # Inheritance
-    from EvaluatorMultiPlayers import EvaluatorMultiPlayers, _extract
+    from EvaluatorMultiPlayers import EvaluatorMultiPlayers, _extract, PlayersFactory, chunks_of_repetitions, play_chunk, STACK_PLAYERS
 
 
 REPETITIONS = 1  #: Default nb of repetitions
 ACTIVATION = 1  #: Default probability of activation
+ACTIVATION_BLOCK_SIZE = 1000  #: Default number of time steps of the blocks of pre-drawn activations of the players, see :class:`ActivationBlocks`
 DELTA_T_PLOT = 50  #: Default sampling rate for plotting
 
 MORE_ACCURATE = False          #: Use the count of selections instead of rewards for a more accurate mean/std reward measure.
@@ -70,6 +71,7 @@ class EvaluatorSparseMultiPlayers(EvaluatorMultiPlayers):
         super(EvaluatorSparseMultiPlayers, self).__init__(configuration, moreAccurate=moreAccurate)
         self.activations = self.cfg.get('activations', ACTIVATION)  #: Probability of activations
         assert np.min(self.activations) > 0 and np.max(self.activations) <= 1, "Error: probability of activations = {} were not all in (0, 1] ...".format(self.activations)  # DEBUG
+        self.activation_block_size = self.cfg.get('activation_block_size', ACTIVATION_BLOCK_SIZE)  #: Number of time steps of the blocks of pre-drawn activations of the players, see :class:`ActivationBlocks`
         self.collisionModel = self.cfg.get('collisionModel', onlyUniqUserGetsRewardSparse)  #: Which collision model should be used
         self.full_lost_if_collision = full_lost_if_collision.get(self.collisionModel.__name__, True)  #: Is there a full loss of rewards if collision ? To compute the correct decomposition of regret
         print("Using collision model {} (function {}).\nMore details:\n{}".format(self.collisionModel.__name__, self.collisionModel, self.collisionModel.__doc__))
@@ -81,42 +83,46 @@ class EvaluatorSparseMultiPlayers(EvaluatorMultiPlayers):
         print("\n\nEvaluating environment:", repr(env))  # DEBUG
         self.players = []
         self.__initPlayers__(env)
+        # Draw at once the means of all the repetitions of a Bayesian problem
+        if isinstance(env, ChangingAtEachRepMAB):
+            env.newMeansOfRepetitions(self.repetitions)
         # Get the position of the best arms
         means = env.means
         bestarm = env.maxArm
         indexes_bestarm = np.nonzero(np.isclose(means, bestarm))[0]
 
-        def store(r, repeatId):
-            """Store the result of the experiment r."""
-            self.rewards[envId] += np.cumsum(r.rewards, axis=1)  # cumsum on time
-            self.lastCumRewards[envId][repeatId] = np.sum(r.rewards)  # sum on time and sum on policies
-            self.pulls[envId] += r.pulls
-            self.lastPulls[envId][:, :, repeatId] = r.pulls
-            self.allPulls[envId] += r.allPulls
-            self.collisions[envId] += r.collisions
-            self.lastCumCollisions[envId][:, repeatId] = np.sum(r.collisions, axis=1)  # sum on time
-            for playerId in range(self.nbPlayers):
-                self.nbSwitchs[envId][playerId, 1:] += (np.diff(r.choices[playerId, :]) != 0)
-                self.bestArmPulls[envId][playerId, :] += np.cumsum(np.in1d(r.choices[playerId, :], indexes_bestarm))
-                # FIXME there is probably a bug in this computation
-                self.freeTransmissions[envId][playerId, :] += np.array([r.choices[playerId, t] not in r.collisions[:, t] for t in range(self.horizon)])
-
+        def store(merged):
+            """Store the merged results of a chunk of experiments."""
+            repeatIds = merged.repeatIds
+            self.rewards[envId] += merged.rewards
+            self.sumRewards[envId] += merged.sumRewards
+            self.lastCumRewards[envId][repeatIds] = merged.lastCumRewards
+            self.pulls[envId] += merged.pulls
+            self.lastPulls[envId][:, :, repeatIds] = merged.lasts("lastPulls")
+            self.allPulls[envId] += merged.allPulls
+            self.collisions[envId] += merged.allCollisions
+            self.nbCollisions[envId] += merged.nbCollisions
+            self.lastCumCollisions[envId][:, repeatIds] = merged.lasts("lastCumCollisions")
+            self.regretTerms[envId] += merged.regretTerms
+            self.nbSwitchs[envId][:, 1:] += merged.nbSwitchs
+            self.bestArmPulls[envId] += merged.bestArmPulls
+            self.freeTransmissions[envId] += merged.freeTransmissions
+            self.fairness[envId] += merged.fairness
+
+        kwargs = dict(delta_t_plot=self.delta_t_plot, full_lost_if_collision=self.full_lost_if_collision, sensing_block_size=self.sensing_block_size, activation_block_size=self.activation_block_size, stack_players=self.stack_players)
         # Start now
         if self.useJoblib:
             seeds = np.random.randint(low=0, high=100 * self.repetitions, size=self.repetitions)
-            repeatIdout = 0
-            for r in Parallel(n_jobs=self.cfg['n_jobs'], verbose=self.cfg['verbosity'])(
-                delayed(delayed_play)(env, self.players, self.horizon, self.collisionModel, self.activations, seed=seeds[repeatId], repeatId=repeatId)
-                for repeatId in tqdm(range(self.repetitions), desc="Repeat||")
+            factory = PlayersFactory(self.players)
+            chunks = chunks_of_repetitions(self.repetitions, self.cfg['n_jobs'], repetitions_per_chunk=self.repetitions_per_chunk)
+            for merged in Parallel(n_jobs=self.cfg['n_jobs'], verbose=self.cfg['verbosity'])(
+                delayed(play_chunk)(delayed_play, env, factory, repeatIds, seeds[repeatIds], indexes_bestarm, self.horizon, self.collisionModel, self.activations, **kwargs)
+                for repeatIds in tqdm(chunks, desc="Chunks||")
             ):
-                store(r, repeatIdout)
-                repeatIdout += 1
-            if env.isChangingAtEachRepetition:
-                env._t += self.repetitions  # new self.repetitions draw!
+                store(merged)
         else:
-            for repeatId in tqdm(range(self.repetitions), desc="Repeat"):
-                r = delayed_play(env, self.players, self.horizon, self.collisionModel, self.activations, repeatId=repeatId)
-                store(r, repeatId)
+            # all the repetitions are played by one copy of the players, restarted by their startGame
+            store(play_chunk(delayed_play, env, PlayersFactory(self.players), tqdm(range(self.repetitions), desc="Repeat"), [None] * self.repetitions, indexes_bestarm, self.horizon, self.collisionModel, self.activations, **kwargs))
 
     # --- Getter methods
 
@@ -131,46 +137,30 @@ class EvaluatorSparseMultiPlayers(EvaluatorMultiPlayers):
             worseArm = np.min(meansArms)
             sumBestMeans -= worseArm  # This count the collisions
         averageBestRewards = self._times * sumBestMeans
-        # And for the actual rewards, the collisions are counted in the rewards logged in self.getRewards
-        actualRewards = np.sum(self.rewards[envId][:, :], axis=0) / float(self.repetitions)
+        # And for the actual rewards, the collisions are counted in the rewards logged in self.sumRewards
+        actualRewards = self.sumRewards[envId] / float(self.repetitions)
         return averageBestRewards - actualRewards
 
     # --- Three terms in the regret
 
     def getFirstRegretTerm(self, envId=0):
         """Extract and compute the first term :math:`(a)` in the centralized regret: losses due to pulling suboptimal arms."""
-        means = self.envs[envId].means
-        sortingIndex = np.argsort(means)
-        means = np.sort(means)
-        deltaMeansWorstArms = means[-min(self.envs[envId].nbArms, self.nbPlayers)] - means[:-min(self.envs[envId].nbArms, self.nbPlayers)]
-        allPulls = self.allPulls[envId] / float(self.repetitions)  # Shape: (nbPlayers, nbArms, duration)
-        allWorstPulls = allPulls[:, sortingIndex[:-min(self.envs[envId].nbArms, self.nbPlayers)], :]
-        worstPulls = np.sum(allWorstPulls, axis=0)  # sum for all players
-        losses = np.dot(deltaMeansWorstArms, worstPulls)  # Count and sum on k in Mworst
+        # the losses of each time step were computed during the simulations, from the pulls of that step
+        losses = self.regretTerms[envId][0] / float(self.repetitions)
         firstRegretTerm = np.cumsum(losses)  # Accumulate losses
         return firstRegretTerm
 
     def getSecondRegretTerm(self, envId=0):
         """Extract and compute the second term :math:`(b)` in the centralized regret: losses due to not pulling optimal arms."""
-        means = self.envs[envId].means
-        sortingIndex = np.argsort(means)
-        means = np.sort(means)
-        deltaMeansBestArms = means[-min(self.envs[envId].nbArms, self.nbPlayers):] - means[-min(self.envs[envId].nbArms, self.nbPlayers)]
-        allPulls = self.allPulls[envId] / float(self.repetitions)  # Shape: (nbPlayers, nbArms, duration)
-        allBestPulls = allPulls[:, sortingIndex[-min(self.envs[envId].nbArms, self.nbPlayers):], :]
-        bestMisses = 1 - np.sum(allBestPulls, axis=0)  # sum for all players
-        losses = np.dot(deltaMeansBestArms, bestMisses)  # Count and sum on k in Mbest
+        losses = self.regretTerms[envId][1] / float(self.repetitions)
         secondRegretTerm = np.cumsum(losses)  # Accumulate losses
         return secondRegretTerm
 
     def getThirdRegretTerm(self, envId=0):
         """Extract and compute the third term :math:`(c)` in the centralized regret: losses due to collisions."""
-        means = self.envs[envId].means
-        countCollisions = self.collisions[envId]   # Shape: (nbArms, duration)
         if not self.full_lost_if_collision:
             print("Warning: the collision model ({}) does *not* yield a loss in communication when colliding (one user can communicate, or in average one user can communicate), so countCollisions -= 1 for the 3rd regret term ...".format(self.collisionModel.__name__))  # DEBUG
-            countCollisions = np.maximum(0, countCollisions - 1)
-        losses = np.dot(means, countCollisions / float(self.repetitions))  # Count and sum on k in 1...K
+        losses = self.regretTerms[envId][2] / float(self.repetitions)
         thirdRegretTerm = np.cumsum(losses)  # Accumulate losses
         return thirdRegretTerm
 
@@ -248,30 +238,49 @@ class EvaluatorSparseMultiPlayers(EvaluatorMultiPlayers):
 
 
 def delayed_play(env, players, horizon, collisionModel, activations,
-                 seed=None, repeatId=0):
-    """Helper function for the parallelization."""
+                 seed=None, repeatId=0,
+                 delta_t_plot=1, full_lost_if_collision=True,
+                 sensing_block_size=SENSING_BLOCK_SIZE,
+                 activation_block_size=ACTIVATION_BLOCK_SIZE, stack_players=STACK_PLAYERS):
+    """Helper function for the parallelization.
+
+    - The returned :class:`ResultMultiPlayers` is compact: pulls and collisions are only kept on the plotting grid (every ``delta_t_plot`` steps).
+    - If the collision model accepts it, the sensing of the arms is pre-drawn by blocks of ``sensing_block_size`` steps, see :class:`CollisionModels.SensingBlocks`.
+    - The activations of the players are pre-drawn by blocks of ``activation_block_size`` steps, see :class:`ActivationBlocks`, and only the activated players make a choice.
+    - If ``stack_players`` is True and the players are the children of an homogeneous decentralized policy, the activated players are played in one vectorized pass, see :class:`PoliciesMultiPlayers.StackedPlayers`.
+    """
+    start_time = time.time()
     # Give a unique seed to random & numpy.random for each call of this function
     try:
         if seed is not None:
             np.random.seed(seed)
-            random.seed(seed)
+            random.seed(int(seed))
     except (ValueError, SystemError):
         print("Warning: setting random.seed and np.random.seed seems to not be available. Are you using Windows?")  # XXX
     means = env.means
-    if env.isChangingAtEachRepetition:
+    if isinstance(env, ChangingAtEachRepMAB):
+        means = env.newRandomArms(repeatId=repeatId)
+    elif env.isChangingAtEachRepetition:
         means = env.newRandomArms()
-    players = deepcopy(players)
     nbArms = env.nbArms
     nbPlayers = len(players)
+    stacked = None
+    if stack_players and hasattr(getattr(players[0], 'mother', None), 'stackedPlayers'):
+        stacked = players[0].mother.stackedPlayers(players)
     # Start game
-    for player in players:
-        player.startGame()
+    if stacked is not None:
+        stacked.startGame()
+    else:
+        for player in players:
+            player.startGame()
     # Store results
-    result = ResultMultiPlayers(env.nbArms, horizon, nbPlayers, means=means)
+    result = ResultMultiPlayers(env.nbArms, horizon, nbPlayers, means=means, delta_t_plot=delta_t_plot, full_lost_if_collision=full_lost_if_collision)
     rewards = np.zeros(nbPlayers)
     choices = np.zeros(nbPlayers, dtype=int)
     pulls = np.zeros((nbPlayers, nbArms), dtype=int)
+    sensingBlocks = SensingBlocks(env.arms, blockSize=sensing_block_size) if uses_sensing(collisionModel) else None
     collisions = np.zeros(nbArms, dtype=int)
+    activationBlocks = ActivationBlocks(activations, nbPlayers, blockSize=activation_block_size)
 
     nbActivations = np.zeros(nbPlayers, dtype=int)
 
@@ -282,33 +291,30 @@ def delayed_play(env, players, horizon, collisionModel, activations,
         choices.fill(-100000)
         pulls.fill(0)
         collisions.fill(0)
-        # Decide who gets activated
-        # # 1. pure iid Bernoulli activations, so sum(random_activations) == np.random.binomial(nbPlayers, activation) if activations are all the same
-        # random_activations = np.random.random_sample(nbPlayers) <= activations
-        # FIXME finish these experiments
-        # 2. maybe first decide how many players from [0, nbArms] or [0, nbPlayers] are activated, then who
-        # nb_activated_players = np.random.binomial(nbArms, np.mean(activations))
-        nb_activated_players = np.random.binomial(nbPlayers, np.mean(activations))
-        # who_is_activated = np.random.choice(nbPlayers, size=nb_activated_players, replace=False)
-        who_is_activated = np.random.choice(nbPlayers, size=nb_activated_players, replace=False, p=np.asarray(activations)/np.sum(activations))
-        random_activations = np.in1d(np.arange(nbPlayers), who_is_activated)
-        # Every player decides which arm to pull
-        for playerId, player in enumerate(players):
-            # if with_proba(activations[playerId]):
-            if random_activations[playerId]:
-                nbActivations[playerId] += 1
-                choices[playerId] = player.choice()
-                # print(" Round t = \t{}, player \t#{:>2}/{} ({}) \tgot activated and chose : {} ...".format(t, playerId + 1, len(players), player, choices[playerId]))  # DEBUG
-            # else:
-            #     print(" Round t = \t{}, player \t#{:>2}/{} ({}) \tdid not get activated ...".format(t, playerId + 1, len(players), player))  # DEBUG
+        # Decide who gets activated: pure iid Bernoulli activations, pre-drawn by blocks
+        random_activations = activationBlocks()
+        nbActivations += random_activations
+        # Every activated player decides which arm to pull
+        if stacked is not None:
+            choices[:] = stacked.choice(random_activations)
+            choices[~random_activations] = -100000
+        else:
+            for playerId in np.flatnonzero(random_activations):
+                choices[playerId] = players[playerId].choice()
 
         # Then we decide if there is collisions and what to do why them
         # XXX It is here that the player may receive a reward, if there is no collisions
-        collisionModel(t, env.arms, players, choices, rewards, pulls, collisions)
+        receivers = players if stacked is None else stacked  # the stacked players receive all their feedback at once
+        if sensingBlocks is None:
+            collisionModel(t, env.arms, receivers, choices, rewards, pulls, collisions)
+        else:
+            collisionModel(t, env.arms, receivers, choices, rewards, pulls, collisions, sensing=sensingBlocks(t, env.arms))
 
         # Finally we store the results
         result.store(t, choices, rewards, pulls, collisions)
 
+    if stacked is not None:
+        stacked.sync()
     # Print the quality of estimation of arm ranking for this policy, just for 1st repetition
     if repeatId == 0:
         print("\nNumber of activations by players:")
@@ -325,9 +331,46 @@ def delayed_play(env, players, horizon, collisionModel, activations,
             except AttributeError:
                 print("Unable to print the estimated ordering, no method estimatedOrder was found!")
 
+    result.running_time = time.time() - start_time
     return result
 
 
+class ActivationBlocks(object):
+    """ Activations of the sparse players, pre-drawn by blocks of ``blockSize`` time steps.
+
+    - At each time step, the player ``i`` is activated with probability ``activations[i]``, independently from the other players and the other time steps (``activations`` can also be one probability for all the players),
+    - a block is a ``(blockSize, nbPlayers)`` boolean matrix, drawn in one call to :func:`numpy.random.random_sample`, and each call gives its next row.
+
+    >>> import numpy as np; np.random.seed(0)
+    >>> activationBlocks = ActivationBlocks([0.5, 0.9, 0.1], 3, blockSize=4)
+    >>> for t in range(6):
+    ...     print(activationBlocks())
+    [False  True False]
+    [False  True False]
+    [ True  True False]
+    [ True  True False]
+    [False False  True]
+    [ True  True False]
+    >>> activationBlocks = ActivationBlocks(0.25, 1000, blockSize=100)
+    >>> np.mean([np.mean(activationBlocks()) for t in range(100)])  # doctest: +ELLIPSIS
+    0.25...
+    """
+
+    def __init__(self, activations, nbPlayers, blockSize=ACTIVATION_BLOCK_SIZE):
+        self.activations = np.broadcast_to(np.asarray(activations, dtype=float), (nbPlayers,))  #: Probabilities of activation of the players
+        self.blockSize = max(1, int(blockSize))  #: Number of time steps of one block
+        self._block = np.zeros((self.blockSize, nbPlayers), dtype=bool)
+        self._index = self.blockSize
+
+    def __call__(self):
+        """ Boolean mask of the activated players for the next time step."""
+        if self._index >= self.blockSize:
+            np.less(np.random.random_sample(self._block.shape), self.activations, out=self._block)
+            self._index = 0
+        self._index += 1
+        return self._block[self._index - 1]
+
+
 def with_proba(proba):
     """`True` with probability = `proba`, `False` with probability = `1 - proba`.
 
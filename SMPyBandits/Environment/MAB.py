@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-""" :class:`MAB`, :class:`MarkovianMAB`, :class:`ChangingAtEachRepMAB`, :class:`IncreasingMAB`, :class:`PieceWiseStationaryMAB` and :class:`NonStationaryMAB` classes to wrap the arms of some Multi-Armed Bandit problems.
+""" :class:`MAB`, :class:`MarkovianMAB`, :class:`ChangingAtEachRepMAB`, :class:`IncreasingMAB`, :class:`PieceWiseStationaryMAB`, :class:`NonStationaryMAB` and :class:`ReplayMAB` classes to wrap the arms of some Multi-Armed Bandit problems.
 
 Such class has to have *at least* these methods:
 
@@ -33,6 +33,19 @@ try:
 except ImportError:
     from plotsettings import signature, wraptext, wraplatex, palette, makemarkers, legend, show_and_save
 
+try:
+    from Arms import Bernoulli, randomMeans  # Only used in the doctests
+except ImportError:  # WARNING ModuleNotFoundError is only Python 3.6+
+    try:
+        from SMPyBandits.Arms import Bernoulli, randomMeans
+    except ImportError:  # from the Environment folder
+        import sys; sys.path.insert(0, '..')
+        from Arms import Bernoulli, randomMeans
+
+
+#: Default number of samples of each arm drawn at once by :meth:`MAB.draw` (0 to draw them one by one).
+DRAW_BLOCK_SIZE = 4096
+
 
 class MAB(object):
     """ Basic Multi-Armed Bandit problem, for stochastic and i.i.d. arms.
@@ -58,6 +71,7 @@ class MAB(object):
         ]
 
     - Both will create three Bernoulli arms, of parameters (means) 0.1, 0.5 and 0.9.
+    - A dict configuration can also have a key ``'draw_block_size'``, see :meth:`draw` (default is :data:`DRAW_BLOCK_SIZE`).
     """
 
     def __init__(self, configuration):
@@ -80,10 +94,12 @@ class MAB(object):
                 self.arms.append(arm_type(*param) if isinstance(param, (dict, tuple, list)) else arm_type(param))
             # XXX try to read sparsity
             self._sparsity = configuration["sparsity"] if "sparsity" in configuration else None
+            drawBlockSize = configuration.get("draw_block_size", DRAW_BLOCK_SIZE)
         else:
             print("  Taking arms of this MAB problem from a list of arms 'configuration' = {} ...".format(configuration))  # DEBUG
             for arm in configuration:
                 self.arms.append(arm)
+            drawBlockSize = DRAW_BLOCK_SIZE
 
         # Compute the means and stats
         print(" - with 'arms' =", self.arms)  # DEBUG
@@ -91,6 +107,7 @@ class MAB(object):
         print(" - with 'means' =", self.means)  # DEBUG
         self.nbArms = len(self.arms)  #: Number of arms
         print(" - with 'nbArms' =", self.nbArms)  # DEBUG
+        self.reset_draw_buffers(drawBlockSize)
         if self._sparsity is not None:
             print(" - with 'sparsity' =", self._sparsity)  # DEBUG
         self.maxArm = np.max(self.means)  #: Max mean of arms
@@ -158,9 +175,45 @@ class MAB(object):
 
     # --- Draw samples
 
+    def reset_draw_buffers(self, drawBlockSize=None):
+        """ Empty the buffers of samples of :meth:`draw` (and change their size, if given)."""
+        if drawBlockSize is not None:
+            self.drawBlockSize = int(drawBlockSize)  #: Number of samples of each arm drawn at once by :meth:`draw`.
+        self._drawBuffers = [None] * self.nbArms  # samples of each arm drawn in advance
+        self._drawPositions = [self.drawBlockSize] * self.nbArms  # number of samples already used in each buffer
+        self._drawnArms = [None] * self.nbArms  # the arm which filled each buffer
+
+    def __getstate__(self):
+        """ Drop the samples drawn in advance when copying or pickling the problem, so the copies do not share them."""
+        state = self.__dict__.copy()
+        if "_drawBuffers" in state:
+            state["_drawBuffers"] = [None] * self.nbArms
+            state["_drawPositions"] = [self.drawBlockSize] * self.nbArms
+            state["_drawnArms"] = [None] * self.nbArms
+        return state
+
     def draw(self, armId, t=1):
-        """ Return a random sample from the armId-th arm, at time t. Usually t is not used."""
-        return self.arms[armId].draw(t)
+        """ Return a random sample from the armId-th arm, at time t. Usually t is not used.
+
+        - The samples of each arm are drawn in advance, by blocks of :attr:`drawBlockSize` with one call to ``arm.draw_nparray``, and the buffer is refilled when it is exhausted or when the arm changed (e.g., after a change point),
+        - arms which do not implement ``draw_nparray`` (or if :attr:`drawBlockSize` is 0) are sampled one by one, with ``arm.draw(t)``.
+        """
+        arm = self.arms[armId]
+        position = self._drawPositions[armId]
+        if position >= self.drawBlockSize or arm is not self._drawnArms[armId]:
+            if self.drawBlockSize <= 0:
+                return arm.draw(t)
+            try:
+                self._drawBuffers[armId] = arm.draw_nparray((self.drawBlockSize,)).tolist()
+            except (NotImplementedError, AttributeError):
+                self._drawBuffers[armId] = None
+            self._drawnArms[armId] = arm
+            position = 0
+        buffer = self._drawBuffers[armId]
+        if buffer is None:
+            return arm.draw(t)
+        self._drawPositions[armId] = position + 1
+        return buffer[position]
 
     def draw_nparray(self, armId, shape=(1,)):
         """ Return a numpy array of random sample from the armId-th arm, of a certain shape."""
@@ -222,11 +275,46 @@ class MAB(object):
 
         - It is a numpy array of shape (nbArms, horizon).
         """
-        # allMeans = np.tile(self.means, (horizon, 1)).T
-        allMeans = np.zeros((self.nbArms, horizon))
-        for t in range(horizon):
-            allMeans[:, t] = self.means
-        return allMeans
+        return np.repeat(np.asarray(self.means, dtype=float)[:, np.newaxis], horizon, axis=1)
+
+    def nextChangePoint(self, t=0):
+        """Return the first time step :math:`\\geq t` where the means of the arms change, ie. where :meth:`newRandomArms` has to be called (``inf`` if there is none).
+
+        - The simulation loops only compare the current time step to this number, and ask for the next one when they reach it.
+        - Here the means never change.
+        """
+        return float('inf')
+
+    def get_segments(self, horizon=None):
+        """Return the intervals of time where the means of the arms are constant, on the time steps :math:`t = 0, \\dots, T-1`: the arrays ``starts`` and ``lengths`` of the intervals, and the matrix ``means`` of the means of the arms on each interval, of shape ``(nbIntervals, nbArms)``.
+
+        - Here there is only one interval.
+        """
+        return np.array([0]), np.array([horizon]), np.array([self.means], dtype=float)
+
+    def sum_maxArms(self, M=1, horizon=None):
+        """Return the sum on the time steps :math:`t = 0, \\dots, T-1` of the sum of the M-best means of the arms, ie. ``np.sum(self.get_maxArms(M, horizon))``.
+
+        - It is computed from :meth:`get_segments` in :math:`\\mathcal{O}(\\text{number of intervals})`, without building a vector of length horizon.
+
+        It is the same oracle for all the kinds of problems:
+
+        >>> import io, contextlib
+        >>> args = {"nbArms": 3, "mingap": None, "lower": 0., "amplitude": 1., "isSorted": False}
+        >>> with contextlib.redirect_stdout(io.StringIO()):
+        ...     problems = [
+        ...         MAB({"arm_type": Bernoulli, "params": [0.1, 0.5, 0.9]}),
+        ...         PieceWiseStationaryMAB({"arm_type": Bernoulli, "params": {"listOfMeans": [[0.1, 0.9, 0.5], [0.5, 0.2, 0.8]], "changePoints": [0, 400]}}),
+        ...         NonStationaryMAB({"arm_type": Bernoulli, "params": {"newMeans": randomMeans, "changePoints": [0, 300, 600], "args": args}}),
+        ...         ChangingAtEachRepMAB({"arm_type": Bernoulli, "params": {"newMeans": randomMeans, "args": args}}),
+        ...     ]
+        >>> _ = problems[2].newRandomArms(300, verbose=False), problems[2].newRandomArms(600, verbose=False)
+        >>> _ = problems[3].newMeansOfRepetitions(10)
+        >>> [np.isclose(problem.sum_maxArms(M, 1000), np.sum(problem.get_maxArms(M, 1000))) for problem in problems for M in (1, 2)]
+        [True, True, True, True, True, True, True, True]
+        """
+        _, lengths, means = self.get_segments(horizon=horizon)
+        return np.dot(lengths, np.sum(np.sort(means, axis=1)[:, -M:], axis=1))
 
     #
     # --- Estimate sparsity
@@ -404,6 +492,10 @@ class MAB(object):
 RESTED = True  #: Default is rested Markovian.
 
 
+#: Default number of steps of the Markov chains generated at once by :class:`MarkovianMAB`.
+MARKOV_BLOCK_SIZE = 1000
+
+
 def dict_of_transition_matrix(mat):
     """ Convert a transition matrix (list of list or numpy array) to a dictionary mapping (state, state) to probabilities (as used by :class:`pykov.Chain`)."""
     if isinstance(mat, list):
@@ -413,11 +505,33 @@ def dict_of_transition_matrix(mat):
 
 
 def transition_matrix_of_dict(dic):
-    """ Convert a dictionary mapping (state, state) to probabilities (as used by :class:`pykov.Chain`) to a transition matrix (numpy array)."""
-    keys = list(dic.keys())
-    xkeys = sorted(list({i for i, _ in keys}))
-    ykeys = sorted(list({j for _, j in keys}))
-    return np.array([[dic[(i, j)] for i in xkeys] for j in ykeys])
+    """ Convert a dictionary mapping (state, state) to probabilities (as used by :class:`pykov.Chain`) to a right transition matrix (numpy array), on the sorted states (missing transitions have probability 0).
+
+    >>> transition_matrix_of_dict({(0, 0): 0.7, (0, 1): 0.3, (1, 0): 0.5, (1, 1): 0.5})
+    array([[0.7, 0.3],
+           [0.5, 0.5]])
+    """
+    states = sorted({state for transition in dic for state in transition})
+    return np.array([[dic.get((i, j), 0) for j in states] for i in states])
+
+
+def steady_distribution(matrix):
+    r""" Stationary distribution :math:`\pi` of this right transition matrix :math:`P`, solution of :math:`\pi P = \pi` and :math:`\sum_i \pi_i = 1`, by linear algebra.
+
+    - Raise a ``ValueError`` if the chain has more than one stationary distribution (ie. if it is not irreducible).
+
+    >>> steady_distribution([[0.7, 0.3], [0.5, 0.5]])
+    array([0.625, 0.375])
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    nbStates = len(matrix)
+    equations = matrix.T - np.eye(nbStates)
+    if np.linalg.matrix_rank(equations) < nbStates - 1:
+        raise ValueError("The Markov chain of transition matrix {} is non-ergodic, and so does not have a unique steady state distribution... Please choose another transition matrix that as to be irreducible, aperiodic, and reversible.".format(matrix.tolist()))
+    equations = np.vstack([equations, np.ones(nbStates)])
+    rightHandSide = np.zeros(nbStates + 1)
+    rightHandSide[-1] = 1
+    return np.linalg.lstsq(equations, rightHandSide, rcond=None)[0]
 
 
 class MarkovianMAB(MAB):
@@ -448,7 +562,7 @@ class MarkovianMAB(MAB):
             }
         }
 
-    - This class requires the [pykov](https://github.com/riccardoscalco/Pykov) module to represent and use Markov chain.
+    - The Markov chains are represented by integer-indexed transition matrices, their steady distributions are computed by linear algebra, and their states are generated by blocks of ``blockSize`` steps (an optional key of ``params``, default is :data:`MARKOV_BLOCK_SIZE`): for each arm if *rested*, and for all the arms at once if *restless*.
     """
 
     def __init__(self, configuration):
@@ -468,46 +582,33 @@ class MarkovianMAB(MAB):
         transitions = configuration["params"]["transitions"]
         dict_transitions = []
         matrix_transitions = []
+        values_of_states = []
         for t in transitions:
             if isinstance(t, dict):
                 dict_transitions.append(t)
                 matrix_transitions.append(transition_matrix_of_dict(t))
+                values_of_states.append(np.array(sorted({state for transition in t for state in transition}), dtype=float))
             else:
                 dict_transitions.append(dict_of_transition_matrix(t))
                 matrix_transitions.append(np.asarray(t))
+                values_of_states.append(np.arange(len(t), dtype=float))
 
         self.matrix_transitions = matrix_transitions
         print(" - Using these transition matrices:", matrix_transitions)  # DEBUG
         self.dict_transitions = dict_transitions
         print(" - Using these transition dictionaries:", dict_transitions)  # DEBUG
 
-        # FIXED this will fail harshly if Pykov is not installed/present
-        self.chains = [Chain(d) for d in dict_transitions]
-        print(" - For these Markov chains:", self.chains)  # DEBUG
-
         self.rested = configuration["params"].get("rested", RESTED)  #: Rested or not Markovian model?
         print(" - Rested:", self.rested)  # DEBUG
 
         self.nbArms = len(self.matrix_transitions)  #: Number of arms
         print(" - with 'nbArms' =", self.nbArms)  # DEBUG
 
-        # # Make every transition matrix a right stochastic transition matrix
-        # for c in self.chains:
-        #     c.stochastic()
-
         # Means of arms = steady distribution
-        self.states = [np.array(list(c.states())) for c in self.chains]
-        print(" - and states:", self.states)  # DEBUG
-        try:
-            self.steadys = [np.array(list(c.steady().values())) for c in self.chains]
-        except ValueError:
-            for c in self.chains:
-                if len(c.steady()) == 0:
-                    print("[ERROR] the steady state of the Markov chain {} was not-found because it is non-ergodic...".format(c))
-                    raise ValueError("The Markov chain {} is non-ergodic, and so does not have a steady state distribution... Please choose another transition matrix that as to be irreducible, aperiodic, and reversible.".format(c))
-        # If the steady state exist, go on
+        print(" - and states:", values_of_states)  # DEBUG
+        self.steadys = [steady_distribution(mat) for mat in matrix_transitions]
         print(" - and steady state distributions:", self.steadys)  # DEBUG
-        self.means = np.array([np.dot(s, p) for s, p in zip(self.states, self.steadys)])  #: Means of each arms, from their steady distributions.
+        self.means = np.array([np.dot(s, p) for s, p in zip(values_of_states, self.steadys)])  #: Means of each arms, from their steady distributions.
         print(" - so it gives arms of means:", self.means)  # DEBUG
 
         self.arms = [configuration["params"]["steadyArm"](mean) for mean in self.means]
@@ -519,10 +620,57 @@ class MarkovianMAB(MAB):
         self.minArm = np.min(self.means)  #: Min mean of arms
         print(" - with 'minArm' =", self.minArm)  # DEBUG
 
-        #: States of each arm, initially they are all busy
-        self.states = np.zeros(self.nbArms)
+        # Integer-indexed chains, with the same number of states for all arms (the extra states are never reached)
+        nbStates = max(len(values) for values in values_of_states)
+        self._values = np.zeros((self.nbArms, nbStates))  # value (reward) of each state of each chain
+        self._cumulated = np.ones((self.nbArms, nbStates, nbStates))  # cumulated probabilities of the rows of the transition matrices
+        for armId, (values, mat) in enumerate(zip(values_of_states, matrix_transitions)):
+            self._values[armId, :len(values)] = values
+            self._cumulated[armId, :len(values), :len(values)] = np.cumsum(mat, axis=1)
+            self._cumulated[armId, :len(values), len(values) - 1:] = 1  # no rounding error on the last state
+        self.blockSize = configuration["params"].get("blockSize", MARKOV_BLOCK_SIZE)  #: Number of steps of the Markov chains generated at once
+        #: States of each arm, initially they are all busy (in the state 0, or in their first state)
+        initialStates = np.array([np.argmax(values == 0) for values in values_of_states])
+        self._trajectories = np.repeat(initialStates[:, np.newaxis], self.blockSize, axis=1)  # next states of each chain, generated by blocks
+        self._positions = np.full(self.nbArms, self.blockSize)  # number of states already used in the blocks
         print("DONE for creating this MarkovianMAB problem...")  # DEBUG
 
+    @property
+    def states(self):
+        """ Current states of each arm."""
+        armIds = np.arange(self.nbArms)
+        return self._values[armIds, self._trajectories[armIds, self._positions - 1]]
+
+    def __getstate__(self):
+        """ Drop the states generated in advance when copying or pickling the problem, so the copies do not share them."""
+        state = self.__dict__.copy()
+        armIds = np.arange(self.nbArms)
+        currentStates = self._trajectories[armIds, self._positions - 1]
+        state["_trajectories"] = np.repeat(currentStates[:, np.newaxis], self.blockSize, axis=1)
+        state["_positions"] = np.full(self.nbArms, self.blockSize)
+        return state
+
+    def _newTrajectories(self, armIds):
+        r""" Generate the next ``blockSize`` states of the Markov chains of these arms, from their current states, in a vectorized way.
+
+        - One uniform random number :math:`u_n` for each step gives the map :math:`f_n` from a state to the next one (the first state :math:`j` with cumulated probability :math:`P(s, 1) + \dots + P(s, j) > u_n`), found by a binary search in each row of the cumulated transition matrices, so each step costs :math:`\mathcal{O}(S \log S)` for :math:`S` states,
+        - and the compositions :math:`f_n \circ \dots \circ f_1` are computed for all :math:`n` with a parallel prefix scan, in :math:`\log_2(\text{blockSize})` vectorized steps.
+        """
+        currentStates = self._trajectories[armIds, -1]
+        uniforms = np.random.random_sample((len(armIds), self.blockSize))
+        # the row r of the cumulated probabilities is shifted to [r, r + 1], so all the rows are searched at once in one sorted array
+        nbStates = self._cumulated.shape[-1]
+        rows = np.arange(len(armIds) * nbStates).reshape((len(armIds), 1, nbStates))
+        shiftedRows = (self._cumulated[armIds] + rows.reshape((len(armIds), nbStates, 1))).ravel()
+        # maps[k, n, s] = next state of the chain of armIds[k], from state s, at step n
+        maps = np.searchsorted(shiftedRows, rows + uniforms[:, :, np.newaxis], side='right') - nbStates * rows
+        shift = 1
+        while shift < self.blockSize:
+            maps[:, shift:] = np.take_along_axis(maps[:, shift:], maps[:, :-shift], axis=2)
+            shift *= 2
+        self._trajectories[armIds] = np.take_along_axis(maps, currentStates[:, np.newaxis, np.newaxis], axis=2)[:, :, 0]
+        self._positions[armIds] = 0
+
     def __repr__(self):
         return "{}(nbArms: {}, chains: {}, arms: {})".format(self.__class__.__name__, self.nbArms, self.matrix_transitions, self.arms)
 
@@ -563,24 +711,15 @@ class MarkovianMAB(MAB):
         - If *rested* Markovian, only the state of the Markov chain of arm `armId` changes. It is the simpler model, and the default model.
         - But if *restless* (non rested) Markovian, the states of all the Markov chain of all arms change (not only `armId`).
         """
-        # 1. Get current state for that arm, and its Markov chain
-        state, chain = self.states[armId], self.chains[armId]
-        # 2. Sample from that Markov chain
-        nextState = chain.move(state)
-        # 3. Update the state
-        self.states[armId] = nextState
-        # print("- For the arm #{}, previously in the state {}, the Markov chain moved to state {} ...".format(armId, state, nextState))  # DEBUG
-
-        if not self.rested:
-            # print("- Non-rested Markovian model, every other arm is also moving...")  # DEBUG
-            for armId2 in range(self.nbArms):
-                # For each other arm, they evolve
-                if armId2 != armId:
-                    state, chain = self.states[armId2], self.chains[armId2]
-                    nextState = chain.move(state)
-                    # print("    - For the arm #{}, previously in the state {}, the Markov chain moved to state {} ...".format(armId, state, nextState))  # DEBUG
-                    self.states[armId2] = nextState
-
+        # 1. Get the next states of the chains, generated in advance by blocks
+        if self._positions[armId] >= self.blockSize:
+            self._newTrajectories(np.array([armId]) if self.rested else np.arange(self.nbArms))
+        nextState = self._values[armId, self._trajectories[armId, self._positions[armId]]]
+        # 2. Move on the Markov chain of that arm, or on every Markov chains
+        if self.rested:
+            self._positions[armId] += 1
+        else:
+            self._positions += 1
         return float(nextState)
 
 
@@ -597,6 +736,8 @@ class ChangingAtEachRepMAB(MAB):
     .. warning:: It works perfectly fine, but it is still experimental, be careful when using this feature.
 
     .. note:: Testing bandit algorithms against randomly generated problems at each repetitions is usually referred to as *"Bayesian problems"* in the literature: a prior is set on problems (eg. uniform on :math:`[0,1]^K` or less obvious for instance if a ``mingap`` is set), and the performance is assessed against this prior. It differs from the *frequentist* point of view of having one fixed problem and doing eg. ``n=1000`` repetitions on the same problem.
+
+    - The means of all the repetitions can be drawn at once with :meth:`newMeansOfRepetitions`, and then the repetition ``repeatId`` uses the row ``repeatId`` of this array (see :meth:`newRandomArms`).
     """
 
     def __init__(self, configuration, verbose=VERBOSE):
@@ -627,12 +768,14 @@ class ChangingAtEachRepMAB(MAB):
         print("\n\n ==> Creating the dynamic arms ...")  # DEBUG
         # Keep track of the successive mean vectors
         self._historyOfMeans = []  # Historic of the means vectors
+        self._meansOfRepetitions = None  # Array of the means vectors of all the repetitions, if drawn at once
         self._t = 0  # nb of calls to the function for generating new arms
         # Generate a first mean vector
         self.newRandomArms()
         print("   - drawing a random set of arms")
         self.nbArms = len(self.arms)  #: Means of arms
         print("   - with 'nbArms' =", self.nbArms)  # DEBUG
+        self.reset_draw_buffers(configuration.get("draw_block_size", DRAW_BLOCK_SIZE))
         print("   - with 'arms' =", self.arms)  # DEBUG
         print(" - Example of initial draw of 'means' =", self.means)  # DEBUG
         print("   - with 'maxArm' =", self.maxArm)  # DEBUG
@@ -663,13 +806,31 @@ class ChangingAtEachRepMAB(MAB):
     #
     # --- Dynamic arms and means
 
-    def newRandomArms(self, t=None, verbose=VERBOSE):
-        """Generate a new list of arms, from ``arm_type(params['newMeans'](*params['args']))``."""
-        one_draw_of_means = self.newMeans(**self.args)
+    def newMeansOfRepetitions(self, repetitions):
+        """Draw at once the (repetitions, nbArms) array of the means of all the repetitions, with the vectorized version of ``params['newMeans']`` if there is one (see :func:`Arms.meansMatrix`).
+
+        - This array becomes the history of means, so :attr:`means`, :meth:`lowerbound`, :meth:`hoifactor` etc are averaged on the problems of all the repetitions.
+        - The repetitions of all the policies use the same problems.
+        """
+        try:
+            from Arms import meansMatrix
+        except ImportError:  # WARNING ModuleNotFoundError is only Python 3.6+
+            from SMPyBandits.Arms import meansMatrix
+        self._meansOfRepetitions = meansMatrix(self.newMeans, nbDraws=repetitions, **self.args)
+        self._historyOfMeans = list(self._meansOfRepetitions)
+        self._t = repetitions
+        return self._meansOfRepetitions
+
+    def newRandomArms(self, t=None, verbose=VERBOSE, repeatId=None):
+        """Generate a new list of arms, from ``arm_type(params['newMeans'](*params['args']))``, or from the row ``repeatId`` of the means drawn by :meth:`newMeansOfRepetitions` (if it was called)."""
+        if repeatId is not None and self._meansOfRepetitions is not None:
+            one_draw_of_means = self._meansOfRepetitions[repeatId % len(self._meansOfRepetitions)]
+        else:
+            one_draw_of_means = self.newMeans(**self.args)
+            self._t += 1  # new draw!
+            self._historyOfMeans.append(one_draw_of_means)
         self._arms = [self.arm_type(mean) for mean in one_draw_of_means]
         self.nbArms = len(self._arms)  # useless
-        self._t += 1  # new draw!
-        self._historyOfMeans.append(one_draw_of_means)
         if verbose or self._verbose:
             print("\n  - Creating a new dynamic list of means = {} for arms: ChangingAtEachRepMAB = {} ...".format(np.array(one_draw_of_means), repr(self)))  # DEBUG
             # print("Currently self._t = {} and self._historyOfMeans = {} ...".format(self._t, self._historyOfMeans))  # DEBUG
@@ -703,42 +864,55 @@ class ChangingAtEachRepMAB(MAB):
         sortedMeans = np.mean(np.sort(np.array(self._historyOfMeans), axis=1), axis=0)
         return sortedMeans[:-M]
 
+    def get_segments(self, horizon=None):
+        """Return the only interval of time, like :meth:`MAB.get_segments`, with the means of the arms averaged on all the draws of new means *after sorting each draw* (like :meth:`Mbest`), so that :meth:`sum_maxArms` uses the same oracle as :meth:`get_maxArm` and :meth:`get_maxArms`, the best arms of each draw.
+
+        - The arms are not identified: the k-th value is the average of the k-th smallest means of the draws.
+        """
+        sortedMeans = np.mean(np.sort(np.array(self._historyOfMeans), axis=1), axis=0)
+        return np.array([0]), np.array([horizon]), np.array([sortedMeans], dtype=float)
+
     @property
     def minArm(self):
         """Return the smallest mean of the arms, for a dynamic MAB (averaged on all the draws of new means)."""
-        return np.mean(np.min(np.array(self._historyOfMeans)))
+        return np.mean(np.min(np.array(self._historyOfMeans), axis=1))
 
     @property
     def maxArm(self):
-        """Return the largest mean of the arms, for a dynamic MAB (averaged on all the draws of new means)."""
-        return np.mean(np.max(np.array(self._historyOfMeans)))
+        """Return the largest mean of the arms, for a dynamic MAB (averaged on all the draws of new means).
+
+        - It is the average of the largest mean of each draw, so the oracle of :meth:`get_maxArm` is the same as the one of :meth:`sum_maxArms`:
+
+        >>> import io, contextlib
+        >>> with contextlib.redirect_stdout(io.StringIO()):
+        ...     problem = ChangingAtEachRepMAB({"arm_type": Bernoulli, "params": {"newMeans": randomMeans, "args": {"nbArms": 3, "mingap": None, "lower": 0., "amplitude": 1., "isSorted": False}}})
+        >>> means = problem.newMeansOfRepetitions(10)
+        >>> np.isclose(problem.maxArm, np.mean(np.max(means, axis=1))), np.isclose(problem.minArm, np.mean(np.min(means, axis=1)))
+        (True, True)
+        >>> np.isclose(problem.get_maxArm(1000).sum(), problem.sum_maxArms(1, 1000))
+        True
+        """
+        return np.mean(np.max(np.array(self._historyOfMeans), axis=1))
 
     #
     # --- Compute lower bounds
 
+    def _sumOverSuboptimalArms(self, oneTerm):
+        """ For each draw of new means, the sum of ``oneTerm(max(means), m)`` for the means m of the suboptimal arms, computed in one pass on the array of all the draws."""
+        allMeans = np.array(self._historyOfMeans, dtype=float)
+        maxMeans = np.broadcast_to(np.max(allMeans, axis=1, keepdims=True), allMeans.shape)
+        suboptimal = allMeans != maxMeans
+        terms = np.zeros_like(allMeans)
+        terms[suboptimal] = np.vectorize(oneTerm, otypes=[float])(maxMeans[suboptimal], allMeans[suboptimal])
+        return np.sum(terms, axis=1)
+
     def lowerbound(self):
         """ Compute the constant C(mu), for [Lai & Robbins] lower-bound for this MAB problem (complexity), using functions from :mod:`kullback` (averaged on all the draws of new means)."""
-        oneLR = self.arms[0].oneLR
-        return np.mean([
-                        sum(
-                            oneLR(np.max(means), m)
-                            for m in means
-                            if m != np.max(means)
-                        )
-                        for means in self._historyOfMeans
-                        ])
+        return np.mean(self._sumOverSuboptimalArms(self.arms[0].oneLR))
 
     def hoifactor(self):
         """ Compute the HOI factor H_OI(mu), the Optimal Arm Identification (OI) factor, for this MAB problem (complexity). Cf. (3.3) in Navikkumar MODI's thesis, "Machine Learning and Statistical Decision Making for Green Radio" (2017) (averaged on all the draws of new means)."""
-        oneHOI = self.arms[0].oneHOI
-        return np.mean([
-                        sum(
-                            oneHOI(np.max(means), m)
-                            for m in means
-                            if m != np.max(means)
-                        ) / float(len(means))
-                        for means in self._historyOfMeans
-                        ])
+        return np.mean(self._sumOverSuboptimalArms(self.arms[0].oneHOI) / float(self.nbArms))
 
     def lowerbound_multiplayers(self, nbPlayers=1):
         """ Compute our multi-players lower bound for this MAB problem (complexity), using functions from :mod:`kullback`. """
@@ -832,6 +1006,8 @@ class PieceWiseStationaryMAB(MAB):
         if 0 not in self.changePoints and len(self.listOfMeans) == len(self.changePoints) - 1:
             self.changePoints = [0] + self.changePoints
         assert len(self.listOfMeans) == len(self.changePoints), "Error: the list of means {} does not has the same length as the list of change points {}...".format(self.listOfMeans, self.changePoints)  # DEBUG
+        self._sortedChangePoints = np.unique(self.changePoints)  # sorted change points, see nextChangePoint()
+        self._setOfChangePoints = set(self.changePoints)  # for fast membership tests
 
         # XXX try to read sparsity
         self._sparsity = configuration["sparsity"] if "sparsity" in configuration else None
@@ -844,8 +1020,10 @@ class PieceWiseStationaryMAB(MAB):
         ]
 
         self.currentInterval = 0  # current number of the interval we are in
+        self._meansTables = dict()  # memoized tables of the means, see _meansTable()
 
         print("   - with 'nbArms' =", self.nbArms)  # DEBUG
+        self.reset_draw_buffers(configuration.get("draw_block_size", DRAW_BLOCK_SIZE))
         print("   - with 'arms' =", self.arms)  # DEBUG
         print(" - Initial draw of 'means' =", self.means)  # DEBUG
 
@@ -868,7 +1046,7 @@ class PieceWiseStationaryMAB(MAB):
     def newRandomArms(self, t=None, onlyOneArm=None, verbose=VERBOSE):
         """Fake function, there is nothing random here, it is just to tell the piece-wise stationary MAB problem to maybe use the next interval.
         """
-        if t > 0 and t in self.changePoints:
+        if t > 0 and t in self._setOfChangePoints:
             if verbose: print("  - BREAKPOINT For a PieceWiseStationaryMAB object, the function newRandomArms was called, with t = {}, and current interval was {}, so means was = {} and will be = {}...".format(t, self.currentInterval, self.listOfMeans[self.currentInterval], self.listOfMeans[self.currentInterval + 1]))  # DEBUG
             self.currentInterval += 1  # next interval!
         else:
@@ -936,91 +1114,106 @@ class PieceWiseStationaryMAB(MAB):
     #
     # --- Helper to compute vector of min arms, max arms, all arms
 
+    def nextChangePoint(self, t=0):
+        """Return the first change point :math:`\\geq t` (``inf`` if there is none), found by a binary search in the sorted change points.
+
+        - The simulation loops only compare the current time step to this number, and ask for the next one when they reach it.
+        """
+        i = np.searchsorted(self._sortedChangePoints, t)
+        return int(self._sortedChangePoints[i]) if i < len(self._sortedChangePoints) else float('inf')
+
+    def schedule(self):
+        """Return the compact schedule of the means of the arms: the array of the change points (the first one is the beginning of the first interval), and the matrix of the means of the arms on each interval, of shape ``(nbIntervals, nbArms)``."""
+        return np.asarray(self.changePoints), np.asarray(self.listOfMeans, dtype=float)
+
+    def get_segments(self, horizon=None):
+        r"""Return the intervals of time where the means of the arms are constant, on the time steps :math:`t = 0, \dots, T-1`: the arrays ``starts`` and ``lengths`` of the intervals, and the matrix ``means`` of the means of the arms on each interval, of shape ``(nbIntervals, nbArms)``.
+
+        - It costs :math:`\mathcal{O}(\text{number of intervals})`, the empty intervals (after the horizon) are removed,
+        - the first interval starts at :math:`t = 0`, and the interval :math:`i \geq 1` starts at the change point ``changePoints[i]``.
+
+        >>> problem = PieceWiseStationaryMAB({"arm_type": Bernoulli, "params": {"listOfMeans": [[0.1, 0.9], [0.5, 0.2], [0.3, 0.4]], "changePoints": [0, 3, 5]}})  # doctest: +ELLIPSIS
+          Special MAB problem, with arm (possibly) changing at every time step, ...
+        >>> starts, lengths, means = problem.get_segments(horizon=8)
+        >>> starts, lengths
+        (array([0, 3, 5]), array([3, 2, 3]))
+        >>> problem.get_segments(horizon=4)[1]
+        array([3, 1])
+        >>> problem.get_maxArm(horizon=8)
+        array([0.9, 0.9, 0.9, 0.5, 0.5, 0.4, 0.4, 0.4])
+        >>> problem.get_allMeans(horizon=4)
+        array([[0.1, 0.1, 0.1, 0.5],
+               [0.9, 0.9, 0.9, 0.2]])
+        >>> problem.sum_maxArms(M=2, horizon=8), np.sum(problem.get_maxArms(M=2, horizon=8))
+        (6.5, 6.5)
+        """
+        changePoints, means = self.schedule()
+        if horizon is None:
+            horizon = np.max(changePoints)
+        bounds = np.clip(np.concatenate([[0], changePoints[1:], [horizon]]), 0, horizon)
+        lengths = np.diff(bounds)
+        nonEmpty = lengths > 0
+        return bounds[:-1][nonEmpty], lengths[nonEmpty], means[nonEmpty]
+
+    def _meansTable(self, name, horizon=None, M=1):
+        """Vector of length horizon (or matrix of shape (nbArms, horizon) for ``name="allMeans"``) of the values of ``name`` on each interval, expanded with ``np.repeat``.
+
+        - The tables are computed once for each horizon, memoized (in ``self._meansTables``) and read-only.
+        """
+        if horizon is None:
+            horizon = np.max(self.schedule()[0])
+        key = (name, horizon, M)
+        if key not in self._meansTables:
+            _, lengths, means = self.get_segments(horizon=horizon)
+            if name == "allMeans":
+                values = means.T
+            elif name == "minArm":
+                values = np.min(means, axis=1)
+            elif name == "maxArm":
+                values = np.max(means, axis=1)
+            elif name == "minArms":
+                values = np.sum(np.sort(means, axis=1)[:, :-M], axis=1)
+            elif name == "maxArms":
+                values = np.sum(np.sort(means, axis=1)[:, -M:], axis=1)
+            table = np.repeat(values, lengths, axis=-1)
+            table.setflags(write=False)
+            self._meansTables[key] = table
+        return self._meansTables[key]
+
     def get_minArm(self, horizon=None):
         """Return the smallest mean of the arms, for a piece-wise stationary MAB
 
         - It is a vector of length horizon.
         """
-        if horizon is None:
-            horizon = np.max(self.changePoints)
-        mapOfMinArms = [np.min(means) for means in self.listOfMeans]
-        meansOfMinArms = np.zeros(horizon)
-        nbChangePoint = 0
-        for t in range(horizon):
-            if nbChangePoint < len(self.changePoints) - 1 and t >= self.changePoints[nbChangePoint + 1]:
-                nbChangePoint += 1
-            meansOfMinArms[t] = mapOfMinArms[nbChangePoint]
-        return meansOfMinArms
+        return self._meansTable("minArm", horizon=horizon)
 
     def get_minArms(self, M=1, horizon=None):
         """Return the vector of sum of the M-worst means of the arms, for a piece-wise stationary MAB.
 
         - It is a vector of length horizon.
         """
-        if horizon is None:
-            horizon = np.max(self.changePoints)
-        def Mworst(unsorted_list):
-            sorted_list = np.sort(unsorted_list)
-            return np.sum(sorted_list[:-M])
-        mapOfMworstMaxArms = [Mworst(means) for means in self.listOfMeans]
-        meansOfMworstMaxArms = np.ones(horizon)
-        nbChangePoint = 0
-        for t in range(horizon):
-            if nbChangePoint < len(self.changePoints) - 1 and t >= self.changePoints[nbChangePoint + 1]:
-                nbChangePoint += 1
-            meansOfMworstMaxArms[t] = mapOfMworstMaxArms[nbChangePoint]
-        return meansOfMworstMaxArms
+        return self._meansTable("minArms", horizon=horizon, M=M)
 
     def get_maxArm(self, horizon=None):
         """Return the vector of max mean of the arms, for a piece-wise stationary MAB.
 
         - It is a vector of length horizon.
         """
-        if horizon is None:
-            horizon = np.max(self.changePoints)
-        mapOfMaxArms = [np.max(means) for means in self.listOfMeans]
-        meansOfMaxArms = np.ones(horizon)
-        nbChangePoint = 0
-        for t in range(horizon):
-            if nbChangePoint < len(self.changePoints) - 1 and t >= self.changePoints[nbChangePoint + 1]:
-                nbChangePoint += 1
-            meansOfMaxArms[t] = mapOfMaxArms[nbChangePoint]
-        return meansOfMaxArms
+        return self._meansTable("maxArm", horizon=horizon)
 
     def get_maxArms(self, M=1, horizon=None):
         """Return the vector of sum of the M-best means of the arms, for a piece-wise stationary MAB.
 
         - It is a vector of length horizon.
         """
-        if horizon is None:
-            horizon = np.max(self.changePoints)
-        def Mbest(unsorted_list):
-            sorted_list = np.sort(unsorted_list)
-            return np.sum(sorted_list[-M:])
-        mapOfMBestMaxArms = [Mbest(means) for means in self.listOfMeans]
-        meansOfMBestMaxArms = np.ones(horizon)
-        nbChangePoint = 0
-        for t in range(horizon):
-            if nbChangePoint < len(self.changePoints) - 1 and t >= self.changePoints[nbChangePoint + 1]:
-                nbChangePoint += 1
-            meansOfMBestMaxArms[t] = mapOfMBestMaxArms[nbChangePoint]
-        return meansOfMBestMaxArms
+        return self._meansTable("maxArms", horizon=horizon, M=M)
 
     def get_allMeans(self, horizon=None):
         """Return the vector of mean of the arms, for a piece-wise stationary MAB.
 
         - It is a numpy array of shape (nbArms, horizon).
         """
-        if horizon is None:
-            horizon = np.max(self.changePoints)
-        meansOfArms = np.ones((self.nbArms, horizon))
-        for armId in range(self.nbArms):
-            nbChangePoint = 0
-            for t in range(horizon):
-                if nbChangePoint < len(self.changePoints) - 1 and t >= self.changePoints[nbChangePoint + 1]:
-                    nbChangePoint += 1
-                meansOfArms[armId][t] = self.listOfMeans[nbChangePoint][armId]
-        return meansOfArms
+        return self._meansTable("allMeans", horizon=horizon)
 
     #
     # --- Compute lower bounds
@@ -1081,6 +1274,8 @@ class NonStationaryMAB(PieceWiseStationaryMAB):
         print(" - with 'newMeans' =", self.newMeans)  # DEBUG
         self.changePoints = params["changePoints"]  #: List of the change points
         print(" - with 'changePoints' =", self.changePoints)  # DEBUG
+        self._sortedChangePoints = np.unique(self.changePoints)  # sorted change points, see nextChangePoint()
+        self._setOfChangePoints = set(self.changePoints)  # for fast membership tests
         self.onlyOneArm = params.get("onlyOneArm", None)  #: None by default, but can be "uniform" to only change *one* arm at each change point.
         print(" - with 'onlyOneArm' =", self.onlyOneArm)  # DEBUG
         self.args = params["args"]  #: Args to give to function
@@ -1092,11 +1287,13 @@ class NonStationaryMAB(PieceWiseStationaryMAB):
         self._historyOfMeans = dict()  # Historic of the means vectors, storing time of {changepoint: newMeans}
         self._historyOfChangePoints = []  # Historic of the change points
         self._t = 0  # nb of calls to the function for generating new arms
+        self._meansTables = dict()  # memoized tables of the means, see _meansTable()
         # Generate a first mean vector
         self.newRandomArms(0)
         print("   - drawing a random set of arms")
         self.nbArms = len(self.arms)  #: Means of arms
         print("   - with 'nbArms' =", self.nbArms)  # DEBUG
+        self.reset_draw_buffers(configuration.get("draw_block_size", DRAW_BLOCK_SIZE))
         print("   - with 'arms' =", self.arms)  # DEBUG
         print(" - Example of initial draw of 'means' =", self.means)  # DEBUG
 
@@ -1129,7 +1326,7 @@ class NonStationaryMAB(PieceWiseStationaryMAB):
 
         .. warning:: TODO? So far the only change points we consider is when the means of arms change, but the family of distributions stay the same. I could implement a more generic way, for instance to be able to test algorithms that detect change between different families of distribution (e.g., from a Gaussian of variance=1 to a Gaussian of variance=2, with different or not means).
         """
-        if ((t > 0 and t not in self.changePoints) or (t in self._historyOfChangePoints)):
+        if ((t > 0 and t not in self._setOfChangePoints) or (t in self._historyOfMeans)):
             # return the latest generate means
             return self._historyOfMeans[self._historyOfChangePoints[-1]]
         self._historyOfChangePoints.append(t)
@@ -1150,6 +1347,7 @@ class NonStationaryMAB(PieceWiseStationaryMAB):
                 if arm not in onlyOneArm:
                     one_draw_of_means[arm] = self._historyOfMeans[self._historyOfChangePoints[-2]][arm]
         self._historyOfMeans[t] = one_draw_of_means
+        self._meansTables.clear()  # the memoized tables of the means are outdated
         self._arms = [self.arm_type(mean) for mean in one_draw_of_means]
         self.nbArms = len(self._arms)  # useless
         if verbose or self._verbose:
@@ -1157,54 +1355,20 @@ class NonStationaryMAB(PieceWiseStationaryMAB):
             # print("Currently self._t = {} and self._historyOfMeans = {} ...".format(self._t, self._historyOfMeans))  # DEBUG
         return one_draw_of_means
 
-    def get_minArm(self, horizon=None):
-        """Return the smallest mean of the arms, for a non-stationary MAB
-
-        - It is a vector of length horizon.
-        """
-        if horizon is None:
-            horizon = np.max(self._historyOfChangePoints)
-        mapOfMinArms = [np.min (self._historyOfMeans[tau]) for tau in sorted(self._historyOfChangePoints)]
-        meansOfMinArms = np.zeros(horizon)
-        nbChangePoint = 0
-        for t in range(horizon):
-            if nbChangePoint < len(self._historyOfChangePoints) - 1 and t >= self._historyOfChangePoints[nbChangePoint + 1]:
-                nbChangePoint += 1
-            meansOfMinArms[t] = mapOfMinArms[nbChangePoint]
-        return meansOfMinArms
-
-    def get_maxArm(self, horizon=None):
-        """Return the vector of max mean of the arms, for a non-stationary MAB.
+    @property
+    def arms(self):
+        """Return the *current* list of arms, the last ones drawn by :meth:`newRandomArms`."""
+        return self._arms
 
-        - It is a vector of length horizon.
-        """
-        if horizon is None:
-            horizon = np.max(self._historyOfChangePoints)
-        mapOfMaxArms = [np.max(self._historyOfMeans[tau]) for tau in sorted(self._historyOfChangePoints)]
-        meansOfMaxArms = np.ones(horizon)
-        nbChangePoint = 0
-        for t in range(horizon):
-            if nbChangePoint < len(self._historyOfChangePoints) - 1 and t >= self._historyOfChangePoints[nbChangePoint + 1]:
-                nbChangePoint += 1
-            meansOfMaxArms[t] = mapOfMaxArms[nbChangePoint]
-        return meansOfMaxArms
+    @property
+    def means(self):
+        """Return the list of means of the *current* arms, the last ones drawn by :meth:`newRandomArms`."""
+        return self._historyOfMeans[self._historyOfChangePoints[-1]]
 
-    def get_allMeans(self, horizon=None):
-        """Return the vector of mean of the arms, for a non-stationary MAB.
-
-        - It is a numpy array of shape (nbArms, horizon).
-        """
-        if horizon is None:
-            horizon = np.max(self._historyOfChangePoints)
-        mapOfArms = [self._historyOfMeans[tau] for tau in sorted(self._historyOfChangePoints)]
-        meansOfArms = np.ones((self.nbArms, horizon))
-        for armId in range(self.nbArms):
-            nbChangePoint = 0
-            for t in range(horizon):
-                if nbChangePoint < len(self._historyOfChangePoints) - 1 and t >= self._historyOfChangePoints[nbChangePoint + 1]:
-                    nbChangePoint += 1
-                meansOfArms[armId][t] = mapOfArms[nbChangePoint][armId]
-        return meansOfArms
+    def schedule(self):
+        """Return the compact schedule of the means of the arms drawn so far: the array of the change points where new means were drawn, and the matrix of these means, of shape ``(nbIntervals, nbArms)``."""
+        changePoints = sorted(self._historyOfChangePoints)
+        return np.asarray(changePoints), np.array([self._historyOfMeans[tau] for tau in changePoints], dtype=float)
 
 
 # --- IncreasingMAB
@@ -1302,6 +1466,314 @@ class IncreasingMAB(MAB):
         return reward
 
 
+# --- Replay of logged rewards
+
+REPLAY_ORDERS = ("sequential", "offset", "permutation")  #: Orders in which :class:`ReplayMAB` can read the rows of its log.
+REPLAY_BLOCK_SIZE = 4096  #: Default number of rows of the log read at once by :class:`ReplayMAB`.
+REPLAY_GRID_SIZE = 1000  #: Default number of rows of the intervals where the means of the arms of a :class:`ReplayMAB` are constant.
+REPLAY_CHUNK_SIZE = 2 ** 18  #: Number of rows of the log read at once when computing its empirical means.
+
+
+def open_rewards_log(filename, nbArms=None, dtype="float64"):
+    """ Memory-map a log of rewards, one row per time step and one column per arm, in read-only mode.
+
+    - A ``.npy`` file (saved with ``numpy.save``) of a 2D array of shape ``(nbRows, nbArms)`` is mapped with ``numpy.load(filename, mmap_mode='r')``, its shape and dtype are read from its header,
+    - any other file is read as raw binary values of type ``dtype``, written row by row (C order) without any header, like ``array.tofile(filename)``: then ``nbArms`` is required.
+
+    >>> import tempfile, os
+    >>> filename = os.path.join(tempfile.mkdtemp(), "rewards.bin")
+    >>> np.arange(6, dtype=np.float32).reshape(3, 2).tofile(filename)
+    >>> open_rewards_log(filename, nbArms=2, dtype="float32")
+    memmap([[0., 1.],
+            [2., 3.],
+            [4., 5.]], dtype=float32)
+    """
+    if str(filename).endswith(".npy"):
+        log = np.load(filename, mmap_mode='r')
+    else:
+        assert nbArms is not None, "Error: the number of arms 'nbArms' is required to read the raw binary log of rewards {}.".format(filename)  # DEBUG
+        log = np.memmap(filename, dtype=dtype, mode='r')
+        assert log.size % nbArms == 0, "Error: the raw binary log of rewards {} has {} values, that is not a multiple of nbArms = {}.".format(filename, log.size, nbArms)  # DEBUG
+        log = log.reshape(-1, nbArms)
+    assert log.ndim == 2, "Error: the log of rewards {} has to be a 2D array, one row per time step and one column per arm, but it has shape {}.".format(filename, log.shape)  # DEBUG
+    return log
+
+
+class ReplayMAB(PieceWiseStationaryMAB):
+    """ MAB problem replaying rewards logged in a file, one row per time step and one column per arm.
+
+    - The log is memory-mapped (see :func:`open_rewards_log` for the layout of the files) and read by blocks of ``blockSize`` rows, so it is never loaded in memory, and the copies of the problem in the worker processes only keep the name of the file and map it again, sharing the same pages with zero copies.
+    - ``order`` (optional, default ``"sequential"``) is the order in which the rows are read:
+
+      - ``"sequential"``: the row :math:`t` at time :math:`t`, for all the repetitions. The means of the arms are the empirical means of the log on intervals of ``gridSize`` rows, so it is a piece-wise stationary problem with a change point every ``gridSize`` steps, and the regret is computed with these time-varying means,
+      - ``"offset"``: the rows :math:`t + o` (modulo the number of rows), with a random offset :math:`o` drawn for each repetition,
+      - ``"permutation"``: the rows in a random order drawn for each repetition, by blocks: the blocks of ``blockSize`` rows are read in a random order, and the rows of each block in a random order (the last incomplete block of the log is not used).
+
+      In the two random orders, the means of the arms are the empirical means of the whole log (of the rows that are used), constant in time.
+
+    - ``steadyArm`` is the kind of arm used for the lower bounds and the ``arms`` attribute, with the means of the arms (as for :class:`MarkovianMAB`).
+
+    Example::
+
+        configuration = {
+            "arm_type": "Replay",
+            "params": {
+                "filename": "rewards.npy",  # or "rewards.bin", then "nbArms": 10 and "dtype": "float32" are needed
+                "order": "offset",
+                "steadyArm": Bernoulli
+            }
+        }
+
+    - ``params`` can also have a key ``"rewards"`` instead of ``"filename"``, for a 2D array already in memory (or already mapped).
+
+    For instance, with a log of 10 rows where the reward of the first arm is :math:`t / 10` at row :math:`t`, read by blocks of 4 rows:
+
+    >>> import tempfile, os, pickle
+    >>> filename = os.path.join(tempfile.mkdtemp(), "rewards.npy")
+    >>> np.save(filename, np.arange(20).reshape(10, 2) / 20.)
+    >>> def replay(order):
+    ...     return ReplayMAB({"arm_type": "Replay", "params": {"filename": filename, "order": order, "blockSize": 4, "gridSize": 5, "steadyArm": Bernoulli}})
+
+    In the sequential order, the row :math:`t` is read at time :math:`t`, and the means are constant on the intervals of ``gridSize`` rows:
+
+    >>> problem = replay("sequential")  # doctest: +ELLIPSIS
+    <BLANKLINE>
+    <BLANKLINE>
+    Creating a new ReplayMAB problem ...
+    >>> [problem.draw(0, t) for t in range(10)]
+    [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+    >>> starts, lengths, means = problem.get_segments(horizon=8)
+    >>> starts, lengths, means
+    (array([0, 5]), array([5, 3]), array([[0.2 , 0.25],
+           [0.7 , 0.75]]))
+    >>> problem.means, problem.newRandomArms(t=6, verbose=False)
+    (array([0.2 , 0.25]), array([0.7 , 0.75]))
+
+    In the "offset" order, the rows are read from a random offset, and wrap around the end of the log:
+
+    >>> problem = replay("offset")  # doctest: +ELLIPSIS
+    <BLANKLINE>
+    <BLANKLINE>
+    Creating a new ReplayMAB problem ...
+    >>> np.random.seed(0)
+    >>> _ = problem.newRandomArms(verbose=False)
+    >>> problem._offset, [problem.draw(0, t) for t in range(10)]
+    (5, [0.5, 0.6, 0.7, 0.8, 0.9, 0.0, 0.1, 0.2, 0.3, 0.4])
+
+    A copy of the problem maps the file again, and reads the same rows (with the same offset):
+
+    >>> other = pickle.loads(pickle.dumps(problem))
+    >>> isinstance(other._log, np.memmap), other._log is problem._log
+    (True, False)
+    >>> [other.draw(0, t) for t in range(10)] == [problem.draw(0, t) for t in range(10)]
+    True
+
+    In the "permutation" order, the rows of the complete blocks (the first 8 rows) are read in a random order:
+
+    >>> problem = replay("permutation")  # doctest: +ELLIPSIS
+    <BLANKLINE>
+    <BLANKLINE>
+    Creating a new ReplayMAB problem ...
+    >>> _ = problem.newRandomArms(verbose=False)
+    >>> sorted(problem.draw(0, t) for t in range(8)), problem.means
+    ([0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7], array([0.35, 0.4 ]))
+
+    """
+
+    def __init__(self, configuration, verbose=VERBOSE):
+        """New ReplayMAB."""
+        print("\n\nCreating a new ReplayMAB problem ...")  # DEBUG
+        self.isMarkovian = False  #: The problem is not Markovian.
+        self._sparsity = None
+
+        assert isinstance(configuration, dict) \
+            and "params" in configuration \
+            and isinstance(configuration["params"], dict) \
+            and ("filename" in configuration["params"] or "rewards" in configuration["params"]), \
+            "Error: this ReplayMAB is not really a replay MAB, you should use a simple MAB instead!"  # DEBUG
+        params = configuration["params"]
+        print("  Reading the log of rewards of this ReplayMAB from a dictionnary 'configuration' = {} ...".format(configuration))  # DEBUG
+        self.filename = params.get("filename", None)  #: Name of the file of the log of rewards (``None`` if they were given as an array).
+        self._nbArmsOfLog = params.get("nbArms", None)
+        self._dtypeOfLog = params.get("dtype", "float64")
+        self._log = self._open() if self.filename is not None else np.asarray(params["rewards"])
+        self.nbRows, self.nbArms = self._log.shape  #: Number of rows of the log, and number of arms.
+        print(" - with 'nbRows' =", self.nbRows)  # DEBUG
+        print(" - with 'nbArms' =", self.nbArms)  # DEBUG
+
+        self.order = params.get("order", "sequential")  #: Order in which the rows of the log are read, see :data:`REPLAY_ORDERS`.
+        assert self.order in REPLAY_ORDERS, "Error: the order of a ReplayMAB has to be one of {}, not {}.".format(REPLAY_ORDERS, self.order)  # DEBUG
+        print(" - with 'order' =", self.order)  # DEBUG
+        self.blockSize = int(params.get("blockSize", REPLAY_BLOCK_SIZE))  #: Number of rows of the log read at once.
+        self.gridSize = int(params.get("gridSize", REPLAY_GRID_SIZE))  #: Number of rows of the intervals where the means of the arms are constant, in the sequential order.
+        self._steadyArm = params["steadyArm"]
+
+        self.isChangingAtEachRepetition = self.order != "sequential"  #: The random orders are drawn again at each repetition.
+        self.isDynamic = self.order == "sequential"  #: The means change only in the sequential order.
+        self.currentInterval = 0  # current number of the interval we are in
+        self._meansTables = dict()  # memoized tables of the means, see _meansTable()
+        self._knownGridMeans = np.zeros((0, self.nbArms))  # means of the first intervals of the log, see _gridMeans()
+        self._offset = 0
+        nbUsedRows = self.nbRows
+        if self.order == "permutation":
+            assert self.nbRows >= self.blockSize, "Error: the log of rewards has {} rows, less than one block of {} rows, it cannot be read by blocks in a random order.".format(self.nbRows, self.blockSize)  # DEBUG
+            nbUsedRows = (self.nbRows // self.blockSize) * self.blockSize
+        self._blockOrder = np.arange(nbUsedRows // self.blockSize)
+        self._block, self._blockRewards = None, None
+        self._globalMeans = None if self.isDynamic else self._columnMeans(nbUsedRows)
+        print(" - with 'means' =", self.means)  # DEBUG
+
+    def _open(self):
+        """ Map the file of the log of rewards."""
+        return open_rewards_log(self.filename, nbArms=self._nbArmsOfLog, dtype=self._dtypeOfLog)
+
+    def __getstate__(self):
+        """ Drop the mapping of the file (and the block of rewards read in advance) when copying or pickling the problem: the copies map the file again, and so share it with zero copies."""
+        state = super(ReplayMAB, self).__getstate__()
+        if self.filename is not None:
+            state["_log"] = None
+        state["_block"], state["_blockRewards"] = None, None
+        return state
+
+    def __setstate__(self, state):
+        """ Map the file of the log of rewards again, after copying or unpickling the problem."""
+        self.__dict__.update(state)
+        if self._log is None:
+            self._log = self._open()
+
+    def __repr__(self):
+        return "{}(nbArms: {}, nbRows: {}, order: {}, log: {})".format(self.__class__.__name__, self.nbArms, self.nbRows, self.order, self.filename if self.filename is not None else "array")
+
+    def reprarms(self, nbPlayers=None, openTag='', endTag='^*', latex=True):
+        """Cannot represent the logged arms, so print the ReplayMAB object"""
+        text = r"{text}, $K={K}$ arms replayed from {T} logged rewards ({order} order)".format(
+            text="Replay MAB",
+            K=self.nbArms,
+            T=self.nbRows,
+            order=self.order,
+        )
+        return wraptext(text)
+
+    # --- Empirical means of the log
+
+    def _columnMeans(self, nbRows):
+        """ Empirical means of the arms on the first nbRows rows of the log, read by chunks of :data:`REPLAY_CHUNK_SIZE` rows."""
+        total = np.zeros(self.nbArms)
+        for start in range(0, nbRows, REPLAY_CHUNK_SIZE):
+            total += np.sum(self._log[start:min(start + REPLAY_CHUNK_SIZE, nbRows)], axis=0, dtype=float)
+        return total / nbRows
+
+    def _gridMeans(self, nbIntervals):
+        """ Empirical means of the arms on the first nbIntervals intervals of ``gridSize`` rows of the log (the last one can be shorter), of shape ``(nbIntervals, nbArms)``.
+
+        - They are memoized, and only the missing intervals are read (by chunks of about :data:`REPLAY_CHUNK_SIZE` rows).
+        """
+        nbKnown = len(self._knownGridMeans)
+        if nbIntervals > nbKnown:
+            step = max(1, REPLAY_CHUNK_SIZE // self.gridSize)  # intervals per chunk
+            newMeans = [self._knownGridMeans]
+            for first in range(nbKnown, nbIntervals, step):
+                last = min(first + step, nbIntervals)
+                chunk = np.asarray(self._log[first * self.gridSize:last * self.gridSize], dtype=float)
+                nbFull = len(chunk) // self.gridSize
+                newMeans.append(np.mean(chunk[:nbFull * self.gridSize].reshape(nbFull, self.gridSize, self.nbArms), axis=1))
+                if len(chunk) > nbFull * self.gridSize:
+                    newMeans.append(np.mean(chunk[nbFull * self.gridSize:], axis=0)[np.newaxis, :])
+            self._knownGridMeans = np.vstack(newMeans)
+        return self._knownGridMeans[:nbIntervals]
+
+    # All these properties arms, means cannot be attributes, as the means of arms change at every interval
+
+    @property
+    def arms(self):
+        """Return the list of arms of type ``steadyArm`` with the *current* means (only used for the lower bounds)."""
+        return [self._steadyArm(mean) for mean in self.means]
+
+    @property
+    def means(self):
+        """ Return the *current* means of the arms: the empirical means of the log on the current interval in the sequential order, or on the whole log in the random orders."""
+        if self.isDynamic:
+            return self._gridMeans(self.currentInterval + 1)[self.currentInterval]
+        return self._globalMeans
+
+    @property
+    def changePoints(self):
+        """ The beginnings of the intervals where the means of the arms are constant: every ``gridSize`` rows in the sequential order, or only 0."""
+        return np.arange(0, self.nbRows, self.gridSize) if self.isDynamic else np.array([0])
+
+    def nextChangePoint(self, t=0):
+        """Return the first change point :math:`\\geq t` (``inf`` if there is none), ie. the next multiple of ``gridSize`` in the sequential order."""
+        if not self.isDynamic:
+            return float('inf')
+        nextChangePoint = -(-int(t) // self.gridSize) * self.gridSize
+        return nextChangePoint if nextChangePoint < self.nbRows else float('inf')
+
+    def schedule(self):
+        """Return the compact schedule of the means of the arms: the array of the change points, and the matrix of the means of the arms on each interval, of shape ``(nbIntervals, nbArms)``.
+
+        .. warning:: In the sequential order, it reads the whole log, prefer :meth:`get_segments` with a horizon.
+        """
+        if self.isDynamic:
+            changePoints = self.changePoints
+            return changePoints, self._gridMeans(len(changePoints))
+        return self.changePoints, self._globalMeans[np.newaxis, :]
+
+    def get_segments(self, horizon=None):
+        """Return the intervals of time where the means of the arms are constant, on the time steps :math:`t = 0, \\dots, T-1`, as :meth:`PieceWiseStationaryMAB.get_segments`.
+
+        - Only the first :math:`\\lceil T / \\text{gridSize} \\rceil` intervals of the log are read, and the horizon cannot be longer than the log in the sequential order.
+        """
+        if horizon is None:
+            horizon = self.nbRows
+        if not self.isDynamic:
+            return np.array([0]), np.array([horizon]), self._globalMeans[np.newaxis, :]
+        if horizon > self.nbRows:
+            raise ValueError("Error: the log of rewards of {} has only {} rows, it cannot be replayed sequentially for a horizon T = {}.".format(self, self.nbRows, horizon))
+        starts = np.arange(0, horizon, self.gridSize)
+        lengths = np.diff(np.append(starts, horizon))
+        return starts, lengths, self._gridMeans(len(starts))
+
+    def newRandomArms(self, t=None, onlyOneArm=None, verbose=VERBOSE):
+        """Use the next interval in the sequential order, or draw a new random offset or order of the blocks of rows (for a new repetition) in the random orders.
+        """
+        if self.isDynamic:
+            if t is not None:
+                self.currentInterval = int(t) // self.gridSize
+        else:
+            if self.order == "offset":
+                self._offset = np.random.randint(self.nbRows)
+            else:
+                self._blockOrder = np.random.permutation(len(self._blockOrder))
+            self._block, self._blockRewards = None, None
+            if verbose: print("  - For a ReplayMAB object, the function newRandomArms was called, with new offset = {} and first blocks = {}...".format(self._offset, self._blockOrder[:5]))  # DEBUG
+        return self.means
+
+    # --- Draw samples
+
+    def _readBlock(self, block):
+        """ Read the rows of the log used at the time steps of this block, in memory."""
+        if self.order == "permutation":
+            start = self._blockOrder[block % len(self._blockOrder)] * self.blockSize
+            rewards = np.asarray(self._log[start:start + self.blockSize], dtype=float)[np.random.permutation(self.blockSize)]
+        else:
+            start = (block * self.blockSize + self._offset) % self.nbRows
+            rewards = np.asarray(self._log[start:start + self.blockSize], dtype=float)
+            while len(rewards) < self.blockSize:  # wrap around the end of the log
+                rewards = np.vstack([rewards, np.asarray(self._log[:self.blockSize - len(rewards)], dtype=float)])
+        self._block, self._blockRewards = block, rewards.tolist()
+
+    def draw(self, armId, t=1):
+        """ Return the logged reward of the armId-th arm, at time t."""
+        block = t // self.blockSize
+        if block != self._block:
+            self._readBlock(block)
+        return self._blockRewards[t - block * self.blockSize][armId]
+
+    def draw_nparray(self, armId, shape=(1,)):
+        """ Not available: the rewards are not random, they depend on the time steps."""
+        raise NotImplementedError("A ReplayMAB cannot draw arrays of rewards, use draw(armId, t) for each time t.")
+
+
 # --- Utility functions
 
 def binomialCoefficient(k, n):
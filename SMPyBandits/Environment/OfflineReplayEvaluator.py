@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+""" OfflineReplayEvaluator class to evaluate policies offline, on logged bandit data, with the replay method.
+
+- The log is a list of events ``(arm, reward)``, collected by a *uniformly random* exploration policy, and stored in one or several files (chunks), each one a 2D array of shape ``(nbEvents, 2)``: the arm shown (as an integer in ``{0, ..., K-1}``) and the reward observed, see :func:`MAB.open_rewards_log` for the layout of the files (``.npy`` or raw binary).
+- The replay method, from [Li et al, 2011](https://arxiv.org/abs/1003.5956), streams the events through each policy: a logged event is *accepted* only if the policy chooses the logged arm, then the policy receives the logged reward, otherwise the event is ignored. With a uniform logging policy, the mean reward on the accepted events is an unbiased estimate of the click-through rate (CTR) of the policy, on about ``nbEvents / K`` steps.
+- The files are memory-mapped and read by blocks of ``block_size`` events, all the policies (and repetitions) of one process advance together on each block, so the log is read only once per process, and each policy has its own random state, so its results do not depend on how the policies are distributed between the processes.
+
+Example of configuration::
+
+    configuration = {
+        "log": {
+            "filenames": ["events-000.npy", "events-001.npy"],  # or arrays of shape (nbEvents, 2)
+            "nbArms": 10,
+            # "dtype": "float32",  # for raw binary files
+        },
+        "repetitions": 1,
+        "n_jobs": 4,
+        "verbosity": 6,
+        "policies": [
+            {"archtype": UCB, "params": {}},
+            {"archtype": Thompson, "params": {}},
+        ]
+    }
+"""
+from __future__ import division, print_function  # Python 2 compatibility
+
+__author__ = "Lilian Besson"
+__version__ = "0.9"
+
+# Generic imports
+import random
+import time
+from copy import deepcopy
+# Scientific imports
+import numpy as np
+import matplotlib.pyplot as plt
+
+try:
+    # Local imports, libraries
+    from .usejoblib import USE_JOBLIB, Parallel, delayed
+    from .usetqdm import USE_TQDM, tqdm
+    # Local imports, tools and config
+    from .plotsettings import signature, palette, makemarkers, legend, show_and_save, violin_or_box_plot, adjust_xticks_subplots
+    # Local imports, objects and functions
+    from .MAB import open_rewards_log
+except ImportError:
+    # Local imports, libraries
+    from usejoblib import USE_JOBLIB, Parallel, delayed
+    from usetqdm import USE_TQDM, tqdm
+    # Local imports, tools and config
+    from plotsettings import signature, palette, makemarkers, legend, show_and_save, violin_or_box_plot, adjust_xticks_subplots
+    # Local imports, objects and functions
+    from MAB import open_rewards_log
+
+try:
+    from Policies import TakeFixedArm, Uniform  # Only used in the doctests
+except ImportError:  # WARNING ModuleNotFoundError is only Python 3.6+
+    try:
+        from SMPyBandits.Policies import TakeFixedArm, Uniform
+    except ImportError:  # from the Environment folder
+        import sys; sys.path.insert(0, '..')
+        from Policies import TakeFixedArm, Uniform
+
+
+REPETITIONS = 1    #: Default nb of repetitions
+NB_POINTS_PLOT = 1000  #: Default number of points of the curves, ie. the sampling rate for plotting is ``nbEvents / NB_POINTS_PLOT``
+BLOCK_SIZE = 4096  #: Default number of events read at once from the log
+USE_BOX_PLOT = True  #: True to use boxplot, False to use violinplot.
+
+
+def open_log_chunks(logConfiguration):
+    """ Open (memory-map) the chunks of the log of events, given as a dictionary with keys ``filenames`` (names of files, or 2D arrays) and ``dtype`` (optional, for raw binary files)."""
+    chunks = []
+    for filename in logConfiguration["filenames"]:
+        if isinstance(filename, str):
+            chunks.append(open_rewards_log(filename, nbArms=2, dtype=logConfiguration.get("dtype", "float64")))
+        else:
+            chunks.append(np.asarray(filename))
+        assert chunks[-1].ndim == 2 and chunks[-1].shape[1] == 2, "Error: each chunk of the log of events has to be a 2D array of shape (nbEvents, 2), with the arm and the reward of each event."  # DEBUG
+    return chunks
+
+
+class OfflineReplayEvaluator(object):
+    """ OfflineReplayEvaluator class to evaluate policies offline, on the log of a uniformly random policy, with the replay method.
+
+    For instance, on a log of 3000 events of 3 Bernoulli arms, in two chunks in memory:
+
+    >>> generator = np.random.RandomState(0)
+    >>> arms = generator.randint(3, size=3000)
+    >>> rewards = generator.random_sample(3000) < np.array([0.1, 0.5, 0.9])[arms]
+    >>> log = np.column_stack([arms, rewards]).astype(float)
+    >>> def replay(n_jobs):
+    ...     evaluation = OfflineReplayEvaluator({
+    ...         "log": {"filenames": [log[:1000], log[1000:]], "nbArms": 3},
+    ...         "repetitions": 2, "n_jobs": n_jobs, "verbosity": 0, "block_size": 256,
+    ...         "policies": [
+    ...             {"archtype": TakeFixedArm, "params": {"armIndex": 2}},
+    ...             {"archtype": Uniform, "params": {}},
+    ...         ]
+    ...     })
+    ...     np.random.seed(1)  # the seeds of the repetitions
+    ...     evaluation.startReplay()
+    ...     return evaluation
+    >>> evaluation = replay(n_jobs=1)  # doctest: +ELLIPSIS
+    Number of policies in this comparison: 2
+    ...
+
+    A policy always choosing the same arm accepts all the events of this arm, about :math:`N / K`, and its CTR is the logged mean of the arm:
+
+    >>> evaluation.getAcceptedEvents(0)[-1] == evaluation.loggedPulls[2], evaluation.loggedPulls[2]
+    (True, 997)
+    >>> np.isclose(evaluation.getCTR(0)[-1], evaluation.loggedRewards[2] / evaluation.loggedPulls[2])
+    True
+
+    The results do not depend on the number of processes:
+
+    >>> other = replay(n_jobs=2)  # doctest: +ELLIPSIS
+    Number of policies in this comparison: 2
+    ...
+    >>> np.array_equal(evaluation.acceptedEvents, other.acceptedEvents), np.array_equal(evaluation.cumRewards, other.cumRewards)
+    (True, True)
+    """
+
+    def __init__(self, configuration, useJoblib=USE_JOBLIB):
+        self.cfg = configuration  #: Configuration dictionnary
+        # Attributes
+        self.nbPolicies = len(self.cfg['policies'])  #: Number of policies
+        print("Number of policies in this comparison:", self.nbPolicies)
+        self.logConfiguration = self.cfg['log']  #: Configuration of the log of events
+        self.nbArms = self.logConfiguration['nbArms']  #: Number of arms of the logged bandit problem
+        print("Number of arms:", self.nbArms)
+        self.nbEvents = sum(len(chunk) for chunk in open_log_chunks(self.logConfiguration))  #: Total number of logged events
+        print("Number of logged events:", self.nbEvents)
+        self.repetitions = self.cfg.get('repetitions', REPETITIONS)  #: Number of repetitions
+        print("Number of repetitions:", self.repetitions)
+        self.delta_t_plot = self.cfg.get('delta_t_plot', max(1, self.nbEvents // NB_POINTS_PLOT))  #: Sampling rate for plotting (in logged events)
+        print("Sampling rate for plotting, delta_t_plot:", self.delta_t_plot)
+        self.block_size = self.cfg.get('block_size', BLOCK_SIZE)  #: Number of events read at once from the log
+        print("Number of jobs for parallelization:", self.cfg['n_jobs'])
+        self.useJoblib = useJoblib and self.cfg['n_jobs'] != 1  #: Use joblib to parallelize the replay of the policies (useful)
+        self.showplot = self.cfg.get('showplot', True)  #: Show the plot (interactive display or not)
+        self.use_box_plot = USE_BOX_PLOT or (self.repetitions == 1)  #: To use box plot (or violin plot if False). Force to use boxplot if repetitions=1.
+        self.signature = signature
+
+        self.change_labels = self.cfg.get('change_labels', {})  #: Possibly empty dictionary to map 'policyId' to new labels (overwrite their name).
+        self.append_labels = self.cfg.get('append_labels', {})  #: Possibly empty dictionary to map 'policyId' to new labels (by appending the result from 'append_labels').
+
+        # Internal object memory
+        self.policies = []  #: List of policies
+        self.__initPolicies__()
+        # Internal vectorial memory
+        nbGridPoints = self.nbEvents // self.delta_t_plot
+        self._events = self.delta_t_plot * np.arange(1, 1 + nbGridPoints)  #: Numbers of logged events of the points of the curves
+        self.acceptedEvents = np.zeros((self.nbPolicies, self.repetitions, nbGridPoints), dtype=int)  #: For each policy and repetition, number of accepted events after each point of the curves
+        self.cumRewards = np.zeros((self.nbPolicies, self.repetitions, nbGridPoints))  #: For each policy and repetition, sum of the rewards of the accepted events after each point of the curves
+        self.pulls = np.zeros((self.nbPolicies, self.nbArms), dtype=int)  #: For each policy, total number of accepted events of each arm (summed on the repetitions)
+        self.runningTimes = np.zeros((self.nbPolicies, self.repetitions))  #: For each policy and repetition, running time of the policy
+        self.loggedPulls = np.zeros(self.nbArms, dtype=int)  #: Number of logged events of each arm
+        self.loggedRewards = np.zeros(self.nbArms)  #: Sum of the logged rewards of each arm
+
+    # --- Init methods
+
+    def __initPolicies__(self):
+        """ Create or initialize policies."""
+        for policyId, policy in enumerate(self.cfg['policies']):
+            print("- Adding policy #{} = {} ...".format(policyId + 1, policy))  # DEBUG
+            if isinstance(policy, dict):
+                print("  Creating this policy from a dictionnary 'self.cfg['policies'][{}]' = {} ...".format(policyId, policy))  # DEBUG
+                self.policies.append(policy['archtype'](self.nbArms, **policy['params']))
+            else:
+                print("  Using this already created policy 'self.cfg['policies'][{}]' = {} ...".format(policyId, policy))  # DEBUG
+                self.policies.append(policy)
+        for policyId in range(self.nbPolicies):
+            self.policies[policyId].__cachedstr__ = str(self.policies[policyId])
+            if policyId in self.append_labels:
+                self.policies[policyId].__cachedstr__ += self.append_labels[policyId]
+            if policyId in self.change_labels:
+                self.policies[policyId].__cachedstr__ = self.change_labels[policyId]
+
+    # --- Start computation
+
+    def startReplay(self):
+        """ Replay the log for all the policies and repetitions.
+
+        - The pairs (policy, repetition) are split in ``n_jobs`` groups, and each group is replayed by one process, in one pass of the log (or only one group if joblib is not used).
+        """
+        tasks = [(policyId, repeatId) for policyId in range(self.nbPolicies) for repeatId in range(self.repetitions)]
+        seeds = np.random.randint(low=0, high=100 * len(tasks), size=len(tasks)).tolist()
+        nbGroups = 1
+        if self.useJoblib:
+            nbGroups = len(tasks) if self.cfg['n_jobs'] < 0 else min(len(tasks), self.cfg['n_jobs'])
+        groups = [list(range(len(tasks)))[i::nbGroups] for i in range(nbGroups)]
+        print("\n\n\n- Replaying the log of {} events for {} policies and {} repetitions, in {} group(s) ...".format(self.nbEvents, self.nbPolicies, self.repetitions, nbGroups))  # DEBUG
+
+        def store(r, taskId):
+            """ Store the result of the replay of the #taskId (policy, repetition)."""
+            policyId, repeatId = tasks[taskId]
+            self.acceptedEvents[policyId, repeatId, :] = r["acceptedEvents"]
+            self.cumRewards[policyId, repeatId, :] = r["cumRewards"]
+            self.pulls[policyId, :] += r["pulls"]
+            self.runningTimes[policyId, repeatId] = r["runningTime"]
+
+        jobs = [
+            (delayed(replay_pass) if self.useJoblib else replay_pass)(self.logConfiguration, [self.policies[tasks[taskId][0]] for taskId in group], [seeds[taskId] for taskId in group], self.nbArms, self.delta_t_plot, self.block_size, showProgress=(groupId == 0))
+            for groupId, group in enumerate(groups)
+        ]
+        results = Parallel(n_jobs=self.cfg['n_jobs'], verbose=self.cfg['verbosity'])(jobs) if self.useJoblib else jobs
+        for group, (loggedPulls, loggedRewards, groupResults) in zip(groups, results):
+            for taskId, r in zip(group, groupResults):
+                store(r, taskId)
+        self.loggedPulls, self.loggedRewards = loggedPulls, loggedRewards
+
+    # --- Getter methods
+
+    def getAcceptedEvents(self, policyId):
+        """ Average number of accepted events of this policy, after each point of the curves."""
+        return np.mean(self.acceptedEvents[policyId], axis=0)
+
+    def getCTR(self, policyId):
+        """ Estimated click-through rate (CTR) of this policy, ie. mean reward on its accepted events, after each point of the curves (averaged on the repetitions, and ``nan`` before the first accepted event)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.mean(self.cumRewards[policyId] / self.acceptedEvents[policyId], axis=0)
+
+    def getLoggedCTR(self):
+        """ CTR of the logging policy, ie. mean reward of all the logged events."""
+        return np.sum(self.loggedRewards) / max(1, np.sum(self.loggedPulls))
+
+    def getBestArmCTR(self):
+        """ CTR of the best arm, ie. largest empirical mean of the logged rewards of the arms."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.nanmax(self.loggedRewards / self.loggedPulls)
+
+    def getRunningTimes(self):
+        """Get the means and stds and list of running time of the different policies."""
+        all_times = [ self.runningTimes[policyId, :] for policyId in range(self.nbPolicies) ]
+        means = [ np.mean(times) for times in all_times ]
+        stds  = [ np.std(times) for times in all_times ]
+        return means, stds, all_times
+
+    # --- Printing and plotting methods
+
+    def printFinalRanking(self):
+        """Print the final ranking of the different policies, by decreasing estimated CTR."""
+        print("\nGiving the final ranks ...")
+        print("\nFinal ranking for this log of {} events (CTR of the logging policy = {:.5g}, of the best arm = {:.5g}) :".format(self.nbEvents, self.getLoggedCTR(), self.getBestArmCTR()))
+        lastCTR = np.array([self.getCTR(policyId)[-1] for policyId in range(self.nbPolicies)])
+        lastAccepted = np.array([self.getAcceptedEvents(policyId)[-1] for policyId in range(self.nbPolicies)])
+        index_of_sorting = np.argsort(-lastCTR)
+        for i, k in enumerate(index_of_sorting):
+            policy = self.policies[k]
+            print("- Policy '{}'\twas ranked\t{} / {} for this replay (estimated CTR = {:.5g}, on {:.5g} accepted events).".format(policy.__cachedstr__, i + 1, self.nbPolicies, lastCTR[k], lastAccepted[k]))
+        return lastCTR, index_of_sorting
+
+    def _title(self, text):
+        """ Title of the plots: this text, and the description of the log."""
+        return "{}, averaged ${}$ times\nReplay of ${}$ logged events, ${}$ arms".format(text, self.repetitions, self.nbEvents, self.nbArms)
+
+    def plotCTR(self, savefig=None):
+        """Plot the estimated CTR of the different policies, as a function of the number of logged events, with the CTR of the logging policy and of the best arm."""
+        fig = plt.figure()
+        colors = palette(self.nbPolicies)
+        markers = makemarkers(self.nbPolicies)
+        X = self._events
+        for i, policy in enumerate(self.policies):
+            plt.plot(X, self.getCTR(i), label=policy.__cachedstr__, color=colors[i], marker=markers[i], markevery=(i / 50., 0.1), lw=3)
+        plt.plot(X, self.getLoggedCTR() * np.ones_like(X), 'k:', label="Logging policy, CTR = ${:.3g}$".format(self.getLoggedCTR()))
+        plt.plot(X, self.getBestArmCTR() * np.ones_like(X), 'k--', label="Best arm, CTR = ${:.3g}$".format(self.getBestArmCTR()))
+        legend()
+        plt.xlabel(r"Number of logged events, $N = {}${}".format(self.nbEvents, self.signature))
+        plt.ylabel("Estimated CTR (mean reward on the accepted events)")
+        plt.title(self._title("Estimated CTR for different bandit algorithms"))
+        show_and_save(self.showplot, savefig, fig=fig)
+        return fig
+
+    def plotAcceptedEvents(self, savefig=None):
+        """Plot the number of accepted events of the different policies, as a function of the number of logged events, with the expected number ``N / K``."""
+        fig = plt.figure()
+        colors = palette(self.nbPolicies)
+        markers = makemarkers(self.nbPolicies)
+        X = self._events
+        for i, policy in enumerate(self.policies):
+            plt.plot(X, self.getAcceptedEvents(i), label=policy.__cachedstr__, color=colors[i], marker=markers[i], markevery=(i / 50., 0.1), lw=3)
+        plt.plot(X, X / float(self.nbArms), 'k--', label="$N / K$")
+        legend()
+        plt.xlabel(r"Number of logged events, $N = {}${}".format(self.nbEvents, self.signature))
+        plt.ylabel("Number of accepted events")
+        plt.title(self._title("Accepted events for different bandit algorithms"))
+        show_and_save(self.showplot, savefig, fig=fig)
+        return fig
+
+    def printRunningTimes(self, precision=3):
+        """Print the average+-std running time of the different policies."""
+        print("\nGiving the mean and std running times ...")
+        try:
+            from IPython.core.magics.execution import _format_time
+        except ImportError:
+            def _format_time(timespan, precision=3):
+                """ Fallback for IPython's _format_time, in seconds."""
+                return "{:.{}g} s".format(timespan, precision)
+        means, stds, _ = self.getRunningTimes()
+        for policyId in np.argsort(means):
+            policy = self.policies[policyId]
+            print("\nFor policy #{} called '{}' ...".format(policyId, policy.__cachedstr__))
+            mean_time, var_time  = means[policyId], stds[policyId]
+            if self.repetitions <= 1:
+                print(u"    {} (mean of 1 run)" .format(_format_time(mean_time, precision)))
+            else:
+                print(u"    {} ± {} per loop (mean ± std. dev. of {} run)" .format(_format_time(mean_time, precision), _format_time(var_time, precision), self.repetitions))
+
+    def plotRunningTimes(self, savefig=None, base=1, unit="seconds"):
+        """Plot the running times of the different policies, as a box plot for each."""
+        means, _, all_times = self.getRunningTimes()
+        # order by increasing mean time
+        index_of_sorting = np.argsort(means)
+        labels = [ policy.__cachedstr__ for policy in self.policies ]
+        labels = [ labels[i] for i in index_of_sorting ]
+        all_times = [ np.asarray(all_times[i]) / float(base) for i in index_of_sorting ]
+        fig = plt.figure()
+        violin_or_box_plot(data=all_times, labels=labels, boxplot=self.use_box_plot)
+        plt.xlabel("Bandit algorithms{}".format(self.signature))
+        ylabel = "Running times (in {}), for {} repetitions".format(unit, self.repetitions)
+        plt.ylabel(ylabel)
+        adjust_xticks_subplots(ylabel=ylabel, labels=labels)
+        plt.title(self._title("Running times for different bandit algorithms"))
+        show_and_save(self.showplot, savefig, fig=fig)
+        return fig
+
+
+# Helper function for the parallelization
+
+def replay_pass(logConfiguration, policies, seeds, nbArms, delta_t_plot, block_size=BLOCK_SIZE, showProgress=False):
+    """ Replay the log once, for these policies, each one with its own seed.
+
+    - The events are read by blocks of ``block_size``, and each policy replays a whole block with its own random states (of ``random`` and ``numpy.random``), restored before and saved after the block.
+    - Return the numbers of logged events and the sums of logged rewards of each arm, and for each policy a dictionary with the number of accepted events and the sum of their rewards after every ``delta_t_plot`` logged events, the pulls of each arm and the running time.
+    """
+    policies = [deepcopy(policy) for policy in policies]
+    states = []
+    for policy, seed in zip(policies, seeds):
+        random.seed(seed)
+        np.random.seed(seed)
+        policy.startGame()
+        states.append((random.getstate(), np.random.get_state()))
+    nbPolicies = len(policies)
+    accepted, cumRewards = np.zeros(nbPolicies, dtype=int), np.zeros(nbPolicies)
+    pulls = np.zeros((nbPolicies, nbArms), dtype=int)
+    runningTimes = np.zeros(nbPolicies)
+    acceptedEvents, sumRewards = [[] for _ in policies], [[] for _ in policies]
+    loggedPulls, loggedRewards = np.zeros(nbArms, dtype=int), np.zeros(nbArms)
+    nbEventsBefore = 0
+
+    chunks = open_log_chunks(logConfiguration)
+    blocks = [(chunk, start) for chunk in chunks for start in range(0, len(chunk), block_size)]
+    for chunk, start in (tqdm(blocks, desc="Blocks of events") if showProgress else blocks):
+        block = np.asarray(chunk[start:start + block_size], dtype=float)
+        arms = block[:, 0].astype(int)
+        rewards = block[:, 1]
+        loggedPulls += np.bincount(arms, minlength=nbArms)
+        loggedRewards += np.bincount(arms, weights=rewards, minlength=nbArms)
+        # Points of the curves in this block
+        points = np.arange(delta_t_plot - 1 - nbEventsBefore % delta_t_plot, len(block), delta_t_plot)
+        for i, policy in enumerate(policies):
+            random.setstate(states[i][0])
+            np.random.set_state(states[i][1])
+            startTime = time.time()
+            isAccepted = np.zeros(len(block), dtype=bool)
+            for n, (arm, reward) in enumerate(zip(arms.tolist(), rewards.tolist())):
+                if policy.choice() == arm:
+                    policy.getReward(arm, reward)
+                    isAccepted[n] = True
+            runningTimes[i] += time.time() - startTime
+            states[i] = (random.getstate(), np.random.get_state())
+            pulls[i] += np.bincount(arms[isAccepted], minlength=nbArms)
+            acceptedCum = accepted[i] + np.cumsum(isAccepted)
+            rewardsCum = cumRewards[i] + np.cumsum(rewards * isAccepted)
+            acceptedEvents[i].append(acceptedCum[points])
+            sumRewards[i].append(rewardsCum[points])
+            accepted[i], cumRewards[i] = acceptedCum[-1], rewardsCum[-1]
+        nbEventsBefore += len(block)
+
+    results = [
+        {
+            "acceptedEvents": np.concatenate(acceptedEvents[i]),
+            "cumRewards": np.concatenate(sumRewards[i]),
+            "pulls": pulls[i],
+            "runningTime": runningTimes[i],
+        }
+        for i in range(nbPolicies)
+    ]
+    return loggedPulls, loggedRewards, results
+
+
+# --- Debugging
+
+if __name__ == "__main__":
+    # Code for debugging purposes.
+    from doctest import testmod
+    print("\nTesting automatically all the docstring written in each functions of this module :")
+    testmod(verbose=True)
@@ -21,10 +21,7 @@ class Result(object):
         self.pulls = np.zeros(nbArms, dtype=int)  #: Store the pulls.
         if means is not None:
             indexes_bestarm = np.nonzero(np.isclose(means, np.max(means)))[0]
-        indexes_bestarm = np.asarray(indexes_bestarm)
-        if np.size(indexes_bestarm) == 1:
-            indexes_bestarm = np.asarray([indexes_bestarm])
-        self.indexes_bestarm = [ indexes_bestarm for _ in range(horizon)]  #: Store also the position of the best arm, XXX in case of dynamically switching environment.
+        self.bestArmSegments = [(0, np.atleast_1d(indexes_bestarm))]  #: Store also the position of the best arm, as a list of ``(time, indexes_bestarm)`` valid from that time until the next one, XXX in case of dynamically switching environment.
         self.running_time = -1  #: Store the running time of the experiment.
         self.memory_consumption = -1  #: Store the memory consumption of the experiment.
         self.number_of_cp_detections = 0  #: Store the number of change point detected during the experiment.
@@ -39,8 +36,45 @@ class Result(object):
         """ Store the position of the best arm from this list of arm.
 
         - From that time t **and after**, the index of the best arm is stored as ``indexes_bestarm``.
+        - It only adds a segment to ``self.bestArmSegments``, in :math:`\\mathcal{O}(1)`.
 
         .. warning:: FIXME This is still experimental!
         """
-        for t in range(time, len(self.indexes_bestarm)):
-            self.indexes_bestarm[t] = indexes_bestarm
+        while self.bestArmSegments and self.bestArmSegments[-1][0] >= time:
+            self.bestArmSegments.pop()
+        self.bestArmSegments.append((time, np.atleast_1d(indexes_bestarm)))
+
+    @property
+    def indexes_bestarm(self):
+        """ List of the indexes of the best arm(s) at each time step, expanded from ``self.bestArmSegments``."""
+        horizon = len(self.choices)
+        ends = [time for time, _ in self.bestArmSegments[1:]] + [horizon]
+        return [indexes for (start, indexes), end in zip(self.bestArmSegments, ends) for _ in range(min(start, horizon), min(end, horizon))]
+
+    def choices_of_bestarm(self):
+        """ Boolean vector of length horizon: was the arm chosen at each time step one of the best arm(s) at that time step?
+
+        >>> result = Result(3, 6, means=[0.1, 0.5, 0.9])
+        >>> for t, choice in enumerate([0, 2, 2, 1, 1, 2]):
+        ...     result.store(t, choice, 1)
+        >>> result.change_in_arms(3, [1])
+        >>> result.choices_of_bestarm()
+        array([False,  True,  True,  True,  True, False])
+        >>> [list(indexes) for indexes in result.indexes_bestarm]
+        [[2], [2], [2], [1], [1], [1]]
+        """
+        horizon = len(self.choices)
+        isBest = np.zeros(horizon, dtype=bool)
+        ends = [time for time, _ in self.bestArmSegments[1:]] + [horizon]
+        for (start, indexes), end in zip(self.bestArmSegments, ends):
+            isBest[start:end] = np.in1d(self.choices[start:end], indexes)
+        return isBest
+
+
+# --- Debugging
+
+if __name__ == "__main__":
+    # Code for debugging purposes.
+    from doctest import testmod
+    print("\nTesting automatically all the docstring written in each functions of this module :")
+    testmod(verbose=True)
@@ -1,5 +1,13 @@
 # -*- coding: utf-8 -*-
-""" ResultMultiPlayers.ResultMultiPlayers class to wrap the simulation results, for the multi-players case."""
+""" ResultMultiPlayers.ResultMultiPlayers class to wrap the simulation results, for the multi-players case.
+
+- The result of one repetition is *compact*: nothing has a size of order :math:`M \times K \times T`.
+- The choices are stored with the smallest integer type able to hold the indexes of the arms (``int16`` or ``int32``),
+- the pulls and the collisions of every arm, and the rewards of every player, are cumulated during the simulation, and only kept on the plotting grid (every ``delta_t_plot`` steps), only the sum of the rewards of all the players is kept at every step,
+- the three terms of the decomposition of the centralized regret, the number of collisions and the free transmissions are computed at every step, from the pulls and the collisions of that step, and stored as vectors of size :math:`T` (or :math:`M \times T`),
+- the fairness measures of the cumulated rewards of the players are computed at the end of each repetition, on the plotting grid,
+- so the evaluators only have to add these accumulators, and the results sent back from the parallel workers are small.
+"""
 from __future__ import division, print_function  # Python 2 compatibility
 
 __author__ = "Lilian Besson"
@@ -7,28 +15,300 @@ __version__ = "0.9"
 
 import numpy as np
 
+try:
+    from .fairnessMeasures import fairness_measures
+except ImportError:
+    from fairnessMeasures import fairness_measures
+
+
+#: Default number of time steps of the blocks of ranks buffered by :class:`RanksTransitions`.
+RANKS_BLOCK_SIZE = 1000
+
+
+def choices_dtype(nbArms):
+    """ Smallest signed integer type able to store the choices of the players (indexes of the arms, or -1 for a non activated player).
+
+    >>> choices_dtype(10)
+    <class 'numpy.int16'>
+    >>> choices_dtype(100000)
+    <class 'numpy.int32'>
+    """
+    return np.int16 if nbArms < np.iinfo(np.int16).max else np.int32
+
+
+def grid_size(horizon, delta_t_plot=1):
+    """ Number of time steps in the plotting grid ``0, delta_t_plot, 2 * delta_t_plot, ...`` (of size ``horizon // delta_t_plot`` if it divides the horizon)."""
+    return len(range(0, horizon, delta_t_plot))
+
 
 class ResultMultiPlayers(object):
     """ ResultMultiPlayers accumulators, for the multi-players case. """
 
-    # , delta_t_save=1
-    def __init__(self, nbArms, horizon, nbPlayers, means=None):
+    def __init__(self, nbArms, horizon, nbPlayers, means=None, delta_t_plot=1, full_lost_if_collision=True):
         """ Create ResultMultiPlayers."""
-        # self._means = means  # Keep the means for ChangingAtEachRepMAB cases
-        self.choices = np.zeros((nbPlayers, horizon), dtype=int)  #: Store all the choices of all the players
-        self.rewards = np.zeros((nbPlayers, horizon))  #: Store all the rewards of all the players, to compute the mean
-        # self.rewardsSquared = np.zeros((nbPlayers, horizon))  #: Store all the rewards**2 of all the players, to compute the variance  # XXX uncomment if needed
+        self.nbArms = nbArms  #: Number of arms
+        self.delta_t_plot = delta_t_plot  #: Sampling rate of the plotting grid
+        self.full_lost_if_collision = full_lost_if_collision  #: Is there a full loss of rewards if collision? To compute the third term of the regret
+        self.choices = np.zeros((nbPlayers, horizon), dtype=choices_dtype(nbArms))  #: Store all the choices of all the players (-1 for non activated players)
+        self.sumRewards = np.zeros(horizon)  #: Store the sum of the rewards of all the players, at each time step
+        self._cumRewards = np.zeros(nbPlayers)  # Cumulated rewards of each player, up to the current time step
+        self.cumRewards = np.zeros((nbPlayers, grid_size(horizon, delta_t_plot)))  #: Store the cumulated rewards of all the players, on the plotting grid
         self.pulls = np.zeros((nbPlayers, nbArms), dtype=int)  #: Store the pulls of all the players
-        self.allPulls = np.zeros((nbPlayers, nbArms, horizon), dtype=int)  #: Store all the pulls of all the players
-        self.collisions = np.zeros((nbArms, horizon), dtype=int)  #: Store the collisions on all the arms
+        self.allPulls = np.zeros((nbPlayers, nbArms, grid_size(horizon, delta_t_plot)), dtype=np.int32)  #: Store the cumulated pulls of all the players, on the plotting grid
+        self.collisions = np.zeros(nbArms, dtype=int)  #: Store the cumulated collisions on all the arms
+        self.allCollisions = np.zeros((nbArms, grid_size(horizon, delta_t_plot)), dtype=np.int32)  #: Store the cumulated collisions on all the arms, on the plotting grid
+        self.nbCollisions = np.zeros(horizon, dtype=np.int32)  #: Store the number of collisions (on all the arms) at each time step
+        self.freeTransmissions = np.zeros((nbPlayers, horizon), dtype=bool)  #: Store the successful transmissions (alone on their arm) of all the players
+        self.regretTerms = np.zeros((3, horizon))  #: Store the losses of the three terms (a), (b) and (c) of the centralized regret, at each time step
         self.running_time = -1  #: Store the running time of the experiment
         self.memory_consumption = -1  #: Store the memory consumption of the experiment
+        self.ranksTransitions = None  #: Store the transitions of the configurations of ranks of the players (a :class:`RanksTransitions`), if they are counted
+        self.change_means(means)
+
+    def change_means(self, means):
+        r""" Compute the weights used for the losses of the three terms of the regret, for these means (to call when the means of the arms change).
+
+        - Term :math:`(a)`: :math:`\mu_M^* - \mu_k` for the suboptimal arms,
+        - term :math:`(b)`: :math:`\mu_k - \mu_M^*` for the :math:`M` best arms (:math:`M` is limited to :math:`K`),
+        - term :math:`(c)`: :math:`\mu_k` for all the arms.
+        """
+        self._weights = None
+        if means is None:
+            return
+        means = np.asarray(means, dtype=float)
+        nbBest = min(self.nbArms, self.choices.shape[0])
+        sortingIndex = np.argsort(means)
+        worst, best = sortingIndex[:-nbBest], sortingIndex[-nbBest:]
+        weights = np.zeros((3, self.nbArms))
+        weights[0, worst] = means[best[0]] - means[worst]
+        weights[1, best] = means[best] - means[best[0]]
+        weights[2] = means
+        self._weights = weights
+        self._sumBestDeltas = np.sum(weights[1])
 
     def store(self, time, choices, rewards, pulls, collisions):
         """ Store results."""
-        self.choices[:, time] = choices
-        self.rewards[:, time] = rewards
-        # self.rewardsSquared[:, time] = rewards ** 2  # XXX uncomment if needed
+        self.choices[:, time] = np.where(choices >= 0, choices, -1)
+        self.sumRewards[time] = np.sum(rewards)
+        self._cumRewards += rewards
         self.pulls += pulls
-        self.allPulls[:, :, time] = pulls
-        self.collisions[:, time] = collisions
+        self.collisions += collisions
+        self.nbCollisions[time] = np.sum(collisions)
+        activated = choices >= 0
+        self.freeTransmissions[:, time] = activated & (collisions[np.where(activated, choices, 0)] == 0)
+        if time % self.delta_t_plot == 0:
+            self.cumRewards[:, time // self.delta_t_plot] = self._cumRewards
+            self.allPulls[:, :, time // self.delta_t_plot] = self.pulls
+            self.allCollisions[:, time // self.delta_t_plot] = self.collisions
+        if self._weights is not None:
+            allArmPulls = np.sum(pulls, axis=0)  # sum for all players
+            if not self.full_lost_if_collision:
+                collisions = np.maximum(0, collisions - 1)
+            self.regretTerms[0, time] = np.dot(self._weights[0], allArmPulls)
+            self.regretTerms[1, time] = self._sumBestDeltas - np.dot(self._weights[1], allArmPulls)
+            self.regretTerms[2, time] = np.dot(self._weights[2], collisions)
+
+
+class RanksTransitions(object):
+    r""" Count the transitions of the Markov chain on the configurations of ranks of the players (for rhoRand and other policies using ranks).
+
+    - A configuration is the multiset of the ranks of the :math:`M` players, printed as the number of players having each rank :math:`1, \dots, R` (with :math:`R` the max rank, usually :math:`M`): there are :math:`\binom{M+R-1}{M}` of them, ie :math:`\binom{2M-1}{M}` if :math:`R = M`,
+    - each configuration is encoded by an integer, with the combinatorial number system: if the sorted ranks are :math:`r_1 \leq \dots \leq r_M`, the code is :math:`\sum_{i=1}^{M} \binom{r_i - 1 + i - 1}{i}`, in :math:`\{0, \dots, \binom{M+R-1}{M} - 1\}`,
+    - the ranks are buffered by blocks of ``blockSize`` time steps, and the transitions of a block are added with one ``np.add.at`` to a count matrix, indexed by the configurations seen so far (in their order of appearance).
+
+    >>> transitions = RanksTransitions(2, blockSize=3)
+    >>> for ranks in [[1, 2], [2, 1], [1, 1], [1, 2], [2, 2]]:
+    ...     transitions.add(ranks)
+    >>> transitions.encode(np.array([[1, 1], [1, 2], [2, 2]]))
+    array([0, 1, 2])
+    >>> transitions.configurations()
+    array([[1, 1],
+           [2, 0],
+           [0, 2]])
+    >>> transitions.counts
+    array([[1, 1, 1],
+           [1, 0, 0],
+           [0, 0, 0]])
+    """
+
+    def __init__(self, nbPlayers, maxRank=None, blockSize=RANKS_BLOCK_SIZE):
+        self.nbPlayers = nbPlayers  #: Number M of players.
+        self.maxRank = nbPlayers if maxRank is None else maxRank  #: Max rank R of the players (the configurations are printed with at least R ranks).
+        self.blockSize = int(blockSize)  #: Number of time steps in one block.
+        self.nbStates = _binomials(nbPlayers + self.maxRank, nbPlayers)[nbPlayers + self.maxRank - 1, nbPlayers]  #: Number of possible configurations, :math:`\binom{M+R-1}{M}`.
+        self.states = np.zeros((0, nbPlayers), dtype=int)  #: Sorted ranks of the configurations seen so far, in their order of appearance.
+        self._index = dict()  # from the code of a configuration to its index in self.states
+        self._counts = np.zeros((0, 0), dtype=np.int64)  # count matrix, larger than the number of configurations seen so far
+        self._binomials = _binomials(nbPlayers + self.maxRank, nbPlayers)
+        self._buffer = np.zeros((self.blockSize + 1, nbPlayers), dtype=int)  # the first row keeps the last ranks of the previous block
+        self._length = 0
+
+    @property
+    def nbSeenStates(self):
+        """ Number of configurations seen so far."""
+        return len(self.states)
+
+    @property
+    def counts(self):
+        """ Matrix of the number of transitions between the configurations seen so far, of shape ``(nbSeenStates, nbSeenStates)``."""
+        self.flush()
+        return self._counts[:self.nbSeenStates, :self.nbSeenStates]
+
+    def add(self, ranks):
+        """ Add the ranks of the players at the next time step."""
+        self._buffer[self._length] = ranks
+        self._length += 1
+        if self._length == len(self._buffer):
+            self.flush()
+
+    def encode(self, ranks):
+        """ Integer codes of the configurations of these ranks (one row of ``ranks`` for each time step)."""
+        positions = np.sort(ranks, axis=1) - 1 + np.arange(self.nbPlayers)  # strictly increasing on each row
+        if np.max(positions) >= len(self._binomials):  # a rank larger than maxRank
+            self._binomials = _binomials(np.max(positions) + 1, self.nbPlayers)
+        return np.sum(self._binomials[positions, np.arange(1, self.nbPlayers + 1)], axis=1)
+
+    def flush(self):
+        """ Add the transitions of the buffered ranks to the count matrix."""
+        if self._length == 0:
+            return
+        ranks = self._buffer[:self._length]
+        codes, first, inverse = np.unique(self.encode(ranks), return_index=True, return_inverse=True)
+        # Index of each configuration of the block, with the new ones added to self.states
+        newStates = sorted((i, code) for code, i in zip(codes, first) if code not in self._index)
+        for _, code in newStates:
+            self._index[code] = len(self._index)
+        if newStates:
+            self.states = np.concatenate([self.states, np.sort(ranks[[i for i, _ in newStates]], axis=1)])
+        indexes = np.array([self._index[code] for code in codes])[np.ravel(inverse)]
+        if self.nbSeenStates > len(self._counts):  # grow the count matrix
+            counts = np.zeros((2 * self.nbSeenStates, 2 * self.nbSeenStates), dtype=np.int64)
+            counts[:len(self._counts), :len(self._counts)] = self._counts
+            self._counts = counts
+        np.add.at(self._counts, (indexes[:-1], indexes[1:]), 1)
+        self._buffer[0] = ranks[-1]
+        self._length = 1
+
+    def configurations(self):
+        """ Array of the number of players having each rank, for each configuration seen so far, of shape ``(nbSeenStates, R)``."""
+        self.flush()
+        maxRank = max(self.maxRank, np.max(self.states, initial=1))
+        configurations = np.zeros((self.nbSeenStates, maxRank + 1), dtype=int)
+        np.add.at(configurations, (np.arange(self.nbSeenStates)[:, np.newaxis], self.states), 1)
+        return configurations[:, 1:]
+
+    def transitions(self):
+        """ Sparse representation of the count matrix: the arrays ``rows, columns, counts`` of its non-zero entries."""
+        rows, columns = np.nonzero(self.counts)
+        return rows, columns, self.counts[rows, columns]
+
+    def print_summary(self, horizon=None):
+        """ Print the configurations, the empirical probabilities of the transitions and the number of times each partition of M was seen (without the order of the ranks)."""
+        counts = self.counts
+        configurations = self.configurations()
+        horizon = max(1, np.sum(counts)) if horizon is None else horizon
+        print("==> Information about the markov chain states:")  # DEBUG
+        print("    The Markov chain has {:>4} = (2M-1 choose M) differents states, {} were seen ...".format(self.nbStates, self.nbSeenStates))  # DEBUG
+        order = np.lexsort(configurations.T[::-1])
+        for s in order:
+            print("        ", tuple(configurations[s]))
+        print("==> Information about the markov chain transitions:")  # DEBUG
+        seen = np.sum(counts, axis=1)  # number of transitions out of each state
+        probas = counts / np.maximum(1, seen)[:, np.newaxis]
+        for s1 in np.lexsort(np.vstack([configurations.T[::-1], seen])):
+            print("\nState s1 = {} was seen {:>6} times ...".format(tuple(configurations[s1]), seen[s1]))  # DEBUG
+            nonzero = np.flatnonzero(counts[s1])
+            for s2 in nonzero[np.lexsort(np.vstack([configurations[nonzero].T[::-1], counts[s1, nonzero]]))]:
+                print("    The transition {} --> {} was seen {:>7} times ({:.2%}) ...".format(tuple(configurations[s1]), tuple(configurations[s2]), counts[s1, s2], counts[s1, s2] / float(horizon)))  # DEBUG
+                print("        So the estimated proba is {:.3g} ...".format(probas[s1, s2]))
+        # now from the set point of view
+        print("\n\nNow with states just counting the strong partitions of M = {} ...".format(self.nbPlayers))  # DEBUG
+        partitions, inverse = np.unique(np.sort(configurations, axis=1), axis=0, return_inverse=True)
+        seenPartitions = np.bincount(np.ravel(inverse), weights=seen, minlength=len(partitions)).astype(int)
+        for p in np.lexsort(np.vstack([partitions.T[::-1], seenPartitions])):
+            print("    The state {} was seen {:>7} times ({:.2%}) ...".format(tuple(partitions[p]), seenPartitions[p], seenPartitions[p] / float(horizon)))  # DEBUG
+
+
+def _binomials(n, k):
+    """ Array of the binomial coefficients :math:`\\binom{i}{j}` for :math:`0 \\leq i < n` and :math:`0 \\leq j \\leq k` (Pascal's triangle).
+
+    >>> _binomials(5, 2)[4]
+    array([1, 4, 6])
+    """
+    binomials = np.zeros((max(1, n), k + 1), dtype=np.int64)
+    binomials[:, 0] = 1
+    for i in range(1, n):
+        binomials[i, 1:] = binomials[i - 1, 1:] + binomials[i - 1, :-1]
+    return binomials
+
+
+class MergedResultsMultiPlayers(object):
+    """ Merged accumulators of a chunk of repetitions, computed in a parallel worker from the :class:`ResultMultiPlayers` of each repetition.
+
+    - The quantities summed on the repetitions by the evaluators are summed here (their size does not depend on the number of repetitions),
+    - and the quantities kept for each repetition (last cumulated rewards, pulls and collisions, running times etc) are stacked, in the order of ``repeatIds``.
+    """
+
+    def __init__(self, indexes_bestarm):
+        """ Create empty MergedResultsMultiPlayers."""
+        self.indexes_bestarm = indexes_bestarm  #: Indexes of the best arms, to count the pulls of the best arms
+        self.repeatIds = []  #: Indexes of the merged repetitions
+        self.nbRepetitions = 0  #: Number of merged repetitions
+        self.ranksTransitions = None  #: Transitions of the configurations of ranks (a :class:`RanksTransitions`), counted for one repetition only
+
+    def add(self, r, repeatId):
+        """ Add the result ``r`` of the repetition ``repeatId``."""
+        sums = {
+            "rewards": r.cumRewards,  # on the plotting grid
+            "sumRewards": np.cumsum(r.sumRewards),  # cumsum on time
+            "pulls": r.pulls,
+            "allPulls": r.allPulls,
+            "allCollisions": r.allCollisions,
+            "nbCollisions": r.nbCollisions,
+            "regretTerms": r.regretTerms,
+            "nbSwitchs": (np.diff(r.choices, axis=1) != 0).astype(np.int32),
+            "bestArmPulls": np.cumsum(np.in1d(r.choices, self.indexes_bestarm).reshape(r.choices.shape), axis=1),
+            "freeTransmissions": r.freeTransmissions.astype(np.int32),
+            "fairness": fairness_measures(r.cumRewards[np.newaxis])[:, 0],  # measures of STREAMING_FAIRNESS, on the plotting grid
+        }
+        lasts = {
+            "lastCumRewards": np.sum(r.sumRewards),  # sum on time and sum on players
+            "lastPulls": r.pulls,
+            "lastCumCollisions": r.collisions,
+            "running_time": r.running_time,
+            "memory_consumption": r.memory_consumption,
+        }
+        if r.ranksTransitions is not None:
+            self.ranksTransitions = r.ranksTransitions
+        if self.nbRepetitions == 0:
+            for name, value in sums.items():
+                setattr(self, name, np.array(value))
+            for name, value in lasts.items():
+                setattr(self, name, [value])
+        else:
+            for name, value in sums.items():
+                np.add(getattr(self, name), value, out=getattr(self, name))
+            for name, value in lasts.items():
+                getattr(self, name).append(value)
+        self.repeatIds.append(repeatId)
+        self.nbRepetitions += 1
+
+    def lasts(self, name):
+        """ Array of the values of ``name`` for each repetition, stacked on the last axis.
+
+        >>> merged = MergedResultsMultiPlayers([0])
+        >>> merged.lastPulls = [np.array([[1, 2]]), np.array([[3, 4]])]
+        >>> merged.lasts("lastPulls")
+        array([[[1, 3],
+                [2, 4]]])
+        """
+        return np.stack(getattr(self, name), axis=-1)
+
+
+# --- Debugging
+
+if __name__ == "__main__":
+    # Code for debugging purposes.
+    from doctest import testmod
+    print("\nTesting automatically all the docstring written in each functions of this module :")
+    testmod(verbose=True)
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 """ ``Environment`` module:
 
-- :class:`MAB`, :class:`MarkovianMAB`, :class:`ChangingAtEachRepMAB`, :class:`IncreasingMAB`, :class:`PieceWiseStationaryMAB`, :class:`NonStationaryMAB` objects, used to wrap the problems (essentially a list of arms).
+- :class:`MAB`, :class:`MarkovianMAB`, :class:`ChangingAtEachRepMAB`, :class:`IncreasingMAB`, :class:`PieceWiseStationaryMAB`, :class:`NonStationaryMAB`, :class:`ReplayMAB` objects, used to wrap the problems (essentially a list of arms).
 - :class:`Result` and :class:`ResultMultiPlayers` objects, used to wrap simulation results (list of decisions and rewards).
 - :class:`Evaluator` environment, used to wrap simulation, for the single player case.
+- :class:`OfflineReplayEvaluator` environment, used to evaluate policies offline on logged bandit data, with the replay method.
 - :class:`EvaluatorMultiPlayers` environment, used to wrap simulation, for the multi-players case.
 - :class:`EvaluatorSparseMultiPlayers` environment, used to wrap simulation, for the multi-players case with sparse activated players.
 - :mod:`CollisionModels` implements different collision models.
@@ -22,10 +23,11 @@ from __future__ import division, print_function  # Python 2 compatibility
 __author__ = "Lilian Besson"
 __version__ = "0.9"
 
-from .MAB import MAB, MarkovianMAB, ChangingAtEachRepMAB, IncreasingMAB, PieceWiseStationaryMAB, NonStationaryMAB
+from .MAB import MAB, MarkovianMAB, ChangingAtEachRepMAB, IncreasingMAB, PieceWiseStationaryMAB, NonStationaryMAB, ReplayMAB
 
 from .Result import Result
 from .Evaluator import Evaluator
+from .OfflineReplayEvaluator import OfflineReplayEvaluator
 
 from .CollisionModels import *
 from .ResultMultiPlayers import ResultMultiPlayers
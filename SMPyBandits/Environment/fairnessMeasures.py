@@ -3,6 +3,7 @@ r""" Define some function to measure fairness of a vector of cumulated rewards,
 
 - All functions are valued in :math:`[0, 1]`: :math:`100\%` means fully unfair (one player has :math:`0` rewards, another one has :math:`>0` rewards), and :math:`0\%` means fully fair (they all have exactly the same rewards).
 - Reference: https://en.wikipedia.org/wiki/Fairness_measure and http://ica1www.epfl.ch/PS_files/LEB3132.pdf#search=%22max-min%20fairness%22.
+- They all accept arrays of any shape, and compute the measure along the players' axis ``axis``: for instance :func:`fairness_measures` gives the measures of cumulated rewards of shape `(repetitions, nbPlayers, grid)` in one call.
 """
 from __future__ import division, print_function  # Python 2 compatibility
 
@@ -182,10 +183,10 @@ def mo_walrand_fairness(X, axis=0, alpha=2):
     else:
         assert alpha >= 0, "Error: the parameter 'alpha' for mo_walrand_fairness() function has to be >= 0, but it was {} instead.".format(alpha)  # DEBUG
         if alpha == 1:
-            return np.sum(np.log(X))
+            return np.sum(np.log(X), axis=axis)
         else:
             oneMalpha = 1. - alpha
-            return (1. / oneMalpha) * np.sum(X ** oneMalpha)
+            return (1. / oneMalpha) * np.sum(X ** oneMalpha, axis=axis)
 
 
 def mean_fairness(X, axis=0, methods=(amplitude_fairness, std_fairness, rajjain_fairness)):
@@ -240,6 +241,39 @@ fairness_mapping = {
 }
 
 
+#: Names of the fairness measures valued in :math:`[0, 1]`, computed during the simulations on the plotting grid, see :func:`fairness_measures`
+STREAMING_FAIRNESS = ("Amplitude", "STD", "RajJain", "Mean")
+
+
+def fairness_measures(cumRewards, names=STREAMING_FAIRNESS, axis=1):
+    r""" Compute the fairness measures ``names`` of cumulated rewards of shape `(repetitions, nbPlayers, grid)`, in one call.
+
+    - Returns an array of shape `(len(names), repetitions, grid)`: each measure is computed along the players' axis ``axis``, for every repetition and every time step of the grid,
+    - when all the players have :math:`0` rewards (eg. at the first time steps), they have the same rewards, so the measures are :math:`0` (fully fair) instead of `nan`.
+
+    Examples:
+
+    >>> import numpy.random as rn; rn.seed(1)  # for reproductibility
+    >>> cumRewards = np.cumsum(rn.randint(1, 10, (4, 3, 10)), axis=2)  # 4 repetitions, 3 players, grid of 10 time steps
+    >>> cumRewards[:, :, 0] = 0
+    >>> measures = fairness_measures(cumRewards)
+    >>> measures.shape
+    (4, 4, 10)
+    >>> np.allclose(measures[:, :, 1:], [fairness_mapping[name](cumRewards[:, :, 1:], axis=1) for name in STREAMING_FAIRNESS])
+    True
+    >>> measures[:, :, 0]
+    array([[0., 0., 0., 0.],
+           [0., 0., 0., 0.],
+           [0., 0., 0., 0.],
+           [0., 0., 0., 0.]])
+    """
+    cumRewards = np.asarray(cumRewards, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        measures = np.array([fairness_mapping[name](cumRewards, axis=axis) for name in names])
+    measures[np.isnan(measures)] = 0
+    return measures
+
+
 # Only export and expose the useful functions defined here
 __all__ = [
     "amplitude_fairness",
@@ -249,6 +283,8 @@ __all__ = [
     "mean_fairness",
     "fairnessMeasure",
     "fairness_mapping",
+    "STREAMING_FAIRNESS",
+    "fairness_measures",
 ]
 
 
@@ -24,6 +24,9 @@
 .. module:: A Python module for finite Markov chains.
     :platform: Unix, Windows, Mac
 
+- The ``Matrix`` and ``Chain`` objects are dictionaries mapping the links ``(state, state)`` to their probabilities,
+- but their algebra runs on a ``scipy.sparse`` CSR matrix, built once from the links with a stable index of the states (in order of first appearance), and cached with the results computed from it (steady state, fundamental matrix etc) until the links are modified.
+
 .. moduleauthor::
     Riccardo Scalco <riccardo.scalco@gmail.com>
 
@@ -32,6 +35,7 @@ from __future__ import division, print_function  # Python 2 compatibility
 
 import random
 import math
+import bisect
 import six
 import numpy
 import sys
@@ -39,6 +43,7 @@ import sys
 from collections import OrderedDict
 
 import scipy.sparse as ss
+import scipy.sparse.csgraph
 import scipy.sparse.linalg as ssl
 
 if sys.version_info < (2, 6):
@@ -53,36 +58,18 @@ __authors__ = 'Riccardo Scalco'
 __many_thanks_to__ = 'Sandra Steiner, Nicky Van Foreest, Adel Qalieh'
 
 
+#: Names of the cached attributes of a ``Matrix``, deleted by :func:`_del_cache` when its links are modified.
+_CACHED_ATTRIBUTES = ('_states', '_succ', '_pred', '_steady', '_guess', '_fundamental_matrix', '_index', '_csr', '_cumulated')
+
+
 def _del_cache(fn):
     """
     Delete cache.
     """
     def wrapper(*args, **kwargs):
         self = args[0]
-        try:
-            del self._states
-        except AttributeError:
-            pass
-        try:
-            del self._succ
-        except AttributeError:
-            pass
-        try:
-            del self._pred
-        except AttributeError:
-            pass
-        try:
-            del self._steady
-        except AttributeError:
-            pass
-        try:
-            del self._guess
-        except AttributeError:
-            pass
-        try:
-            del self._fundamental_matrix
-        except AttributeError:
-            pass
+        for name in _CACHED_ATTRIBUTES:
+            self.__dict__.pop(name, None)
         return fn(*args, **kwargs)
     return wrapper
 
@@ -116,10 +103,10 @@ class Vector(OrderedDict):
 
         if data:
             self.update([item for item in six.iteritems(data)
-                         if abs(item[1]) > numpy.finfo(numpy.float).eps])
+                         if abs(item[1]) > numpy.finfo(float).eps])
         if len(kwargs):
             self.update([item for item in six.iteritems(kwargs)
-                         if abs(item[1]) > numpy.finfo(numpy.float).eps])
+                         if abs(item[1]) > numpy.finfo(float).eps])
 
     def __getitem__(self, key):
         """
@@ -144,7 +131,7 @@ class Vector(OrderedDict):
         >>> q
         {'C': 0.4, 'B': 0.6}
         """
-        if abs(value) > numpy.finfo(numpy.float).eps:
+        if abs(value) > numpy.finfo(float).eps:
             OrderedDict.__setitem__(self, key, value)
         elif key in self:
             del self[key]
@@ -168,8 +155,7 @@ class Vector(OrderedDict):
         if isinstance(M, Matrix):
             e2p, p2e = M._el2pos_()
             x = self._toarray(e2p)
-            A = M._dok_(e2p).tocsr().transpose()
-            y = A.dot(x)
+            y = M._csr_().transpose().dot(x)
             result = Vector()
             result._fromarray(y, e2p)
             return result
@@ -407,8 +393,7 @@ class Matrix(OrderedDict):
         OrderedDict.__init__(self)
 
         if data:
-            self.update([item for item in six.iteritems(data)
-                        if abs(item[1]) > numpy.finfo(numpy.float).eps])
+            self.update(data)
 
     def __getitem__(self, *args):
         """
@@ -452,7 +437,7 @@ class Matrix(OrderedDict):
         >>> T.states()
         {'A', 'B'}
         """
-        if abs(value) > numpy.finfo(numpy.float).eps:
+        if abs(value) > numpy.finfo(float).eps:
             OrderedDict.__setitem__(self, key, value)
         elif key in self:
             del self[key]
@@ -520,7 +505,12 @@ class Matrix(OrderedDict):
         >>> T
         {('B', 'A'): 1.0, ('B', 'C'): 2, ('A', 'B'): 0.3, ('A', 'A'): 0.7}
         """
-        OrderedDict.update(self, other)
+        eps = numpy.finfo(float).eps
+        for key, value in (six.iteritems(other) if hasattr(other, 'keys') else other):
+            if abs(value) > eps:
+                OrderedDict.__setitem__(self, key, value)
+            elif key in self:
+                OrderedDict.__delitem__(self, key)
 
     @_del_cache
     def setdefault(self, k, *args):
@@ -556,28 +546,46 @@ class Matrix(OrderedDict):
         # Required because we changed the OrderedDict.__init__ signature
         return (self.__class__, (), None, None, six.iteritems(self))
 
-    def _dok_(self, el2pos, method=''):
+    def _csr_(self, el2pos=None):
         """
+        Return the ``scipy.sparse`` CSR matrix of the links, indexed by ``el2pos``
+        (by default the index of :meth:`_el2pos_`, and then it is cached).
         """
+        cached = el2pos is None
+        if cached:
+            try:
+                return self._csr
+            except AttributeError:
+                el2pos, _ = self._el2pos_()
         m = len(el2pos)
-        S = ss.dok_matrix((m, m))
-        if method == '':
-            for k, v in six.iteritems(self):
-                i = el2pos[k[0]]
-                j = el2pos[k[1]]
-                S[i, j] = float(v)
-        elif method == 'transpose':
-            for k, v in six.iteritems(self):
-                i = el2pos[k[0]]
-                j = el2pos[k[1]]
-                S[j, i] = float(v)
+        rows = numpy.fromiter((el2pos[link[0]] for link in six.iterkeys(self)), dtype=int, count=len(self))
+        cols = numpy.fromiter((el2pos[link[1]] for link in six.iterkeys(self)), dtype=int, count=len(self))
+        data = numpy.fromiter(six.itervalues(self), dtype=float, count=len(self))
+        S = ss.csr_matrix((data, (rows, cols)), shape=(m, m))
+        if cached:
+            self._csr = S
         return S
 
+    def _from_csr_(self, mat, pos2el):
+        """
+        Set the links from a ``scipy.sparse`` matrix (or a numpy array), indexed by ``pos2el``.
+        """
+        mat = ss.coo_matrix(mat)
+        self.update(((pos2el[i], pos2el[j]), v) for i, j, v in zip(mat.row, mat.col, mat.data))
+        return None
+
+    def _dok_(self, el2pos, method=''):
+        """
+        """
+        S = self._csr_(el2pos)
+        if method == 'transpose':
+            S = S.transpose()
+        return S.todok()
+
     def _from_dok_(self, mat, pos2el):
         """
         """
-        for ii, val in mat.items():
-            self[pos2el[ii[0]], pos2el[ii[1]]] = val
+        self._from_csr_(mat, pos2el)
         return None
 
     def _numpy_mat(self, el2pos):
@@ -589,11 +597,7 @@ class Matrix(OrderedDict):
         two strings.
         el2pos : see _map()
         """
-        m = len(el2pos)
-        T = numpy.matrix(numpy.zeros((m, m)))
-        for k, v in six.iteritems(self):
-            T[el2pos[k[0]], el2pos[k[1]]] = v
-        return T
+        return numpy.matrix(self._csr_(el2pos).toarray())
 
     def _from_numpy_mat(self, T, pos2el):
         """
@@ -603,21 +607,29 @@ class Matrix(OrderedDict):
         T : the numpy.matrix.
         pos2el : see _map()
         """
-        for i in range(len(T)):
-            for j in range(len(T)):
-                if T[i, j]:
-                    self[(pos2el[i], pos2el[j])] = T[i, j]
+        self._from_csr_(numpy.asarray(T), pos2el)
         return None
 
     def _el2pos_(self):
         """
+        Return the mappings from the states to their positions and back, in
+        order of first appearance in the links (cached until the links change).
+        """
+        try:
+            return self._index
+        except AttributeError:
+            states = list(OrderedDict.fromkeys(state for link in six.iterkeys(self) for state in link))
+            self._index = (dict((element, pos) for pos, element in enumerate(states)), dict(enumerate(states)))
+            return self._index
+
+    def _vector_(self, arr, positions=None):
+        """
+        Return a ``Vector`` from an array of values of the states at these positions (all by default).
         """
-        el2pos = {}
-        pos2el = {}
-        for pos, element in enumerate(list(self.states())):
-            el2pos[element] = pos
-            pos2el[pos] = element
-        return el2pos, pos2el
+        _, pos2el = self._el2pos_()
+        if positions is None:
+            positions = range(len(arr))
+        return Vector(OrderedDict((pos2el[pos], value) for pos, value in zip(positions, arr)))
 
     def stochastic(self):
         """
@@ -708,7 +720,7 @@ class Matrix(OrderedDict):
         >>> T.remove(['B'])
         {('A', 'A'): 0.7}
         >>> T = pykov.Chain({('A','B'): .3, ('A','A'): .7, ('B','A'): 1.,
-                             ('C','D'): .5, ('D','C'): 1., ('C','B'): .5})
+        ...                  ('C','D'): .5, ('D','C'): 1., ('C','B'): .5})
         >>> T.remove(['A','B'])
         {('C', 'D'): 0.5, ('D', 'C'): 1.0}
         """
@@ -741,10 +753,15 @@ class Matrix(OrderedDict):
         {('A', 'A'): 1.0, ('B', 'B'): 1.0}
         """
         el2pos, pos2el = self._el2pos_()
-        P = self._numpy_mat(el2pos)
-        P = P**n
+        P = self._csr_()
+        result = ss.identity(len(el2pos), format='csr')
+        while n > 0:  # by repeated squaring
+            if n % 2 == 1:
+                result = result.dot(P)
+            P = P.dot(P)
+            n //= 2
         res = Matrix()
-        res._from_numpy_mat(P, pos2el)
+        res._from_csr_(result, pos2el)
         return res
 
     def pow(self, n):
@@ -759,8 +776,8 @@ class Matrix(OrderedDict):
         >>> T * p
         {'A': 0.42, 'B': 0.3}
         >>> W = pykov.Matrix({('N', 'M'): 0.5, ('M', 'N'): 0.7,
-                              ('M', 'M'): 0.3, ('O', 'N'): 0.5,
-                              ('O', 'O'): 0.5, ('N', 'O'): 0.5})
+        ...                   ('M', 'M'): 0.3, ('O', 'N'): 0.5,
+        ...                   ('O', 'O'): 0.5, ('N', 'O'): 0.5})
         >>> W * W
         {('N', 'M'): 0.15, ('M', 'N'): 0.21, ('M', 'O'): 0.35,
          ('M', 'M'): 0.44, ('O', 'M'): 0.25, ('O', 'N'): 0.25,
@@ -769,21 +786,19 @@ class Matrix(OrderedDict):
         if isinstance(v, Vector):
             e2p, p2e = self._el2pos_()
             x = v._toarray(e2p)
-            M = self._dok_(e2p).tocsr()
-            y = M.dot(x)
+            y = self._csr_().dot(x)
             result = Vector()
             result._fromarray(y, e2p)
             return result
         elif isinstance(v, Matrix):
             e2p, p2e = self._el2pos_()
-            M = self._dok_(e2p).tocsr()
-            N = v._dok_(e2p).tocsr()
-            C = M.dot(N).todok()
+            M = self._csr_()
+            N = v._csr_() if v._el2pos_()[0] == e2p else v._csr_(e2p)
             if 'Chain' in repr(self.__class__):
                 res = Chain()
             elif 'Matrix' in repr(self.__class__):
                 res = Matrix()
-            res._from_dok_(C, p2e)
+            res._from_csr_(M.dot(N), p2e)
             return res
         elif isinstance(v, int) or isinstance(v, float):
             return Matrix(OrderedDict([(key, value * v) for key, value in
@@ -845,7 +860,7 @@ class Matrix(OrderedDict):
         >>> T.trace()
         0.7
         """
-        return sum([self[k, k] for k in self.states()])
+        return float(self._csr_().diagonal().sum())
 
     def eye(self):
         """
@@ -896,15 +911,31 @@ class Matrix(OrderedDict):
         """
         e2p, p2e = self._el2pos_()
         if method == "UMFPACK_At":
-            A = self._dok_(e2p).tocsr().transpose()
+            A = self._csr_().transpose()
         else:
-            A = self._dok_(e2p).tocsr()
+            A = self._csr_()
         bb = b._toarray(e2p)
-        x = ssl.spsolve(A, bb, use_umfpack=True)
+        x = numpy.atleast_1d(ssl.spsolve(A.tocsc(), bb, use_umfpack=True))
         res = Vector()
         res._fromarray(x, e2p)
         return res
 
+    def _solve_on_(self, states, b=None, transpose=False):
+        """
+        Solve :math:`(I - Q) x = b` (or :math:`(I - Q)^T x = b`), where :math:`Q`
+        is the restriction of the matrix to these states, and ``b`` a ``Vector``
+        (ones by default). Return the ``Vector x`` on these states.
+        """
+        el2pos, _ = self._el2pos_()
+        positions = numpy.array(sorted(el2pos[state] for state in set(states) if state in el2pos), dtype=int)
+        Q = self._csr_()[positions][:, positions]
+        if transpose:
+            Q = Q.transpose()
+        K = ss.identity(len(positions), format='csc') - Q.tocsc()
+        bb = numpy.ones(len(positions)) if b is None else b._toarray(el2pos)[positions]
+        x = numpy.atleast_1d(ssl.spsolve(K, bb, use_umfpack=True))
+        return self._vector_(x, positions)
+
 
 class Chain(Matrix):
 
@@ -925,7 +956,35 @@ class Chain(Matrix):
         'B'
 
         """
-        return self.succ(state).choose(random_func)
+        if random_func is None:
+            random_func = random.uniform
+        el2pos, pos2el = self._el2pos_()
+        return pos2el[self._next_position_(el2pos[state], random_func(0, 1))]
+
+    def _cumulated_(self):
+        """
+        Return the (cached) list, for each state position, of the positions of its successors
+        and of their cumulated probabilities, in the order of the links (as :meth:`Vector.choose`).
+        """
+        try:
+            return self._cumulated
+        except AttributeError:
+            el2pos, _ = self._el2pos_()
+            self._cumulated = [([], []) for _ in range(len(el2pos))]
+            for (state1, state2), value in six.iteritems(self):
+                successors, cumulated = self._cumulated[el2pos[state1]]
+                successors.append(el2pos[state2])
+                cumulated.append(value + (cumulated[-1] if cumulated else 0.))
+            return self._cumulated
+
+    def _next_position_(self, i, u):
+        """
+        Return the position of the next state from the state at position i, for the uniform random number u.
+        """
+        successors, cumulated = self._cumulated_()[i]
+        if not successors:
+            raise PykovError('Zero links from state ' + repr(self._el2pos_()[1][i]))
+        return successors[min(bisect.bisect_right(cumulated, u), len(successors) - 1)]
 
     def pow(self, p, n):
         """
@@ -947,15 +1006,17 @@ class Chain(Matrix):
 
         .. note::
 
-           Inverse iteration method (P is the Markov chain)
+           The balance equations are solved with the normalization (P is the Markov chain)
 
            .. math::
 
               Q = \mathbf{I} - P
 
-              Q^T x = e
+              Q^T x = 0, \quad \sum_i x_i = 1
 
-              e = (0,0,\dots,0,1)
+           As :math:`Q^T` is singular (its rows sum to zero), its last
+           equation is replaced by the normalization, and the system
+           is solved with a sparse LU decomposition.
            ..
         ..
 
@@ -966,23 +1027,25 @@ class Chain(Matrix):
            Princeton University Press, Chichester, West Sussex, 1994.
 
         >>> T = pykov.Chain({('A','B'): .3, ('A','A'): .7, ('B','A'): 1.})
-        >>> T.steady()
-        {'A': 0.7692307692307676, 'B': 0.23076923076923028}
+        >>> T.steady()  # doctest: +ELLIPSIS
+        Vector([('A', 0.76923...), ('B', 0.23076...)])
+        >>> T = pykov.Chain({('A','B'): .2, ('A','C'): .8, ('B','A'): .5, ('B','C'): .5,
+        ...                  ('C','A'): .1, ('C','B'): .3, ('C','C'): .6})
+        >>> sorted((state, round(p, 3)) for state, p in T.steady().items())
+        [('A', 0.17), ('B', 0.218), ('C', 0.612)]
         """
         try:
             return self._steady
         except AttributeError:
             e2p, p2e = self._el2pos_()
             m = len(e2p)
-            P = self._dok_(e2p).tocsr()
-            Q = ss.eye(m, format='csr') - P
+            P = self._csr_()
+            Q = (ss.identity(m, format='csr') - P).transpose().tocsr()
+            # replace the last (redundant) balance equation by the normalization
+            Q = ss.vstack([Q[:-1], ss.csr_matrix(numpy.ones((1, m)))], format='csc')
             e = numpy.zeros(m)
             e[-1] = 1.
-            Q = Q.transpose()
-            # not elegant singular matrix error
-            Q[0, 0] = Q[0, 0] + _machineEpsilon()
-            x = ssl.spsolve(Q, e, use_umfpack=True)
-            x = x / sum(x)
+            x = numpy.atleast_1d(ssl.spsolve(Q, e, use_umfpack=True))
             res = Vector()
             res._fromarray(x, e2p)
             self._steady = res
@@ -1017,10 +1080,12 @@ class Chain(Matrix):
         """
         if not p:
             p = self.steady()
-        H = 0.
-        for state in self.states():
-            H += p[state] * sum([v * math.log(v) for v in
-                                 self.succ(state).values()])
+        el2pos, _ = self._el2pos_()
+        P = self._csr_()
+        # sum of P_ij ln P_ij on each row i
+        rows = numpy.repeat(numpy.arange(P.shape[0]), numpy.diff(P.indptr))
+        H_i = numpy.bincount(rows, weights=P.data * numpy.log(P.data), minlength=P.shape[0])
+        H = numpy.dot(p._toarray(el2pos), H_i)
         if norm:
             n = len(self.states())
             return -H / (n * math.log(n))
@@ -1038,21 +1103,13 @@ class Chain(Matrix):
            Springer-Verlag: New York, 1976.
 
         >>> d = {('R', 'N'): 0.25, ('R', 'S'): 0.25, ('S', 'R'): 0.25,
-                 ('R', 'R'): 0.5, ('N', 'S'): 0.5, ('S', 'S'): 0.5,
-                 ('S', 'N'): 0.25, ('N', 'R'): 0.5, ('N', 'N'): 0.0}
+        ...      ('R', 'R'): 0.5, ('N', 'S'): 0.5, ('S', 'S'): 0.5,
+        ...      ('S', 'N'): 0.25, ('N', 'R'): 0.5, ('N', 'N'): 0.0}
         >>> T = pykov.Chain(d)
         >>> T.mfpt_to('R')
         {'S': 3.333333333333333, 'N': 2.666666666666667}
         """
-        if len(self.states()) == 2:
-            self.states().remove(state)
-            other = self.states().pop()
-            self.states().add(state)
-            self.states().add(other)
-            return Vector({other: 1. / self[other, state]})
-        T = self.remove([state])
-        T = T.eye() - T
-        return T._UMPFPACKSolve(T.ones())
+        return self._solve_on_(self.states() - set([state]))
 
     def adjacency(self):
         """
@@ -1089,19 +1146,15 @@ class Chain(Matrix):
             else:
                 # There is no steady state, so choose a state uniformly at
                 # random.
-                start = random.sample(self.states(), 1)[0]
-        if stop is None:
-            result = [start]
-            for i in range(steps):
-                result.append(self.move(result[-1]))
-            return result
-        else:
-            result = [start]
-            for i in range(steps):
-                result.append(self.move(result[-1]))
-                if result[-1] == stop:
-                    return result
-            return result
+                start = random.sample(list(self.states()), 1)[0]
+        el2pos, pos2el = self._el2pos_()
+        stop = el2pos.get(stop, -1) if stop is not None else -1
+        positions = [el2pos[start]]
+        for i in range(steps):
+            positions.append(self._next_position_(positions[-1], random.uniform(0, 1)))
+            if positions[-1] == stop:
+                break
+        return [pos2el[pos] for pos in positions]
 
     def walk_probability(self, walk):
         """
@@ -1149,8 +1202,8 @@ class Chain(Matrix):
         ..
 
         >>> d = {('R','R'):1./2, ('R','N'):1./4, ('R','S'):1./4,
-                 ('N','R'):1./2, ('N','N'):0., ('N','S'):1./2,
-                 ('S','R'):1./4, ('S','N'):1./4, ('S','S'):1./2}
+        ...      ('N','R'):1./2, ('N','N'):0., ('N','S'):1./2,
+        ...      ('S','R'):1./4, ('S','N'):1./4, ('S','S'):1./2}
         >>> T = pykov.Chain(d)
         >>> T.mixing_time()
         2
@@ -1190,18 +1243,16 @@ class Chain(Matrix):
            Springer-Verlag: New York, 1976.
 
         >>> d = {('R','R'):1./2, ('R','N'):1./4, ('R','S'):1./4,
-                 ('N','R'):1./2, ('N','N'):0., ('N','S'):1./2,
-                 ('S','R'):1./4, ('S','N'):1./4, ('S','S'):1./2}
+        ...      ('N','R'):1./2, ('N','N'):0., ('N','S'):1./2,
+        ...      ('S','R'):1./4, ('S','N'):1./4, ('S','S'):1./2}
         >>> T = pykov.Chain(d)
         >>> p = pykov.Vector({'N':.3, 'S':.7})
         >>> tau = T.absorbing_time(p.keys())
         >>> p * tau
         3.1333333333333329
         """
-        Q = self.remove(self.states() - set(transient_set))
-        K = Q.eye() - Q
         # means
-        tau = K._UMPFPACKSolve(K.ones())
+        tau = self._solve_on_(transient_set)
         return tau
 
     def absorbing_tour(self, p, transient_set=None):
@@ -1223,19 +1274,16 @@ class Chain(Matrix):
            Springer-Verlag: New York, 1976.
 
         >>> d = {('R','R'):1./2, ('R','N'):1./4, ('R','S'):1./4,
-                 ('N','R'):1./2, ('N','N'):0., ('N','S'):1./2,
-                 ('S','R'):1./4, ('S','N'):1./4, ('S','S'):1./2}
+        ...      ('N','R'):1./2, ('N','N'):0., ('N','S'):1./2,
+        ...      ('S','R'):1./4, ('S','N'):1./4, ('S','S'):1./2}
         >>> T = pykov.Chain(d)
         >>> p = pykov.Vector({'N':.3, 'S':.7})
         >>> T.absorbing_tour(p)
         {'S': 2.2666666666666666, 'N': 0.8666666666666669}
         """
-        if transient_set:
-            Q = self.remove(self.states() - transient_set)
-        else:
-            Q = self.remove(self.states() - set(p.keys()))
-        K = Q.eye() - Q
-        return K._UMPFPACKSolve(p, method='UMFPACK_At')
+        if not transient_set:
+            transient_set = p.keys()
+        return self._solve_on_(transient_set, b=p, transpose=True)
 
     def fundamental_matrix(self):
         """
@@ -1257,18 +1305,13 @@ class Chain(Matrix):
         except AttributeError:
             el2pos, pos2el = self._el2pos_()
             p = self.steady()._toarray(el2pos)
-            P = self._numpy_mat(el2pos)
+            P = self._csr_().toarray()
             d = len(p)
-            A = numpy.matrix([p for i in range(d)])
-            I = numpy.matrix(numpy.identity(d))
-            # E = numpy.matrix(numpy.ones((d, d)))
-            D = numpy.zeros((d, d))
-            diag = 1. / p
-            for pos, val in enumerate(diag):
-                D[pos, pos] = val
+            A = numpy.tile(p, (d, 1))
+            I = numpy.identity(d)
             Z = numpy.linalg.inv(I - P + A)
             res = Matrix()
-            res._from_numpy_mat(Z, pos2el)
+            res._from_csr_(Z, pos2el)
             self._fundamental_matrix = res
             return res
 
@@ -1290,16 +1333,17 @@ class Chain(Matrix):
         ..see also: http://www.ssc.wisc.edu/~jmontgom/commclasses.pdf
         """
         el2pos, pos2el = self._el2pos_()
-        Z = self.adjacency()
-        I = self.eye()
-        n = len(self.states())
-
-        A = (I + Z)**(n - 1)
-        numpy_A = A._numpy_mat(el2pos)
-        numpy_A = numpy_A > 0
-        numpy_A = numpy_A.astype(int)
+        n = len(el2pos)
+        # states reachable in less than 1, 2, 4, ... steps, until nothing changes
+        A = ss.identity(n, format='csr') + self._csr_()
+        A.data[:] = 1
+        nnz = -1
+        while A.nnz != nnz:
+            nnz = A.nnz
+            A = A.dot(A)
+            A.data[:] = 1
         res = Matrix()
-        res._from_numpy_mat(numpy_A, pos2el)
+        res._from_csr_(A.astype(int), pos2el)
         return res
 
     def is_accessible(self, i, j):
@@ -1326,35 +1370,11 @@ class Chain(Matrix):
         >>> T.communication_classes()
         """
         el2pos, pos2el = self._el2pos_()
-        A = self.accessibility_matrix()
-
-        numpy_A = A._numpy_mat(el2pos)
-        numpy_A_trans = numpy.transpose(numpy_A)
-        numpy_res = numpy.logical_and(numpy_A, numpy_A_trans)
-        numpy_res = numpy_res.astype(int)
-
-        # remove duplicate rows
-        # remaining rows will give communication
-        # ref: http://stackoverflow.com/questions/16970982/find-unique-rows-in-numpy-array
-        a = numpy_res
-        b = numpy.ascontiguousarray(a).view(
-            numpy.dtype(
-                (numpy.void, a.dtype.itemsize * a.shape[1])
-            )
-        )
-        _, idx = numpy.unique(b, return_index=True)
-
-        unique_a = a[idx]
-
+        # the communication classes are the strongly connected components
+        _, labels = ss.csgraph.connected_components(self._csr_(), directed=True, connection='strong')
         res = Set()
-        for row in unique_a:
-            # each iteration here is a comm. class
-            comm_class = Set()
-            number_of_elements = len(A.states())
-            for el in range(number_of_elements):
-                if row[0, el] == 1:
-                    comm_class.add(pos2el[el])
-            res.add(comm_class)
+        for label in numpy.unique(labels):
+            res.add(frozenset(pos2el[pos] for pos in numpy.flatnonzero(labels == label)))
         return res
 
 
@@ -1543,7 +1563,7 @@ def _remove_dead_branch(transitions_list):
 
 def _machineEpsilon(func=float):
     """
-    should be the same result of: numpy.finfo(numpy.float).eps
+    should be the same result of: numpy.finfo(float).eps
     """
     machine_epsilon = func(1)
     while func(1) + func(machine_epsilon) != func(1):
@@ -1558,4 +1578,5 @@ if __name__ == "__main__":
     # Code for debugging purposes.
     from doctest import testmod
     print("\nTesting automatically all the docstring written in each functions of this module :")
-    testmod(verbose=True)
+    # the examples refer to this module as pykov
+    testmod(verbose=True, extraglobs={'pykov': sys.modules[__name__]})
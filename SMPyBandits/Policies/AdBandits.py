@@ -18,10 +18,12 @@ try:
     from .Posterior import Beta
     from .BasePolicy import BasePolicy
     from .with_proba import with_proba
+    from .topM import kth_largest_with_ties
 except ImportError:
     from Posterior import Beta
     from BasePolicy import BasePolicy
     from with_proba import with_proba
+    from topM import kth_largest_with_ties
 
 
 # --- Data
@@ -105,7 +107,5 @@ class AdBandits(BasePolicy):
                 upperbounds = [self.posterior[arm].quantile(1. - 1. / self.t) for arm in range(self.nbArms)]
                 indexes = expectations - np.max(upperbounds)
             # We computed the indexes, OK let's use them
-            sortedRewards = np.sort(indexes)  # XXX What happens here if two arms has the same index, being the max?
-            chosenIndex = sortedRewards[-rank]
             # Uniform choice among the rank-th best arms
-            return choice(np.nonzero(indexes == chosenIndex)[0])
+            return kth_largest_with_ties(indexes, rank)
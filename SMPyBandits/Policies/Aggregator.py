@@ -41,8 +41,10 @@ import numpy as np
 import numpy.random as rn
 try:
     from .BasePolicy import BasePolicy
+    from .StackedChildren import stack_if_homogeneous
 except ImportError:
     from BasePolicy import BasePolicy
+    from StackedChildren import stack_if_homogeneous
 
 
 # Default values for the parameters
@@ -70,6 +72,9 @@ USE_LOSSES = False
 #: Should all trusts be updated, or only the trusts of slaves Ai who advised the decision ``Aggregator[A1..AN]`` followed.
 UPDATE_ALL_CHILDREN = False
 
+#: Should homogeneous children (same index policy, different scalar parameters) be stacked, to compute all their indexes in one vectorized pass (see :class:`Policies.StackedChildren`).
+STACK_CHILDREN = True
+
 
 class Aggregator(BasePolicy):
     """ My Aggregated bandit algorithm, similar to Exp4 but not exactly equivalent."""
@@ -79,7 +84,7 @@ class Aggregator(BasePolicy):
                  update_all_children=UPDATE_ALL_CHILDREN, update_like_exp4=UPDATE_LIKE_EXP4,
                  unbiased=UNBIASED, prior='uniform',
                  lower=0., amplitude=1.,
-                 extra_str=''
+                 extra_str='', stack_children=STACK_CHILDREN
                 ):
         # Attributes
         self.nbArms = nbArms  #: Number of arms
@@ -119,12 +124,14 @@ class Aggregator(BasePolicy):
             else:
                 print("  Using this already created player 'children[{}]' = {} ...".format(i, child))  # DEBUG
                 self.children.append(child)
+        self._stacked = stack_if_homogeneous(self.children) if stack_children else None  #: If not None, the stacked memory of the homogeneous children.
         # Initialize the arrays
         # Assume uniform prior if not given or if = 'uniform'
         self.trusts = np.full(self.nbChildren, 1. / self.nbChildren)  #: Initial trusts in the slaves. Default to uniform, but a prior can also be given.
         if prior is not None and prior != 'uniform':
             assert len(prior) == self.nbChildren, "Error: the 'prior' argument given to Aggregator has to be an array of the good size ({}).".format(self.nbChildren)  # DEBUG
             self.trusts = prior
+        self._prior = np.array(self.trusts, dtype=float)  # Copy of the initial trusts, restored by startGame.
         # Internal vectorial memory
         self.choices = np.full(self.nbChildren, -10000, dtype=int)  #: Keep track of the last choices of each slave, to know whom to update if update_all_children is false.
         if self.update_like_exp4:
@@ -175,11 +182,17 @@ class Aggregator(BasePolicy):
     # --- Start and get a reward
 
     def startGame(self):
-        """ Start the game for each child."""
+        """ Start the game for each child, and forget the trusts learned during the previous game."""
         self.t = 0
+        self.trusts = np.copy(self._prior)
+        if self.update_like_exp4:
+            self.children_cumulated_losses.fill(0)
         # Start all children
-        for i in range(self.nbChildren):
-            self.children[i].startGame()
+        if self._stacked is not None:
+            self._stacked.startGame()
+        else:
+            for i in range(self.nbChildren):
+                self.children[i].startGame()
         self.choices.fill(-1)
         self.index.fill(0)
 
@@ -187,8 +200,11 @@ class Aggregator(BasePolicy):
         """ Give reward for each child, and then update the trust probabilities."""
         self.t += 1
         # First, give reward to all children
-        for child in self.children:
-            child.getReward(arm, reward)
+        if self._stacked is not None:
+            self._stacked.getReward(arm, reward)
+        else:
+            for child in self.children:
+                child.getReward(arm, reward)
         # Then compute the new learning rate
         trusts = self.trusts
         rate = self.rate
@@ -222,10 +238,18 @@ class Aggregator(BasePolicy):
         # print("  The most trusted child policy is the {}th with confidence {}.".format(1 + np.argmax(self.trusts), np.max(self.trusts)))  # DEBUG
         # print("self.trusts =", self.trusts)  # DEBUG
 
-    # --- Internal method
+    # --- Internal methods
+
+    def _syncChildren(self):
+        """ If the children are stacked, update their internal time, before using them one by one."""
+        if self._stacked is not None:
+            self._stacked.sync()
 
     def _makeChildrenChoose(self):
         """ Convenience method to make every children chose their best arm, and store their decision in ``self.choices``."""
+        if self._stacked is not None:
+            self.choices[:] = self._stacked.choice()
+            return
         for i, child in enumerate(self.children):
             self.choices[i] = child.choice()
             # Could we be faster here? Idea: first sample according to self.trusts, then make it decide
@@ -246,6 +270,7 @@ class Aggregator(BasePolicy):
         if rank == 1:
             return self.choice()
         else:
+            self._syncChildren()
             for i, child in enumerate(self.children):
                 self.choices[i] = child.choiceWithRank(rank)
             return rn.choice(self.choices, p=self.trusts)
@@ -255,6 +280,7 @@ class Aggregator(BasePolicy):
         if (availableArms == 'all') or (len(availableArms) == self.nbArms):
             return self.choice()
         else:
+            self._syncChildren()
             for i, child in enumerate(self.children):
                 self.choices[i] = child.choiceFromSubSet(availableArms)
             return rn.choice(self.choices, p=self.trusts)
@@ -264,6 +290,7 @@ class Aggregator(BasePolicy):
         if nb == 1:
             return np.array([self.choice()])
         else:
+            self._syncChildren()
             choices = [None] * self.nbChildren
             for i, child in enumerate(self.children):
                 choices[i] = child.choiceMultiple(nb)
@@ -276,6 +303,7 @@ class Aggregator(BasePolicy):
         if nb == 1:
             return np.array([self.choice()])
         else:
+            self._syncChildren()
             choices = [None] * self.nbChildren
             for i, child in enumerate(self.children):
                 choices[i] = child.choiceIMP(nb)
@@ -286,6 +314,7 @@ class Aggregator(BasePolicy):
     def estimatedOrder(self):
         """ Make each child vote for their estimate order of the arms, then randomly select an ordering by `importance sampling <https://en.wikipedia.org/wiki/Importance_sampling>`_ with the trust probabilities.
         Return the estimate order of the arms, as a permutation on ``[0..K-1]`` that would order the arms by increasing means."""
+        self._syncChildren()
         alltrusts = self.trusts
         orders = []
         trusts = []
@@ -306,6 +335,7 @@ class Aggregator(BasePolicy):
 
     def computeIndex(self, arm):
         """ Compute the current index of arm 'arm', by computing all the indexes of the children policies, and computing a convex combination using the trusts probabilities."""
+        self._syncChildren()
         indexes = [None] * self.nbChildren
         for i, child in enumerate(self.children):
             indexes[i] = child.computeIndex(arm)
@@ -313,7 +343,11 @@ class Aggregator(BasePolicy):
         return index
 
     def computeAllIndex(self):
-        """ Compute the current indexes for all arms. Possibly vectorized, by default it can *not* be vectorized automatically."""
+        """ Compute the current indexes for all arms. Vectorized if the children are stacked, by default it can *not* be vectorized automatically."""
+        if self._stacked is not None:
+            self._stacked.computeAllIndex()
+            self.index[:] = np.dot(self.trusts, self._stacked.index)
+            return
         for arm in range(self.nbArms):
             self.index[arm] = self.computeIndex(arm)
 
@@ -322,5 +356,6 @@ class Aggregator(BasePolicy):
         # FIXME not clear why it should be like giving a zero reward to the master policy,
         # super(Aggregator, self).handleCollision(arm, reward=reward)
         # XXX maybe giving the collision information to all children players is enough...
+        self._syncChildren()
         for child in self.children:
             child.handleCollision(arm, reward=reward)
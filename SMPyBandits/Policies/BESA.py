@@ -391,6 +391,15 @@ class BESA(IndexPolicy):
             ")" if (b1 or b2 or b3 or b4 or b5 or b6) else "",
         )
 
+    def startGame(self):
+        """ Start the game: also forget the history of rewards, and the order of the last tournament, so that a restarted policy plays as a new one."""
+        super(BESA, self).startGame()
+        if self._has_horizon:
+            self.all_rewards.fill(-1e5)
+        else:
+            self.all_rewards = { k : [] for k in range(self.nbArms) }
+        self._actions = np.arange(self.nbArms)
+
     def getReward(self, arm, reward):
         """ Add the current reward in the global history.
 
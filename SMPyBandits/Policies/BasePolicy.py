@@ -67,6 +67,35 @@ class BasePolicy(object):
             reward = (reward - self.lower) / self.amplitude
             self.rewards[arm] += reward
 
+    def getRewards(self, arms, rewards):
+        """ Give a batch of rewards at once, as if :meth:`getReward` was called for each pair ``(arms[i], rewards[i])``.
+
+        - If the policy only uses ``t``, ``pulls`` and ``rewards`` (i.e., it does not redefine :meth:`getReward`), they are updated with :func:`numpy.add.at` in one vectorized step,
+        - otherwise :meth:`getReward` is simply called for each pair, in order.
+
+        It leaves the policy in the same state as a loop on :meth:`getReward`:
+
+        >>> arms, rewards = [0, 2, 0, 1, 0], [1, 0, 0.5, 1, 1]
+        >>> policy, other = BasePolicy(3), BasePolicy(3)
+        >>> policy.startGame(); other.startGame()
+        >>> policy.getRewards(arms, rewards)
+        >>> for arm, reward in zip(arms, rewards):
+        ...     other.getReward(arm, reward)
+        >>> policy.t == other.t, np.array_equal(policy.pulls, other.pulls), np.array_equal(policy.rewards, other.rewards)
+        (True, True, True)
+        >>> policy.t, policy.pulls, policy.rewards
+        (5, array([3, 1, 1]), array([2.5, 1. , 0. ]))
+        """
+        if type(self).getReward is not BasePolicy.getReward:
+            for arm, reward in zip(arms, rewards):
+                self.getReward(arm, reward)
+            return
+        arms = np.asarray(arms, dtype=int)
+        rewards = (np.asarray(rewards, dtype=float) - self.lower) / self.amplitude
+        self.t += len(arms)
+        np.add.at(self.pulls, arms, 1)
+        np.add.at(self.rewards, arms, rewards)
+
     # --- Basic choice() and handleCollision() method
 
     def choice(self):
@@ -80,6 +109,22 @@ class BasePolicy(object):
     #     self.getReward(arm, self.lower)
     #     # raise NotImplementedError("This method handleCollision() has to be implemented in the child class inheriting from BasePolicy.")
 
+    def choiceBatch(self, n=1):
+        """ Return an array of ``n`` decisions, all made with the current statistics (e.g., for a batch of delayed feedback).
+
+        - By default, :meth:`choice` is simply called ``n`` times, child classes can do it more efficiently.
+
+        >>> class UniformChoice(BasePolicy):
+        ...     def choice(self):
+        ...         return np.random.randint(self.nbArms)
+        >>> policy = UniformChoice(3)
+        >>> policy.startGame()
+        >>> choices = policy.choiceBatch(10)
+        >>> len(choices), np.all((0 <= choices) & (choices < policy.nbArms))
+        (10, True)
+        """
+        return np.array([self.choice() for _ in range(n)], dtype=int)
+
     # --- Others choice...() methods, partly implemented
 
     def choiceWithRank(self, rank=1):
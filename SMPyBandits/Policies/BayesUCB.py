@@ -9,6 +9,8 @@ from __future__ import division, print_function  # Python 2 compatibility
 __author__ = "Olivier Cappé, Aurélien Garivier, Emilie Kaufmann, Lilian Besson"
 __version__ = "0.5"
 
+from scipy.special import btdtri
+
 try:
   from .BayesianIndexPolicy import BayesianIndexPolicy
 except ImportError:
@@ -28,3 +30,10 @@ class BayesUCB(BayesianIndexPolicy):
         .. math:: I_k(t) = \mathrm{Quantile}\left(\mathrm{Beta}(1 + S_k(t), 1 + N_k(t) - S_k(t)), 1 - \frac{1}{t}\right).
         """
         return self.posterior[arm].quantile(1. - 1. / (1 + self.t))
+
+    def computeAllIndex(self):
+        """ For Beta posteriors, compute the K quantiles with one call to :func:`scipy.special.btdtri`, otherwise compute them one by one."""
+        parameters = self._beta_parameters()
+        if parameters is None or type(self).computeIndex is not BayesUCB.computeIndex:
+            return super(BayesUCB, self).computeAllIndex()
+        self.index[:] = btdtri(parameters[0], parameters[1], 1. - 1. / (1 + self.t))
@@ -5,12 +5,17 @@ from __future__ import division, print_function  # Python 2 compatibility
 __author__ = "Lilian Besson"
 __version__ = "0.9"
 
+import numpy as np
+import numpy.random as rn
+
 try:
     from .IndexPolicy import IndexPolicy
     from .Posterior import Beta
+    from .topM import argmax_with_ties
 except ImportError:
     from IndexPolicy import IndexPolicy
     from Posterior import Beta
+    from topM import argmax_with_ties
 
 
 class BayesianIndexPolicy(IndexPolicy):
@@ -40,6 +45,12 @@ class BayesianIndexPolicy(IndexPolicy):
                 # print("Creating posterior for arm {}, with args = {} and kwargs = {}.".format(arm, args, kwargs))  # DEBUG
                 self.posterior[arm] = posterior(*args, **kwargs)
         self._posterior_name = str(self.posterior[0].__class__.__name__)
+        self._N = None  #: Counts of the Beta posteriors of all the arms, as one (K, 2) array, if they are Beta posteriors (i.e., if they have a ``parameters()`` method).
+        if hasattr(self.posterior[0], 'parameters'):
+            self._N = np.array([posterior.N for posterior in self.posterior], dtype=float)
+            parameters = np.array([posterior.parameters() for posterior in self.posterior], dtype=float)
+            self._prior = parameters - self._N[:, ::-1]  #: Part of the parameters :math:`(\alpha_k, \beta_k)` which is not in the counts (e.g., the prior of a :class:`Posterior.DiscountedBeta`).
+            self._bind_posteriors()
 
     def __str__(self):
         """ -> str"""
@@ -48,6 +59,17 @@ class BayesianIndexPolicy(IndexPolicy):
         else:
             return "{}({})".format(self.__class__.__name__, self._posterior_name)
 
+    def _bind_posteriors(self):
+        """ The counts ``N`` of every Beta posterior are a view on its row of ``self._N``."""
+        for arm, posterior in enumerate(self.posterior):
+            posterior.N = self._N[arm]
+
+    def __setstate__(self, state):
+        """ A copied (or unpickled) array is not a view anymore, so the counts of the copied posteriors are bound again to the rows of the copied array."""
+        self.__dict__.update(state)
+        if self.__dict__.get('_N', None) is not None:
+            self._bind_posteriors()
+
     def startGame(self):
         """ Reset the posterior on each arm."""
         self.t = 0
@@ -60,5 +82,42 @@ class BayesianIndexPolicy(IndexPolicy):
         self.posterior[arm].update((reward - self.lower) / self.amplitude)
         self.t += 1
 
+    def _beta_parameters(self):
+        """ Return the two arrays of parameters :math:`(\alpha_k, \beta_k)` of the posteriors of all the arms, if they are Beta posteriors (i.e., if they have a ``parameters()`` method), or None."""
+        if self._N is None:
+            return None
+        return self._prior[:, 0] + self._N[:, 1], self._prior[:, 1] + self._N[:, 0]
+
+    def getRewards(self, arms, rewards):
+        """ Update the posteriors with a batch of normalized rewards.
+
+        - For Beta posteriors, the rewards are binarized all at once (like :func:`Posterior.Beta.bernoulliBinarization`) and the counts of successes and failures are added to each arm in one step,
+        - for other posteriors, each observation is given to the posterior of its arm, in order.
+        """
+        if type(self).getReward is not BayesianIndexPolicy.getReward:
+            return super(BayesianIndexPolicy, self).getRewards(arms, rewards)
+        arms = np.asarray(arms, dtype=int)
+        rewards = (np.asarray(rewards, dtype=float) - self.lower) / self.amplitude
+        if self._posterior_name == "Beta":
+            assert np.all((0 <= rewards) & (rewards <= 1)), "Error: only bounded rewards in [0, 1] are supported by this Beta posterior right now."  # DEBUG
+            successes = np.bincount(arms, weights=(rn.random_sample(len(rewards)) < rewards), minlength=self.nbArms)
+            pulls = np.bincount(arms, minlength=self.nbArms)
+            self._N[:, 1] += successes
+            self._N[:, 0] += pulls - successes
+        else:
+            for arm, reward in zip(arms, rewards):
+                self.posterior[arm].update(reward)
+        self.t += len(rewards)
+
+    def choiceBatch(self, n=1):
+        """ The posteriors are the same for the ``n`` decisions, but the indexes are computed again for each decision, as they can be random (e.g., for :class:`Thompson`)."""
+        if type(self).choice is not IndexPolicy.choice:
+            return super(BayesianIndexPolicy, self).choiceBatch(n=n)
+        choices = np.zeros(n, dtype=int)
+        for i in range(n):
+            self.computeAllIndex()
+            choices[i] = argmax_with_ties(self.index)
+        return choices
+
     def computeIndex(self, arm):
         raise NotImplementedError("This method computeIndex(arm) has to be implemented in the child class inheriting from BayesianIndexPolicy.")
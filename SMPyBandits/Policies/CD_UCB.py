@@ -89,6 +89,13 @@ class CD_IndexPolicy(BaseWrapperPolicy):
     def __str__(self):
         return r"CD-{}($\varepsilon={:.3g}$, $\gamma={:.3g}$, {}{})".format(self._policy.__name__, self.epsilon, self.proba_random_exploration, "" if self._per_arm_restart else "Global", ", lazy detect {}".format(self.lazy_detect_change_only_x_steps) if self.lazy_detect_change_only_x_steps != LAZY_DETECT_CHANGE_ONLY_X_STEPS else "")
 
+    def startGame(self, createNewPolicy=True):
+        """ Start the game: also forget the rewards and the restarts of each arm, so that a restarted policy plays as a new one."""
+        super(CD_IndexPolicy, self).startGame(createNewPolicy=createNewPolicy)
+        self.all_rewards = [[] for _ in range(self.nbArms)]
+        self.last_pulls.fill(0)
+        self.last_restart_times.fill(0)
+
     def choice(self):
         r""" With a probability :math:`\alpha`, play uniformly at random, otherwise, pass the call to :meth:`choice` of the underlying policy."""
         if with_proba(self.proba_random_exploration):
@@ -22,8 +22,10 @@ import numpy.random as rn
 from scipy.optimize import minimize_scalar
 try:
     from .BasePolicy import BasePolicy
+    from .StackedChildren import stack_if_homogeneous
 except ImportError:
     from BasePolicy import BasePolicy
+    from StackedChildren import stack_if_homogeneous
 
 
 # --- Renormalize function
@@ -109,6 +111,9 @@ UNBIASED = True  # Better
 BROADCAST_ALL = True
 BROADCAST_ALL = False
 
+#: Should homogeneous children (same index policy, different scalar parameters) be stacked, to compute all their indexes in one vectorized pass (see :class:`Policies.StackedChildren`).
+STACK_CHILDREN = True
+
 
 # --- CORRAL algorithm
 
@@ -118,7 +123,7 @@ class CORRAL(BasePolicy):
     def __init__(self, nbArms, children=None,
                  horizon=None, rate=None,
                  unbiased=UNBIASED, broadcast_all=BROADCAST_ALL, prior='uniform',
-                 lower=0., amplitude=1.
+                 lower=0., amplitude=1., stack_children=STACK_CHILDREN
                 ):
         # Attributes
         self.nbArms = nbArms  #: Number of arms.
@@ -142,6 +147,7 @@ class CORRAL(BasePolicy):
         else:
             self._default_parameters = False
         assert rate > 0, "Error: parameter 'rate' for a CORRAL player was expected to be > 0, but = {:.3g}...".format(rate)  # DEBUG
+        self._rate = rate  # Initial learning rate, restored by startGame.
         self.rates = np.full(nbChildren, rate)  #: Value of the learning rate (will be **increasing** in time).
 
         # Internal object memory
@@ -158,6 +164,7 @@ class CORRAL(BasePolicy):
             else:
                 print("  Using this already created player 'children[{}]' = {} ...".format(i, child))  # DEBUG
                 self.children.append(child)
+        self._stacked = stack_if_homogeneous(self.children) if stack_children else None  #: If not None, the stacked memory of the homogeneous children.
 
         # Initialize the arrays
         # Assume uniform prior if not given or if = 'uniform'
@@ -165,6 +172,7 @@ class CORRAL(BasePolicy):
         if prior is not None and prior != 'uniform':
             assert len(prior) == nbChildren, "Error: the 'prior' argument given to CORRAL has to be an array of the good size ({}).".format(nbChildren)  # DEBUG
             self.trusts = prior
+        self._prior = np.array(self.trusts, dtype=float)  # Copy of the initial trusts, restored by startGame.
         self.bar_trusts = np.copy(self.trusts)  #: Initial bar trusts in the slaves. Default to uniform, but a prior can also be given.
 
         # Internal vectorial memory
@@ -205,10 +213,18 @@ class CORRAL(BasePolicy):
     # --- Start the game
 
     def startGame(self):
-        """ Start the game for each child."""
+        """ Start the game for each child, and forget the trusts and learning rates learned during the previous game."""
+        self.trusts = np.copy(self._prior)
+        self.bar_trusts = np.copy(self._prior)
+        self.rhos = self.bar_trusts / 2
+        self.rates.fill(self._rate)
+        self.last_choice = None
         # Start all children
-        for i in range(self.nbChildren):
-            self.children[i].startGame()
+        if self._stacked is not None:
+            self._stacked.startGame()
+        else:
+            for i in range(self.nbChildren):
+                self.children[i].startGame()
 
     # --- Get a reward
 
@@ -222,7 +238,9 @@ class CORRAL(BasePolicy):
 
         # print("  A CORRAL player {} received a reward = {:.3g} on arm {} and trust = {:.3g} on that choice = {}, giving {:.3g} ...".format(self, reward, arm, self.bar_trusts[self.last_choice], self.last_choice, new_reward))  # DEBUG
         # 1. First, give rewards to all children
-        if self.broadcast_all:
+        if self._stacked is not None:
+            self._stacked.getReward(arm, reward, child=None if self.broadcast_all else self.last_choice)
+        elif self.broadcast_all:
             for i, child in enumerate(self.children):
                 # # if i == self.last_choice:
                 # if self.choices[i] == arm:
@@ -276,10 +294,19 @@ class CORRAL(BasePolicy):
 
     # --- Choice of arm methods
 
+    def _syncChildren(self):
+        """ If the children are stacked, update the internal time of all children (or only the trusted one), before using them one by one."""
+        if self._stacked is not None:
+            self._stacked.sync(child=None if self.broadcast_all else self.last_choice)
+
     def choice(self):
         """ Trust one of the slave and listen to his `choice`."""
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.bar_trusts)
+        if self.broadcast_all and self._stacked is not None:
+            self.choices[:] = self._stacked.choice()
+            return self.choices[self.last_choice]
+        self._syncChildren()
         if self.broadcast_all:
             for i, child in enumerate(self.children):
                 self.choices[i] = child.choice()
@@ -292,6 +319,7 @@ class CORRAL(BasePolicy):
         """ Trust one of the slave and listen to his `choiceWithRank`."""
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.bar_trusts)
+        self._syncChildren()
         if self.broadcast_all:
             for i, child in enumerate(self.children):
                 self.choices[i] = child.choiceWithRank(rank=rank)
@@ -304,6 +332,7 @@ class CORRAL(BasePolicy):
         """ Trust one of the slave and listen to his `choiceFromSubSet`."""
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.bar_trusts)
+        self._syncChildren()
         if self.broadcast_all:
             for i, child in enumerate(self.children):
                 self.choices[i] = child.choiceFromSubSet(availableArms=availableArms)
@@ -316,6 +345,7 @@ class CORRAL(BasePolicy):
         """ Trust one of the slave and listen to his `choiceMultiple`."""
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.bar_trusts)
+        self._syncChildren()
         if self.broadcast_all:
             for i, child in enumerate(self.children):
                 self.choices[i] = child.choiceMultiple(nb=nb)
@@ -328,6 +358,7 @@ class CORRAL(BasePolicy):
         """ Trust one of the slave and listen to his `choiceIMP`."""
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.bar_trusts)
+        self._syncChildren()
         if self.broadcast_all:
             for i, child in enumerate(self.children):
                 self.choices[i] = child.choiceIMP(nb=nb)
@@ -343,6 +374,7 @@ class CORRAL(BasePolicy):
         """
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.bar_trusts)
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].estimatedOrder()
 
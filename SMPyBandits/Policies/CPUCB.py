@@ -149,6 +149,26 @@ def ClopperPearsonUCB(x, N, alpha=0.05):
     return upperbound
 
 
+def ClopperPearsonUCBs(xArray, nArray, alpha=0.05):
+    """ Returns just the upper-confidence bounds of the confidence intervals, for vectorial inputs (``xArray`` and ``nArray`` with ``nArray >= 1``), in one call to :func:`scipy.stats.f.ppf`.
+
+    >>> np.random.seed(1234)  # reproducible results
+    >>> xArray = np.random.binomial(100, 0.6, 4)
+    >>> ClopperPearsonUCBs(xArray, 100)  # doctest: +ELLIPSIS
+    array([0.705..., 0.640..., 0.705..., 0.620...])
+    >>> ClopperPearsonUCBs([0, 3, 5], [5, 5, 5])  # doctest: +ELLIPSIS
+    array([0.521..., 0.947..., 1.        ])
+    """
+    xArray, nArray = np.asarray(xArray, dtype=float), np.asarray(nArray, dtype=float)
+    nu1 = 2 * (xArray + 1)
+    nu2 = 2 * (nArray - xArray)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        F = scipy.stats.f.ppf(1 - (alpha / 2.), nu1, nu2)
+        upperbounds = (nu1 * F) / (nu2 + nu1 * F)
+    # extreme right case, truncate upperbound to 1
+    return np.where(xArray >= nArray, 1., upperbounds)
+
+
 # # Define a vectorized clopperPearsonUCB function, in ONE line!
 # clopperPearsonUCB = np.vectorize(ClopperPearsonUCB)
 # clopperPearsonUCB.__doc__ = ClopperPearsonUCB.__doc__
@@ -182,11 +202,11 @@ class CPUCB(UCB):
         else:
             return ClopperPearsonUCB(self.rewards[arm], self.pulls[arm], 1. / (self.t ** self.c))
 
-    # def computeAllIndex(self):
-    #     """ Compute the current indexes for all arms, in a vectorized manner."""
-    #     indexes = ClopperPearsonUCB(self.rewards, self.pulls, 1. / (self.t ** self.c))
-    #     indexes[self.pulls < 1] = float('+inf')
-    #     self.index[:] = indexes
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        indexes = ClopperPearsonUCBs(self.rewards, np.maximum(1, self.pulls), 1. / (max(1, self.t) ** self.c))
+        indexes[self.pulls < 1] = float('+inf')
+        self.index[:] = indexes
 
 
 # --- Debugging
@@ -11,6 +11,8 @@ from __future__ import division, print_function  # Python 2 compatibility
 __author__ = "Lilian Besson"
 __version__ = "0.9"
 
+import numpy.random as rn
+
 try:
     from .DiscountedBayesianIndexPolicy import DiscountedBayesianIndexPolicy
 except (ImportError, SystemError):
@@ -46,3 +48,10 @@ class DiscountedThompson(DiscountedBayesianIndexPolicy):
             \widetilde{F_{k'}}(t+1) &= \gamma \widetilde{F_{k'}}(t), \forall k' \neq A(t).
         """
         return self.posterior[arm].sample()
+
+    def computeAllIndex(self):
+        """ For DiscountedBeta posteriors, sample the K indexes with one call to :func:`numpy.random.beta`, otherwise sample them one by one."""
+        parameters = self._beta_parameters()
+        if parameters is None or type(self).computeIndex is not DiscountedThompson.computeIndex:
+            return super(DiscountedThompson, self).computeAllIndex()
+        self.index[:] = rn.beta(parameters[0], parameters[1])
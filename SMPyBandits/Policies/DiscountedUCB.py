@@ -55,6 +55,13 @@ class DiscountedUCB(UCBalpha):
             ", $\alpha={:.3g}$".format(self.alpha) if self.alpha != ALPHA else "",
         )
 
+    def startGame(self):
+        """ Start the game: also forget the discounted pulls and rewards, so that a restarted policy plays as a new one."""
+        super(DiscountedUCB, self).startGame()
+        self.discounted_pulls.fill(0)
+        self.discounted_rewards.fill(0)
+        self.delta_time_steps.fill(0)
+
     def getReward(self, arm, reward):
         r""" Give a reward: increase t, pulls, and update cumulated sum of rewards for that arm (normalized in [0, 1]).
 
@@ -141,9 +148,9 @@ class DiscountedUCBPlus(DiscountedUCB):
 # --- SW-klUCB
 
 try:
-    from .kullback import klucbBern
+    from .kullback import klucbBern, vectorize_klucb
 except (ImportError, SystemError):
-    from kullback import klucbBern
+    from kullback import klucbBern, vectorize_klucb
 
 #: Default value for the constant c used in the computation of KL-UCB index.
 constant_c = 1.  #: default value, as it was in pymaBandits v1.0
@@ -163,6 +170,7 @@ class DiscountedklUCB(DiscountedUCB):
     def __init__(self, nbArms, klucb=klucbBern, *args, **kwargs):
         super(DiscountedklUCB, self).__init__(nbArms, *args, **kwargs)
         self.klucb = klucb  #: kl function to use
+        self.klucb_vect = vectorize_klucb(klucb)  #: kl function to use, in a vectorized way (see :func:`kullback.vectorize_klucb`).
 
     def __str__(self):
         name = self.klucb.__name__[5:]
@@ -193,9 +201,12 @@ class DiscountedklUCB(DiscountedUCB):
             return self.klucb(mean, level, tolerance)
 
     def computeAllIndex(self):
-        """ Compute the current indexes for all arms. Possibly vectorized, by default it can *not* be vectorized automatically."""
-        for arm in range(self.nbArms):
-            self.index[arm] = self.computeIndex(arm)
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        n_t_gamma = np.sum(self.discounted_pulls)
+        assert n_t_gamma <= self.t, "Error: n_t_gamma was computed as {:.3g} but should be < t = {:.3g}...".format(n_t_gamma, self.t)  # DEBUG
+        indexes = self.klucb_vect(self.discounted_rewards / self.discounted_pulls, constant_c * np.log(n_t_gamma) / self.discounted_pulls, tolerance)
+        indexes[self.discounted_pulls < 1] = float('+inf')
+        self.index[:] = indexes
 
 
 
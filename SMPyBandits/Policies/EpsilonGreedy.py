@@ -18,9 +18,11 @@ import numpy.random as rn
 try:
     from .BasePolicy import BasePolicy
     from .with_proba import with_proba
+    from .topM import argmax_with_ties, kth_largest_with_ties, topM_with_ties
 except ImportError:
     from BasePolicy import BasePolicy
     from with_proba import with_proba
+    from topM import argmax_with_ties, kth_largest_with_ties, topM_with_ties
 
 
 #: Default value for epsilon for :class:`EpsilonGreedy`
@@ -56,7 +58,7 @@ class EpsilonGreedy(BasePolicy):
             biased_means = self.rewards / (1 + self.pulls)
             # return rn.choice(np.nonzero(biased_means == np.max(biased_means))[0])
             # WARNING why max on rewards and not mean rewards?
-            return rn.choice(np.nonzero(self.rewards == np.max(self.rewards))[0])
+            return argmax_with_ties(self.rewards)
 
     def choiceWithRank(self, rank=1):
         """With a probability of epsilon, explore (uniform choice), otherwhise exploit with the rank, based on just accumulated *rewards* (not empirical mean rewards)."""
@@ -66,10 +68,8 @@ class EpsilonGreedy(BasePolicy):
             if with_proba(self.epsilon):  # Proba epsilon : explore
                 return rn.randint(0, self.nbArms - 1)
             else:  # Proba 1 - epsilon : exploit
-                sortedRewards = np.sort(self.rewards)
-                chosenIndex = sortedRewards[-rank]
                 # Uniform choice among the rank-th best arms
-                return rn.choice(np.nonzero(self.rewards == chosenIndex)[0])
+                return kth_largest_with_ties(self.rewards, rank)
 
     def choiceFromSubSet(self, availableArms='all'):
         if (availableArms == 'all') or (len(availableArms) == self.nbArms):
@@ -84,7 +84,8 @@ class EpsilonGreedy(BasePolicy):
                 return rn.choice(availableArms)
             else:  # Proba 1 - epsilon : exploit
                 # Uniform choice among the best arms
-                return rn.choice(np.nonzero(self.rewards[availableArms] == np.max(self.rewards[availableArms]))[0])
+                availableArms = np.asarray(availableArms)
+                return availableArms[argmax_with_ties(self.rewards[availableArms])]
 
     def choiceMultiple(self, nb=1):
         if nb == 1:
@@ -94,9 +95,8 @@ class EpsilonGreedy(BasePolicy):
             if with_proba(self.epsilon):  # Proba epsilon : Explore
                 return rn.choice(self.nbArms, size=nb, replace=False)
             else:  # Proba 1 - epsilon : exploit
-                sortedRewards = np.sort(self.rewards)
                 # Uniform choice among the best arms
-                return rn.choice(np.nonzero(self.rewards >= sortedRewards[-nb])[0], size=nb, replace=False)
+                return topM_with_ties(self.rewards, nb, shuffle=True)
 
 
 # --- Epsilon-Decreasing
@@ -14,8 +14,10 @@ import numpy as np
 import numpy.random as rn
 try:
     from .BasePolicy import BasePolicy
+    from .topM import topM_with_ties
 except ImportError:
     from BasePolicy import BasePolicy
+    from topM import topM_with_ties
 
 #: self.unbiased is a flag to know if the rewards are used as biased estimator,
 #: i.e., just :math:`r_t`, or unbiased estimators, :math:`r_t / trusts_t`.
@@ -50,9 +52,10 @@ class Exp3(BasePolicy):
         # The proba that another player has the same is nbPlayers / factorial(nbArms) : should be SMALL !
 
     def startGame(self):
-        """Start with uniform weights."""
+        """Start with uniform weights, and a new random order for the initial exploration of the arms."""
         super(Exp3, self).startGame()
         self.weights.fill(1. / self.nbArms)
+        self._initial_exploration = rn.permutation(self.nbArms)
 
     def __str__(self):
         return r"Exp3($\gamma: {:.3g}$)".format(self.gamma)
@@ -106,6 +109,46 @@ class Exp3(BasePolicy):
         # Renormalize weights at each step
         self.weights /= np.sum(self.weights)
 
+    def getRewards(self, arms, rewards):
+        r"""Give a batch of rewards at once, as a *delayed feedback*: the trusts and :math:`\gamma_t` are computed only once, at the beginning of the batch, then all the multiplicative updates are applied together and the weights are renormalized only once.
+
+        - It is the same as calling :meth:`getReward` for each reward if the batch has size 1, and a close approximation for small batches,
+        - if a child class redefines :meth:`getReward`, it is simply called for each reward.
+
+        A batch of size 1 leaves the policy in the same state as :meth:`getReward`, and a larger batch gives the same counts and close weights:
+
+        >>> policy, other = Exp3(3, gamma=0.1), Exp3(3, gamma=0.1)
+        >>> policy.startGame(); other.startGame()
+        >>> policy.getRewards([1], [1.]); other.getReward(1, 1.)
+        >>> np.allclose(policy.weights, other.weights)
+        True
+        >>> arms, rewards = [0, 2, 1, 0], [1, 0, 0.5, 1]
+        >>> policy.getRewards(arms, rewards)
+        >>> for arm, reward in zip(arms, rewards):
+        ...     other.getReward(arm, reward)
+        >>> policy.t == other.t, np.array_equal(policy.pulls, other.pulls), np.array_equal(policy.rewards, other.rewards)
+        (True, True, True)
+        >>> np.allclose(policy.weights, other.weights, rtol=0.01)
+        True
+        """
+        if type(self).getReward is not Exp3.getReward:
+            return BasePolicy.getRewards(self, arms, rewards)
+        arms = np.asarray(arms, dtype=int)
+        rewards = np.asarray(rewards, dtype=float)
+        gamma = self.gamma
+        # Not BasePolicy.getRewards, that would call getReward for each reward
+        self.t += len(arms)
+        np.add.at(self.pulls, arms, 1)
+        np.add.at(self.rewards, arms, (rewards - self.lower) / self.amplitude)
+        # Update weights of the arms, with these biased or unbiased rewards
+        if self.unbiased:
+            rewards = rewards / self.trusts[arms]
+        sumRewards = np.bincount(arms, weights=rewards, minlength=self.nbArms)
+        # Multiplicative weights, exp(a) * exp(b) = exp(a + b)
+        self.weights *= np.exp(sumRewards * (gamma / self.nbArms))
+        # Renormalize weights once
+        self.weights /= np.sum(self.weights)
+
     # --- Choice methods
 
     def choice(self):
@@ -117,6 +160,23 @@ class Exp3(BasePolicy):
         else:
             return rn.choice(self.nbArms, p=self.trusts)
 
+    def choiceBatch(self, n=1):
+        """The ``n`` next decisions, with the same trusts, drawn in one call to :func:`numpy.random.choice` (after the initial exploration of each arm).
+
+        >>> policy = Exp3(3, gamma=0.1)
+        >>> policy.startGame()
+        >>> choices = policy.choiceBatch(10)
+        >>> len(choices), np.all((0 <= choices) & (choices < policy.nbArms))
+        (10, True)
+        >>> sorted(choices[:3])  # each arm is first explored once
+        [0, 1, 2]
+        """
+        if type(self).choice is not Exp3.choice:
+            return super(Exp3, self).choiceBatch(n=n)
+        nbExplorations = min(n, max(0, self.nbArms - self.t))
+        exploration = self._initial_exploration[self.t:self.t + nbExplorations]
+        return np.concatenate((exploration, rn.choice(self.nbArms, size=n - nbExplorations, p=self.trusts))).astype(int)
+
     def choiceWithRank(self, rank=1):
         """Multiple (rank >= 1) random selection, with probabilities = trusts, thank to :func:`numpy.random.choice`, and select the last one (less probable).
 
@@ -147,8 +207,7 @@ class Exp3(BasePolicy):
     def estimatedBestArms(self, M=1):
         """ Return a (non-necessarily sorted) list of the indexes of the M-best arms. Identify the set M-best."""
         assert 1 <= M <= self.nbArms, "Error: the parameter 'M' has to be between 1 and K = {}, but it was {} ...".format(self.nbArms, M)  # DEBUG
-        order = self.estimatedOrder()
-        return order[-M:]
+        return topM_with_ties(self.trusts, M)
 
 
 # --- Three special cases
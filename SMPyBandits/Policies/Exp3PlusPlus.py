@@ -14,8 +14,10 @@ import numpy as np
 import numpy.random as rn
 try:
     from .BasePolicy import BasePolicy
+    from .topM import topM_with_ties
 except ImportError:
     from BasePolicy import BasePolicy
+    from topM import topM_with_ties
 
 
 #: Value for the :math:`\alpha` parameter.
@@ -49,10 +51,11 @@ class Exp3PlusPlus(BasePolicy):
         # The proba that another player has the same is nbPlayers / factorial(nbArms) : should be SMALL !
 
     def startGame(self):
-        """Start with uniform weights."""
+        """Start with uniform weights, and a new random order for the initial exploration of the arms."""
         super(Exp3PlusPlus, self).startGame()
         self.weights.fill(1. / self.nbArms)
         self.losses.fill(0)
+        self._initial_exploration = rn.permutation(self.nbArms)
 
     def __str__(self):
         s = "{}{}".format("" if self.alpha == ALPHA else r"$\alpha={}$".format(self.alpha), "" if self.beta == BETA else r"$\beta={}$".format(self.beta))
@@ -191,5 +194,4 @@ class Exp3PlusPlus(BasePolicy):
     def estimatedBestArms(self, M=1):
         """ Return a (non-necessarily sorted) list of the indexes of the M-best arms. Identify the set M-best."""
         assert 1 <= M <= self.nbArms, "Error: the parameter 'M' has to be between 1 and K = {}, but it was {} ...".format(self.nbArms, M)  # DEBUG
-        order = self.estimatedOrder()
-        return order[-M:]
+        return topM_with_ties(self.trusts, M)
@@ -23,10 +23,12 @@ try:
     from .EpsilonGreedy import EpsilonGreedy
     from .BasePolicy import BasePolicy
     from .with_proba import with_proba
+    from .topM import argmax_with_ties
 except ImportError:
     from EpsilonGreedy import EpsilonGreedy
     from BasePolicy import BasePolicy
     from with_proba import with_proba
+    from topM import argmax_with_ties
 
 
 #: Default value for the gap, :math:`\Delta = \min_{i\neq j} \mu_i - \mu_j`, :math:`\Delta = 0.1` as in many basic experiments.
@@ -136,6 +138,12 @@ class ETC_FixedBudget(EpsilonGreedy):
     def __str__(self):
         return r"ETC_FixedBudget($T={}$, $\Delta={:.3g}$, $T_0={}$)".format(self.horizon, self.gap, self.max_t)
 
+    def startGame(self):
+        """ Start the game: also forget the Round-Robin phase and the arm on which the policy committed, so that a restarted policy plays as a new one."""
+        super(ETC_FixedBudget, self).startGame()
+        self.round_robin_index = -1
+        self.best_identified_arm = None
+
     def choice(self):
         r""" For n rounds, choose each arm sequentially in a Round-Robin phase, then commit to the arm with highest empirical average.
 
@@ -150,7 +158,7 @@ class ETC_FixedBudget(EpsilonGreedy):
             # Commit to the best arm
             if self.best_identified_arm is None:
                 means = self.rewards / self.pulls
-                self.best_identified_arm = np.random.choice(np.nonzero(means == np.max(means))[0])
+                self.best_identified_arm = argmax_with_ties(means)
             return self.best_identified_arm
 
     # This decorator @property makes this method an attribute, cf. https://docs.python.org/3/library/functions.html#property
@@ -187,6 +195,12 @@ class _ETC_RoundRobin_WithStoppingCriteria(EpsilonGreedy):
     def __str__(self):
         return r"{}($T={}$, $\Delta={:.3g}$)".format(self.__class__.__name__, self.horizon, self.gap)
 
+    def startGame(self):
+        """ Start the game: also forget the Round-Robin phase and the arm on which the policy committed, so that a restarted policy plays as a new one."""
+        super(_ETC_RoundRobin_WithStoppingCriteria, self).startGame()
+        self.round_robin_index = -1
+        self.best_identified_arm = None
+
     def choice(self):
         r""" Choose each arm sequentially in a Round-Robin phase, as long as the following criteria is not satisfied, then commit to the arm with highest empirical average.
 
@@ -199,7 +213,7 @@ class _ETC_RoundRobin_WithStoppingCriteria(EpsilonGreedy):
             if self.round_robin_index == 0:  # only check at the end of a Round-Robin phase
                 means = self.rewards / self.pulls
                 if self.stopping_criteria():
-                    self.best_identified_arm = np.random.choice(np.nonzero(means == np.max(means))[0])
+                    self.best_identified_arm = argmax_with_ties(means)
             return self.round_robin_index
         return self.best_identified_arm
 
@@ -297,11 +311,11 @@ class DeltaUCB(BasePolicy):
             return self.t
         # 1. stats on the least chosen arm
         nb_least_chosen = np.min(self.pulls)
-        least_chosen = np.random.choice(np.nonzero(self.pulls == nb_least_chosen)[0])
+        least_chosen = argmax_with_ties(-self.pulls)
         mean_min = self.rewards[least_chosen] / self.pulls[least_chosen]
         ucb_min = mean_min + np.sqrt(self.alpha * np.log(self.horizon / nb_least_chosen) / nb_least_chosen)
         # 2. stats on the most chosen arm
-        most_chosen = np.random.choice(np.nonzero(self.pulls == np.max(self.pulls))[0])
+        most_chosen = argmax_with_ties(self.pulls)
         mean_max = self.rewards[most_chosen] / self.pulls[most_chosen]
         ucb_max = mean_max + self.gap - self.alpha * self.epsilon_T
         # now check the two ucb
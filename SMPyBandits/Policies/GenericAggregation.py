@@ -16,19 +16,25 @@ import numpy as np
 import numpy.random as rn
 try:
     from .BasePolicy import BasePolicy
+    from .StackedChildren import stack_if_homogeneous
     from .with_proba import with_proba
 except ImportError:
     from BasePolicy import BasePolicy
+    from StackedChildren import stack_if_homogeneous
     from with_proba import with_proba
 
 
+#: Should homogeneous children (same index policy, different scalar parameters) be stacked, to compute all their indexes in one vectorized pass (see :class:`Policies.StackedChildren`).
+STACK_CHILDREN = True
+
+
 # --- GenericAggregation algorithm
 
 class GenericAggregation(BasePolicy):
     """ The GenericAggregation aggregation bandit algorithm."""
 
     def __init__(self, nbArms, master=None, children=None,
-            lower=0., amplitude=1.
+            lower=0., amplitude=1., stack_children=STACK_CHILDREN
         ):
         # Attributes
         self.nbArms = nbArms  #: Number of arms.
@@ -64,6 +70,7 @@ class GenericAggregation(BasePolicy):
             else:
                 print("  Using this already created player 'children[{}]' = {} ...".format(i, child))  # DEBUG
                 self.children.append(child)
+        self._stacked = stack_if_homogeneous(self.children) if stack_children else None  #: If not None, the stacked memory of the homogeneous children.
 
     def __str__(self):
         """ Nicely print the name of the algorithm with its relevant parameters."""
@@ -74,23 +81,35 @@ class GenericAggregation(BasePolicy):
     def startGame(self):
         """ Start the game for each child, and for the master."""
         self.master.startGame()
-        for i in range(self.nbChildren):
-            self.children[i].startGame()
+        if self._stacked is not None:
+            self._stacked.startGame()
+        else:
+            for i in range(self.nbChildren):
+                self.children[i].startGame()
 
     # --- Get a reward
 
     def getReward(self, arm, reward):
         """ Give reward for each child, and for the master."""
         self.master.getReward(self.last_choice, reward)
-        for i in range(self.nbChildren):
-            self.children[i].getReward(arm, reward)
+        if self._stacked is not None:
+            self._stacked.getReward(arm, reward)
+        else:
+            for i in range(self.nbChildren):
+                self.children[i].getReward(arm, reward)
 
     # --- Choice of arm methods
 
+    def _syncChildren(self):
+        """ If the children are stacked, update the internal time of the trusted child, before using it."""
+        if self._stacked is not None:
+            self._stacked.sync(child=self.last_choice)
+
     def choice(self):
         """ Trust one of the slave and listen to his `choice`."""
         # 1. first decide who to listen to
         self.last_choice = self.master.choice()
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].choice()
 
@@ -98,6 +117,7 @@ class GenericAggregation(BasePolicy):
         """ Trust one of the slave and listen to his `choiceWithRank`."""
         # 1. first decide who to listen to
         self.last_choice = self.master.choice()
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].choiceWithRank(rank=rank)
 
@@ -105,6 +125,7 @@ class GenericAggregation(BasePolicy):
         """ Trust one of the slave and listen to his `choiceFromSubSet`."""
         # 1. first decide who to listen to
         self.last_choice = self.master.choice()
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].choiceFromSubSet(availableArms=availableArms)
 
@@ -112,6 +133,7 @@ class GenericAggregation(BasePolicy):
         """ Trust one of the slave and listen to his `choiceMultiple`."""
         # 1. first decide who to listen to
         self.last_choice = self.master.choice()
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].choiceMultiple(nb=nb)
 
@@ -119,6 +141,7 @@ class GenericAggregation(BasePolicy):
         """ Trust one of the slave and listen to his `choiceIMP`."""
         # 1. first decide who to listen to
         self.last_choice = self.master.choice()
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].choiceIMP(nb=nb)
 
@@ -129,6 +152,7 @@ class GenericAggregation(BasePolicy):
         """
         # 1. first decide who to listen to
         self.last_choice = self.master.choice()
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].estimatedOrder()
 
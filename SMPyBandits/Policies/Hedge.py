@@ -12,8 +12,10 @@ import numpy as np
 import numpy.random as rn
 try:
     from .BasePolicy import BasePolicy
+    from .topM import topM_with_ties
 except ImportError:
     from BasePolicy import BasePolicy
+    from topM import topM_with_ties
 
 #: Default :math:`\varepsilon` parameter.
 EPSILON = 0.01
@@ -40,9 +42,10 @@ class Hedge(BasePolicy):
         # The proba that another player has the same is nbPlayers / factorial(nbArms) : should be SMALL !
 
     def startGame(self):
-        """Start with uniform weights."""
+        """Start with uniform weights, and a new random order for the initial exploration of the arms."""
         super(Hedge, self).startGame()
         self.weights.fill(1. / self.nbArms)
+        self._initial_exploration = rn.permutation(self.nbArms)
 
     def __str__(self):
         return r"Hedge($\varepsilon: {:.3g}$)".format(self.epsilon)
@@ -137,8 +140,7 @@ class Hedge(BasePolicy):
     def estimatedBestArms(self, M=1):
         """ Return a (non-necessarily sorted) list of the indexes of the M-best arms. Identify the set M-best."""
         assert 1 <= M <= self.nbArms, "Error: the parameter 'M' has to be between 1 and K = {}, but it was {} ...".format(self.nbArms, M)  # DEBUG
-        order = self.estimatedOrder()
-        return order[-M:]
+        return topM_with_ties(self.trusts, M)
 
 
 # --- Two special cases
@@ -15,10 +15,12 @@ try:
     from .DMED import DMED
     from .usenumba import jit
     from .kullback import klBern
+    from .topM import argmax_with_ties
 except ImportError:
     from DMED import DMED
     from usenumba import jit
     from kullback import klBern
+    from topM import argmax_with_ties
 
 
 # --- Utilitary functions Dinf
@@ -120,7 +122,7 @@ class IMED(DMED):
 
         # then do as IndexPolicy but with a min instead
         # try:
-        return np.random.choice(np.nonzero(indexes_to_minimize == np.min(indexes_to_minimize))[0])
+        return argmax_with_ties(-indexes_to_minimize)
         # except ValueError:
         #     if not np.all(np.isnan(indexes_to_minimize)):
         #         raise ValueError("Error: unknown error in IMED.choice(): the indexes were {} but couldn't be used to select an arm.".format(indexes_to_minimize))
@@ -12,8 +12,10 @@ import numpy as np
 
 try:
     from .BasePolicy import BasePolicy
+    from .topM import argmax_with_ties, kth_largest_with_ties, topM_with_ties
 except (ImportError, SystemError):
     from BasePolicy import BasePolicy
+    from topM import argmax_with_ties, kth_largest_with_ties, topM_with_ties
 
 
 class IndexPolicy(BasePolicy):
@@ -51,16 +53,35 @@ class IndexPolicy(BasePolicy):
 
         .. math:: A(t) \sim U(\arg\max_{1 \leq k \leq K} I_k(t)).
 
-        .. warning:: In almost all cases, there is a unique arm with maximal index, so we loose a lot of time with this generic code, but I couldn't find a way to be more efficient without loosing generality.
+        .. note:: In almost all cases, there is a unique arm with maximal index, and then :func:`topM.argmax_with_ties` does not use the random generator.
         """
         # I prefer to let this be another method, so child of IndexPolicy only needs to implement it (if they want, or just computeIndex)
         self.computeAllIndex()
         # Uniform choice among the best arms
-        try:
-            return np.random.choice(np.nonzero(self.index == np.max(self.index))[0])
-        except ValueError:
-            print("Warning: unknown error in IndexPolicy.choice(): the indexes were {} but couldn't be used to select an arm.".format(self.index))
-            return np.random.randint(self.nbArms)
+        return argmax_with_ties(self.index)
+
+    def choiceBatch(self, n=1):
+        """ In an index policy, the indexes are computed only once, then each of the ``n`` decisions is an arm with maximal index (uniformly at random, independently for each decision).
+
+        - If the child class redefines :meth:`choice`, it is simply called ``n`` times.
+
+        >>> from UCBalpha import UCBalpha
+        >>> policy = UCBalpha(3)
+        >>> policy.startGame()
+        >>> policy.getRewards([0, 1, 2, 0, 2], [1, 0, 1, 1, 0])
+        >>> choices = policy.choiceBatch(6)
+        >>> len(choices), np.all(choices == np.argmax(policy.index))
+        (6, True)
+        >>> policy.t  # no decision is a feedback
+        5
+        """
+        if type(self).choice is not IndexPolicy.choice:
+            return super(IndexPolicy, self).choiceBatch(n=n)
+        self.computeAllIndex()
+        candidates = np.flatnonzero(self.index == np.max(self.index))
+        if len(candidates) == 0:
+            return np.random.randint(self.nbArms, size=n)
+        return candidates[np.random.randint(len(candidates), size=n)]
 
     # --- Others choice...() methods
 
@@ -79,16 +100,10 @@ class IndexPolicy(BasePolicy):
         else:
             assert rank >= 1, "Error: for IndexPolicy = {}, in choiceWithRank(rank={}) rank has to be >= 1.".format(self, rank)
             self.computeAllIndex()
-            sortedRewards = np.sort(self.index)
             # Question: What happens here if two arms has the same index, being the max?
             # Then it is fair to chose a random arm with best index, instead of aiming at an arm with index being ranked rank
-            chosenIndex = sortedRewards[-rank]
-            # Uniform choice among the rank-th best arms
-            try:
-                return np.random.choice(np.nonzero(self.index == chosenIndex)[0])
-            except ValueError:
-                print("Warning: unknown error in IndexPolicy.choiceWithRank(): the indexes were {} but couldn't be used to select an arm.".format(self.index))
-                return np.random.randint(self.nbArms)
+            # Uniform choice among the rank-th best arms, without sorting the indexes
+            return kth_largest_with_ties(self.index, rank)
 
     def choiceFromSubSet(self, availableArms='all'):
         """ In an index policy, choose the best arm from sub-set availableArms (uniformly at random)."""
@@ -105,10 +120,8 @@ class IndexPolicy(BasePolicy):
             for arm in availableArms:
                 self.index[arm] = self.computeIndex(arm)
             # Uniform choice among the best arms
-            try:
-                return availableArms[np.random.choice(np.nonzero(self.index[availableArms] == np.max(self.index[availableArms]))[0])]
-            except ValueError:
-                return np.random.choice(availableArms)
+            availableArms = np.asarray(availableArms)
+            return availableArms[argmax_with_ties(self.index[availableArms])]
 
     def choiceMultiple(self, nb=1):
         """ In an index policy, choose nb arms with maximal indexes (uniformly at random)."""
@@ -116,16 +129,15 @@ class IndexPolicy(BasePolicy):
             return np.array([self.choice()])
         else:
             self.computeAllIndex()
-            sortedIndexes = np.sort(self.index)
             # Uniform choice of nb different arms among the best arms
             # FIXED sort it then apply affectation_order, to fix its order ==> will have a fixed nb of switches for CentralizedMultiplePlay
-            try:
-                return np.random.choice(np.nonzero(self.index >= sortedIndexes[-nb])[0], size=nb, replace=False)
-            except ValueError:
-                return np.random.choice(self.nbArms, size=nb, replace=False)
+            return topM_with_ties(self.index, nb, shuffle=True)
 
     def choiceIMP(self, nb=1, startWithChoiceMultiple=True):
-        """ In an index policy, the IMP strategy is hybrid: choose nb-1 arms with maximal empirical averages, then 1 arm with maximal index. Cf. algorithm IMP-TS [Komiyama, Honda, Nakagawa, 2016, arXiv 1506.00779]."""
+        """ In an index policy, the IMP strategy is hybrid: choose nb-1 arms with maximal empirical averages, then 1 arm with maximal index. Cf. algorithm IMP-TS [Komiyama, Honda, Nakagawa, 2016, arXiv 1506.00779].
+
+        - The nb-1 arms are chosen uniformly at random among the arms whose empirical averages are at least the nb-th largest one (found without sorting them).
+        """
         if nb == 1:
             return np.array([self.choice()])
         else:
@@ -139,8 +151,8 @@ class IndexPolicy(BasePolicy):
                 empiricalMeans = self.rewards / self.pulls
                 empiricalMeans[self.pulls < 1] = float('inf')
             # First choose nb-1 arms, from rewards
-            sortedEmpiricalMeans = np.sort(empiricalMeans)
-            exploitations = np.random.choice(np.nonzero(empiricalMeans >= sortedEmpiricalMeans[-nb])[0], size=nb - 1, replace=False)
+            threshold = np.partition(empiricalMeans, self.nbArms - nb)[self.nbArms - nb]
+            exploitations = np.random.choice(np.flatnonzero(empiricalMeans >= threshold), size=nb - 1, replace=False)
             # Then choose 1 arm, from index now
             availableArms = np.setdiff1d(np.arange(self.nbArms), exploitations)
             exploration = self.choiceFromSubSet(availableArms)
@@ -162,5 +174,5 @@ class IndexPolicy(BasePolicy):
         #     print("Warning: estimatedBestArms() for self = {} was called with M = {} but all indexes are +inf, so using a random estimate = {} of Mbest instead of the biased [K-M,...,K-1] ...".format(self, M, choice))  # DEBUG
         #     return choice
         # else:
-        order = self.estimatedOrder()
-        return order[-M:]
+        self.computeAllIndex()
+        return topM_with_ties(self.index, M)
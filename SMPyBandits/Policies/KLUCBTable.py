@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+r""" A precomputed lookup table for the Bernoulli kl-UCB index, with a guaranteed error bound.
+
+For Bernoulli arms, the kl-UCB index only depends on the empirical mean :math:`x = \hat{\mu}_k(t) \in [0, 1]` and on the exploration term :math:`d = f(t) / N_k(t) \geq 0` (e.g., :math:`f(t) = c \log(t)` for :class:`klUCB`):
+
+.. math:: U(x, d) = \sup \{ q \in [x, 1] : \mathrm{kl}(x, q) \leq d \}.
+
+Computing it with :func:`kullback.klucbBern` requires a bisection search of about 15 calls to :func:`kullback.klBern`, for every arm and at every step.
+A :class:`KLUCBTable` precomputes :math:`U` on a 2-D grid :math:`(x_i)_i \times (\sqrt{d_j})_j`, and then a lookup only costs two binary searches in the grid axes, a bilinear interpolation, and two calls to :func:`klBern_array`.
+
+- The grid uses :math:`s = \sqrt{d}` instead of :math:`d`, because :math:`U(x, d) - x` behaves like :math:`\sqrt{2 x (1 - x) d}` for small :math:`d`, and is smooth in :math:`s`.
+- The two axes are refined adaptively, by splitting in halves the intervals where the bilinear interpolation is more than ``tolerance / 4`` away from :math:`U` in the middle of the cells, i.e., where the curvature of :math:`U` is high (small :math:`d`, and :math:`x` close to :math:`0` or :math:`1`).
+- For :math:`d > d_{\max} = \log(1 / \mathrm{tolerance})`, :math:`U(x, d) \geq U(0, d) = 1 - \exp(-d) > 1 - \mathrm{tolerance}`, so the lookup simply returns 1.
+- The error bound is *guaranteed*, not only estimated on the grid: with :math:`q = \tilde{U}(x, d) + \mathrm{tolerance} / 2` (where :math:`\tilde{U}` is the interpolated value), :math:`q \geq U(x, d)` if and only if :math:`q \geq 1` or :math:`\mathrm{kl}(x, q) > d`, and :math:`q - \mathrm{tolerance} \leq U(x, d)` if and only if :math:`q - \mathrm{tolerance} \leq x` or :math:`\mathrm{kl}(x, q - \mathrm{tolerance}) \leq d`. These two conditions are checked at every lookup, and the (very rare) values failing them are computed by the bisection search of :func:`klucbBern_array`.
+- So the lookup is always an upper bound of the exact index, at most ``tolerance`` away from it: the kl-UCB policies using it stay optimistic.
+- The table is stored as one ``.npy`` file, that is loaded as a read-only memory-map (:func:`numpy.load` with ``mmap_mode='r'``): loading is instantaneous, and the memory is shared by all the processes using the same file (e.g., the parallel repetitions of the simulations, or several policy servers).
+
+Example:
+
+>>> table = KLUCBTable(tolerance=1e-3)
+>>> table.shape  # doctest: +SKIP
+(91, 693)
+>>> x, d = np.array([0.1, 0.5, 0.9, 0.5]), np.array([0.2, 0.2, 0.2, 10.])
+>>> exact = klucbBern_array(x, d, precision=1e-9)
+>>> np.round(exact, 4)
+array([0.3784, 0.7871, 0.9945, 1.    ])
+>>> upperbound = table(x, d)
+>>> bool(np.all(exact <= upperbound)), bool(np.all(upperbound <= exact + table.tolerance))
+(True, True)
+
+It can be used by :class:`klUCB`, :class:`klUCBPlus`, :class:`klUCBH` and :class:`klUCBloglog` (with Bernoulli arms), by giving it as the ``table`` parameter:
+
+>>> from klUCB import klUCB  # doctest: +SKIP
+>>> policy = klUCB(10, table=table)  # doctest: +SKIP
+"""
+from __future__ import division, print_function  # Python 2 compatibility
+
+__author__ = "Lilian Besson"
+__version__ = "0.9"
+
+import os.path
+import numpy as np
+
+
+#: Default tolerance of the tables, i.e., maximum distance between the value given by the table and the exact kl-UCB index.
+TOLERANCE = 1e-3
+
+#: Threshold value: means in [0, 1] are truncated to [eps, 1 - eps], as in :func:`kullback.klBern`.
+eps = 1e-15
+
+#: Number of points of each axis of the initial grid, before the refinement.
+INITIAL_SIZE = 33
+
+#: Maximum number of refinements of the grid (each one can split in halves some intervals of the two axes).
+MAX_REFINEMENTS = 30
+
+
+# --- Vectorized computation of the exact indexes
+
+def klBern_array(x, y):
+    r""" Kullback-Leibler divergence for Bernoulli distributions, vectorized version of :func:`kullback.klBern`.
+
+    >>> klBern_array(np.array([0.5, 0.1, 0.4]), np.array([0.5, 0.9, 0.5]))  # doctest: +ELLIPSIS
+    array([0.        , 1.757779..., 0.020135...])
+    """
+    x = np.clip(x, eps, 1 - eps)
+    y = np.clip(y, eps, 1 - eps)
+    return x * np.log(x / y) + (1 - x) * np.log((1 - x) / (1 - y))
+
+
+def klucbBern_array(x, d, precision=1e-6):
+    r""" Upper bound of the kl-UCB index for Bernoulli distributions, vectorized version of :func:`kullback.klucbBern`.
+
+    - It uses the same bisection search, on all the values at once, but it returns the upper end of the final interval instead of its middle: the result is always larger than the exact index, and at most ``precision`` away from it.
+
+    >>> klucbBern_array(np.array([0.1, 0.5, 0.9]), np.array([0.2, 0.2, 0.2]), precision=1e-9)  # doctest: +ELLIPSIS
+    array([0.37839..., 0.78708..., 0.99448...])
+    """
+    x, d = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(d, dtype=float))
+    lower = x.copy()
+    upper = np.minimum(1., x + np.sqrt(np.abs(0.5 * d)))  # as klucbGauss(x, d, sig2x=0.25)
+    while np.max(upper - lower, initial=0.) > precision:
+        middle = (lower + upper) * 0.5
+        above = klBern_array(x, middle) > d
+        upper = np.where(above, middle, upper)
+        lower = np.where(above, lower, middle)
+    return upper
+
+
+# --- Construction of the table
+
+def _split(axis, intervals):
+    """ Split in halves the intervals ``[axis[i], axis[i+1]]`` for all the indexes ``i`` in ``intervals``."""
+    middles = (axis[intervals] + axis[intervals + 1]) * 0.5
+    return np.sort(np.concatenate((axis, middles)))
+
+
+def _interpolation_errors(xs, ss, indexes, precision):
+    """ Errors of the bilinear interpolation of the indexes in the middle of the intervals of the two axes, and in the centers of the cells, maximized over the other axis."""
+    xm, sm = (xs[1:] + xs[:-1]) * 0.5, (ss[1:] + ss[:-1]) * 0.5
+    x_errors = np.abs(klucbBern_array(xm[:, np.newaxis], ss[np.newaxis, :] ** 2, precision) - (indexes[1:] + indexes[:-1]) * 0.5)
+    s_errors = np.abs(klucbBern_array(xs[:, np.newaxis], sm[np.newaxis, :] ** 2, precision) - (indexes[:, 1:] + indexes[:, :-1]) * 0.5)
+    center_errors = np.abs(klucbBern_array(xm[:, np.newaxis], sm[np.newaxis, :] ** 2, precision) - (indexes[1:, 1:] + indexes[1:, :-1] + indexes[:-1, 1:] + indexes[:-1, :-1]) * 0.25)
+    return np.maximum(np.max(x_errors, axis=1), np.max(center_errors, axis=1)), np.maximum(np.max(s_errors, axis=0), np.max(center_errors, axis=0))
+
+
+def build_table(tolerance=TOLERANCE, initial_size=INITIAL_SIZE, max_refinements=MAX_REFINEMENTS):
+    r""" Compute the 2-D array storing the grid and the kl-UCB indexes, refined until the bilinear interpolation is ``tolerance / 4`` close to the indexes in the middle of every cell.
+
+    - The returned array ``A`` has shape ``(1 + nx, 1 + ns)``: ``A[1:, 0]`` is the axis of the means :math:`x`, ``A[0, 1:]`` is the axis of the square roots :math:`s = \sqrt{d}` of the exploration terms, ``A[1:, 1:]`` are the indexes, and ``A[0, 0]`` stores the tolerance.
+    - The indexes are computed with a precision of ``tolerance / 20``.
+
+    >>> array = build_table(tolerance=0.01)
+    >>> array.shape  # doctest: +SKIP
+    (30, 74)
+    >>> array[0, 0], array[1:, 0].min(), array[1:, 0].max()
+    (0.01, 0.0, 1.0)
+    """
+    assert 0 < tolerance < 1, "Error: the tolerance of a KLUCBTable has to be in (0, 1), not {}.".format(tolerance)  # DEBUG
+    precision = tolerance / 20.
+    threshold = tolerance / 4.
+    xs = np.linspace(0, 1, initial_size)
+    ss = np.linspace(0, np.sqrt(np.log(1. / tolerance)), initial_size)
+    for _ in range(max_refinements):
+        indexes = klucbBern_array(xs[:, np.newaxis], ss[np.newaxis, :] ** 2, precision)
+        x_errors, s_errors = _interpolation_errors(xs, ss, indexes, precision)
+        x_intervals = np.flatnonzero(x_errors > threshold)
+        s_intervals = np.flatnonzero(s_errors > threshold)
+        if len(x_intervals) == 0 and len(s_intervals) == 0:
+            break
+        xs = _split(xs, x_intervals)
+        ss = _split(ss, s_intervals)
+    else:
+        print("Warning: the grid of the KLUCBTable did not reach the tolerance {} after {} refinements, the lookups will be slower but still correct...".format(tolerance, max_refinements))  # DEBUG
+    array = np.empty((1 + len(xs), 1 + len(ss)))
+    array[0, 0] = tolerance
+    array[1:, 0] = xs
+    array[0, 1:] = ss
+    array[1:, 1:] = indexes
+    return array
+
+
+# --- Class KLUCBTable
+
+class KLUCBTable(object):
+    r""" A precomputed lookup table for the Bernoulli kl-UCB index, with a guaranteed error bound.
+
+    - ``tolerance``: maximum distance between the value given by the table and the exact kl-UCB index (the value is always larger),
+    - ``path``: if given and if the file exists, the table is loaded from it, as a read-only memory-map; if given and the file does not exist, the table is computed and saved to it.
+    """
+
+    def __init__(self, tolerance=TOLERANCE, path=None):
+        if path is not None and os.path.exists(path):
+            array = np.load(path, mmap_mode='r')
+            assert array.ndim == 2 and array[0, 0] <= tolerance, "Error: the KLUCBTable stored in '{}' has a tolerance {} larger than the required tolerance {}.".format(path, array[0, 0], tolerance)  # DEBUG
+        else:
+            array = build_table(tolerance=tolerance)
+            if path is not None:
+                print("Saving the KLUCBTable with tolerance {} to '{}'...".format(tolerance, path))  # DEBUG
+                np.save(path, array)
+                array = np.load(path, mmap_mode='r')
+        self.tolerance = float(array[0, 0])  #: Guaranteed error bound of the table.
+        self.means = array[1:, 0]  #: Axis of the empirical means, in [0, 1].
+        self.roots = array[0, 1:]  #: Axis of the square roots of the exploration terms, in :math:`[0, \sqrt{d_{\max}}]`.
+        self.indexes = array[1:, 1:]  #: kl-UCB indexes on the grid.
+        self.shape = self.indexes.shape  #: Shape of the grid.
+        self.nbFallbacks = 0  #: Number of values that were computed by the bisection search, because the interpolation was not precise enough.
+        # Used in place of kullback.klucbBern by the klUCB policies, so it has the same name
+        self.__name__ = "klucbBern"
+
+    def __str__(self):
+        return "KLUCBTable({} x {}, tolerance={:.3g})".format(self.shape[0], self.shape[1], self.tolerance)
+
+    def __call__(self, x, d, precision=None):
+        r""" Return an upper bound of the kl-UCB index :math:`U(x, d)`, at most ``tolerance`` away from the exact index, for scalars or arrays ``x`` and ``d``.
+
+        - It has the same signature as :func:`kullback.klucbBern`, but ``precision`` is ignored (the precision is the ``tolerance`` of the table).
+        - ``nan`` values of ``x`` or ``d`` (e.g., for arms never pulled) give ``nan``.
+        """
+        x, d = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(d, dtype=float))
+        isScalar = x.ndim == 0
+        x, d = np.atleast_1d(np.clip(x, 0., 1.)), np.atleast_1d(d)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            s = np.sqrt(np.maximum(d, 0.))
+            # bilinear interpolation in the cell [xs[i-1], xs[i]] x [ss[j-1], ss[j]]
+            xs, ss, indexes = self.means, self.roots, self.indexes
+            i = np.clip(np.searchsorted(xs, x), 1, len(xs) - 1)
+            j = np.clip(np.searchsorted(ss, s), 1, len(ss) - 1)
+            wx = np.clip((x - xs[i - 1]) / (xs[i] - xs[i - 1]), 0., 1.)
+            ws = np.clip((s - ss[j - 1]) / (ss[j] - ss[j - 1]), 0., 1.)
+            interpolated = (1 - wx) * ((1 - ws) * indexes[i - 1, j - 1] + ws * indexes[i - 1, j]) + wx * ((1 - ws) * indexes[i, j - 1] + ws * indexes[i, j])
+            upper = np.minimum(1., interpolated + 0.5 * self.tolerance)
+            upper[s > ss[-1]] = 1.
+            # certificates: U(x, d) <= upper <= U(x, d) + tolerance
+            lower = upper - self.tolerance
+            isUpper = (upper >= 1) | ((upper >= x) & (klBern_array(x, upper) > d))
+            isClose = (lower <= x) | (klBern_array(x, lower) <= d)
+            failed = ~(isUpper & isClose) & ~np.isnan(upper)
+            if np.any(failed):
+                self.nbFallbacks += np.count_nonzero(failed)
+                upper[failed] = klucbBern_array(x[failed], d[failed], self.tolerance)
+        if isScalar:
+            return float(upper[0])
+        return upper
+
+
+# --- Debugging
+
+if __name__ == "__main__":
+    # Code for debugging purposes.
+    from doctest import testmod
+    print("\nTesting automatically all the docstring written in each functions of this module :")
+    testmod(verbose=True)
@@ -93,6 +93,7 @@ class LM_DSEE(BasePolicy):
     def startGame(self):
         """ Start the game (fill pulls and rewards with 0)."""
         super(LM_DSEE, self).startGame()
+        self.phase = State.Exploration
         self.current_exploration_arm = None
         self.current_exploitation_arm = None
         self.batch_number = 1
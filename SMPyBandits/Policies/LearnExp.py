@@ -22,9 +22,11 @@ import numpy as np
 import numpy.random as rn
 try:
     from .BasePolicy import BasePolicy
+    from .StackedChildren import stack_if_homogeneous
     from .with_proba import with_proba
 except ImportError:
     from BasePolicy import BasePolicy
+    from StackedChildren import stack_if_homogeneous
     from with_proba import with_proba
 
 
@@ -66,6 +68,9 @@ UNBIASED = True  # Better
 #: Default value for the constant Eta in (0, 1]
 ETA = 0.5
 
+#: Should homogeneous children (same index policy, different scalar parameters) be stacked, to compute all their indexes in one vectorized pass (see :class:`Policies.StackedChildren`).
+STACK_CHILDREN = True
+
 
 # --- LearnExp algorithm
 
@@ -74,7 +79,7 @@ class LearnExp(BasePolicy):
 
     def __init__(self, nbArms, children=None,
                  unbiased=UNBIASED, eta=ETA, prior='uniform',
-                 lower=0., amplitude=1.
+                 lower=0., amplitude=1., stack_children=STACK_CHILDREN
                  ):
         # Attributes
         self.nbArms = nbArms  #: Number of arms.
@@ -104,6 +109,7 @@ class LearnExp(BasePolicy):
             else:
                 print("  Using this already created player 'children[{}]' = {} ...".format(i, child))  # DEBUG
                 self.children.append(child)
+        self._stacked = stack_if_homogeneous(self.children) if stack_children else None  #: If not None, the stacked memory of the homogeneous children.
 
         self.last_choice = None  #: Remember the index of the last child trusted for a decision.
         # Initialize the arrays
@@ -112,6 +118,7 @@ class LearnExp(BasePolicy):
         if prior is not None and prior != 'uniform':
             assert len(prior) == nbChildren, "Error: the 'prior' argument given to LearnExp has to be an array of the good size ({}).".format(nbChildren)  # DEBUG
             self.trusts = prior
+        self._prior = np.array(self.trusts, dtype=float)  # Copy of the initial trusts, restored by startGame.
 
         self.weights = (self.trusts - self.rate) / (1 - self.eta)  #: Weights :math:`w_j^t`.
 
@@ -123,10 +130,16 @@ class LearnExp(BasePolicy):
     # --- Start the game
 
     def startGame(self):
-        """ Start the game for each child."""
+        """ Start the game for each child, and forget the trusts and weights learned during the previous game."""
+        self.trusts = np.copy(self._prior)
+        self.weights = (self.trusts - self.rate) / (1 - self.eta)
+        self.last_choice = None
         # Start all children
-        for i in range(self.nbChildren):
-            self.children[i].startGame()
+        if self._stacked is not None:
+            self._stacked.startGame()
+        else:
+            for i in range(self.nbChildren):
+                self.children[i].startGame()
 
     # --- Get a reward
 
@@ -140,7 +153,10 @@ class LearnExp(BasePolicy):
         probability = self.rate / self.trusts[self.last_choice]
         assert 0 <= probability <= 1, "Error: 'probability' = {:.3g} = rate = {:.3g} / trust_j^t = {:.3g} should have been in [0, 1]...".format(probability, self.rate, self.trusts[self.last_choice])  # DEBUG
         if with_proba(probability):
-            self.children[self.last_choice].getReward(arm, reward)
+            if self._stacked is not None:
+                self._stacked.getReward(arm, reward, child=self.last_choice)
+            else:
+                self.children[self.last_choice].getReward(arm, reward)
 
         # 2. Then reinitialize this array of losses
         assert 0 <= new_reward <= 1, "Error: the normalized reward {:.3g} was NOT in [0, 1] ...".format(new_reward)  # DEBUG
@@ -162,10 +178,16 @@ class LearnExp(BasePolicy):
 
     # --- Choice of arm methods
 
+    def _syncChildren(self):
+        """ If the children are stacked, update the internal time of the trusted child, before using it."""
+        if self._stacked is not None:
+            self._stacked.sync(child=self.last_choice)
+
     def choice(self):
         """ Trust one of the slave and listen to his `choice`."""
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.trusts)
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].choice()
 
@@ -173,6 +195,7 @@ class LearnExp(BasePolicy):
         """ Trust one of the slave and listen to his `choiceWithRank`."""
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.trusts)
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].choiceWithRank(rank=rank)
 
@@ -180,6 +203,7 @@ class LearnExp(BasePolicy):
         """ Trust one of the slave and listen to his `choiceFromSubSet`."""
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.trusts)
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].choiceFromSubSet(availableArms=availableArms)
 
@@ -187,6 +211,7 @@ class LearnExp(BasePolicy):
         """ Trust one of the slave and listen to his `choiceMultiple`."""
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.trusts)
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].choiceMultiple(nb=nb)
 
@@ -194,6 +219,7 @@ class LearnExp(BasePolicy):
         """ Trust one of the slave and listen to his `choiceIMP`."""
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.trusts)
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].choiceIMP(nb=nb)
 
@@ -204,6 +230,7 @@ class LearnExp(BasePolicy):
         """
         # 1. first decide who to listen to
         self.last_choice = rn.choice(self.nbChildren, p=self.trusts)
+        self._syncChildren()
         # 2. then listen to him
         return self.children[self.last_choice].estimatedOrder()
 
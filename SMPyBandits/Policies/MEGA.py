@@ -17,9 +17,11 @@ import numpy.random as rn
 try:
     from .BasePolicy import BasePolicy
     from .with_proba import with_proba
+    from .topM import argmax_with_ties
 except ImportError:
     from BasePolicy import BasePolicy
     from with_proba import with_proba
+    from topM import argmax_with_ties
 
 
 # --- Class MEGA
@@ -95,7 +97,7 @@ class MEGA(BasePolicy):
                     self.meanRewards[self.pulls != 0] = self.rewards[self.pulls != 0] / self.pulls[self.pulls != 0]
                     # newArm = np.argmax(self.meanRewards)
                     # Uniformly chosen if more than one arm has the highest index, but that's unlikely
-                    newArm = np.random.choice(np.nonzero(self.meanRewards == np.max(self.meanRewards))[0])
+                    newArm = argmax_with_ties(self.meanRewards)
                 self.chosenArm = newArm
             return self.chosenArm
 
@@ -127,6 +127,7 @@ class MusicalChair(BasePolicy):
         # Store parameters
         self.Time0 = Time0  #: Parameter T0
         self.nbPlayers = nbPlayers  #: Number of players
+        self._Time0, self._nbPlayers = Time0, nbPlayers  # Given parameters, restored by startGame as nbPlayers is estimated during the game.
         # Internal memory
         self.chair = None  #: Current chair. Not sited yet.
         self.cumulatedRewards = np.zeros(nbArms)  #: That's the s_i(t) of the paper
@@ -142,6 +143,7 @@ class MusicalChair(BasePolicy):
 
     def startGame(self):
         """ Just reinitialize all the internal memory, and decide how to start (state 1 or 2)."""
+        self.Time0, self.nbPlayers = self._Time0, self._nbPlayers
         self.t = -1  # -1 because t += 1 is done in self.choice()
         self.chair = None  # Not sited yet
         self.cumulatedRewards.fill(0)
@@ -55,8 +55,20 @@ class OCUCB(UCB):
         return max([exp(1), log(t), t * log(t) / C_kt])
 
     def _Bterms(self):
-        r""" Compute all the extra terms, :math:`B_k(t)` for each arm k, in a naive manner, not optimized to be vectorial, but it works."""
-        return np.array([self._Bterm(k) for k in range(self.nbArms)])
+        r""" Compute all the extra terms, :math:`B_k(t)` for each arm k, in a vectorized manner.
+
+        - As :math:`C_k(t) = T_k(t)^{1 - \rho} \sum_{j=1}^{K} \min\left\{ T_k(t)^{\rho}, T_j(t)^{\rho} \right\}`, it only needs to sort the values :math:`T_j(t)^{\rho}` and to use their cumulated sums, in :math:`\mathcal{O}(K \log K)` instead of :math:`\mathcal{O}(K^2)`.
+        """
+        t = max(1, self.t)
+        T_ = np.asarray(self.pulls, dtype=float)
+        T_rho = T_ ** self.rho
+        sorted_T_rho = np.sort(T_rho)
+        cumsum_T_rho = np.concatenate(([0.], np.cumsum(sorted_T_rho)))
+        # number of arms j with T_j^rho < T_k^rho, and sum of their T_j^rho
+        nb_smaller = np.searchsorted(sorted_T_rho, T_rho, side='left')
+        C_t = (T_ ** (1. - self.rho)) * ((len(T_) - nb_smaller) * T_rho + cumsum_T_rho[nb_smaller])
+        with np.errstate(divide='ignore'):
+            return np.maximum(max(exp(1), log(t)), t * log(t) / C_t)
 
     def computeIndex(self, arm):
         r""" Compute the current index, at time t and after :math:`N_k(t)` pulls of arm k:
@@ -70,3 +82,10 @@ class OCUCB(UCB):
             return float('+inf')
         else:
             return (self.rewards[arm] / self.pulls[arm]) + sqrt(2 * self.eta * log(self._Bterm(arm)) / self.pulls[arm])
+
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            indexes = (self.rewards / self.pulls) + np.sqrt(2 * self.eta * np.log(self._Bterms()) / self.pulls)
+        indexes[self.pulls < 1] = float('+inf')
+        self.index[:] = indexes
@@ -58,12 +58,12 @@ class OCUCBH(OCUCB):
         else:
             return (self.rewards[arm] / self.pulls[arm]) + sqrt((self.alpha / self.pulls[arm]) * log(self.psi * self.horizon / self.t) )
 
-    # XXX Error : division by zero ?
-    # def computeAllIndex(self):
-    #     """ Compute the current indexes for all arms, in a vectorized manner."""
-    #     indexes = (self.rewards / self.pulls) + np.sqrt((self.alpha / self.pulls) * np.log(self.psi * self.horizon / self.t) )
-    #     indexes[self.pulls < 1] = float('+inf')
-    #     self.index[:] = indexes
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            indexes = (self.rewards / self.pulls) + np.sqrt((self.alpha / self.pulls) * np.log(self.psi * self.horizon / max(1, self.t)) )
+        indexes[self.pulls < 1] = float('+inf')
+        self.index[:] = indexes
 
 
 # --- AOCUCB
@@ -90,10 +90,10 @@ class AOCUCBH(OCUCBH):
         else:
             return (self.rewards[arm] / self.pulls[arm]) + sqrt((2 / self.pulls[arm]) * log(self.horizon / self.pulls[arm]) )
 
-    # XXX Error : division by zero ?
-    # def computeAllIndex(self):
-    #     """ Compute the current indexes for all arms, in a vectorized manner."""
-    #     indexes = (self.rewards / self.pulls) + np.sqrt((2 / self.pulls) * np.log(self.horizon / self.pulls) )
-    #     indexes[self.pulls < 1] = float('+inf')
-    #     self.index[:] = indexes
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            indexes = (self.rewards / self.pulls) + np.sqrt((2 / self.pulls) * np.log(self.horizon / self.pulls) )
+        indexes[self.pulls < 1] = float('+inf')
+        self.index[:] = indexes
 
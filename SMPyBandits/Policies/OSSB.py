@@ -23,9 +23,11 @@ import numpy as np
 try:
     from .BasePolicy import BasePolicy
     from .kullback import klBern, klGauss
+    from .topM import argmax_with_ties
 except ImportError:
     from BasePolicy import BasePolicy
     from kullback import klBern, klGauss
+    from topM import argmax_with_ties
 klBern_vect = np.vectorize(klBern)
 
 # WARNING using np.vectorize gave weird result on klGauss
@@ -221,13 +223,13 @@ class OSSB(BasePolicy):
         if np.all(self.pulls >= (1. + self.gamma) * np.log(self.t) * values_c_x_mt):
             self.phase = Phase.exploitation
             # self.counter_s_no_exploitation_phase += 0  # useless
-            chosen_arm = np.random.choice(np.nonzero(means == np.max(means))[0])
+            chosen_arm = argmax_with_ties(means)
             # print("[exploitation phase] Choosing at random in the set of best arms {} at time t = {} : choice = {} ...".format(np.nonzero(means == np.max(means))[0], self.t, chosen_arm))  # DEBUG
             return chosen_arm
         else:
             self.counter_s_no_exploitation_phase += 1
             # we don't just take argmin because of possible non-uniqueness
-            least_explored = np.random.choice(np.nonzero(self.pulls == np.min(self.pulls))[0])
+            least_explored = argmax_with_ties(-self.pulls)
             ratios = self.pulls / values_c_x_mt
             min_ratios_non_inf = np.nanmin(ratios[~np.isinf(ratios)])
             if np.isnan(min_ratios_non_inf):
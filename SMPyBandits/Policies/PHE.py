@@ -46,3 +46,13 @@ class PHE(IndexPolicy):
         U_is = np.random.binomial(number_of_perturbation, 0.5)
         perturbated_mean = (V_is + U_is) / (s + number_of_perturbation)
         return perturbated_mean
+
+    def computeAllIndex(self):
+        """ Compute the randomized indexes for all arms, in a vectorized manner (the pseudo-rewards of all the arms are drawn in one call to :func:`numpy.random.binomial`)."""
+        s = self.pulls
+        number_of_perturbation = np.ceil(self.perturbation_scale * s).astype(int)
+        U_is = np.random.binomial(number_of_perturbation, 0.5)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            perturbated_means = (self.rewards + U_is) / (s + number_of_perturbation)
+        perturbated_means[s <= 0] = float('+inf')
+        self.index[:] = perturbated_means
@@ -95,7 +95,7 @@ class Beta(Posterior):
             a = self._a
         if b is None:
             b = self._b
-        self.N = [a, b]
+        self.N[:] = [a, b]
 
     def sample(self):
         """Get a random sample from the Beta posterior (using :func:`numpy.random.betavariate`).
@@ -112,6 +112,10 @@ class Beta(Posterior):
         return btdtri(self.N[1], self.N[0], p)
         # Bug: do not call btdtri with (0.5,0.5,0.5) in scipy version < 0.9 (old)
 
+    def parameters(self):
+        """Return the two parameters :math:`(\alpha, \beta)` of the Beta posterior, used to sample or compute quantiles of many posteriors at once."""
+        return self.N[1], self.N[0]
+
     def mean(self):
         """Compute the mean of the Beta posterior (should be useless)."""
         return self.N[1] / float(sum(self.N))
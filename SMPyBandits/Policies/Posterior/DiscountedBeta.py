@@ -59,7 +59,7 @@ class DiscountedBeta(Beta):
             a = self._a
         if b is None:
             b = self._b
-        self.N = [0, 0]
+        self.N[:] = [0, 0]
 
     def sample(self):
         """Get a random sample from the DiscountedBeta posterior (using :func:`numpy.random.betavariate`).
@@ -76,6 +76,10 @@ class DiscountedBeta(Beta):
         return btdtri(self._a + self.N[1], self._b + self.N[0], p)
         # Bug: do not call btdtri with (0.5,0.5,0.5) in scipy version < 0.9 (old)
 
+    def parameters(self):
+        """Return the two parameters :math:`(\alpha, \beta)` of the DiscountedBeta posterior, used to sample or compute quantiles of many posteriors at once."""
+        return self._a + self.N[1], self._b + self.N[0]
+
     def forget(self, obs):
         """Forget the last observation, and undiscount the count of observations."""
         # print("Info: calling DiscountedBeta.forget() with obs = {}, self.N = {} and self.gamma = {} ...".format(obs, self.N, self.gamma))  # DEBUG
@@ -105,11 +105,11 @@ class RandomizedIndexPolicy(IndexPolicy):
         index = super(RandomizedIndexPolicy, self).computeIndex(arm)
         mean = self.rewards[arm] / self.pulls[arm]
         ucb = index - mean
-        random_perturbation = self.perturbation()
+        random_perturbation = self.perturbation(size=1)[0]
         perturbated_index = mean + ucb * random_perturbation
         if VERBOSE:
             print("  - at time t = {}, policy {} would have used index = {} and mean = {}, but using its perturbation distribution ({}), it sampled a perturbation = {}, and the perturbated index was {} instead...".format(self.t, self, index, mean, self.perturbation_name, random_perturbation, perturbated_index))  # DEBUG
-        self.index = perturbated_index
+        return perturbated_index
 
     def computeAllIndex(self):
         r""" In a randomized index policy, with distribution :math:`\mathrm{Distribution}` generating perturbations :math:`Z_k(t)`, with index :math:`I_k(t)` and mean :math:`\hat{\mu}_k(t)` for each arm :math:`k`, it chooses an arm with maximal perturbated index (uniformly at random):
@@ -125,10 +125,8 @@ class RandomizedIndexPolicy(IndexPolicy):
         means = self.rewards / self.pulls
         ucb = index - means
         random_perturbations = self.perturbation(size=self.nbArms)
-        for arm in range(self.nbArms):
-            perturbated_index = means[arm] + ucb[arm] * random_perturbations[arm]
-            self.index[arm] = perturbated_index
-            if self.pulls[arm] < 1:
-                self.index[arm] = float('+inf')
+        perturbated_indexes = means + ucb * random_perturbations
+        perturbated_indexes[self.pulls < 1] = float('+inf')
+        self.index[:] = perturbated_indexes
         if VERBOSE:
             print("  - at time t = {}, policy {} would have used indexes = {} and means = {}, but using its perturbation distribution ({}), it sampled perturbations = {}, and the perturbated indexes was {} instead...".format(self.t, self, index, means, self.perturbation_name, random_perturbations, self.index))  # DEBUG
@@ -85,8 +85,11 @@ class SIC_MMAB(BasePolicy):
     def startGame(self):
         """ Just reinitialize all the internal memory, and decide how to start (state 1 or 2)."""
         self.phase = State.Fixation  #: Current state
+        self.t = 0
+        self.nbArms = self._nbArms  # Arms are deactivated during the game
         self.rewards.fill(0)
         self.pulls.fill(0)
+        self.last_action = np.random.randint(self.nbArms)
         # Store parameters
         self.ext_rank = -1
         self.int_rank = 0
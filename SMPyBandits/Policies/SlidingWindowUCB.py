@@ -55,6 +55,28 @@ class SWUCB(IndexPolicy):
             ", $\alpha={:.3g}$".format(self.alpha) if self.alpha != ALPHA else "",
         )
 
+    def startGame(self):
+        """ Start the game: also forget the rewards and choices of the sliding window, so that a restarted policy plays as a new one.
+
+        >>> policy, other = SWUCB(3, tau=4), SWUCB(3, tau=4)
+        >>> policy.startGame()
+        >>> for arm in [0, 1, 2, 2]:
+        ...     policy.getReward(arm, 1)
+        >>> policy.startGame(); other.startGame()
+        >>> def trajectory(policy, rewards=[1, 0, 0, 1, 1, 0]):
+        ...     np.random.seed(0)  # the ties are broken at random
+        ...     choices = []
+        ...     for reward in rewards:
+        ...         choices.append(policy.choice())
+        ...         policy.getReward(choices[-1], reward)
+        ...     return choices
+        >>> trajectory(policy) == trajectory(other)
+        True
+        """
+        super(SWUCB, self).startGame()
+        self.last_rewards.fill(0)
+        self.last_choices.fill(-1)
+
     def getReward(self, arm, reward):
         """Give a reward: increase t, pulls, and update cumulated sum of rewards and update small history (sliding window) for that arm (normalized in [0, 1]).
         """
@@ -83,6 +105,22 @@ class SWUCB(IndexPolicy):
         else:
             return (np.sum(self.last_rewards[self.last_choices == arm]) / last_pulls_of_this_arm) + sqrt((self.alpha * log(min(self.t, self.tau))) / last_pulls_of_this_arm)
 
+    def _window_pulls_and_rewards(self):
+        r""" Compute :math:`N_{k,\tau}(t)` and :math:`X_{k,\tau}(t)` for all the arms, in :math:`\mathcal{O}(\tau + K)` with :func:`numpy.bincount` (instead of :math:`\mathcal{O}(\tau K)` arm by arm)."""
+        seen = self.last_choices >= 0
+        last_choices = self.last_choices[seen]
+        last_pulls = np.bincount(last_choices, minlength=self.nbArms)
+        last_rewards = np.bincount(last_choices, weights=self.last_rewards[seen], minlength=self.nbArms)
+        return last_pulls, last_rewards
+
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        last_pulls, last_rewards = self._window_pulls_and_rewards()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            indexes = (last_rewards / last_pulls) + np.sqrt((self.alpha * np.log(min(self.t, self.tau))) / last_pulls)
+        indexes[last_pulls < 1] = float('+inf')
+        self.index[:] = indexes
+
 
 # --- Horizon dependent version
 
@@ -94,11 +132,10 @@ class SWUCBPlus(SWUCB):
 
     def __init__(self, nbArms, horizon=None,
                  *args, **kwargs):
+        tau = kwargs.pop('tau', TAU)
         if horizon is not None:
             T = int(horizon)
             tau = int(4 * sqrt(T * log(T)))
-        else:
-            tau = TAU
         super(SWUCBPlus, self).__init__(nbArms, tau=tau, *args, **kwargs)
         # New parameter
 
@@ -109,9 +146,9 @@ class SWUCBPlus(SWUCB):
 # --- SW-klUCB
 
 try:
-    from .kullback import klucbBern
+    from .kullback import klucbBern, vectorize_klucb
 except (ImportError, SystemError):
-    from kullback import klucbBern
+    from kullback import klucbBern, vectorize_klucb
 
 #: Default value for the constant c used in the computation of KL-UCB index.
 constant_c = 1.  #: default value, as it was in pymaBandits v1.0
@@ -129,6 +166,7 @@ class SWklUCB(SWUCB):
     def __init__(self, nbArms, tau=TAU, klucb=klucbBern, *args, **kwargs):
         super(SWklUCB, self).__init__(nbArms, tau=tau, *args, **kwargs)
         self.klucb = klucb  #: kl function to use
+        self.klucb_vect = vectorize_klucb(klucb)  #: kl function to use, in a vectorized way (see :func:`kullback.vectorize_klucb`).
 
     def __str__(self):
         name = self.klucb.__name__[5:]
@@ -158,6 +196,14 @@ class SWklUCB(SWUCB):
             level = constant_c * log(min(self.t, self.tau)) / last_pulls_of_this_arm
             return self.klucb(mean, level, tolerance)
 
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        last_pulls, last_rewards = self._window_pulls_and_rewards()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            indexes = self.klucb_vect(last_rewards / last_pulls, constant_c * np.log(min(self.t, self.tau)) / last_pulls, tolerance)
+        indexes[last_pulls < 1] = float('+inf')
+        self.index[:] = indexes
+
 
 class SWklUCBPlus(SWklUCB, SWUCBPlus):
     r""" An experimental policy, using only a sliding window (of :math:`\tau` *steps*, not counting draws of each arms) instead of using the full-size history, and using klUCB (see :class:`Policy.klUCB`) indexes instead of UCB.
@@ -46,8 +46,9 @@ class Softmax(BasePolicy):
         # The proba that another player has the same is nbPlayers / factorial(nbArms) : should be SMALL !
 
     def startGame(self):
-        """Nothing special to do."""
+        """Start with a new random order for the initial exploration of the arms."""
         super(Softmax, self).startGame()
+        self._initial_exploration = rn.permutation(self.nbArms)
 
     def __str__(self):
         return "Softmax(temp: {})".format(self.temperature)
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+""" Stack the internal memory of several *homogeneous* children policies, to compute their indexes in one vectorized pass.
+
+Aggregation policies (:class:`Aggregator`, :class:`CORRAL`, :class:`LearnExp` and :class:`GenericAggregation`) are often used with children that are all instances of the same index policy, differing only by a scalar parameter (e.g., ``UCBalpha`` for 20 values of ``alpha``, or ``klUCB`` for 20 values of ``c``).
+Asking every child for its ``choice()`` and forwarding every reward to every child in a Python loop multiplies the cost of each step by the number N of children.
+
+- With :class:`StackedChildren`, the memory of the N children (``pulls``, ``rewards``, ``index`` and ``t``) is stored in (N, K) arrays, and every child sees its own row as a *view*, so the children stay usable one by one.
+- A stacked twin of the children's class is created, holding the (N, K) arrays and the scalar parameters as (N, 1) columns, so that the vectorized ``computeAllIndex()`` of that class computes all the N x K indexes at once, thanks to broadcasting.
+- Children are stackable only if they are homogeneous (see :func:`are_homogeneous`) *and* if the stacked computation gives the same indexes as the children do, which is checked once at creation on a random state.
+- If children are not stackable, aggregation policies simply use them one by one, as before.
+
+Example:
+
+>>> from UCBalpha import UCBalpha
+>>> children = [UCBalpha(3, alpha=alpha) for alpha in [0.5, 1, 4]]
+>>> are_homogeneous(children)
+True
+>>> stacked = StackedChildren(children)
+>>> stacked.startGame()
+>>> for arm, reward in [(0, 1), (1, 0), (2, 1), (0, 0), (2, 1)]:
+...     stacked.getReward(arm, reward)
+>>> stacked.computeAllIndex()
+>>> np.round(stacked.index, 3)
+array([[0.949, 0.634, 1.449],
+       [1.134, 0.897, 1.634],
+       [1.769, 1.794, 2.269]])
+>>> stacked.sync()
+>>> children[2].t, children[2].pulls
+(5, array([2, 1, 2]))
+>>> children[2].computeAllIndex()
+>>> np.round(children[2].index, 3)
+array([1.769, 1.794, 2.269])
+
+The children stay views on the stacked memory after a copy of the aggregation policy (e.g., when the evaluator deep-copies the policies before playing a repetition), so a copied stacked aggregator plays exactly as the unstacked one:
+
+>>> from CORRAL import CORRAL
+>>> def aggregator(stack_children):
+...     children = [UCBalpha(3, alpha=alpha) for alpha in [0.5, 1, 4]]
+...     return CORRAL(3, children=children, horizon=100, broadcast_all=False, stack_children=stack_children)
+>>> policies = [deepcopy(aggregator(True)), aggregator(False)]  # doctest: +ELLIPSIS
+  Using this already created player...
+>>> np.shares_memory(policies[0].children[0].pulls, policies[0]._stacked.pulls)
+True
+>>> for policy in policies:
+...     policy.startGame()
+...     rn.seed(1)  # reproducible
+...     for t in range(8):
+...         policy.getReward(policy.choice(), t % 2)
+>>> [policy.children[2].pulls for policy in policies]
+[array([0, 1, 0]), array([0, 1, 0])]
+>>> [np.sum([child.pulls for child in policy.children]) for policy in policies]
+[8, 8]
+"""
+from __future__ import division, print_function  # Python 2 compatibility
+
+__author__ = "Lilian Besson"
+__version__ = "0.9"
+
+from copy import copy, deepcopy
+import numpy as np
+import numpy.random as rn
+
+try:
+    from .BasePolicy import BasePolicy
+    from .IndexPolicy import IndexPolicy
+except (ImportError, SystemError):
+    from BasePolicy import BasePolicy
+    from IndexPolicy import IndexPolicy
+
+
+#: Names of the attributes that are stacked as (N, K) or (N, 1) arrays, and not seen as parameters.
+STATE_ATTRIBUTES = ('pulls', 'rewards', 'index', 't')
+
+#: Number of random states used to check that the stacked computation gives the same indexes than the children.
+NB_CHECKS = 3
+
+
+# --- Utility functions
+
+def _is_scalar(value):
+    """ True if value is a scalar number (that can be stacked in a column)."""
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+
+
+def _same_value(a, b):
+    """ True if two attributes can be considered to be the same (same object, equal values, or vectorized version of the same function)."""
+    if a is b:
+        return True
+    if isinstance(a, np.vectorize) and isinstance(b, np.vectorize):
+        return a.pyfunc is b.pyfunc
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return isinstance(a, np.ndarray) and isinstance(b, np.ndarray) and a.shape == b.shape and np.array_equal(a, b)
+    try:
+        return bool(a == b)
+    except (ValueError, TypeError):
+        return False
+
+
+def are_homogeneous(children):
+    """ True if all the children are instances of the same :class:`IndexPolicy`, differing only by scalar parameters, and using the default ``getReward`` and ``startGame`` methods (i.e., their memory is only ``pulls``, ``rewards`` and ``t``)."""
+    if len(children) < 2:
+        return False
+    cls = type(children[0])
+    if not issubclass(cls, IndexPolicy) or any(type(child) is not cls for child in children):
+        return False
+    # the memory of the children has to be only pulls, rewards and t
+    if cls.getReward is not BasePolicy.getReward:
+        return False
+    if cls.startGame not in (BasePolicy.startGame, IndexPolicy.startGame):
+        return False
+    # no need to stack children who can not compute their indexes in a vectorized manner
+    if cls.computeAllIndex is IndexPolicy.computeAllIndex:
+        return False
+    names = set(vars(children[0]).keys())
+    if any(set(vars(child).keys()) != names for child in children):
+        return False
+    for name in names - set(STATE_ATTRIBUTES):
+        values = [getattr(child, name) for child in children]
+        if not all(_same_value(values[0], value) for value in values[1:]):
+            if not all(_is_scalar(value) for value in values):
+                return False
+    return True
+
+
+# --- Class StackedChildren
+
+class StackedChildren(object):
+    """ Stack the internal memory of N homogeneous children policies, to compute their indexes in one vectorized pass.
+
+    - ``pulls``, ``rewards`` and ``index`` are (N, K) arrays, each child uses its row as a view,
+    - ``t`` is a (N, 1) array, and it is copied back to the children only when :meth:`sync` is called (i.e., before using one child on its own).
+    """
+
+    def __init__(self, children, exact=False):
+        assert are_homogeneous(children), "Error: the children given to StackedChildren have to be homogeneous, cf. are_homogeneous(children)."  # DEBUG
+        self.children = children  #: List of the N children.
+        self.nbChildren = nbChildren = len(children)  #: Number N of children.
+        self.nbArms = nbArms = children[0].nbArms  #: Number K of arms.
+        self.pulls = np.zeros((nbChildren, nbArms), dtype=int)  #: Number of pulls of each arm, for each child.
+        self.rewards = np.zeros((nbChildren, nbArms))  #: Cumulated (normalized) rewards of each arm, for each child.
+        self.index = np.zeros((nbChildren, nbArms))  #: Indexes of each arm, for each child.
+        self.t = np.zeros((nbChildren, 1), dtype=int)  #: Internal time of each child.
+        self.lower = np.array([[child.lower] for child in children])  #: Lower values for rewards of each child.
+        self.amplitude = np.array([[child.amplitude] for child in children])  #: Amplitude of rewards of each child.
+        self._synced = True
+        for i, child in enumerate(children):
+            self.pulls[i] = child.pulls
+            self.rewards[i] = child.rewards
+            self.index[i] = child.index
+            self.t[i] = child.t
+        self._bind_children()
+        self._twin = self._make_twin()
+        self._exact = exact  # If True, the stacked indexes have to be exactly equal to the children's ones (e.g., to reproduce the same trajectories)
+        self.is_vectorized = self._check_twin()  #: True if the stacked indexes are the same as the children's ones, if False the indexes are computed one child at a time.
+
+    def __str__(self):
+        return "StackedChildren({} x {})".format(self.nbChildren, self.children[0])
+
+    def _bind_children(self):
+        """ The memory of every child is a view on its row of the stacked arrays."""
+        for i, child in enumerate(self.children):
+            child.pulls, child.rewards, child.index = self.pulls[i], self.rewards[i], self.index[i]
+
+    def __setstate__(self, state):
+        """ A copied (or unpickled) array is not a view anymore, so the memory of the copied children is bound again to the rows of the copied stacked arrays."""
+        self.__dict__.update(state)
+        self._bind_children()
+
+    def _make_twin(self):
+        """ Create an instance of the class of the children, holding the stacked memory and the parameters as (N, 1) columns, without calling its ``__init__``."""
+        cls = type(self.children[0])
+        twin = cls.__new__(cls)
+        self._columns = ['pulls', 'rewards', 'index', 't']  # Attributes of the twin with one row for each child
+        for name, value in vars(self.children[0]).items():
+            if name in STATE_ATTRIBUTES:
+                continue
+            values = [getattr(child, name) for child in self.children]
+            if not all(_same_value(value, other) for other in values[1:]):
+                value = np.array(values).reshape((self.nbChildren, 1))
+                self._columns.append(name)
+            twin.__dict__[name] = value
+        twin.__dict__.update(pulls=self.pulls, rewards=self.rewards, index=self.index, t=self.t)
+        return twin
+
+    def _check_twin(self):
+        """ Check on a few random states that the stacked indexes are the same as the ones computed by the children, and restore the state of the children and of the random generator."""
+        state = (self.pulls.copy(), self.rewards.copy(), self.index.copy(), self.t.copy())
+        rng_state = rn.get_state()
+        generator = rn.RandomState(len(self.children))
+        try:
+            with np.errstate(all='ignore'):
+                for _ in range(NB_CHECKS):
+                    self.pulls[:] = generator.randint(0, 4, size=self.pulls.shape)
+                    self.rewards[:] = self.pulls * generator.random_sample(self.pulls.shape)
+                    self.t[:] = 1 + np.sum(self.pulls, axis=1, keepdims=True)
+                    self._twin.computeAllIndex()
+                    stacked_index = np.array(self._twin.index, dtype=float)
+                    for i, child in enumerate(self.children):
+                        copied_child = deepcopy(child)
+                        copied_child.t = int(self.t[i, 0])
+                        copied_child.computeAllIndex()
+                        if self._exact and not np.array_equal(stacked_index[i], copied_child.index, equal_nan=True):
+                            return False
+                        if not np.allclose(stacked_index[i], copied_child.index, equal_nan=True):
+                            return False
+        except Exception:
+            return False
+        finally:
+            self.pulls[:], self.rewards[:], self.index[:], self.t[:] = state
+            self._twin.index = self.index
+            rn.set_state(rng_state)
+        return True
+
+    # --- Start game, and receive rewards
+
+    def startGame(self):
+        """ Start the game for each child (fill their memory with 0)."""
+        for child in self.children:
+            child.startGame()
+        self.t.fill(0)
+        self._synced = True
+
+    def getReward(self, arm, reward, child=None):
+        """ Give a reward on that arm to all the children (if ``child`` is None), or to only one child (or to several *distinct* children, if ``child``, ``arm`` and ``reward`` are arrays)."""
+        if child is None:
+            self.t += 1
+            self.pulls[:, arm] += 1
+            self.rewards[:, arm] += (reward - self.lower[:, 0]) / self.amplitude[:, 0]
+        else:
+            self.t[child] += 1
+            self.pulls[child, arm] += 1
+            self.rewards[child, arm] += (reward - self.lower[child, 0]) / self.amplitude[child, 0]
+        self._synced = False
+
+    def sync(self, child=None):
+        """ Copy the internal time ``t`` back to all the children (or only one), to be able to use them one by one."""
+        if child is not None:
+            self.children[child].t = int(self.t[child, 0])
+        elif not self._synced:
+            for i, this_child in enumerate(self.children):
+                this_child.t = int(self.t[i, 0])
+            self._synced = True
+
+    # --- Computing indexes and choices
+
+    def computeAllIndex(self, rows=None):
+        """ Compute the current indexes for all the arms and all the children (or only the children in ``rows``), in one vectorized pass if possible, or child by child."""
+        if self.is_vectorized and rows is not None and len(rows) < self.nbChildren:
+            if len(rows) == 0:
+                return
+            # a twin holding only these rows of the stacked memory
+            twin = copy(self._twin)
+            for name in self._columns:
+                twin.__dict__[name] = self._twin.__dict__[name][rows]
+            twin.computeAllIndex()
+            self.index[rows] = twin.index
+        elif self.is_vectorized:
+            self._twin.computeAllIndex()
+            if self._twin.index is not self.index:
+                self.index[:] = self._twin.index
+                self._twin.index = self.index
+        else:
+            self.sync()
+            for i in (range(self.nbChildren) if rows is None else rows):
+                self.children[i].computeAllIndex()
+
+    def choice(self):
+        """ Return the array of the N choices of the children: for each child, an arm with maximal index (uniformly at random)."""
+        self.computeAllIndex()
+        with np.errstate(invalid='ignore'):
+            isBest = self.index == np.max(self.index, axis=1, keepdims=True)
+        # Uniform choice among the best arms: the best arm with the largest random tag
+        tags = np.where(isBest, rn.random_sample(self.index.shape), -1.)
+        choices = np.argmax(tags, axis=1)
+        noBest = ~np.any(isBest, axis=1)
+        if np.any(noBest):
+            choices[noBest] = rn.randint(self.nbArms, size=np.count_nonzero(noBest))
+        return choices
+
+
+# --- Utility function for the aggregation policies
+
+def stack_if_homogeneous(children):
+    """ Return a :class:`StackedChildren` object if the children are homogeneous and if their indexes can be computed in one vectorized pass, or None otherwise (then children have to be used one by one)."""
+    if not are_homogeneous(children):
+        return None
+    stacked = StackedChildren(children)
+    if not stacked.is_vectorized:
+        return None
+    return stacked
+
+
+# --- Debugging
+
+if __name__ == "__main__":
+    # Code for debugging purposes.
+    from doctest import testmod
+    print("\nTesting automatically all the docstring written in each functions of this module :")
+    testmod(verbose=True)
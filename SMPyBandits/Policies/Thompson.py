@@ -9,6 +9,9 @@ from __future__ import division, print_function  # Python 2 compatibility
 __author__ = "Olivier Cappé, Aurélien Garivier, Emilie Kaufmann, Lilian Besson"
 __version__ = "0.9"
 
+import numpy as np
+import numpy.random as rn
+
 try:
     from .BayesianIndexPolicy import BayesianIndexPolicy
 except (ImportError, SystemError):
@@ -49,3 +52,32 @@ class Thompson(BayesianIndexPolicy):
             I_k(t) &\sim \mathrm{Beta}(1 + \tilde{S_k}(t), 1 + \tilde{N_k}(t) - \tilde{S_k}(t)).
         """
         return self.posterior[arm].sample()
+
+    def computeAllIndex(self):
+        """ For Beta posteriors, sample the K indexes with one call to :func:`numpy.random.beta`, otherwise sample them one by one."""
+        parameters = self._beta_parameters()
+        if parameters is None or type(self).computeIndex is not Thompson.computeIndex:
+            return super(Thompson, self).computeAllIndex()
+        self.index[:] = rn.beta(parameters[0], parameters[1])
+
+    def choiceBatch(self, n=1):
+        """ For Beta posteriors, the ``n`` x K samples are drawn with one call to :func:`numpy.random.beta`, and each decision is the arm of maximal sample (ties have probability zero), otherwise see :meth:`BayesianIndexPolicy.choiceBatch`.
+
+        With binary rewards, :meth:`getRewards` leaves the posteriors in the same state as a loop on :meth:`getReward`:
+
+        >>> arms, rewards = [0, 2, 0, 1, 2, 2], [1, 0, 1, 1, 1, 0]
+        >>> policy, other = Thompson(3), Thompson(3)
+        >>> policy.startGame(); other.startGame()
+        >>> policy.getRewards(arms, rewards)
+        >>> for arm, reward in zip(arms, rewards):
+        ...     other.getReward(arm, reward)
+        >>> policy.t == other.t, [p.parameters() for p in policy.posterior] == [p.parameters() for p in other.posterior]
+        (True, True)
+        >>> choices = policy.choiceBatch(10)
+        >>> len(choices), np.all((0 <= choices) & (choices < policy.nbArms))
+        (10, True)
+        """
+        parameters = self._beta_parameters()
+        if parameters is None or type(self).computeIndex is not Thompson.computeIndex:
+            return super(Thompson, self).choiceBatch(n=n)
+        return np.argmax(rn.beta(parameters[0], parameters[1], size=(n, self.nbArms)), axis=1)
@@ -37,6 +37,11 @@ class TsallisInf(Exp3):
     def __str__(self):
         return r"Tsallis-Inf($\alpha={:.3g}$)".format(self.alpha)
 
+    def startGame(self):
+        """ Start with uniform weights, and forget the cumulative losses, so that a restarted policy plays as a new one."""
+        super(TsallisInf, self).startGame()
+        self.cumulative_losses.fill(0)
+
     @property
     def eta(self):
         r""" Decreasing learning rate, :math:`\eta_t = \frac{1}{\sqrt{t}}`."""
@@ -63,9 +63,24 @@ def Ki_function(pulls, i):
 def Ki_vectorized(pulls):
     r"""Compute the :math:`K_i(t)` index as defined in the article, for all arms (in a vectorized manner).
 
-    .. warning:: I didn't find a fast vectorized formula, so don't use this one.
+    - As :math:`K_i(t) = \frac{1}{\sqrt{T_i(t)}} \sum_{j=1}^{K} \min(\sqrt{T_i(t)}, \sqrt{T_j(t)})`, it only needs to sort the values :math:`\sqrt{T_j(t)}` and to use their cumulated sums, in :math:`\mathcal{O}(K \log K)` instead of :math:`\mathcal{O}(K^2)`.
+
+    >>> pulls = np.array([0, 1, 4, 9])
+    >>> [Ki_function(pulls, i) for i in range(4)]
+    [4, 3.0, 2.5, 2.0]
+    >>> Ki_vectorized(pulls)
+    array([4. , 3. , 2.5, 2. ])
     """
-    return np.array([Ki_function(pulls, i) for i in range(len(pulls))])
+    pulls = np.asarray(pulls, dtype=float)
+    sqrt_pulls = np.sqrt(np.maximum(0, pulls))
+    sorted_sqrt_pulls = np.sort(sqrt_pulls)
+    cumsum_sqrt_pulls = np.concatenate(([0.], np.cumsum(sorted_sqrt_pulls)))
+    # number of arms j with sqrt(T_j) < sqrt(T_i), and sum of their sqrt(T_j)
+    nb_smaller = np.searchsorted(sorted_sqrt_pulls, sqrt_pulls, side='left')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Ki = (len(pulls) - nb_smaller) + cumsum_sqrt_pulls[nb_smaller] / sqrt_pulls
+    Ki[pulls <= 0] = len(pulls)
+    return Ki
     # ratios = np.zeros_like(pulls)
     # for i, p in enumerate(pulls):
     #     ratios[i] = np.sum(np.minimum(1., np.sqrt(pulls / p)))
@@ -140,6 +155,14 @@ class UCBdagger(IndexPolicy):
             H_arm = self.pulls[arm] * Ki_function(self.pulls, arm)
             return (self.rewards[arm] / self.pulls[arm]) + np.sqrt(((2. * self.alpha) / self.pulls[arm]) * log_bar(self.horizon / H_arm))
 
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            H = self.pulls * Ki_vectorized(self.pulls)
+            indexes = (self.rewards / self.pulls) + np.sqrt(((2. * self.alpha) / self.pulls) * log_bar(self.horizon / H))
+        indexes[self.pulls < 1] = float('+inf')
+        self.index[:] = indexes
+
     # def computeAllIndex(self):
     #     """ Compute the current indexes for all arms, in a vectorized manner."""
     #     # H_arms = self.pulls * Ki_vectorized(self.pulls)
@@ -57,6 +57,15 @@ class UCBimproved(SuccessiveElimination):
     def __str__(self):
         return r"UCB-Improved($T={}$, $\alpha={:.3g}$)".format(self.horizon, self.alpha)
 
+    def startGame(self):
+        """ Start the game: all the arms are active again, in the first round, so that a restarted policy plays as a new one."""
+        super(UCBimproved, self).startGame()
+        self.activeArms = list(np.arange(self.nbArms))
+        self.estimate_delta = 1
+        self.max_nb_of_exploration = 1
+        self.current_m = 0
+        self.when_did_it_leave.fill(float('-inf'))
+
     def update_activeArms(self):
         """ Update the set ``activeArms`` of active arms."""
         # first compute UCB and LCB
@@ -70,18 +79,12 @@ class UCBimproved(SuccessiveElimination):
         max_LCB = np.max(LCB)
 
         # now it's time to update activeArms, m, and estimate_delta
-        new_active_arms = [
-            arm
-            for arm in self.activeArms
-            if UCB[arm] >= max_LCB
-        ]
+        activeArms = np.asarray(self.activeArms, dtype=int)
+        stillActive = UCB[activeArms] >= max_LCB
         # maybe we eliminated some arms, so we need to keep in memory when the left
-        if len(new_active_arms) < len(self.activeArms):
-            for arm in self.activeArms:
-                if arm not in new_active_arms:
-                    # self.when_did_it_leave[arm] = self.current_m  # XXX use current_m ?
-                    self.when_did_it_leave[arm] = self.t
-        self.activeArms = new_active_arms
+        # self.when_did_it_leave[activeArms[~stillActive]] = self.current_m  # XXX use current_m ?
+        self.when_did_it_leave[activeArms[~stillActive]] = self.t
+        self.activeArms = list(activeArms[stillActive])
 
         # then update the rest
         self.estimate_delta /= 2.0
@@ -96,11 +99,8 @@ class UCBimproved(SuccessiveElimination):
         if len(self.activeArms) == 1:
             return self.activeArms[0]
         else:
-            arms_not_explored_enough = [
-                arm
-                for arm in self.activeArms
-                if self.pulls[arm] < self.max_nb_of_exploration
-            ]
+            activeArms = np.asarray(self.activeArms, dtype=int)
+            arms_not_explored_enough = activeArms[self.pulls[activeArms] < self.max_nb_of_exploration]
             if len(arms_not_explored_enough) == 0:
                 self.update_activeArms()
                 if not recursive:
@@ -115,4 +115,8 @@ class UCBimproved(SuccessiveElimination):
 
     def computeIndex(self, arm):
         """ Nothing to do, just copy from ``when_did_it_leave``."""
-        self.index[arm] = self.when_did_it_leave[arm]
+        return self.when_did_it_leave[arm]
+
+    def computeAllIndex(self):
+        """ Nothing to do, just copy from ``when_did_it_leave``, for all arms at once."""
+        self.index[:] = self.when_did_it_leave
@@ -34,6 +34,6 @@ class UCBmin(UCB):
 
     def computeAllIndex(self):
         """ Compute the current indexes for all arms, in a vectorized manner."""
-        indexes = (self.rewards / self.pulls) + np.minimum(1., np.sqrt((2 * np.log10(self.t)) / self.pulls))
+        indexes = (self.rewards / self.pulls) + np.minimum(1., np.sqrt(np.log(self.t) / (2 * self.pulls)))
         indexes[self.pulls < 1] = float('+inf')
         self.index[:] = indexes
@@ -106,12 +106,9 @@ class UCB_sq(IndexPolicy):
             return solution_pb_sq(self.rewards[arm] / self.pulls[arm], log(self.t) / self.pulls[arm])  # XXX Faster if c=0
         return solution_pb_sq(self.rewards[arm] / self.pulls[arm], (log(self.t) + self.c * log(max(1, log(self.t)))) / self.pulls[arm])
 
-    # TODO make this vectorized function working!
-    # def computeAllIndex(self):
-    #     """ Compute the current indexes for all arms, in a vectorized manner."""
-    #     indexes = solution_pb_bq(self.rewards / self.pulls, (log(self.t) + self.c * log(max(1, log(self.t)))) / self.pulls)
-    #     indexes[self.pulls < 1] = float('+inf')
-    #     self.index[:] = indexes
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        _computeAllIndex(self, solutions_pb_sq)
 
 
 # --- New distance and algorithm: biquadratic
@@ -183,6 +180,10 @@ class UCB_bq(IndexPolicy):
             return solution_pb_bq(self.rewards[arm] / self.pulls[arm], log(self.t) / self.pulls[arm])  # XXX Faster if c=0
         return solution_pb_bq(self.rewards[arm] / self.pulls[arm], (log(self.t) + self.c * log(max(1, log(self.t)))) / self.pulls[arm])
 
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        _computeAllIndex(self, solutions_pb_bq)
+
 
 # --- New distance and algorithm: Hellinger
 
@@ -255,6 +256,10 @@ class UCB_h(IndexPolicy):
             return solution_pb_hellinger(self.rewards[arm] / self.pulls[arm], log(self.t) / self.pulls[arm])  # XXX Faster if c=0
         return solution_pb_hellinger(self.rewards[arm] / self.pulls[arm], (log(self.t) + self.c * log(max(1, log(self.t)))) / self.pulls[arm])
 
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        _computeAllIndex(self, solutions_pb_hellinger)
+
 
 # --- New distance and algorithm: lower-bound on the Kullback-Leibler distance
 
@@ -339,6 +344,10 @@ class UCB_lb(IndexPolicy):
             return solution_pb_kllb(self.rewards[arm] / self.pulls[arm], log(self.t) / self.pulls[arm])  # XXX Faster if c=0
         return solution_pb_kllb(self.rewards[arm] / self.pulls[arm], (log(self.t) + self.c * log(max(1, log(self.t)))) / self.pulls[arm])
 
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        _computeAllIndex(self, solutions_pb_kllb)
+
 
 # --- New distance and algorithm: a shifted tangent line function of d_kl
 
@@ -377,7 +386,7 @@ def solution_pb_t(p, upperbound, check_solution=CHECK_SOLUTION):
 
     - :math:`\delta` is the ``upperbound`` parameter on the semi-distance between input :math:`p` and solution :math:`q^*`.
     """
-    # p = min(max(p, eps), 1 - eps)  # XXX project [0,1] to [eps,1-eps]
+    p = min(max(p, eps), 1 - eps)  # XXX project [0,1] to [eps,1-eps]
     return min(1, ((p + 1) / 2.) * (upperbound - p * log(p / (p + 1)) - log(2 / (p + 1)) + 1))
 
     # XXX useless checking of the solution, takes time
@@ -417,6 +426,59 @@ class UCB_t(IndexPolicy):
             return solution_pb_t(self.rewards[arm] / self.pulls[arm], log(self.t) / self.pulls[arm])  # XXX Faster if c=0
         return solution_pb_t(self.rewards[arm] / self.pulls[arm], (log(self.t) + self.c * log(max(1, log(self.t)))) / self.pulls[arm])
 
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        _computeAllIndex(self, solutions_pb_t)
+
+
+# --- Vectorized closed-form solutions, for all arms at once
+
+def solutions_pb_sq(p, upperbound):
+    r""" Vectorized version of :func:`solution_pb_sq`, for arrays ``p`` and ``upperbound``."""
+    return p + np.sqrt(upperbound / 2.)
+
+
+def solutions_pb_bq(p, upperbound):
+    r""" Vectorized version of :func:`solution_pb_bq`, for arrays ``p`` and ``upperbound``."""
+    return np.minimum(1, p + np.sqrt(-2.25 + np.sqrt(5.0625 + 2.25 * upperbound)))
+
+
+def solutions_pb_hellinger(p, upperbound):
+    r""" Vectorized version of :func:`solution_pb_hellinger`, for arrays ``p`` and ``upperbound``."""
+    sqrt_p = np.sqrt(p)
+    with np.errstate(invalid='ignore'):
+        solutions = (1 - upperbound/2.) * sqrt_p + np.sqrt((1 - p) * (upperbound - upperbound**2 / 4.)) ** 2
+    return np.where(upperbound < (2 - 2 * sqrt_p), solutions, p)
+
+
+def solutions_pb_kllb(p, upperbound):
+    r""" Vectorized version of :func:`solution_pb_kllb`, for arrays ``p`` and ``upperbound``."""
+    p = np.clip(p, eps, 1 - eps)  # XXX project [0,1] to [eps,1-eps]
+    return 1 - (1 - p) * np.exp((p * np.log(p) - upperbound) / (1 - p))
+
+
+def solutions_pb_t(p, upperbound):
+    r""" Vectorized version of :func:`solution_pb_t`, for arrays ``p`` and ``upperbound``."""
+    p = np.clip(p, eps, 1 - eps)  # XXX project [0,1] to [eps,1-eps]
+    return np.minimum(1, ((p + 1) / 2.) * (upperbound - p * np.log(p / (p + 1)) - np.log(2 / (p + 1)) + 1))
+
+
+def _means_and_upperbounds(policy):
+    r""" Compute the empirical means :math:`\hat{\mu}_k(t)` and the upper-bounds :math:`\frac{\log(t) + c\log(\log(t))}{N_k(t)}` for all arms (with :math:`N_k(t)` replaced by 1 for arms never pulled)."""
+    pulls = np.maximum(1, policy.pulls)
+    log_t = log(max(1, policy.t))
+    return policy.rewards / pulls, (log_t + policy.c * log(max(1, log_t))) / pulls
+
+
+def _computeAllIndex(policy, *solutions_pb):
+    r""" Compute the indexes of all arms for the policy, as the smallest of the vectorized closed-form solutions ``solutions_pb``, and :math:`+\infty` for arms never pulled."""
+    p, upperbound = _means_and_upperbounds(policy)
+    indexes = solutions_pb[0](p, upperbound)
+    for solution_pb in solutions_pb[1:]:
+        indexes = np.minimum(indexes, solution_pb(p, upperbound))
+    indexes[policy.pulls < 1] = float('+inf')
+    policy.index[:] = indexes
+
 
 # --- Now the generic UCBoost algorithm
 
@@ -445,6 +507,15 @@ _distance_of_key = {
     'solution_pb_t': solution_pb_t,
 }
 
+#: Vectorized versions of the functions in ``_distance_of_key``.
+_vectorized_distance_of_key = {
+    'solution_pb_sq': solutions_pb_sq,
+    'solution_pb_bq': solutions_pb_bq,
+    'solution_pb_hellinger': solutions_pb_hellinger,
+    'solution_pb_kllb': solutions_pb_kllb,
+    'solution_pb_t': solutions_pb_t,
+}
+
 
 class UCBoost(IndexPolicy):
     """ The UCBoost policy for bounded bandits (on [0, 1]).
@@ -496,8 +567,13 @@ class UCBoost(IndexPolicy):
             for key in self.set_D
         )
 
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        _computeAllIndex(self, *[_vectorized_distance_of_key[key] for key in self.set_D])
+
 
 _bq_h_lb = [solution_pb_bq, solution_pb_hellinger, solution_pb_kllb]
+_bq_h_lb_vect = [solutions_pb_bq, solutions_pb_hellinger, solutions_pb_kllb]
 
 class UCBoost_bq_h_lb(UCBoost):
     """ The UCBoost policy for bounded bandits (on [0, 1]).
@@ -531,8 +607,13 @@ class UCBoost_bq_h_lb(UCBoost):
             for solution_pb in _bq_h_lb
         )
 
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        _computeAllIndex(self, *_bq_h_lb_vect)
+
 
 _bq_h_lb_t = [solution_pb_bq, solution_pb_hellinger, solution_pb_kllb, solution_pb_t]
+_bq_h_lb_t_vect = [solutions_pb_bq, solutions_pb_hellinger, solutions_pb_kllb, solutions_pb_t]
 
 class UCBoost_bq_h_lb_t(UCBoost):
     """ The UCBoost policy for bounded bandits (on [0, 1]).
@@ -566,8 +647,13 @@ class UCBoost_bq_h_lb_t(UCBoost):
             for solution_pb in _bq_h_lb_t
         )
 
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        _computeAllIndex(self, *_bq_h_lb_t_vect)
+
 
 _bq_h_lb_t_sq = [solution_pb_bq, solution_pb_hellinger, solution_pb_kllb, solution_pb_t, solution_pb_sq]
+_bq_h_lb_t_sq_vect = [solutions_pb_bq, solutions_pb_hellinger, solutions_pb_kllb, solutions_pb_t, solutions_pb_sq]
 
 class UCBoost_bq_h_lb_t_sq(UCBoost):
     """ The UCBoost policy for bounded bandits (on [0, 1]).
@@ -601,6 +687,10 @@ class UCBoost_bq_h_lb_t_sq(UCBoost):
             for solution_pb in _bq_h_lb_t_sq
         )
 
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        _computeAllIndex(self, *_bq_h_lb_t_sq_vect)
+
 
 # --- New distance and algorithm: epsilon approximation on the Kullback-Leibler distance
 
@@ -643,6 +733,34 @@ def min_solutions_pb_from_epsilon(p, upperbound, epsilon=0.001, check_solution=C
     return min_of_solutions
 
 
+def min_solutions_pb_from_epsilon_vect(p, upperbound, epsilon=0.001):
+    r""" Vectorized version of :func:`min_solutions_pb_from_epsilon`, for arrays ``p`` and ``upperbound``.
+
+    - The values :math:`q_k` are computed once for all :math:`\min_k \tau_1(p) \leq k \leq \max_k \tau_2(p)`, and the loop on k is replaced by a masked minimum on a (K, number of k) array.
+
+    >>> p, upperbound = np.array([0.1, 0.5, 0.9]), np.array([0.2, 0.05, 0.01])
+    >>> [min_solutions_pb_from_epsilon(pi, ui, epsilon=0.01) for pi, ui in zip(p, upperbound)]  # doctest: +ELLIPSIS
+    [0.379..., 0.655..., 0.937...]
+    >>> min_solutions_pb_from_epsilon_vect(p, upperbound, epsilon=0.01)  # doctest: +ELLIPSIS
+    array([0.379..., 0.655..., 0.937...])
+    """
+    eta = epsilon / (1.0 + epsilon)
+    p = np.clip(p, eps, 1 - eps)  # XXX project [0,1] to [eps,1-eps]
+    tau_1_p = np.ceil((np.log(1 - p)) / (log(1 - eta))).astype(int)
+    tau_2_p = np.ceil((np.log(1 - np.exp(- epsilon / p))) / (log(1 - eta))).astype(int)
+    min_of_solutions = np.full(np.shape(p), float('+inf'))
+    if np.all(tau_1_p > tau_2_p):
+        return min_of_solutions
+    ks = np.arange(np.min(tau_1_p), np.max(tau_2_p) + 1)
+    temp = 1 - (1.0 - eta) ** ks.astype(float)
+    q = np.clip(temp, eps, 1 - eps)[np.newaxis, :]  # XXX project [0,1] to [eps,1-eps]
+    pp = p[:, np.newaxis]
+    kl = pp * np.log(pp / q) + (1 - pp) * np.log((1 - pp) / (1 - q))
+    solutions = np.where(upperbound[:, np.newaxis] < kl, temp[np.newaxis, :], 1.)
+    in_range = (tau_1_p[:, np.newaxis] <= ks) & (ks <= tau_2_p[:, np.newaxis])
+    return np.min(np.where(in_range, solutions, float('+inf')), axis=1)
+
+
 class UCBoostEpsilon(IndexPolicy):
     r""" The UCBoostEpsilon policy for bounded bandits (on [0, 1]).
 
@@ -684,3 +802,16 @@ class UCBoostEpsilon(IndexPolicy):
             ),
             min_solutions
         )
+
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner."""
+        p, upperbound = _means_and_upperbounds(self)
+        indexes = np.minimum(
+            np.minimum(
+                solutions_pb_kllb(p, upperbound),
+                solutions_pb_sq(p, upperbound)
+            ),
+            min_solutions_pb_from_epsilon_vect(p, upperbound, epsilon=self.epsilon)
+        )
+        indexes[self.pulls < 1] = float('+inf')
+        self.index[:] = indexes
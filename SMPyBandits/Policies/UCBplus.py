@@ -39,6 +39,6 @@ class UCBplus(UCB):
 
     def computeAllIndex(self):
         """ Compute the current indexes for all arms, in a vectorized manner."""
-        indexes = (self.rewards / self.pulls) + np.sqrt(np.maximum(0., (2 * np.log10(self.t)) / self.pulls))
+        indexes = (self.rewards / self.pulls) + np.sqrt(np.maximum(0., np.log(self.t / self.pulls)) / (2 * self.pulls))
         indexes[self.pulls < 1] = float('+inf')
         self.index[:] = indexes
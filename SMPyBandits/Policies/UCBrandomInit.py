@@ -27,6 +27,11 @@ class UCBrandomInit(UCB):
         # The proba that another player has the same is nbPlayers / factorial(nbArms) : should be SMALL !
         # print("One UCB player with _initial_exploration =", self._initial_exploration)  # DEBUG
 
+    def startGame(self):
+        """ Initialize the policy for a new game, with a new random order for the initial exploration of the arms."""
+        super(UCBrandomInit, self).startGame()
+        self._initial_exploration = np.random.permutation(self.nbArms)
+
     def choice(self):
         if self.t < self.nbArms:  # Force to first visit each arm in a certain random order
             return self._initial_exploration[self.t]  # Better: random permutation!
@@ -14,7 +14,7 @@
 
 - Bayesian algorithms: :class:`Thompson`, :class:`BayesUCB`, and :class:`DiscountedThompson`,
 
-- Based on Kullback-Leibler divergence: :class:`klUCB`, :class:`klUCBloglog`, :class:`klUCBPlus`, :class:`klUCBH`, :class:`klUCBHPlus`, :class:`klUCBPlusPlus`, :class:`klUCBswitch`,
+- Based on Kullback-Leibler divergence: :class:`klUCB`, :class:`klUCBloglog`, :class:`klUCBPlus`, :class:`klUCBH`, :class:`klUCBHPlus`, :class:`klUCBPlusPlus`, :class:`klUCBswitch` (the Bernoulli indexes can be read from a precomputed :class:`KLUCBTable`),
 
 - Other index algorithms: :class:`DMED`, :class:`DMED.DMEDPlus`, :class:`IMED`, :class:`OCUCBH`, :class:`OCUCBH.AOCUCBH`, :class:`OCUCB`, :class:`UCBdagger`,
 
@@ -177,6 +177,7 @@ from .Aggregator import Aggregator
 from .CORRAL import CORRAL
 from .LearnExp import LearnExp
 from .GenericAggregation import GenericAggregation
+from .StackedChildren import StackedChildren  # used by aggregation algorithms with homogeneous children
 
 # --- Gittins index policy
 from .ApproximatedFHGittins import ApproximatedFHGittins  # Approximated Finite-Horizon Gittins index
@@ -217,11 +218,13 @@ from .MEGA import MEGA  # Cf. [Avner & Mannor, 2014](https://arxiv.org/abs/1404.
 # --- Utility functions
 
 from .with_proba import with_proba
+from .topM import argmax_with_ties, kth_largest_with_ties, topM_with_ties
 
 # --- KL-UCB index functions
 from .usenumba import jit
 
 from .kullback import klucbBern, klucbExp, klucbGauss, klucbPoisson, klucbGamma
+from .KLUCBTable import KLUCBTable  # Precomputed Bernoulli kl-UCB indexes, for klUCB, klUCBPlus, klUCBH and klUCBloglog
 
 #: Maps name of arms to kl functions
 klucb_mapping = {
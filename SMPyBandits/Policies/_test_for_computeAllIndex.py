@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+""" Test and benchmark of the vectorized ``computeAllIndex()`` method of all the index policies exported by :mod:`Policies`.
+
+For every subclass of :class:`IndexPolicy` exported in ``Policies/__init__.py``, it checks that:
+
+- ``computeAllIndex()`` is vectorized, i.e., it is defined in a class that is at least as specific as the one defining ``computeIndex(arm)`` (if not, the base loop of :meth:`IndexPolicy.computeAllIndex` is used, or worse a parent's vectorized formula is used for a different index),
+- ``computeAllIndex()`` has no hidden Python loop on the arms, i.e., the number of Python (and builtin) function calls it makes does not grow with K, between the smallest and the largest values of K (a :class:`numpy.vectorize` wrapper, or a list comprehension on the arms, calls a Python function once per arm),
+- the vectorized indexes are numerically equal to the scalar ones ``[computeIndex(arm) for arm in range(K)]``, on a few random internal states (for randomized indexes, only the shape and the absence of ``nan`` are checked),
+
+and it reports the per-step cost of ``computeAllIndex()`` for a few values of K.
+
+It is the gate for adding a new index policy: the script exits with status 1 if one policy fails the checks.
+
+$ cd SMPyBandits
+$ python Policies/_test_for_computeAllIndex.py
+Policy                 vectorized  no loop  equal  |   10 arms   100 arms  1000 arms   (µs/step)
+AOCUCBH                True        True     True   |       13.5       17.8       29.0
+...
+Thompson               True        True     True   |       22.8       26.3      103.6
+...
+klUCB                  True        True     True   |      628.2      647.1     1159.7
+...
+All the 59 index policies have a vectorized computeAllIndex() method.
+"""
+from __future__ import division, print_function  # Python 2 compatibility
+
+__author__ = "Lilian Besson"
+__version__ = "0.9"
+
+import sys
+import inspect
+import timeit
+import numpy as np
+
+try:
+    import Policies
+    from Policies.IndexPolicy import IndexPolicy
+except ImportError:
+    sys.path.insert(0, '.')
+    sys.path.insert(0, '..')
+    import Policies
+    from Policies.IndexPolicy import IndexPolicy
+
+
+#: Values of K used for the checks and the benchmark.
+NB_ARMS = (10, 100, 1000)
+
+#: Horizon given to the policies that need one.
+HORIZON = 10000
+
+#: Number of random internal states used to check the equality.
+NB_STATES = 3
+
+#: Number of calls to ``computeAllIndex()`` used to measure its cost.
+NB_CALLS = 50
+
+#: Maximum growth of the number of function calls of ``computeAllIndex()``, from the smallest to the largest value of K (that grows 100 times).
+#: It is exactly 1 for all the truly vectorized policies, and more than 30 for the ones looping on the arms.
+MAX_CALLS_GROWTH = 2
+
+#: Tolerance used to compare the indexes (kl-UCB indexes are computed by bisection).
+RTOL = 1e-6
+ATOL = 1e-6
+
+
+# --- Utility functions
+
+def index_policies():
+    """ Return the sorted list of ``(name, class)`` of all the subclasses of :class:`IndexPolicy` exported by :mod:`Policies`."""
+    policies = []
+    for name in sorted(dir(Policies)):
+        cls = getattr(Policies, name)
+        if inspect.isclass(cls) and issubclass(cls, IndexPolicy) and cls is not IndexPolicy:
+            policies.append((name, cls))
+    return policies
+
+
+def defining_class(cls, method):
+    """ Return the first class in the MRO of ``cls`` that defines ``method``."""
+    for parent in cls.__mro__:
+        if method in vars(parent):
+            return parent
+
+
+def is_vectorized(cls):
+    """ True if ``computeAllIndex()`` is redefined in a class at least as specific as the one defining ``computeIndex(arm)``."""
+    owner_all = defining_class(cls, 'computeAllIndex')
+    owner_index = defining_class(cls, 'computeIndex')
+    return owner_all is not IndexPolicy and issubclass(owner_all, owner_index)
+
+
+def nb_calls(policy):
+    """ Count the Python and builtin function calls made by one call to ``policy.computeAllIndex()``, with :func:`sys.setprofile`."""
+    calls = [0]
+
+    def profiler(frame, event, arg):
+        if event in ('call', 'c_call'):
+            calls[0] += 1
+
+    sys.setprofile(profiler)
+    try:
+        policy.computeAllIndex()
+    finally:
+        sys.setprofile(None)
+    return calls[0]
+
+
+def has_no_loop(cls, nbArmsList=NB_ARMS, maxGrowth=MAX_CALLS_GROWTH):
+    """ True if the number of function calls made by ``computeAllIndex()`` does not grow with K, from ``min(nbArmsList)`` to ``max(nbArmsList)`` arms (i.e., it is not a Python loop on the arms in disguise, like :class:`numpy.vectorize`)."""
+    calls = []
+    for nbArms in (min(nbArmsList), max(nbArmsList)):
+        policy = make_policy(cls, nbArms)
+        play_randomly(policy, nbSteps=3 * nbArms)
+        calls.append(nb_calls(policy))
+    return calls[1] <= maxGrowth * calls[0]
+
+
+def make_policy(cls, nbArms, horizon=HORIZON):
+    """ Create an instance of the policy, giving it an horizon if it accepts one."""
+    try:
+        parameters = inspect.signature(cls.__init__).parameters
+    except (AttributeError, ValueError):  # Python 2
+        parameters = inspect.getargspec(cls.__init__).args
+    if 'horizon' in parameters:
+        return cls(nbArms, horizon=horizon)
+    return cls(nbArms)
+
+
+def play_randomly(policy, nbSteps, seed=0):
+    """ Bring the policy to a random internal state, by giving it Bernoulli rewards on uniformly random arms."""
+    generator = np.random.RandomState(seed)
+    nbArms = int(policy.nbArms)
+    means = generator.random_sample(nbArms)
+    policy.startGame()
+    for arm in generator.randint(nbArms, size=nbSteps):
+        policy.getReward(arm, float(generator.random_sample() < means[arm]))
+    # like the GLR_UCB wrapper, which gives a different time step to each arm of its policy
+    if hasattr(policy, 't_for_each_arm'):
+        policy.t_for_each_arm[:] = policy.t
+
+
+def vectorized_and_scalar_indexes(policy, seed=0):
+    """ Return the indexes computed by ``computeAllIndex()`` and by ``computeIndex(arm)`` for each arm, with the same seed for the random generator."""
+    np.random.seed(seed)
+    policy.computeAllIndex()
+    vectorized = np.array(policy.index, dtype=float)
+    np.random.seed(seed)
+    scalar = np.array([policy.computeIndex(arm) for arm in range(int(policy.nbArms))], dtype=float)
+    return vectorized, scalar
+
+
+def is_randomized(policy):
+    """ True if two computations of the scalar indexes with two different seeds differ."""
+    _, first = vectorized_and_scalar_indexes(policy, seed=1)
+    _, second = vectorized_and_scalar_indexes(policy, seed=2)
+    return not np.allclose(first, second, rtol=RTOL, atol=ATOL, equal_nan=True)
+
+
+def check_policy(cls, nbArms, nbStates=NB_STATES):
+    """ Check that the vectorized indexes can be computed at the beginning of the game, and that they are equal to the scalar ones for ``nbStates`` random internal states (or, for randomized indexes, that they have the good shape and no ``nan``)."""
+    policy = make_policy(cls, nbArms)
+    policy.startGame()
+    policy.computeAllIndex()
+    for state in range(nbStates):
+        policy = make_policy(cls, nbArms)
+        play_randomly(policy, nbSteps=(1 + state) * 3 * nbArms, seed=state)
+        vectorized, scalar = vectorized_and_scalar_indexes(policy)
+        if vectorized.shape != (nbArms,) or np.any(np.isnan(vectorized)) != np.any(np.isnan(scalar)):
+            return False
+        if not is_randomized(policy) and not np.allclose(vectorized, scalar, rtol=RTOL, atol=ATOL, equal_nan=True):
+            print("  For {} with K = {}, the vectorized indexes\n    {}\n  are not equal to the scalar ones\n    {}".format(policy, nbArms, vectorized[:10], scalar[:10]))  # DEBUG
+            return False
+    return True
+
+
+def cost_per_step(cls, nbArms, nbCalls=NB_CALLS):
+    """ Measure the mean cost (in µs) of one call to ``computeAllIndex()``, on a random internal state."""
+    policy = make_policy(cls, nbArms)
+    play_randomly(policy, nbSteps=3 * nbArms)
+    return 1e6 * timeit.timeit(policy.computeAllIndex, number=nbCalls) / nbCalls
+
+
+# --- Main function
+
+def main(nbArmsList=NB_ARMS):
+    """ Check and benchmark all the index policies, print a report, and return the list of names of the policies failing the checks."""
+    failures = []
+    print("{:<22} {:<11} {:<8} {:<6} | {}  (µs/step)".format("Policy", "vectorized", "no loop", "equal", " ".join("{:>4} arms ".format(nbArms) for nbArms in nbArmsList)))
+    for name, cls in index_policies():
+        vectorized = is_vectorized(cls)
+        try:
+            no_loop = has_no_loop(cls, nbArmsList)
+            equal = all(check_policy(cls, nbArms) for nbArms in nbArmsList[:2])
+            costs = [cost_per_step(cls, nbArms) for nbArms in nbArmsList]
+        except Exception as e:
+            print("{:<22} failed with exception {!r}".format(name, e))  # DEBUG
+            failures.append(name)
+            continue
+        print("{:<22} {:<11} {:<8} {:<6} | {}".format(name, str(vectorized), str(no_loop), str(equal), " ".join("{:>10.1f}".format(cost) for cost in costs)))
+        if not (vectorized and no_loop and equal):
+            failures.append(name)
+    if failures:
+        print("\nThe {} following policies fail the checks: {}".format(len(failures), failures))
+    else:
+        print("\nAll the {} index policies have a vectorized computeAllIndex() method.".format(len(index_policies())))
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
@@ -14,10 +14,10 @@ import numpy as np
 np.seterr(divide='ignore')  # XXX dangerous in general, controlled here!
 
 try:
-    from .kullback import klucbBern
+    from .kullback import klucbBern, vectorize_klucb
     from .IndexPolicy import IndexPolicy
 except (ImportError, SystemError):
-    from kullback import klucbBern
+    from kullback import klucbBern, vectorize_klucb
     from IndexPolicy import IndexPolicy
 
 #: Default value for the constant c used in the computation of KL-UCB index.
@@ -35,16 +35,21 @@ class klUCB(IndexPolicy):
     """ The generic KL-UCB policy for one-parameter exponential distributions.
 
     - By default, it assumes Bernoulli arms.
+    - For Bernoulli arms, a precomputed :class:`KLUCBTable.KLUCBTable` can be given as ``table``, to replace the bisection searches by lookups (giving upper bounds of the indexes, at most ``table.tolerance`` away from them).
     - Reference: [Garivier & Cappé - COLT, 2011](https://arxiv.org/pdf/1102.2490.pdf).
     """
 
-    def __init__(self, nbArms, tolerance=TOLERANCE, klucb=klucbBern, c=c, lower=0., amplitude=1.):
+    def __init__(self, nbArms, tolerance=TOLERANCE, klucb=klucbBern, c=c, lower=0., amplitude=1., table=None):
         super(klUCB, self).__init__(nbArms, lower=lower, amplitude=amplitude)
         self.c = c  #: Parameter c
         self.klucb = klucb  #: kl function to use
-        self.klucb_vect = np.vectorize(klucb)  #: kl function to use, in a vectorized way using :func:`numpy.vectorize`.
-        self.klucb_vect.__name__ = klucb.__name__
+        self.klucb_vect = vectorize_klucb(klucb)  #: kl function to use, in a vectorized way (see :func:`kullback.vectorize_klucb`).
         self.tolerance = tolerance  #: Numerical tolerance
+        self.table = table  #: Optional precomputed table of the Bernoulli kl-UCB indexes, see :class:`KLUCBTable.KLUCBTable`.
+        if table is not None:
+            assert klucb is klucbBern, "Error: a KLUCBTable can only be used with klucb=klucbBern, not {}.".format(klucb.__name__)  # DEBUG
+            # the table is already vectorized
+            self.klucb = self.klucb_vect = table
 
     def __str__(self):
         name = self.klucb.__name__[5:]
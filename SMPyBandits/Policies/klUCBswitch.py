@@ -60,15 +60,17 @@ def klucbplus_index(reward, pull, horizon, nbArms, klucb=klucbBern, c=c, toleran
     return klucb(reward / pull, c * log(horizon / (nbArms * pull)) / pull, tolerance)
 
 
-# def klucbplus_indexes(rewards, pulls, horizon, nbArms, klucb=klucbBern, c=c, tolerance=TOLERANCE):
-#     r""" The kl-UCB+ indexes, from [Cappé et al. 13](https://arxiv.org/pdf/1210.1136.pdf):
+def klucbplus_indexes(rewards, pulls, horizon, nbArms, klucb=klucbBern, c=c, tolerance=TOLERANCE):
+    r""" The kl-UCB+ indexes, from [Cappé et al. 13](https://arxiv.org/pdf/1210.1136.pdf):
 
-#     .. math::
+    .. math::
 
-#         \hat{\mu}_k(t) &= \frac{X_k(t)}{N_k(t)}, \\
-#         I^{KL+}_k(t) &= \sup\limits_{q \in [a, b]} \left\{ q : \mathrm{kl}(\hat{\mu}_k(t), q) \leq \frac{c \log(T / (K * N_k(t)))}{N_k(t)} \right\}.
-#     """
-#     return klucb(rewards / pulls, c * np.log(horizon / (nbArms * pulls)) / pulls, tolerance)
+        \hat{\mu}_k(t) &= \frac{X_k(t)}{N_k(t)}, \\
+        I^{KL+}_k(t) &= \sup\limits_{q \in [a, b]} \left\{ q : \mathrm{kl}(\hat{\mu}_k(t), q) \leq \frac{c \log(T / (K * N_k(t)))}{N_k(t)} \right\}.
+
+    - ``klucb`` has to accept vectors, for instance with :func:`numpy.vectorize`.
+    """
+    return klucb(rewards / pulls, c * np.log(horizon / (nbArms * pulls)) / pulls, tolerance)
 
 
 def mossplus_index(reward, pull, horizon, nbArms):
@@ -81,14 +83,14 @@ def mossplus_index(reward, pull, horizon, nbArms):
     return (reward / pull) + sqrt(max(0, log(horizon / (nbArms * pull))) / (2 * pull))
 
 
-# def mossplus_indexes(rewards, pulls, horizon, nbArms):
-#     r""" The MOSS+ indexes, from [Audibert & Bubeck, 2010](http://www.jmlr.org/papers/volume11/audibert10a/audibert10a.pdf):
+def mossplus_indexes(rewards, pulls, horizon, nbArms):
+    r""" The MOSS+ indexes, from [Audibert & Bubeck, 2010](http://www.jmlr.org/papers/volume11/audibert10a/audibert10a.pdf):
 
-#     .. math::
+    .. math::
 
-#         I^{MOSS+}_k(t) = \frac{X_k(t)}{N_k(t)} + \sqrt{\max\left(0, \frac{\log\left(\frac{T}{K N_k(t)}\right)}{N_k(t)}\right)}.
-#     """
-#     return (rewards / pulls) + np.sqrt(np.maximum(0, np.log(horizon / (nbArms * pulls))) / (2 * pulls))
+        I^{MOSS+}_k(t) = \frac{X_k(t)}{N_k(t)} + \sqrt{\max\left(0, \frac{\log\left(\frac{T}{K N_k(t)}\right)}{N_k(t)}\right)}.
+    """
+    return (rewards / pulls) + np.sqrt(np.maximum(0, np.log(horizon / (nbArms * pulls))) / (2 * pulls))
 
 
 # --- Classes
@@ -135,6 +137,11 @@ class klUCBswitch(klUCB):
         complement = "$T={}${}{}{}".format(self.horizon, name, "" if self.c == 1 else r", $c={:.3g}$".format(self.c), "" if self._threshold_switch_name == "" else ", {}".format(self._threshold_switch_name))
         return r"kl-UCB-switch({})".format(complement)
 
+    def startGame(self):
+        """ Start the game: every arm uses the kl-UCB index again, so that a restarted policy plays as a new one."""
+        super(klUCBswitch, self).startGame()
+        self.use_MOSS_index.fill(False)
+
     def computeIndex(self, arm):
         r""" Compute the current index, at time t and after :math:`N_k(t)` pulls of arm k:
 
@@ -154,17 +161,21 @@ class klUCBswitch(klUCB):
             return mossplus_index(self.rewards[arm], self.pulls[arm], self.horizon, self.nbArms)
         else:
             if self.pulls[arm] > self.constant_threshold_switch:
-                self.self.use_MOSS_index[arm] = True
+                self.use_MOSS_index[arm] = True
                 return mossplus_index(self.rewards[arm], self.pulls[arm], self.horizon, self.nbArms)
             else:  # default is to use kl-UCB index
                 return klucbplus_index(self.rewards[arm], self.pulls[arm], self.horizon, self.nbArms, klucb=self.klucb, c=self.c, tolerance=self.tolerance)
 
-    # def computeAllIndex(self):
-    #     """ Compute the current indexes for all arms, in a vectorized manner."""
-    #     # XXX I don't think I could hack numpy operations to be faster than a loop for this algorithm
-    #     indexes = FIXME
-    #     indexes[self.pulls < 1] = float('+inf')
-    #     self.index[:] = indexes
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner: the MOSS+ indexes for the arms which switched, and the kl-UCB+ indexes (the costly ones) only for the other arms."""
+        self.use_MOSS_index |= self.pulls > self.constant_threshold_switch
+        pulls = np.maximum(1, self.pulls)
+        indexes = mossplus_indexes(self.rewards, pulls, self.horizon, self.nbArms)
+        use_klucb = ~self.use_MOSS_index
+        if np.any(use_klucb):
+            indexes[use_klucb] = klucbplus_indexes(self.rewards[use_klucb], pulls[use_klucb], self.horizon, self.nbArms, klucb=self.klucb_vect, c=self.c, tolerance=self.tolerance)
+        indexes[self.pulls < 1] = float('+inf')
+        self.index[:] = indexes
 
 
 # --- Numerical functions required for the indexes for anytime variant kl-UCB-switch
@@ -174,16 +185,20 @@ def logplus(x):
     r""" The :math:`\log_+` function.
 
     .. math:: \log_+(x) := \max(0, \log(x)).
+
+    - It is 0 for any :math:`x \leq 1`, including :math:`x \leq 0`.
     """
-    return max(0, log(x))
+    return log(x) if x > 1 else 0
 
 
-# def logplus_vect(x):
-#     r""" The :math:`\log_+` function.
+def logplus_vect(x):
+    r""" The :math:`\log_+` function.
 
-#     .. math:: \log_+(x) := \max(0, \log(x)).
-#     """
-#     return np.maximum(0, np.log(x))
+    .. math:: \log_+(x) := \max(0, \log(x)).
+
+    - It is 0 for any :math:`x \leq 1`, including :math:`x \leq 0`.
+    """
+    return np.log(np.maximum(1, x))
 
 
 def phi(x):
@@ -194,12 +209,12 @@ def phi(x):
     return logplus(x * (1 + (logplus(x))**2))
 
 
-# def phi_vect(x):
-#     r""" The :math:`\phi(x)` function defined in equation (6) in their paper.
+def phi_vect(x):
+    r""" The :math:`\phi(x)` function defined in equation (6) in their paper.
 
-#     .. math:: \phi(x) := \log_+(x (1 + (\log_+(x))^2)).
-#     """
-#     return logplus_vect(x * (1 + (logplus_vect(x))**2))
+    .. math:: \phi(x) := \log_+(x (1 + (\log_+(x))^2)).
+    """
+    return logplus_vect(x * (1 + (logplus_vect(x))**2))
 
 
 def klucb_index(reward, pull, t, nbArms, klucb=klucbBern, c=c, tolerance=TOLERANCE):
@@ -213,15 +228,17 @@ def klucb_index(reward, pull, t, nbArms, klucb=klucbBern, c=c, tolerance=TOLERAN
     return klucb(reward / pull, c * phi(t / (nbArms * pull)) / pull, tolerance)
 
 
-# def klucb_indexes(rewards, pulls, t, nbArms, klucb=klucbBern, c=c, tolerance=TOLERANCE):
-#     r""" The kl-UCB indexes, from [Garivier & Cappé - COLT, 2011](https://arxiv.org/pdf/1102.2490.pdf):
+def klucb_indexes(rewards, pulls, t, nbArms, klucb=klucbBern, c=c, tolerance=TOLERANCE):
+    r""" The kl-UCB indexes, from [Garivier & Cappé - COLT, 2011](https://arxiv.org/pdf/1102.2490.pdf):
+
+    .. math::
 
-#     .. math::
+        \hat{\mu}_k(t) &= \frac{X_k(t)}{N_k(t)}, \\
+        I^{KL}_k(t) &= \sup\limits_{q \in [a, b]} \left\{ q : \mathrm{kl}(\hat{\mu}_k(t), q) \leq \frac{c \log(t / N_k(t))}{N_k(t)} \right\}.
 
-#         \hat{\mu}_k(t) &= \frac{X_k(t)}{N_k(t)}, \\
-#         I^{KL}_k(t) &= \sup\limits_{q \in [a, b]} \left\{ q : \mathrm{kl}(\hat{\mu}_k(t), q) \leq \frac{c \log(t / N_k(t))}{N_k(t)} \right\}.
-#     """
-#     return klucb(rewards / pulls, c * phi_vect(t / (nbArms * pulls)) / pulls, tolerance)
+    - ``klucb`` has to accept vectors, for instance with :func:`numpy.vectorize`.
+    """
+    return klucb(rewards / pulls, c * phi_vect(t / (nbArms * pulls)) / pulls, tolerance)
 
 
 def moss_index(reward, pull, t, nbArms):
@@ -234,14 +251,14 @@ def moss_index(reward, pull, t, nbArms):
     return (reward / pull) + sqrt(phi(log(t / (nbArms * pull))) / (2 * pull))
 
 
-# def moss_indexes(rewards, pulls, t, nbArms):
-#     r""" The MOSS indexes, from [Audibert & Bubeck, 2010](http://www.jmlr.org/papers/volume11/audibert10a/audibert10a.pdf):
+def moss_indexes(rewards, pulls, t, nbArms):
+    r""" The MOSS indexes, from [Audibert & Bubeck, 2010](http://www.jmlr.org/papers/volume11/audibert10a/audibert10a.pdf):
 
-#     .. math::
+    .. math::
 
-#         I^{MOSS}_k(t) &= \frac{X_k(t)}{N_k(t)} + \sqrt{\max\left(0, \frac{\log\left(\frac{t}{K N_k(t)}\right)}{N_k(t)}\right)}.
-#     """
-#     return (rewards / pulls) + np.sqrt(phi_vect(np.log(t / (nbArms * pulls))) / (2 * pulls))
+        I^{MOSS}_k(t) &= \frac{X_k(t)}{N_k(t)} + \sqrt{\max\left(0, \frac{\log\left(\frac{t}{K N_k(t)}\right)}{N_k(t)}\right)}.
+    """
+    return (rewards / pulls) + np.sqrt(phi_vect(np.log(t / (nbArms * pulls))) / (2 * pulls))
 
 
 
@@ -304,7 +321,18 @@ class klUCBswitchAnytime(klUCBswitch):
             return moss_index(self.rewards[arm], self.pulls[arm], self.t, self.nbArms)
         else:
             if self.pulls[arm] > self.threshold_switch(self.t, self.nbArms):
-                self.self.use_MOSS_index[arm] = True
+                self.use_MOSS_index[arm] = True
                 return moss_index(self.rewards[arm], self.pulls[arm], self.t, self.nbArms)
             else:  # default is to use kl-UCB index
                 return klucb_index(self.rewards[arm], self.pulls[arm], self.t, self.nbArms, klucb=self.klucb, c=self.c, tolerance=self.tolerance)
+
+    def computeAllIndex(self):
+        """ Compute the current indexes for all arms, in a vectorized manner: the MOSS indexes for the arms which switched, and the kl-UCB indexes (the costly ones) only for the other arms."""
+        self.use_MOSS_index |= self.pulls > self.threshold_switch(self.t, self.nbArms)
+        pulls = np.maximum(1, self.pulls)
+        indexes = moss_indexes(self.rewards, pulls, self.t, self.nbArms)
+        use_klucb = ~self.use_MOSS_index
+        if np.any(use_klucb):
+            indexes[use_klucb] = klucb_indexes(self.rewards[use_klucb], pulls[use_klucb], self.t, self.nbArms, klucb=self.klucb_vect, c=self.c, tolerance=self.tolerance)
+        indexes[self.pulls < 1] = float('+inf')
+        self.index[:] = indexes
@@ -10,7 +10,8 @@
 .. warning::
 
     All functions are *not* vectorized, and assume only one value for each argument.
-    If you want vectorized function, use the wrapper :py:class:`numpy.vectorize`:
+    The KL-UCB indexes (and the divergences they use) have a vectorized version, computing the same values on arrays, with the suffix ``_vect``: :func:`klucbBern_vect`, :func:`klBern_vect`, etc (see :func:`vectorize_klucb`).
+    For the other functions, if you want vectorized function, use the wrapper :py:class:`numpy.vectorize`:
 
     >>> import numpy as np
     >>> klBern_vect = np.vectorize(klBern)
@@ -598,6 +599,157 @@ def klucbGamma(x, d, precision=1e-6):
     return klucb(x, d, klGamma, max(upperbound, 1e2), min(-1e2, lowerbound), precision)
 
 
+# --- Vectorized KL functions and KL-UCB indexes, for arrays of values
+
+def klBern_vect(x, y):
+    r""" Kullback-Leibler divergence for Bernoulli distributions, vectorized version of :func:`klBern`.
+
+    >>> klBern_vect([0.5, 0.1, 0.4], [0.5, 0.9, 0.5])  # doctest: +ELLIPSIS
+    array([0.        , 1.757779..., 0.020135...])
+    """
+    x = np.clip(x, eps, 1 - eps)
+    y = np.clip(y, eps, 1 - eps)
+    return x * np.log(x / y) + (1 - x) * np.log((1 - x) / (1 - y))
+
+
+def klPoisson_vect(x, y):
+    r""" Kullback-Leibler divergence for Poison distributions, vectorized version of :func:`klPoisson`.
+
+    >>> klPoisson_vect([3, 2, 4], [3, 6, 8])  # doctest: +ELLIPSIS
+    array([0.        , 1.802775..., 1.227411...])
+    """
+    x = np.maximum(x, eps)
+    y = np.maximum(y, eps)
+    return y - x + x * np.log(x / y)
+
+
+def klGamma_vect(x, y, a=1):
+    r""" Kullback-Leibler divergence for gamma distributions, vectorized version of :func:`klGamma`.
+
+    >>> klGamma_vect([3, 2, 0], [3, 6, 8])  # doctest: +ELLIPSIS
+    array([0.        , 0.431945...,        inf])
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.maximum(x, eps) / np.maximum(y, eps)
+        return np.where((x <= 0) | (y <= 0), float('+inf'), a * (ratio - 1 - np.log(ratio)))
+
+
+def klucb_vect(x, d, kl_vect, upperbound,
+        precision=1e-6, lowerbound=float('-inf'), max_iterations=50,
+    ):
+    r""" The generic KL-UCB index computation, vectorized version of :func:`klucb`.
+
+    - ``x``, ``d``, ``upperbound`` and ``lowerbound`` can be arrays (or numbers), and ``kl_vect`` has to be a vectorized KL divergence (:func:`klBern_vect`, etc).
+    - It is the same bisection search as :func:`klucb`, done on all the values at once: each value stops moving as soon as its own interval is smaller than ``precision``, so the result is exactly the one of :func:`klucb` for each value, and the number of steps is the one of the slowest value (at most ``max_iterations``).
+
+    >>> x, d = [0.1, 0.5, 0.9], [0.2, 0.4, 0.9]
+    >>> klucb_vect(x, d, klBern_vect, 1., 1e-4)  # doctest: +ELLIPSIS
+    array([0.378..., 0.871..., 0.999...])
+    >>> np.array_equal(klucb_vect(x, d, klBern_vect, 1., 1e-4), [klucb(xk, dk, klBern, 1., 1e-4) for xk, dk in zip(x, d)])
+    True
+    """
+    value = np.maximum(np.asarray(x, dtype=float), lowerbound)
+    x, d, u = (np.broadcast_to(np.asarray(array, dtype=float), value.shape) for array in (x, d, upperbound))
+    for _ in range(max_iterations):
+        running = u - value > precision
+        if not np.any(running):
+            break
+        m = (value + u) * 0.5
+        above = kl_vect(x, m) > d
+        u = np.where(running & above, m, u)
+        value = np.where(running & ~above, m, value)
+    return (value + u) * 0.5
+
+
+def klucbBern_vect(x, d, precision=1e-6):
+    """ KL-UCB index computation for Bernoulli distributions, vectorized version of :func:`klucbBern`, using :func:`klucb_vect`.
+
+    >>> klucbBern_vect([0.1, 0.5, 0.9], 0.2)  # doctest: +ELLIPSIS
+    array([0.378..., 0.787..., 0.994...])
+    """
+    upperbound = np.minimum(1., klucbGauss_vect(x, d, sig2x=0.25))  # variance 1/4 for [0,1] bounded distributions
+    return klucb_vect(x, d, klBern_vect, upperbound, precision)
+
+
+def klucbGauss_vect(x, d, sig2x=0.25, precision=0.):
+    """ KL-UCB index computation for Gaussian distributions, vectorized version of :func:`klucbGauss`.
+
+    >>> klucbGauss_vect([0.1, 0.5, 0.9], 0.2)  # doctest: +ELLIPSIS
+    array([0.416..., 0.816..., 1.216...])
+    """
+    return np.asarray(x, dtype=float) + np.sqrt(np.abs(2 * sig2x * np.asarray(d, dtype=float)))
+
+
+def klucbPoisson_vect(x, d, precision=1e-6):
+    """ KL-UCB index computation for Poisson distributions, vectorized version of :func:`klucbPoisson`, using :func:`klucb_vect`.
+
+    >>> klucbPoisson_vect([0.1, 0.5, 0.9], 0.2)  # doctest: +ELLIPSIS
+    array([0.450..., 1.089..., 1.640...])
+    """
+    x, d = np.asarray(x, dtype=float), np.asarray(d, dtype=float)
+    upperbound = x + d + np.sqrt(d * d + 2 * x * d)  # looks safe, to check: left (Gaussian) tail of Poisson dev
+    return klucb_vect(x, d, klPoisson_vect, upperbound, precision)
+
+
+def _exponential_bounds(x, d):
+    """ The bounds used by :func:`klucbExp` and :func:`klucbGamma`, on arrays."""
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        upperbound = np.where(d < 0.77, x / (1 + 2. / 3 * d - np.sqrt(4. / 9 * d * d + 2 * d)), x * np.exp(d + 1))
+        lowerbound = np.where(d > 1.61, x * np.exp(d), x / (1 + d - np.sqrt(d * d + 2 * d)))
+    return upperbound, lowerbound
+
+
+def klucbExp_vect(x, d, precision=1e-6):
+    """ KL-UCB index computation for exponential distributions, vectorized version of :func:`klucbExp`, using :func:`klucb_vect`.
+
+    >>> klucbExp_vect([0.1, 0.5, 0.9], 0.2)  # doctest: +ELLIPSIS
+    array([0.202..., 1.013..., 1.824...])
+    """
+    x, d = np.asarray(x, dtype=float), np.asarray(d, dtype=float)
+    upperbound, lowerbound = _exponential_bounds(x, d)
+    return klucb_vect(x, d, klGamma_vect, upperbound, precision, lowerbound)
+
+
+def klucbGamma_vect(x, d, precision=1e-6):
+    """ KL-UCB index computation for Gamma distributions, vectorized version of :func:`klucbGamma` (with the same arguments given to the bisection search), using :func:`klucb_vect`.
+
+    >>> klucbGamma_vect([0.1, 0.5, 0.9], 0.2)  # doctest: +ELLIPSIS
+    array([0.202..., 1.013..., 1.824...])
+    """
+    x, d = np.asarray(x, dtype=float), np.asarray(d, dtype=float)
+    upperbound, lowerbound = _exponential_bounds(x, d)
+    return klucb_vect(x, d, klGamma_vect, np.maximum(upperbound, 1e2), np.minimum(-1e2, lowerbound), precision)
+
+
+#: Vectorized version of each KL-UCB index function, see :func:`vectorize_klucb`.
+KLUCB_VECT = {
+    klucbBern: klucbBern_vect,
+    klucbGauss: klucbGauss_vect,
+    klucbPoisson: klucbPoisson_vect,
+    klucbExp: klucbExp_vect,
+    klucbGamma: klucbGamma_vect,
+}
+
+
+def vectorize_klucb(klucb):
+    """ Return the vectorized version of a KL-UCB index function, :func:`klucbBern_vect` for :func:`klucbBern`, etc.
+
+    - For another function, it is wrapped in :py:class:`numpy.vectorize`, which is a Python loop on the values.
+
+    >>> vectorize_klucb(klucbBern) is klucbBern_vect
+    True
+    >>> klucbBern_05 = lambda x, d, precision=1e-6: klucbBern(x, d / 2., precision)
+    >>> vectorize_klucb(klucbBern_05)([0.1, 0.5, 0.9], 0.4)  # doctest: +ELLIPSIS
+    array([0.378..., 0.787..., 0.994...])
+    """
+    if klucb in KLUCB_VECT:
+        return KLUCB_VECT[klucb]
+    klucb_vect = np.vectorize(klucb)
+    klucb_vect.__name__ = klucb.__name__
+    return klucb_vect
+
+
 # --- KL functions, for the KL Lower Confidence Bound
 
 @jit
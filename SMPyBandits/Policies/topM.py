@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+r""" Defines the functions used everywhere to select the best arm, the ``rank``-th best arm, or the ``M`` best arms, from a vector of values (indexes, empirical means, trusts etc), with uniform random tie-breaking.
+
+- They never fully sort the K values: they use :func:`numpy.partition` (introselect), of expected cost :math:`\mathcal{O}(K)` instead of :math:`\mathcal{O}(K \log K)` for :func:`numpy.sort`,
+- this matters for multi-players policies (:class:`PoliciesMultiPlayers.rhoRand`, :class:`PoliciesMultiPlayers.RandTopM`, :class:`PoliciesMultiPlayers.MCTopM`, :class:`PoliciesMultiPlayers.CentralizedMultiplePlay` etc), which call them at every step for every player.
+- If the values contain ``nan``, a uniformly random choice is returned instead.
+"""
+from __future__ import division, print_function  # Python 2 compatibility
+
+__author__ = "Lilian Besson"
+__version__ = "0.9"
+
+import numpy as np
+import numpy.random as rn
+
+
+# --- Utility functions
+
+
+def argmax_with_ties(values):
+    r""" Return an index of maximal value, chosen uniformly at random among the ties:
+
+    .. math:: A \sim U(\arg\max_{1 \leq k \leq K} v_k).
+
+    >>> np.random.seed(0)  # reproductible
+    >>> argmax_with_ties([1, 3, 2])
+    1
+    >>> [argmax_with_ties([3, 1, 3, 0, 3]) for _ in range(8)]
+    [0, 2, 0, 2, 2, 4, 0, 4]
+    """
+    values = np.asarray(values)
+    candidates = np.flatnonzero(values == np.max(values))
+    if len(candidates) == 1:
+        return candidates[0]
+    elif len(candidates) == 0:
+        return rn.randint(len(values))
+    return candidates[rn.randint(len(candidates))]
+
+
+def kth_largest_with_ties(values, rank=1):
+    r""" Return an index whose value is the ``rank``-th largest, chosen uniformly at random among the ties (``rank=1`` gives an index of maximal value).
+
+    >>> np.random.seed(0)  # reproductible
+    >>> values = [0.1, 0.9, 0.5, 0.7, 0.3]
+    >>> [kth_largest_with_ties(values, rank) for rank in range(1, 6)]
+    [1, 3, 2, 4, 0]
+
+    - If two values are tied for the ``rank``-th position, one of them is chosen uniformly at random:
+
+    >>> [kth_largest_with_ties([2, 1, 2, 2], rank=2) for _ in range(8)]
+    [0, 2, 0, 2, 2, 3, 0, 3]
+    """
+    values = np.asarray(values)
+    nbArms = len(values)
+    assert 1 <= rank <= nbArms, "Error: for kth_largest_with_ties(values, rank={}), rank has to be between 1 and K = {}.".format(rank, nbArms)  # DEBUG
+    threshold = np.partition(values, nbArms - rank)[nbArms - rank]
+    candidates = np.flatnonzero(values == threshold)
+    if len(candidates) == 1:
+        return candidates[0]
+    elif len(candidates) == 0:
+        return rn.randint(nbArms)
+    return candidates[rn.randint(len(candidates))]
+
+
+def topM_with_ties(values, M=1, shuffle=False):
+    r""" Return the (not sorted) array of the indexes of the ``M`` largest values.
+
+    - All the indexes whose values are strictly larger than the ``M``-th largest value are chosen, and the remaining ones are chosen uniformly at random among the ties.
+    - If ``shuffle`` is True, the indexes are returned in a uniformly random order (as :func:`numpy.random.choice` does).
+
+    >>> np.random.seed(0)  # reproductible
+    >>> values = [0.1, 0.9, 0.5, 0.7, 0.3]
+    >>> sorted(topM_with_ties(values, 2))
+    [1, 3]
+    >>> sorted(topM_with_ties(values, 4))
+    [1, 2, 3, 4]
+    >>> [sorted(topM_with_ties([3, 2, 2, 2, 1], 2)) for _ in range(4)]
+    [[0, 3], [0, 3], [0, 1], [0, 3]]
+    """
+    values = np.asarray(values)
+    nbArms = len(values)
+    assert 1 <= M <= nbArms, "Error: for topM_with_ties(values, M={}), M has to be between 1 and K = {}.".format(M, nbArms)  # DEBUG
+    if M == nbArms:
+        return rn.permutation(nbArms)
+    # the M largest values are at the end, and the (M+1)-th largest is just before
+    order = np.argpartition(values, (nbArms - M - 1, nbArms - M))
+    threshold = values[order[nbArms - M]]
+    if values[order[nbArms - M - 1]] < threshold:
+        # no tie between the M-th and the (M+1)-th largest values, the M best arms are uniquely defined
+        chosen = order[nbArms - M:]
+    else:
+        better = np.flatnonzero(values > threshold)
+        ties = np.flatnonzero(values == threshold)
+        nbTies = M - len(better)
+        if len(ties) < nbTies:  # only possible with nan values
+            return rn.choice(nbArms, size=M, replace=False)
+        chosen = np.concatenate((better, ties[rn.permutation(len(ties))[:nbTies]]))
+    if shuffle:
+        rn.shuffle(chosen)
+    return chosen
+
+
+# --- Debugging
+
+if __name__ == "__main__":
+    # Code for debugging purposes.
+    from doctest import testmod
+    print("\nTesting automatically all the docstring written in each functions of this module :")
+    testmod(verbose=True)
@@ -12,6 +12,12 @@ __version__ = "0.3"
 class BaseMPPolicy(object):
     """ Base class for any multi-players policy."""
 
+    def __new__(cls, *args, **kwargs):
+        """ Create the policy, and keep the parameters given to its class, to be able to build it again (with fresh children) in a parallel worker, see :class:`Environment.EvaluatorMultiPlayers.PlayersFactory`."""
+        self = super(BaseMPPolicy, cls).__new__(cls)
+        self._params = (args, kwargs)
+        return self
+
     def __init__(self):
         """New policy"""
         pass
@@ -21,6 +27,14 @@ class BaseMPPolicy(object):
 
     # --- Proxy methods
 
+    def stackedPlayers(self, players):
+        """ Return an engine playing all these players (the children of this policy) in one vectorized pass, or None if they can not be stacked, see :class:`StackedPlayers.StackedPlayers`."""
+        try:
+            from .StackedPlayers import stack_players
+        except ImportError:
+            from StackedPlayers import stack_players
+        return stack_players(players)
+
     def _startGame_one(self, playerId):
         """Forward the call to self._players[playerId]."""
         return self._players[playerId].startGame()
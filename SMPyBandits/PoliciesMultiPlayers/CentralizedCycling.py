@@ -36,8 +36,8 @@ class Cycling(BaseCentralizedPolicy):
         return "Cycling({})".format(self.offset)
 
     def startGame(self):
-        """Nothing to do."""
-        pass
+        """Start to cycle from the offset."""
+        self.t = -1
 
     def getReward(self, arm, reward):
         """Nothing to do."""
@@ -75,6 +75,7 @@ class CentralizedMultiplePlay(BaseMPPolicy):
         """Pass the call to the player algorithm."""
         if playerId == 0:  # For the first player, run the method
             self.player.startGame()
+            self.choices = (-10000) * np.ones(self.nbArms, dtype=int)
         # For the other players, nothing to do? Yes
         self.affectation_order = np.random.permutation(self.nbPlayers)
 
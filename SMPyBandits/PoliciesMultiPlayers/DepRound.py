@@ -7,7 +7,8 @@ The distribution :math:`(p_1, \dots, p_K)` on :math:`\{1,\dots,K\}` is assumed t
 
 Dependent rounding developed by [Gandhi et al.] is a kind of technique that randomly selects a set of edges from a bipartite graph under some cardinality constraints.
 
-- It runs in :math:`\mathcal{O}(K)` space complexity, and at most :math:`\mathcal{O}(K^2)` time complexity (note that the article [Uchiya et al., 2010] wrongly claim it is in :math:`\mathcal{O}(K)`).
+- Instead of choosing random pairs of fractional weights one by one, the weights are rounded all at once along a random order of the actions, with systematic sampling: the :math:`k` actions whose intervals :math:`[p_1 + \dots + p_{i-1}, p_1 + \dots + p_i)` contain one of the points :math:`U, U+1, \dots, U+k-1` are taken, for one uniform :math:`U` in :math:`[0, 1)`. As :math:`p_i \leq 1`, these are :math:`k` distinct actions, and each action :math:`i` is selected with probability exactly :math:`p_i`,
+- so it runs in :math:`\mathcal{O}(K)` space and :math:`\mathcal{O}(K \log K)` time, with array operations only, and :func:`DepRoundBatch` gives :math:`B` independent subsets (for :math:`B` repetitions or :math:`B` future steps) in one call.
 - References: see also https://www.cs.umd.edu/~samir/grant/jacm06.pdf
 """
 from __future__ import division, print_function  # Python 2 compatibility
@@ -16,12 +17,6 @@ __author__ = "Lilian Besson"
 __version__ = "0.6"
 
 import numpy as np
-from random import random
-
-try:
-    from .with_proba import with_proba
-except ImportError:
-    from with_proba import with_proba
 
 
 # --- Utility functions
@@ -30,7 +25,7 @@ except ImportError:
 def DepRound(weights_p, k=1):
     r""" [[Algorithms for adversarial bandit problems with multiple plays, by T.Uchiya, A.Nakamura and M.Kudo, 2010](http://hdl.handle.net/2115/47057)] Figure 5 (page 15) is a very clean presentation of the algorithm.
 
-    - Inputs: :math:`k < K` and weights_p :math:`= (p_1, \dots, p_K)` such that :math:`\sum_{i=1}^{K} p_i = k` (or :math:`= 1`).
+    - Inputs: :math:`k < K` and weights_p :math:`= (p_1, \dots, p_K)` such that :math:`\sum_{i=1}^{K} p_i = k` (or any positive weights, that are multiplied by :math:`k / \sum_{i=1}^{K} p_i`).
     - Output: A subset of :math:`\{1,\dots,K\}` with exactly :math:`k` elements. Each action :math:`i` is selected with probability exactly :math:`p_i`.
 
     Example:
@@ -42,73 +37,83 @@ def DepRound(weights_p, k=1):
 
     >>> weights_p = [ 2, 2, 2, 2, 2 ]  # all equal weights
     >>> DepRound(weights_p, k)
-    [3, 4]
-    >>> DepRound(weights_p, k)
-    [3, 4]
+    [1, 3]
     >>> DepRound(weights_p, k)
     [0, 1]
+    >>> DepRound(weights_p, k)
+    [1, 3]
 
     >>> weights_p = [ 10, 8, 6, 4, 2 ]  # decreasing weights
     >>> DepRound(weights_p, k)
-    [0, 4]
+    [0, 2]
     >>> DepRound(weights_p, k)
-    [1, 2]
+    [0, 1]
     >>> DepRound(weights_p, k)
-    [3, 4]
+    [0, 1]
 
     >>> weights_p = [ 3, 3, 0, 0, 3 ]  # decreasing weights
     >>> DepRound(weights_p, k)
-    [0, 4]
+    [1, 4]
     >>> DepRound(weights_p, k)
-    [0, 4]
+    [1, 4]
     >>> DepRound(weights_p, k)
-    [0, 4]
+    [0, 1]
     >>> DepRound(weights_p, k)
     [0, 1]
 
     - See [[Gandhi et al, 2006](http://dl.acm.org/citation.cfm?id=1147956)] for the details.
     """
-    p = np.array(weights_p)
-    K = len(p)
-    # Checks
+    K = np.size(weights_p)
     assert k < K, "Error: k = {} should be < K = {}.".format(k, K)  # DEBUG
-    if not np.isclose(np.sum(p), 1):
-        p = p / np.sum(p)
-    assert np.all(0 <= p) and np.all(p <= 1), "Error: the weights (p_1, ..., p_K) should all be 0 <= p_i <= 1 ...".format(p)  # DEBUG
-    assert np.isclose(np.sum(p), 1), "Error: the sum of weights p_1 + ... + p_K should be = 1 (= {}).".format(np.sum(p))  # DEBUG
-    # Main loop
-    possible_ij = [a for a in range(K) if 0 < p[a] < 1]
-    while possible_ij:
-        # Choose distinct i, j with 0 < p_i, p_j < 1
-        if len(possible_ij) == 1:
-            i = np.random.choice(possible_ij, size=1)
-            j = i
-        else:
-            i, j = np.random.choice(possible_ij, size=2, replace=False)
-        pi, pj = p[i], p[j]
-        assert 0 < pi < 1, "Error: pi = {} (with i = {}) is not 0 < pi < 1.".format(pi, i)  # DEBUG
-        assert 0 < pj < 1, "Error: pj = {} (with j = {}) is not 0 < pj < 1.".format(pj, i)  # DEBUG
-        assert i != j, "Error: i = {} is different than with j = {}.".format(i, j)  # DEBUG
-
-        # Set alpha, beta
-        alpha, beta = min(1 - pi, pj), min(pi, 1 - pj)
-        proba = alpha / (alpha + beta)
-        if with_proba(proba):  # with probability = proba = alpha/(alpha+beta)
-            pi, pj = pi + alpha, pj - alpha
-        else:            # with probability = 1 - proba = beta/(alpha+beta)
-            pi, pj = pi - beta, pj + beta
-
-        # Store
-        p[i], p[j] = pi, pj
-        # And update
-        possible_ij = [a for a in range(K) if 0 < p[a] < 1]
-        if len([a for a in range(K) if np.isclose(p[a], 0)]) == K - k:
-            break
-    # Final step
-    subset = [a for a in range(K) if np.isclose(p[a], 1)]
-    if len(subset) < k:
-        subset = [a for a in range(K) if not np.isclose(p[a], 0)]
-    assert len(subset) == k, "Error: DepRound({}, {}) is supposed to return a set of size {}, but {} has size {}...".format(weights_p, k, k, subset, len(subset))  # DEBUG
-    return subset
+    return [int(a) for a in DepRoundBatch(weights_p, k=k)[0]]
 
 
+def DepRoundBatch(weights_p, k=1, size=1):
+    r""" Draw ``size`` independent subsets of :math:`k` actions with :func:`DepRound`, in one call.
+
+    - ``weights_p`` can be one vector :math:`(p_1, \dots, p_K)`, used for all the subsets, or an array of shape ``(size, K)`` with the weights of each subset,
+    - it returns an array of shape ``(size, k)``, with the (sorted) actions of each subset,
+    - each action :math:`i` is in each subset with probability exactly :math:`p_i`.
+
+    >>> np.random.seed(0)  # for reproductibility!
+    >>> DepRoundBatch([0.2, 0.5, 0.8, 0.5], k=2, size=3)
+    array([[0, 1],
+           [2, 3],
+           [1, 2]])
+
+    The marginals are the weights (here with :math:`10^5` subsets):
+
+    >>> weights_p = np.array([0.1, 0.9, 0.25, 0.75, 0.5, 0.5, 0., 1.])
+    >>> subsets = DepRoundBatch(weights_p, k=4, size=100000)
+    >>> marginals = np.bincount(subsets.ravel(), minlength=8) / 100000.
+    >>> np.all(np.abs(marginals - weights_p) < 4 * np.sqrt(weights_p * (1 - weights_p) / 100000.) + 1e-12)
+    True
+    """
+    p = np.array(weights_p, dtype=float, ndmin=2)
+    size = max(size, len(p))
+    K = np.shape(p)[1]
+    # Checks
+    assert 1 <= k <= K, "Error: k = {} should be 1 <= k <= K = {}.".format(k, K)  # DEBUG
+    sums = np.sum(p, axis=1, keepdims=True)
+    if not np.allclose(sums, k):
+        p = p * (k / sums)
+    assert np.all(0 <= p) and np.all(p <= 1 + 1e-9), "Error: the weights (p_1, ..., p_K) should all be 0 <= p_i <= 1 ...".format(p)  # DEBUG
+    p = np.broadcast_to(np.minimum(p, 1), (size, K))
+    # Round the weights along a random order of the actions
+    order = np.argsort(np.random.random_sample((size, K)), axis=1)
+    cumsums = np.cumsum(np.take_along_axis(p, order, axis=1), axis=1)
+    # the k points U, U+1, ..., U+k-1 fall into the intervals of k distinct actions
+    points = np.random.random_sample((size, 1)) + np.arange(k)
+    offsets = (k + 1) * np.arange(size)[:, np.newaxis]  # to search all the rows at once
+    cumsums[:, -1] = k + 1  # the sum is k, up to rounding errors
+    positions = np.searchsorted((cumsums + offsets).ravel(), (points + offsets).ravel(), side='right').reshape(size, k) - K * np.arange(size)[:, np.newaxis]
+    return np.sort(np.take_along_axis(order, positions, axis=1), axis=1)
+
+
+# --- Debugging
+
+if __name__ == "__main__":
+    # Code for debugging purposes.
+    from doctest import testmod
+    print("\nTesting automatically all the docstring written in each functions of this module :")
+    testmod(verbose=True)
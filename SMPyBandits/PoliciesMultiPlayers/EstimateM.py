@@ -169,9 +169,9 @@ class oneEstimateM(ChildPointer):
 
     def startGame(self):
         """Start game."""
-        self._policy.startGame()
         self.nbPlayersEstimate = 1  # Optimistic: start by assuming it is alone!
         self.updateNbPlayers()
+        self._policy.startGame()  # after resetting its maxRank, as it can draw a random rank
         self.collisionCount.fill(0)
         self.timeSinceLastCollision = 0
         self.t = 0
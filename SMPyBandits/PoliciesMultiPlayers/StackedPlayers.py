@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+""" StackedPlayers: play all the children of an homogeneous decentralized multi-player policy in one vectorized pass.
+
+In a simulation, each of the M players is a :class:`ChildPointer`, that forwards each call to the mother policy, that forwards it to its own index policy: one step costs M chains of method calls and M calls to ``computeAllIndex()``.
+
+- If all the players are the children of one :class:`Selfish`, :class:`rhoRand`, :class:`rhoRandRotating` or :class:`RandTopM` policy (including :class:`MCTopM` and the other variants), using an index policy that can be stacked (see :class:`Policies.StackedChildren`),
+- then the statistics of the M index policies are stored as (M, K) arrays, and the M indexes are computed in one pass,
+- the M choices (best arm, rank-th best arm, or arm kept in the estimated M-best set) are computed with numpy from the (M, K) indexes,
+- the feedback from the collision model (rewards, collisions, and the new random ranks after a collision) is given to all the players at once.
+
+The trajectories are *identical* to the ones obtained with the players used one by one, for a fixed seed:
+
+- only the decisions that do not use the random generator are vectorized,
+- when a player has to use it (tie between arms, new random arm in the estimated M-best set, etc), the method of the player is called, with its state synchronized, and these calls are done in the increasing order of the players, as before.
+
+Example::
+
+    >>> players = rhoRand(3, 5, UCB).children
+    >>> stacked = stack_players(players)  # or None if they can not be stacked
+    >>> stacked.startGame()
+    >>> choices = stacked.choice()  # array of the 3 choices
+    >>> # ... the collision model calls stacked.dispatch_feedback(choices, rewards, received, collided, collisionRewards)
+    >>> stacked.sync()  # then the players can be used one by one
+"""
+from __future__ import division, print_function  # Python 2 compatibility
+
+__author__ = "Lilian Besson"
+__version__ = "0.9"
+
+import numpy as np
+import numpy.random as rn
+
+try:
+    from .Selfish import SelfishChildPointer
+    from .rhoRand import oneRhoRand
+    from .rhoRandRotating import oneRhoRandRotating
+    from .RandTopM import oneRandTopM
+except ImportError:
+    from Selfish import SelfishChildPointer
+    from rhoRand import oneRhoRand
+    from rhoRandRotating import oneRhoRandRotating
+    from RandTopM import oneRandTopM
+
+try:
+    from sys import path
+    path.insert(0, '..')
+    from Policies.StackedChildren import StackedChildren, are_homogeneous
+except ImportError:
+    from SMPyBandits.Policies.StackedChildren import StackedChildren, are_homogeneous
+
+
+#: Mapping of the supported classes of children to the kind of decision they make.
+KINDS = {
+    SelfishChildPointer: "selfish",
+    oneRhoRand: "rank",
+    oneRhoRandRotating: "rotating",
+    oneRandTopM: "topM",
+}
+
+
+# --- Utility function
+
+def stack_players(players):
+    """ Return a :class:`StackedPlayers` engine for these players, or None if they can not be stacked (then they have to be used one by one).
+
+    - The players have to be *all* the children of one supported multi-player policy, in order,
+    - and the index policies of the children have to be homogeneous, with indexes computed exactly the same in one vectorized pass.
+    """
+    if len(players) < 2 or type(players[0]) not in KINDS:
+        return None
+    mother = getattr(players[0], 'mother', None)
+    children = getattr(mother, 'children', None)
+    if children is None or len(children) != len(players) or any(player is not child for (player, child) in zip(players, children)):
+        return None
+    if any(type(player) is not type(players[0]) for player in players):
+        return None
+    if KINDS[type(players[0])] != "selfish" and any(player.maxRank > player.nbArms for player in players):
+        return None
+    if not are_homogeneous(mother._players):
+        return None
+    stacked = StackedPlayers(players)
+    if not stacked.policies.is_vectorized:
+        return None
+    return stacked
+
+
+# --- Class StackedPlayers
+
+class StackedPlayers(object):
+    """ Engine playing all the children of an homogeneous decentralized multi-player policy in one vectorized pass.
+
+    - It is used by the simulation in place of the list of players: ``choice()`` gives the M choices, and ``dispatch_feedback()`` receives the feedback of the collision model (see :func:`Environment.CollisionModels.dispatch_feedback`).
+    - The internal state of the players (ranks, chosen arms etc) is kept in arrays, and copied back to them only when :meth:`sync` is called.
+    """
+
+    def __init__(self, players):
+        self.players = players  #: List of the M players (children of the mother policy).
+        self.mother = players[0].mother  #: Mother multi-player policy.
+        self.nbPlayers = len(players)  #: Number M of players.
+        self.nbArms = players[0].nbArms  #: Number K of arms.
+        self.kind = KINDS[type(players[0])]  #: Kind of decision of the players: "selfish", "rank", "rotating" or "topM".
+        self.policies = StackedChildren(self.mother._players, exact=True)  #: Stacked memory of the M index policies.
+        self.maxRank = getattr(players[0], 'maxRank', self.nbPlayers)  #: Max rank of the players.
+        # Internal state of the players
+        self.ranks = np.ones(self.nbPlayers, dtype=int)  #: Current ranks, for rhoRand and rhoRandRotating.
+        self.t = np.zeros(self.nbPlayers, dtype=int)  #: Internal times of the players, for RandTopM.
+        self.chosen = np.full(self.nbPlayers, -1, dtype=int)  #: Current chosen arms (-1 for None), for RandTopM.
+        self.sitted = np.zeros(self.nbPlayers, dtype=bool)  #: Sitted players, for RandTopM with chair.
+        self.prevWorst = np.zeros((self.nbPlayers, self.nbArms), dtype=bool)  #: Masks of the arms worst than the chosen one at previous time step, for RandTopM.
+        if self.kind == "topM":
+            self._withChair = players[0]._withChair
+            self._exitIfWorstWasPicked = players[0]._exitIfWorstWasPicked
+            self._pickPrevWorstFirst = players[0]._pickPrevWorstFirst
+        self._load()
+
+    def __str__(self):
+        return "StackedPlayers({})".format(self.mother)
+
+    def __len__(self):
+        return self.nbPlayers
+
+    def __getitem__(self, playerId):
+        return self.players[playerId]
+
+    def __iter__(self):
+        return iter(self.players)
+
+    # --- Synchronization of the state of the players
+
+    def _load(self, playerId=None):
+        """ Copy the internal state of one player (or all) to the arrays."""
+        for i in (range(self.nbPlayers) if playerId is None else [playerId]):
+            player = self.players[i]
+            if self.kind in ("rank", "rotating"):
+                self.ranks[i] = player.rank
+            elif self.kind == "topM":
+                self.t[i] = player.t
+                self.chosen[i] = -1 if player.chosen_arm is None else player.chosen_arm
+                self.sitted[i] = player.sitted
+                self.prevWorst[i] = False
+                self.prevWorst[i, np.asarray(player.prevWorst, dtype=int)] = True
+
+    def _save(self, playerId=None):
+        """ Copy the internal state of one player (or all) from the arrays back to the player."""
+        self.policies.sync(child=playerId)
+        for i in (range(self.nbPlayers) if playerId is None else [playerId]):
+            player = self.players[i]
+            if self.kind in ("rank", "rotating"):
+                player.rank = int(self.ranks[i])
+            elif self.kind == "topM":
+                player.t = int(self.t[i])
+                player.chosen_arm = None if self.chosen[i] < 0 else int(self.chosen[i])
+                player.sitted = bool(self.sitted[i])
+                player.prevWorst = np.flatnonzero(self.prevWorst[i])
+
+    def sync(self):
+        """ Copy the internal state of all the players back to them, to be able to use them one by one."""
+        self._save()
+
+    def _call(self, playerId, method, *args):
+        """ Call a method of one player, with its state synchronized before and after."""
+        self._save(playerId)
+        result = getattr(self.players[playerId], method)(*args)
+        self._load(playerId)
+        return result
+
+    # --- Start game, choices and feedback
+
+    def startGame(self):
+        """ Start the game for each player (in order, as their random initial ranks are drawn here)."""
+        for player in self.players:
+            player.startGame()
+        self.policies.startGame()
+        self._load()
+
+    def choice(self, active=None):
+        """ Return the array of the M choices of the players.
+
+        - The M x K indexes (or only the rows of the activated players) are computed in one pass, and the choices that do not need the random generator are vectorized,
+        - the other players (ties, new random arm etc) make their choice one by one, in increasing order.
+        - If ``active`` is given (boolean mask of the activated players, for sparse players), only these players make a choice, and the others get -1.
+        """
+        nbPlayers, nbArms = self.nbPlayers, self.nbArms
+        if active is None:
+            active = np.ones(nbPlayers, dtype=bool)
+            self.policies.computeAllIndex()
+        else:
+            self.policies.computeAllIndex(rows=np.flatnonzero(active))  # the indexes of the other players are not used
+        index = self.policies.index
+        candidates = active & ~np.isnan(index).any(axis=1)
+        if self.kind == "selfish":
+            isBest = index == index.max(axis=1)[:, np.newaxis]
+            fast = (np.count_nonzero(isBest, axis=1) == 1) & candidates
+            choices = isBest.argmax(axis=1)
+        elif self.kind in ("rank", "rotating"):
+            # the rank-th largest index, like Policies.topM.kth_largest_with_ties, partitioning each row only around the ranks in use
+            thresholds = np.partition(index, np.unique(nbArms - self.ranks), axis=1)[np.arange(nbPlayers), nbArms - self.ranks]
+            isThreshold = index == thresholds[:, np.newaxis]
+            fast = (np.count_nonzero(isThreshold, axis=1) == 1) & candidates
+            choices = isThreshold.argmax(axis=1)
+            if self.kind == "rotating":
+                self.ranks[fast] = (self.ranks[fast] % self.maxRank) + 1
+        else:
+            choices = self._choiceTopM(index, candidates)
+            fast = choices >= 0
+        for i in np.flatnonzero(active & ~fast):
+            choices[i] = self._call(i, 'choice')
+        choices[~active] = -1
+        return choices
+
+    def _choiceTopM(self, index, candidates):
+        """ Vectorized part of :meth:`oneRandTopM.choice`: choices of the candidate players who keep their arm, or -1 for players who have to use the random generator."""
+        nbPlayers, nbArms = index.shape
+        players = np.arange(nbPlayers)
+        initial = self.t < nbArms
+        # Force to sample each arm at least one
+        isBest = index == np.max(index, axis=1, keepdims=True)
+        fast = initial & (np.count_nonzero(isBest, axis=1) == 1) & candidates
+        chosen = np.where(fast, np.argmax(isBest, axis=1), self.chosen)
+        # But now, trust the estimated set Mbest, uniquely defined only if there is no tie at its boundary
+        if self.maxRank < nbArms:
+            # the M-th and (M+1)-th largest indexes, like Policies.topM.topM_with_ties
+            partitionedIndex = np.partition(index, (nbArms - self.maxRank - 1, nbArms - self.maxRank), axis=1)
+            worstOfMbest = partitionedIndex[:, nbArms - self.maxRank]
+            keep = ~initial & candidates & (partitionedIndex[:, nbArms - self.maxRank - 1] < worstOfMbest)
+            keep &= index[players, np.maximum(chosen, 0)] >= worstOfMbest
+            if self._exitIfWorstWasPicked:
+                # a player finds the worst arm of Mbest with a sort, it is the same without sorting only if it is unique
+                isWorst = index == worstOfMbest[:, np.newaxis]
+                keep &= (np.count_nonzero(isWorst, axis=1) == 1) & (chosen != np.argmax(isWorst, axis=1))
+            fast |= keep
+        self.t[fast] += 1
+        self.chosen[fast] = chosen[fast]
+        if self._pickPrevWorstFirst:
+            self.prevWorst[fast] = index[fast] <= index[players[fast], chosen[fast]][:, np.newaxis]
+        return np.where(fast, chosen, -1)
+
+    def dispatch_feedback(self, choices, rewards, received, collided, collisionRewards=None):
+        """ Give their feedback to all the players at once, as :func:`Environment.CollisionModels.dispatch_feedback` would do one by one.
+
+        - The rewards of the players in ``received`` and the collisions (with ``collisionRewards``, or the penalty for :class:`Selfish`) are added to the stacked statistics,
+        - the colliding rhoRand players draw their new random ranks, and the colliding RandTopM players choose a new arm, one by one, in increasing order.
+        """
+        if self.kind == "topM" and self._withChair:
+            self.sitted[received & (self.t >= self.nbArms)] = True
+        # Rewards of the players who received one, and rewards given after a collision
+        if self.kind == "selfish":
+            # Give a reward of 0, or player.lower, or self.penalty, in case of collision
+            collisionRewards = self.policies.lower[:, 0] if self.mother.penalty is None else np.full(self.nbPlayers, self.mother.penalty)
+        elif collisionRewards is None:
+            collisionRewards = np.zeros(self.nbPlayers)
+        if np.any(received & collided):
+            # some players receive a reward *and* a collision (e.g., rewardIsSharedUniformly): two batches
+            for (fed, fedRewards) in ((np.flatnonzero(received), rewards), (np.flatnonzero(collided), collisionRewards)):
+                if len(fed) > 0:
+                    self.policies.getReward(choices[fed], fedRewards[fed], child=fed)
+        else:
+            fed = np.flatnonzero(received | collided)
+            if len(fed) > 0:
+                self.policies.getReward(choices[fed], np.where(collided, collisionRewards, rewards)[fed], child=fed)
+        if self.kind == "selfish" or not np.any(collided):
+            return
+        colliders = np.flatnonzero(collided)
+        if self.kind in ("rank", "rotating"):
+            self.ranks[colliders] = 1 + rn.randint(self.maxRank, size=len(colliders))  # New random ranks
+        else:
+            for i in colliders:
+                if not (self._withChair and self.sitted[i]):
+                    self._call(i, 'handleCollision', choices[i], None)  # New random arm, the reward was already given
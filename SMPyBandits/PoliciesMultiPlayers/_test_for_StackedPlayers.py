@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+""" Test and benchmark of the stacked multi-player engine :class:`StackedPlayers`.
+
+For a few homogeneous decentralized policies (``Selfish``, ``rhoRand``, ``rhoRandRotating``, ``RandTopM``, ``MCTopM`` and variants, with ``UCB`` or ``klUCB``) and collision models, it checks that:
+
+- the players are stacked,
+- one repetition played with the stacked engine gives *exactly* the same trajectory (choices, rewards and collisions) as with the players used one by one, for the same seed,
+
+and it reports the time of both simulations.
+
+It exits with status 1 if one configuration fails the checks.
+By default, it runs quickly as a test (a short horizon, one seed and only ``UCB``), and with ``BENCHMARK=True`` it uses a longer horizon, two seeds and ``klUCB`` too (it takes a few minutes):
+
+$ cd SMPyBandits
+$ python PoliciesMultiPlayers/_test_for_StackedPlayers.py
+$ BENCHMARK=True python PoliciesMultiPlayers/_test_for_StackedPlayers.py
+Policy                         Collision model            stacked  same   |  one by one   stacked  (s)
+Selfish(6 x UCB)               onlyUniqUserGetsReward     True     True   |        1.38      1.10
+...
+RandTopM(6 x kl-UCB)           onlyUniqUserGetsReward     True     True   |       26.85     10.66
+...
+"""
+from __future__ import division, print_function  # Python 2 compatibility
+
+__author__ = "Lilian Besson"
+__version__ = "0.9"
+
+import sys
+from os import getenv
+import numpy as np
+
+try:
+    from Arms import Bernoulli
+    from Environment import MAB
+    from Environment.CollisionModels import onlyUniqUserGetsReward, rewardIsSharedUniformly, closerUserGetsReward
+    from Environment.EvaluatorMultiPlayers import delayed_play
+    from Policies import UCB, klUCB
+    from PoliciesMultiPlayers import Selfish, rhoRand, rhoRandRotating, RandTopM, RandTopMCautious, MCTopM, MCTopMExtraCautious
+except ImportError:
+    sys.path.insert(0, '.')
+    sys.path.insert(0, '..')
+    from Arms import Bernoulli
+    from Environment import MAB
+    from Environment.CollisionModels import onlyUniqUserGetsReward, rewardIsSharedUniformly, closerUserGetsReward
+    from Environment.EvaluatorMultiPlayers import delayed_play
+    from Policies import UCB, klUCB
+    from PoliciesMultiPlayers import Selfish, rhoRand, rhoRandRotating, RandTopM, RandTopMCautious, MCTopM, MCTopMExtraCautious
+
+
+#: Run the long benchmark instead of the short test? Use ``BENCHMARK=True`` to enable it.
+BENCHMARK = getenv('BENCHMARK', 'False') == 'True'
+
+#: Number of players.
+NB_PLAYERS = 6
+
+#: Means of the arms.
+MEANS = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+
+#: Horizon of the simulations.
+HORIZON = 3000 if BENCHMARK else 300
+
+#: Seeds of the repetitions.
+SEEDS = (0, 1) if BENCHMARK else (0,)
+
+#: Multi-player policies to check.
+POLICIES = (Selfish, rhoRand, rhoRandRotating, RandTopM, RandTopMCautious, MCTopM, MCTopMExtraCautious)
+
+#: Index policies used by the players.
+PLAYER_ALGOS = (UCB, klUCB) if BENCHMARK else (UCB,)
+
+#: Collision models to check.
+COLLISION_MODELS = (onlyUniqUserGetsReward, rewardIsSharedUniformly, closerUserGetsReward)
+
+
+# --- Utility functions
+
+def play(env, policy, collisionModel, seed, stack_players, horizon=HORIZON):
+    """ Play one repetition, with or without the stacked engine, and return the result."""
+    return delayed_play(env, policy.children, horizon, collisionModel, seed=seed, repeatId=1, stack_players=stack_players)
+
+
+def is_stacked(policy):
+    """ True if the children of this policy can be stacked."""
+    return policy.stackedPlayers(policy.children) is not None
+
+
+def same_trajectory(first, second):
+    """ True if the two results have exactly the same choices, rewards and collisions."""
+    return np.array_equal(first.choices, second.choices) and np.array_equal(first.sumRewards, second.sumRewards) and np.array_equal(first.cumRewards, second.cumRewards) and np.array_equal(first.collisions, second.collisions)
+
+
+# --- Main function
+
+def main():
+    """ Check and benchmark all the configurations, print a report, and return the list of the failing ones."""
+    failures = []
+    env = MAB({"arm_type": Bernoulli, "params": MEANS})
+    print("{:<30} {:<26} {:<8} {:<6} | {:>11} {:>9}  (s)".format("Policy", "Collision model", "stacked", "same", "one by one", "stacked"))
+    for policyClass in POLICIES:
+        for playerAlgo in PLAYER_ALGOS:
+            for collisionModel in COLLISION_MODELS:
+                policy = policyClass(NB_PLAYERS, len(MEANS), playerAlgo)
+                stacked = is_stacked(policy)
+                same, times = True, [0, 0]
+                for seed in SEEDS:
+                    results = [play(env, policy, collisionModel, seed, stack_players) for stack_players in (False, True)]
+                    same = same and same_trajectory(*results)
+                    times = [time + result.running_time for (time, result) in zip(times, results)]
+                print("{:<30} {:<26} {:<8} {:<6} | {:>11.2f} {:>9.2f}".format(str(policy), collisionModel.__name__, str(stacked), str(same), *times))
+                if not (stacked and same):
+                    failures.append((str(policy), collisionModel.__name__))
+    if failures:
+        print("\nThe {} following configurations fail the checks: {}".format(len(failures), failures))
+    else:
+        print("\nAll the configurations are stacked, with the same trajectories.")
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
@@ -111,6 +111,6 @@ class rhoRandRotating(rhoRand):
             self.children[playerId] = oneRhoRandRotating(maxRank, self, playerId)
 
     def __str__(self):
-        return "rhoRandRotating({} x {}{})".format(self.nbPlayers, str(self._players[0]))
+        return "rhoRandRotating({} x {})".format(self.nbPlayers, str(self._players[0]))
 
 
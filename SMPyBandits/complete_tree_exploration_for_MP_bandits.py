@@ -13,10 +13,7 @@ Features:
 - The graph can contain all nodes from root to leafs, or only leafs (with summed probabilities), and possibly only the absorbing nodes are showed.
 - Support export of the tree to a GraphViz dot graph, and can save it to SVG/PNG and LaTeX (with Tikz) and PDF etc.
 - By default, the root is highlighted in green and the absorbing nodes are in red.
-
-.. warning:: I still have to fix these issues:
-
-   - TODO : right now, it is not so efficient, could it be improved? I don't think I can do anything in a smarter way, in pure Python.
+- By default, the states are explored depth by depth with a :class:`ExplorationDAG`: a state reached by different paths is expanded only once (with a transposition table), states that are the same up to a permutation of the players (or of arms with the same mean) are merged, and each depth can be expanded in parallel by a pool of processes (``N_JOBS`` env variable). Use ``DAG=False`` to explore the whole tree of :class:`State` recursively, as before.
 
 
 Requirements:
@@ -45,8 +42,10 @@ __author__ = "Lilian Besson"
 __version__ = "0.7"
 
 from collections import Counter, deque
+from copy import copy
 from fractions import Fraction
-from itertools import product
+from itertools import permutations, product
+from multiprocessing import Pool, cpu_count
 from os import getenv, chdir, getcwd
 from os.path import join as os_path_join
 from os.path import dirname, basename
@@ -124,6 +123,15 @@ CONCISE = mybool(getenv('CONCISE', CONCISE))
 FULLHASH = not CONCISE  #: Use only Stilde, N for hashing the states.
 FULLHASH = mybool(getenv('FULLHASH', FULLHASH))
 
+DAG = True  #: By default, explore the states with a :class:`ExplorationDAG` (memoized, depth by depth), not with the recursive exploration of a tree of :class:`State`.
+DAG = mybool(getenv('DAG', DAG))
+
+SYMMETRIES = True  #: By default, the :class:`ExplorationDAG` merges the states that are the same up to a permutation of the players (and of the arms with the same mean).
+SYMMETRIES = mybool(getenv('SYMMETRIES', SYMMETRIES))
+
+N_JOBS = 1  #: Number of processes used to expand each depth of the :class:`ExplorationDAG` (1 to not use a pool of processes, -1 to use all the CPU cores).
+N_JOBS = int(getenv('N_JOBS', N_JOBS))
+
 # FORMAT = "pdf"  #: Format used to save the graphs.
 FORMAT = "svg"  #: Format used to save the graphs.
 FORMAT = getenv("FORMAT", FORMAT)
@@ -899,6 +907,34 @@ class State(object):
                 if proba == 0: continue
                 yield (delta, proba)
 
+    # --- Transitions without copying the state, used by ExplorationDAG
+
+    def with_arrays(self, arrays, memories=None, depth=0):
+        """Get a new state with same parameters (mus, players etc), using the (4, M, K) array ``arrays`` as S, Stilde, N, Ntilde (*not* copied), and no probas and no children."""
+        state = copy(self)
+        state.S, state.Stilde, state.N, state.Ntilde = arrays
+        state.t = np.sum(state.N[0])
+        state.depth = depth
+        state.children, state.probas = [], []
+        return state
+
+    def all_decisions(self):
+        """Generator that yields all the possible decisions of the players, as tuples ``(decisions, memories, number)``: the memories are None for a state without memory, and each decision has probability ``1 / number``."""
+        all_decisions = [ player(j, self) for j, player in enumerate(self.players) ]
+        number_of_decisions = prod(len(decisions) for decisions in all_decisions)
+        for decisions in product(*all_decisions):
+            yield decisions, None, number_of_decisions
+
+    def all_transitions(self):
+        """Generator that yields all the transitions from this state, by blocks of :math:`2^K` coin flips, without copying the state.
+
+        - Each value is ``(memories, increments, probas)``: for each coin flip ``c``, the next state has arrays S, Stilde, N, Ntilde equal to the ones of this state plus ``increments[c]`` (of shape (4, M, K)), and memories ``memories``, with probability ``probas[c]``,
+        - it gives the same transitions as :meth:`all_deltas` (including the ones of probability 0).
+        """
+        coin_flips, probas_of_coin_flips = coin_flips_and_probas(self.mus)
+        for decisions, memories, number in self.all_decisions():
+            yield memories, decisions_increments(decisions, coin_flips, self.M, self.K), [proba / number for proba in probas_of_coin_flips]
+
     # --- Main functions, all explorations are depth first search (not the best, it's just easier...)
 
     def pretty_print_result_recursively(self):
@@ -1041,11 +1077,307 @@ class StateWithMemory(State):
                     if proba == 0: continue
                     yield (delta, proba)
 
+    def with_arrays(self, arrays, memories=None, depth=0):
+        """Get a new state with same parameters (mus, players etc), using the (4, M, K) array ``arrays`` as S, Stilde, N, Ntilde (*not* copied) and these memories, and no probas and no children."""
+        state = super(StateWithMemory, self).with_arrays(arrays, depth=depth)
+        if memories is not None:
+            state.memories = memories
+        return state
+
+    def all_decisions(self):
+        """Generator that yields all the possible decisions of the players and their next memories, as tuples ``(decisions, memories, number)``, each with probability ``1 / number``."""
+        all_decisions = [ player(j, self) for j, player in enumerate(self.players) ]
+        number_of_decisions = prod(len(decisions) for decisions in all_decisions)
+        for decisions in product(*all_decisions):
+            counter = Counter(decisions)
+            collisions = [counter.get(k, 0) >= 2 for k in range(self.K)]
+            all_memories = [ update_memory(j, self, decisions[j], collisions[decisions[j]]) for j, update_memory in enumerate(self.update_memories) ]
+            number_of_memories = prod(len(memories) for memories in all_memories)
+            for memories in product(*all_memories):
+                yield decisions, memories, number_of_decisions * number_of_memories
+
+
+# --- Memoized exploration of the states, depth by depth, as a DAG
+
+ASYMMETRIC_POLICIES = (FixedArm, )  #: Policies that depend on the index of the player or on the index of the arms: their players and arms cannot be permuted.
+
+MAX_ARM_PERMUTATIONS = 720  #: Do not use the symmetries of the arms if there are more permutations of the arms with the same mean than this.
+
+_coin_flips_and_probas = dict()  # cache of the values of coin_flips_and_probas(mus)
+
+def coin_flips_and_probas(mus):
+    """Array of shape (:math:`2^K`, K) of all the coin flips of the K arms, and the list of their probabilities, for Bernoulli arms of means ``mus`` (computed only once for each ``mus``)."""
+    key = tuple(mus)
+    if key not in _coin_flips_and_probas:
+        coin_flips = list(product([0, 1], repeat=len(mus)))
+        probas = [prod(mu if b else (1 - mu) for b, mu in zip(coin_flip, mus)) for coin_flip in coin_flips]
+        _coin_flips_and_probas[key] = (np.array(coin_flips, dtype=int), probas)
+    return _coin_flips_and_probas[key]
+
+def decisions_increments(decisions, coin_flips, M, K):
+    """Array of shape (:math:`2^K`, 4, M, K) of the increments of S, Stilde, N, Ntilde when the M players play these decisions, for each coin flip of the K arms.
+
+    >>> decisions_increments((0, 0), np.array([[0, 1], [1, 1]]), 2, 2)[1]  # two players collide on arm 0
+    array([[[1, 0],
+            [1, 0]],
+    <BLANKLINE>
+           [[0, 0],
+            [0, 0]],
+    <BLANKLINE>
+           [[1, 0],
+            [1, 0]],
+    <BLANKLINE>
+           [[0, 0],
+            [0, 0]]])
+    """
+    choices = np.zeros((M, K), dtype=int)
+    choices[np.arange(M), list(decisions)] = 1
+    noCollision = np.sum(choices, axis=0) < 2
+    increments = np.zeros((len(coin_flips), 4, M, K), dtype=int)
+    increments[:, 0] = choices * coin_flips[:, np.newaxis, :]  # sensing feedback
+    increments[:, 1] = increments[:, 0] * noCollision  # number of succesful transmissions
+    increments[:, 2] = choices  # number of sensing trials
+    increments[:, 3] = choices * noCollision  # number of trials without collisions
+    return increments
+
+def plain(memory):
+    """Convert a memory (possibly using numpy integers or booleans) to plain Python values, to encode it."""
+    if isinstance(memory, tuple):
+        return tuple(plain(m) for m in memory)
+    if isinstance(memory, np.generic):
+        return memory.item()
+    return memory
+
+def symmetries_of(root):
+    """Groups of players that can be permuted (same policy and same update of their memory), and list of the permutations of the arms with the same mean, for the states of this root.
+
+    - Arms can be permuted only for memory-less players: policies with a memory use ``np.argsort`` on the indexes, which does not break the ties symmetrically,
+    - Nothing can be permuted for the :data:`ASYMMETRIC_POLICIES`.
+    """
+    update_memories = getattr(root, 'update_memories', None)
+    if any(player in ASYMMETRIC_POLICIES for player in root.players):
+        return [], [None]
+    # players with the same policy (and update of their memory)
+    policies = [(player, None if update_memories is None else update_memories[j]) for j, player in enumerate(root.players)]
+    groups = []
+    for policy in policies:
+        group = [j for j, other in enumerate(policies) if other == policy]
+        if len(group) > 1 and group not in groups:
+            groups.append(group)
+    if update_memories is not None:
+        return groups, [None]
+    # arms with the same mean
+    arms = []
+    for k, mu in enumerate(root.mus):
+        for same in arms:
+            if bool(root.mus[same[0]] == mu):
+                same.append(k)
+                break
+        else:
+            arms.append([k])
+    if prod(len(list(permutations(same))) for same in arms if len(same) > 1) > MAX_ARM_PERMUTATIONS:
+        print("Warning: too many permutations of the arms with the same mean, the symmetries of the arms are not used...")  # DEBUG
+        return groups, [None]
+    armPermutations = []
+    for sames in product(*[permutations(same) for same in arms]):
+        permutation = np.zeros(root.K, dtype=int)
+        for same, other in zip(arms, sames):
+            permutation[list(same)] = other
+        armPermutations.append(None if np.all(permutation == np.arange(root.K)) else permutation)
+    return groups, armPermutations
+
+def canonical_form(arrays, memories=None, groups=(), armPermutations=(None, )):
+    """Canonical form of a state, up to the permutations of the players in each group and the permutations of the arms.
+
+    - ``arrays`` is the (4, M, K) array of S, Stilde, N, Ntilde, and ``memories`` is None or the tuple of the memories of the players,
+    - it returns ``(key, arrays, memories)``, where ``key`` is a compact byte encoding of the state, used for the transposition table of :class:`ExplorationDAG`,
+    - for each permutation of the arms, the rows of the players of each group are sorted, and the state with the smallest key is kept.
+
+    >>> S = np.array([[0, 1], [1, 0]])
+    >>> key1, arrays1, _ = canonical_form(np.array([S, S, S, S]), groups=[[0, 1]])
+    >>> key2, arrays2, _ = canonical_form(np.array([S[::-1], S[::-1], S[::-1], S[::-1]]), groups=[[0, 1]])
+    >>> key1 == key2, np.array_equal(arrays1, arrays2)
+    (True, True)
+    """
+    best = None
+    for permutation in armPermutations:
+        candidate = arrays if permutation is None else arrays[:, :, permutation]
+        order = list(range(np.shape(arrays)[1]))
+        for group in groups:
+            ordered = sorted(group, key=lambda j: (candidate[:, j, :].tobytes(), repr(None if memories is None else memories[j])))
+            for position, j in zip(group, ordered):
+                order[position] = j
+        candidate = candidate[:, order, :]
+        candidateMemories = None if memories is None else tuple(memories[j] for j in order)
+        key = candidate.tobytes() + repr(candidateMemories).encode()
+        if best is None or key < best[0]:
+            best = (key, candidate, candidateMemories)
+    return best
+
+def expand_node(root, arrays, memories, groups, armPermutations):
+    """List of the ``(key, arrays, memories, proba)`` of the canonical children of the state given by ``arrays`` and ``memories`` (using the parameters of ``root``), with the probabilities of the transitions leading to the same child summed."""
+    state = root.with_arrays(arrays, memories)
+    children = dict()
+    for childMemories, increments, probas in state.all_transitions():
+        childMemories = None if childMemories is None else plain(childMemories)
+        for increment, proba in zip(increments, probas):
+            if proba == 0: continue
+            key, childArrays, childMemories2 = canonical_form(arrays + increment, childMemories, groups, armPermutations)
+            if key in children:
+                children[key][3] += proba
+            else:
+                children[key] = [key, childArrays, childMemories2, proba]
+    return list(children.values())
+
+_worker = dict()  # parameters of the process of a pool used by ExplorationDAG
+
+def _init_worker(root, groups, armPermutations):
+    """Store the parameters of the exploration in a process of the pool."""
+    _worker.update(root=root, groups=groups, armPermutations=armPermutations)
+
+def _expand_nodes(nodes):
+    """Expand a chunk of nodes (list of ``(arrays, memories)``), in a process of the pool."""
+    return [expand_node(_worker['root'], arrays, memories, _worker['groups'], _worker['armPermutations']) for arrays, memories in nodes]
+
+
+class ExplorationDAG(object):
+    """Memoized exploration of the states reachable from a root state, depth by depth, as a directed acyclic graph (DAG).
+
+    - The nodes of each depth are stored in one array of shape (n, 4, M, K) (S, Stilde, N, Ntilde of each node), with the list of their memories (None for memory-less players), the list of their probabilities of being reached from the root, and the list of the edges ``(parent, child, proba)`` from the previous depth,
+    - a transposition table maps the compact byte encoding of each state (see :func:`canonical_form`) to its node, so a state reached by different paths is expanded only once, with the summed probability of these paths,
+    - if ``symmetries=True``, the states that are the same up to a permutation of the players using the same policy, or of the arms with the same mean, are merged (see :func:`symmetries_of`),
+    - each depth is expanded in parallel with a pool of ``n_jobs`` processes, if ``n_jobs > 1``.
+
+    It can be used like the root :class:`State` of a tree: :meth:`explore_from_node_to_depth`, :meth:`get_unique_leafs`, :meth:`proba_reaching_absorbing_state`, :meth:`find_N_absorbing_states`, :meth:`to_dot` and :meth:`saveto` work the same way.
+    """
+
+    def __init__(self, root, n_jobs=N_JOBS, symmetries=SYMMETRIES):
+        self.root = root  #: The root state
+        self.M, self.K, self.mus = root.M, root.K, root.mus
+        self.n_jobs = cpu_count() if n_jobs < 1 else n_jobs  #: Number of processes used to expand each depth
+        self.groups, self.armPermutations = symmetries_of(root) if symmetries else ([], [None])
+        self.depth = 0  #: Depth explored so far
+        self.nodes = [np.array([[root.S, root.Stilde, root.N, root.Ntilde]])]  #: For each depth, array of shape (n, 4, M, K) of the S, Stilde, N, Ntilde of the nodes
+        self.memories = [[plain(root.memories) if hasattr(root, 'memories') else None]]  #: For each depth, list of the memories of the nodes
+        self.reach = [[1]]  #: For each depth, list of the probabilities of reaching the nodes from the root
+        self.edges = [[]]  #: For each depth, list of the edges ``(parent, child, proba)`` from a node of the previous depth
+
+    def __str__(self):
+        return "    ExplorationDAG : explored up-to depth {}, with {} unique states, from this root:\n{}".format(self.depth, sum(len(nodes) for nodes in self.nodes), self.root)
+
+    def to_node(self, concise=CONCISE):
+        """Print the root state as a small string to be attached to a GraphViz node."""
+        return self.root.to_node(concise=concise)
+
+    def is_absorbing(self):
+        """Is the root state absorbing?"""
+        return self.root.is_absorbing()
+
+    def state(self, depth, index):
+        """The :class:`State` (or :class:`StateWithMemory`) of this node, with depth = the number of depths explored after it."""
+        return self.root.with_arrays(self.nodes[depth][index], self.memories[depth][index], depth=self.depth - depth)
+
+    # --- Exploration
+
+    def explore_from_node_to_depth(self, depth=1):
+        """Explore all the states up-to that depth, one depth at a time."""
+        while self.depth < depth:
+            self.explore_one_depth()
+
+    def explore_one_depth(self):
+        """Expand all the nodes of the last depth (in parallel if ``n_jobs > 1``), and merge their children with a transposition table."""
+        nodes = list(zip(self.nodes[-1], self.memories[-1]))
+        if self.n_jobs > 1 and len(nodes) > 1:
+            chunks = [list(chunk) for chunk in np.array_split(np.arange(len(nodes)), min(len(nodes), 4 * self.n_jobs))]
+            pool = Pool(self.n_jobs, initializer=_init_worker, initargs=(self.root, self.groups, self.armPermutations))
+            try:
+                expanded = [children for chunk in pool.map(_expand_nodes, [[nodes[i] for i in chunk] for chunk in chunks]) for children in chunk]
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            expanded = [expand_node(self.root, arrays, memories, self.groups, self.armPermutations) for arrays, memories in nodes]
+        table = dict()  # transposition table, from the key of a state to its index
+        children, memories, reach, edges = [], [], [], []
+        for parent, transitions in enumerate(expanded):
+            for key, childArrays, childMemories, proba in transitions:
+                index = table.get(key)
+                if index is None:
+                    index = table[key] = len(children)
+                    children.append(childArrays)
+                    memories.append(childMemories)
+                    reach.append(0)
+                reach[index] += self.reach[-1][parent] * proba
+                edges.append((parent, index, proba))
+        self.nodes.append(np.array(children))
+        self.memories.append(memories)
+        self.reach.append(reach)
+        self.edges.append(edges)
+        self.depth += 1
+        print("   at depth {} we saw {} different unique states (from {} states)...".format(self.depth, len(children), len(nodes)))
+
+    def all_absorbing_states(self, depth=1):
+        """Generator that yields all the absorbing nodes up-to that depth, one by one, with their probability of being reached from the root, exploring one depth at a time."""
+        for d in range(1, depth + 1):
+            if d > self.depth:
+                self.explore_one_depth()
+            for index in range(len(self.nodes[d])):
+                state = self.state(d, index)
+                if state.is_absorbing():
+                    yield self.reach[d][index], state
+
+    # Same as for a State
+    find_N_absorbing_states = State.__dict__['find_N_absorbing_states']
+    proba_reaching_absorbing_state = State.__dict__['proba_reaching_absorbing_state']
+    saveto = State.__dict__['saveto']
+
+    def get_unique_leafs(self):
+        """The unique leafs (nodes of the deepest depth), with their full probabilities."""
+        return [simplify(p) for p in self.reach[-1]], [self.state(self.depth, index) for index in range(len(self.nodes[-1]))]
+
+    # --- Export to .dot graph
+
+    def to_dot(self,
+               title="", name="", comment="",
+               latex=False, html_in_var_names=False, ext=FORMAT,
+               onlyleafs=ONLYLEAFS, onlyabsorbing=ONLYABSORBING, concise=CONCISE):
+        """Convert the DAG to a .dot graph, using GraphViz, with one node for each unique state (same options as :meth:`State.to_dot`)."""
+        if onlyleafs:
+            return State.__dict__['to_dot'](self, title=title, name=name, comment=comment,
+                                            latex=latex, html_in_var_names=html_in_var_names, ext=ext,
+                                            onlyleafs=onlyleafs, onlyabsorbing=onlyabsorbing, concise=concise)
+        if sum(len(nodes) for nodes in self.nodes) > 1024:
+            raise ValueError("Useless to save a DAG with more than 1024 nodes, the resulting image will be too large to be viewed.")  # DEBUG
+        dot = Digraph(name=name, comment=comment, format=ext)
+        print("\nCreating a dot graph from the DAG...")
+        dot.attr(overlap="false")
+        if title: dot.attr(label=wraptext(title))
+        states = [[self.state(depth, index) for index in range(len(nodes))] for depth, nodes in enumerate(self.nodes)]
+        absorbing = [[state.is_absorbing() for state in level] for level in states]
+        # a node is useful if it has an absorbing node in its descendants
+        useful = [list(level) for level in absorbing]
+        for depth in range(self.depth, 0, -1):
+            for parent, child, _ in self.edges[depth]:
+                useful[depth - 1][parent] |= useful[depth][child]
+        for depth, level in enumerate(states):
+            for index, state in enumerate(level):
+                node_name = "{}_{}".format(depth, index)
+                if depth == 0:
+                    dot.node(node_name, state.to_node(concise=concise), color="green")
+                elif absorbing[depth][index]:
+                    dot.node(node_name, state.to_node(concise=concise), color="red")
+                elif not onlyabsorbing or useful[depth][index]:
+                    dot.node(node_name, state.to_node(concise=concise))
+            for parent, child, proba in self.edges[depth]:
+                if onlyabsorbing and not useful[depth][child]: continue
+                dot.edge("{}_{}".format(depth - 1, parent), "{}_{}".format(depth, child), label=proba2str(simplify(proba), latex=latex, html_in_var_names=html_in_var_names), color="red" if absorbing[depth - 1][parent] else "black")
+        return dot
+
 
 # --- Main function
 
-def main(depth=1, players=None, update_memories=None, mus=None, M=2, K=2, S=None, Stilde=None, N=None, Ntilde=None, find_only_N=None):
-    """Compute all the transitions, and print them."""
+def main(depth=1, players=None, update_memories=None, mus=None, M=2, K=2, S=None, Stilde=None, N=None, Ntilde=None, find_only_N=None, dag=DAG, n_jobs=N_JOBS):
+    """Compute all the transitions, and print them (with a :class:`ExplorationDAG` if ``dag=True``, using ``n_jobs`` processes)."""
     if S is not None:
         M = min(np.shape(S))
         K = max(np.shape(S))
@@ -1073,6 +1405,8 @@ def main(depth=1, players=None, update_memories=None, mus=None, M=2, K=2, S=None
         root = StateWithMemory(S=S, Stilde=Stilde, N=N, Ntilde=Ntilde, mus=mus, players=players, update_memories=update_memories)
     else:
         root = State(S=S, Stilde=Stilde, N=N, Ntilde=Ntilde, mus=mus, players=players)
+    if dag:
+        root = ExplorationDAG(root, n_jobs=n_jobs)
     # Should we only look for find_only_N absorbing child?
     print("\nStarting to explore transitions up-to depth {} for this root state:\n{}".format(depth, root))
     print("    Using these policies:")
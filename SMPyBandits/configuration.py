@@ -91,6 +91,10 @@ TEST_WrapRange = False  # XXX do not let this = False if you want to test my Wra
 CACHE_REWARDS = True  # XXX to manually enable this feature?
 CACHE_REWARDS = False  # XXX to manually disable this feature?
 
+#: Number of samples of each arm drawn at once by the environments (0 to draw them one by one), see :meth:`Environment.MAB.MAB.draw`.
+DRAW_BLOCK_SIZE = 4096
+DRAW_BLOCK_SIZE = int(getenv('DRAW_BLOCK_SIZE', DRAW_BLOCK_SIZE))
+
 #: Should the Aggregator policy update the trusts in each child or just the one trusted for last decision?
 UPDATE_ALL_CHILDREN = True
 UPDATE_ALL_CHILDREN = False  # XXX do not let this = False
@@ -175,6 +179,8 @@ configuration = {
     # "plot_lowerbound": False,
     # --- Cache rewards: use the same random rewards for the Aggregator[..] and the algorithms
     "cache_rewards": CACHE_REWARDS,
+    # --- Samples of the arms drawn in advance, by blocks
+    "draw_block_size": DRAW_BLOCK_SIZE,
     "environment_bayesian": ENVIRONMENT_BAYESIAN,
     # --- Arms
     "environment": [  # XXX Bernoulli arms
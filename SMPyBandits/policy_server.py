@@ -14,6 +14,10 @@ Options:
     --port=<PORT>   Port to use for the TCP connection [default: 10000].
     --host=<HOST>   Address to use for the TCP connection [default: 0.0.0.0].
     --means=<MEANS> Means of arms used by the environment, to print regret [default: None].
+
+Protocol:
+    - a message that is a float is the reward of the last chosen arm, and the server replies with the next chosen arm,
+    - a message that is a JSON object ``{"arms": [...], "rewards": [...], "n": 10}`` is a batch of feedbacks, given to the policy with ``getRewards(arms, rewards)``, and the server replies with the JSON list of the ``n`` next chosen arms, from ``choiceBatch(n)``.
 """
 from __future__ import division, print_function  # Python 2 compatibility
 
@@ -42,6 +46,10 @@ default_configuration = {
         }
     }
 
+#: Size of the chunks used to receive a batch message (bigger than the 16 bytes of a single reward).
+BUFFER_SIZE = 4096
+
+
 def read_configuration_policy(a_string):
     """ Return a valid configuration dictionary to initialize a policy, from the input string."""
     obj = json.loads(a_string)
@@ -49,6 +57,40 @@ def read_configuration_policy(a_string):
     return obj
 
 
+def read_batch_message(connection, message):
+    """ Keep receiving data from the connection until the JSON object started in message is complete, and return it as a dictionary with keys ``arms``, ``rewards`` and ``n``.
+
+    >>> server_side, client_side = socket.socketpair()
+    >>> client_side.sendall(b'0, 2], "rewards": [1, 0.5], "n": 3}')
+    >>> batch = read_batch_message(server_side, '{"arms": [')
+    >>> batch["arms"], batch["rewards"], batch["n"]
+    ([0, 2], [1, 0.5], 3)
+
+    If the connection is closed before the end of the JSON object, the message is incomplete:
+
+    >>> client_side.sendall(b'0, 2], "rewa')
+    >>> client_side.close()
+    >>> read_batch_message(server_side, '{"arms": [')  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    ValueError: Incomplete batch message = ...
+    >>> server_side.close()
+    """
+    while True:
+        try:
+            batch = json.loads(message)
+            break
+        except ValueError:
+            data = connection.recv(BUFFER_SIZE)
+            if not data:
+                raise ValueError("Incomplete batch message = '{!r}'...".format(message))
+            message += data.decode()
+    assert isinstance(batch, dict), "Error: invalid batch message = '{!r}', it should be a JSON object.".format(message)  # DEBUG
+    arms, rewards = batch.get("arms", []), batch.get("rewards", [])
+    assert len(arms) == len(rewards), "Error: invalid batch message, with {} arms but {} rewards.".format(len(arms), len(rewards))  # DEBUG
+    return {"arms": arms, "rewards": rewards, "n": int(batch.get("n", 1))}
+
+
 def server(policy, host, port, means=None):
     """
     Launch a server that:
@@ -56,6 +98,7 @@ def server(policy, host, port, means=None):
     - uses sockets to listen to input and reply
     - create a learning algorithm from a JSON configuration (exactly like ``main.py`` when it reads ``configuration.py``)
     - then receives feedback ``(arm, reward)`` from the network, pass it to the algorithm, listens to his ``arm = choice()`` suggestion, and sends this back to the network.
+    - or receives a batch of feedbacks ``{"arms": [...], "rewards": [...], "n": n}``, pass it to the algorithm with ``getRewards(arms, rewards)``, and sends back the ``n`` next arms from ``choiceBatch(n)``.
     """
     has_index = hasattr(policy, "index")
 
@@ -109,6 +152,21 @@ def server(policy, host, port, means=None):
                     data = connection.recv(16)
                     message = data.decode()
                     print("\nData received: {!r}".format(message))
+                    if message.lstrip().startswith("{"):
+                        try:
+                            batch = read_batch_message(connection, message)
+                        except (ValueError, AssertionError) as e:
+                            print("Unable to read the batch message... ({})".format(e))  # DEBUG
+                            continue
+                        print("Passing a batch of {} rewards to the policy, and asking for the {} next arms...".format(len(batch["rewards"]), batch["n"]))
+                        if len(batch["arms"]) > 0:
+                            policy.getRewards(batch["arms"], batch["rewards"])
+                        chosen_arms = policy.choiceBatch(batch["n"])
+                        chosen_arm = chosen_arms[-1] if len(chosen_arms) > 0 else chosen_arm
+                        message = json.dumps([int(arm) for arm in chosen_arms])
+                        print("Sending: '{!r}'...".format(message))
+                        connection.sendall(message.encode())
+                        continue
                     try:
                         reward = float(message)
 